@@ -1,19 +1,22 @@
 """This module contains the introduction model example."""
 import copy
 
-from uppyyl_observation_matcher.backend.helper import load_observation_data_from_csv, load_model_from_file, \
-    get_instance_data
+from uppyyl_observation_matcher.backend.helper import load_observation_data_from_csv
 from uppyyl_observation_matcher.backend.matching import ObservationMatcher
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.helper import \
-    generate_and_save_preprocess_model, init_directories_and_paths
+    init_directories_and_paths
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.matcher_model_configs import \
     all_matcher_model_configs
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_cache import \
+    PreprocessedModelCache
 from uppyyl_observation_matcher_experiments.definitions import RES_DIR
 
 experiment_sub_path = f'example_models/introduction_example'
 experiment_input_folder = RES_DIR.joinpath(experiment_sub_path)
 experiment_log_dir_path = RES_DIR.parent.joinpath("./logs")
 main_config_path = RES_DIR.joinpath(f'config.ini')
+model_cache = PreprocessedModelCache(
+    cache_dir_path=experiment_log_dir_path.joinpath("introduction_example/cache/preprocessed_models"))
 
 
 def experiment_introduction_example():
@@ -36,13 +39,10 @@ def experiment_introduction_example():
     run_timeout = 30
 
     # Prepare model
-    input_model = load_model_from_file(model_path=config["original_model_file_path"])
-    instance_data = get_instance_data(model=input_model, config=config)
+    instance_data, preprocessed_model = model_cache.load_preprocessed_model(config=config)
     observation_data = load_observation_data_from_csv(
         csv_data_file_path=config["csv_data_file_path"], instance_data=instance_data)
     print(f'Observation data:\n{observation_data}')
-    preprocessed_model = generate_and_save_preprocess_model(
-        model=input_model, instance_data=instance_data, config=config)
 
     # Prepare trace matcher
     observation_matcher = ObservationMatcher(
@@ -0,0 +1,336 @@
+"""This module implements an online monitoring mode, which matches a sliding window of a growing observation stream
+against a prepared matcher."""
+import collections
+import copy
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+
+from uppyyl_observation_matcher.backend.helper import load_observation_data_from_csv
+from uppyyl_observation_matcher.backend.matching import ObservationMatcher
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.helper import \
+    init_directories_and_paths
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.matcher_model_configs import \
+    all_matcher_model_configs
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_cache import \
+    PreprocessedModelCache
+from uppyyl_observation_matcher_experiments.backend.helper import calculate_min_max_avg_float
+
+########################################################################################################################
+# Monitor configurations #
+########################################################################################################################
+default_monitor_config = {
+    "window_size": 10,  # The maximum number of observation rows in the window
+    "window_step": 1,  # The number of new rows after which the window is matched again
+    "poll_interval": 0.5,  # The time (in seconds) between two polls of a tailed file at its end
+    "idle_timeout": None,  # The time (in seconds) after which a tailed file without new rows is closed (None: never)
+    "run_timeout": 30,  # The timeout (in seconds) of the matching of a single window
+}
+
+stdin_source = "-"
+window_rows_file_name = "window_rows.csv"
+monitor_log_file_name = "monitor_log.jsonl"
+
+
+########################################################################################################################
+# Observation stream #
+########################################################################################################################
+def follow_lines(stream, follow=True, poll_interval=0.5, idle_timeout=None, stop_event=None):
+    """Reads the complete lines of a (growing) text stream, similar to "tail -f".
+
+    A line is only returned once its line break was written, so that rows which are still being written are not cut.
+
+    Args:
+        stream: The text stream.
+        follow: Choose whether new lines are awaited at the end of the stream (False stops at the end, e.g., for stdin).
+        poll_interval: The time (in seconds) between two polls at the end of the stream.
+        idle_timeout: The time (in seconds) after which the stream is closed if no new lines are written (None waits
+            until the stop event is set).
+        stop_event: The optional event which stops the reading.
+
+    Yields:
+        The lines (without line breaks).
+    """
+    pending_line = ""
+    idle_start_time = time.monotonic()
+    while stop_event is None or not stop_event.is_set():
+        chunk = stream.readline()
+        if chunk:
+            pending_line += chunk
+            if pending_line.endswith("\n"):
+                yield pending_line.rstrip("\r\n")
+                pending_line = ""
+                idle_start_time = time.monotonic()
+            continue
+        if not follow or (idle_timeout is not None and time.monotonic() - idle_start_time >= idle_timeout):
+            break
+        time.sleep(poll_interval)
+    if pending_line.strip():
+        yield pending_line.rstrip("\r\n")
+
+
+class ObservationRowParser:
+    """Parses the rows of an observation CSV stream, using the CSV format of the observation matcher."""
+
+    def __init__(self, instance_data, rows_file_path):
+        """Initializes ObservationRowParser.
+
+        Args:
+            instance_data: The instance data of the model.
+            rows_file_path: The path of the temporary CSV file via which the rows are parsed.
+        """
+        self.instance_data = instance_data
+        self.rows_file_path = rows_file_path
+
+    def parse(self, header, rows):
+        """Parses new rows of the stream.
+
+        Args:
+            header: The header line of the stream.
+            rows: The new row lines.
+
+        Returns:
+            The observation data of the rows.
+        """
+        with open(self.rows_file_path, 'w') as file:
+            file.write("\n".join([header] + list(rows)) + "\n")
+        return load_observation_data_from_csv(csv_data_file_path=self.rows_file_path, instance_data=self.instance_data)
+
+
+########################################################################################################################
+# Online monitor #
+########################################################################################################################
+class OnlineMonitor:
+    """Matches a bounded sliding window of a growing observation stream against a prepared matcher.
+
+    The stream is read in a separate thread, so that rows arriving during a matching are collected meanwhile. After
+    each matching, all collected rows enter the window at once (i.e., outdated windows are skipped instead of piling
+    up), and the window is matched again once it advanced by at least "window_step" rows. As every window is matched
+    against the same prepared matcher, the matcher model does not grow with the stream. For each window, the latency
+    (i.e., the matching duration) and the lag (i.e., the time from the arrival of its newest row to its result) are
+    reported.
+    """
+
+    def __init__(self, observation_matcher, parse_rows, window_size=10, window_step=1, on_window_matched=None):
+        """Initializes OnlineMonitor.
+
+        Args:
+            observation_matcher: The prepared observation matcher.
+            parse_rows: The function which receives the header line and new row lines, and returns their observation
+                data (one data point per row).
+            window_size: The maximum number of rows in the window.
+            window_step: The number of new rows after which the window is matched again.
+            on_window_matched: The optional callback which receives the record of each matched window.
+        """
+        self.observation_matcher = observation_matcher
+        self.parse_rows = parse_rows
+        self.window_size = max(1, window_size)
+        self.window_step = max(1, window_step)
+        self.on_window_matched = on_window_matched
+        self.stop_event = threading.Event()
+
+    def run(self, lines):
+        """Monitors an observation stream until it ends (or the monitoring is interrupted).
+
+        The stop event of the monitor is set once the monitoring stops, so that line sources following a stream (cf.
+        "follow_lines") can stop as well.
+
+        Args:
+            lines: The iterable of lines of the stream (starting with the header line).
+
+        Returns:
+            The summary of the monitoring.
+        """
+        self.stop_event.clear()
+        line_queue = queue.Queue()
+        reader_errors = []
+
+        def read_lines():
+            """Reads the lines of the stream, and records their arrival times."""
+            try:
+                for line in lines:
+                    if line.strip():
+                        line_queue.put((line, time.time()))
+            except Exception:
+                reader_errors.append(traceback.format_exc())
+            finally:
+                line_queue.put(None)
+
+        reader_thread = threading.Thread(target=read_lines, daemon=True)
+        reader_thread.start()
+
+        header = None
+        window = collections.deque(maxlen=self.window_size)
+        window_records = []
+        row_count = 0
+        unmatched_row_count = 0
+        is_stream_ended = False
+        try:
+            while not is_stream_ended:
+                # Wait for the next row, and take all rows which arrived in the meantime
+                queue_items = [line_queue.get()]
+                while True:
+                    try:
+                        queue_items.append(line_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                new_rows = []
+                for queue_item in queue_items:
+                    if queue_item is None:
+                        is_stream_ended = True
+                    elif header is None:
+                        header = queue_item[0]
+                    else:
+                        new_rows.append(queue_item)
+                if new_rows:
+                    try:
+                        observation_points = self.parse_rows(header, [line for line, _ in new_rows])
+                    except Exception as e:
+                        print(f'Skipped {len(new_rows)} row(s) which could not be parsed: {e}')
+                        new_rows, observation_points = [], []
+                if new_rows:
+                    arrival_times = [arrival_time for _, arrival_time in new_rows]
+                    if len(observation_points) != len(arrival_times):
+                        arrival_times = [arrival_times[-1]] * len(observation_points)
+                    window.extend(zip(observation_points, arrival_times))
+                    row_count += len(new_rows)
+                    unmatched_row_count += len(new_rows)
+
+                if window and (unmatched_row_count >= self.window_step or (is_stream_ended and unmatched_row_count)):
+                    window_record = self._match_window(window=window, window_idx=len(window_records),
+                                                       new_row_count=unmatched_row_count)
+                    window_record["pending_row_count"] = line_queue.qsize()
+                    window_records.append(window_record)
+                    unmatched_row_count = 0
+                    if self.on_window_matched is not None:
+                        self.on_window_matched(window_record)
+        except KeyboardInterrupt:
+            print(f'Monitoring interrupted.')
+        finally:
+            self.stop_event.set()
+        reader_thread.join(timeout=1)
+
+        summary = {"row_count": row_count, "window_count": len(window_records), "reader_error": None}
+        if reader_errors:
+            summary["reader_error"] = reader_errors[0]
+        if window_records:
+            summary["matching_window_count"] = len([record for record in window_records if record["is_matching"]])
+            for key in ["latency", "lag"]:
+                summary[key] = dict(zip(["min", "max", "avg"], calculate_min_max_avg_float(
+                    [record[key] for record in window_records])))
+        return summary
+
+    def _match_window(self, window, window_idx, new_row_count):
+        """Matches the current window against the prepared matcher.
+
+        Args:
+            window: The window of (observation point, arrival time) pairs.
+            window_idx: The index of the window.
+            new_row_count: The number of rows which entered the window since the previous matching.
+
+        Returns:
+            The window record.
+        """
+        observation_data = [observation_point for observation_point, _ in window]
+        durations = {}
+        window_record = {
+            "window_idx": window_idx, "row_count": len(observation_data), "new_row_count": new_row_count,
+            "first_t": observation_data[0].get("t"), "last_t": observation_data[-1].get("t"),
+            "is_matching": False, "is_timeout": False, "error": None,
+        }
+        start_time = time.time()
+        try:
+            matching_res = self.observation_matcher.match(
+                observation_data=observation_data, return_trace=False, use_prepared=True,
+                log_time_to=(durations, f'matching'))
+            window_record["is_matching"] = matching_res["is_matching"]
+            window_record["is_timeout"] = matching_res["is_timeout"]
+        except Exception:
+            window_record["error"] = traceback.format_exc()
+        end_time = time.time()
+        window_record["latency"] = end_time - start_time
+        window_record["lag"] = end_time - window[-1][1]
+        window_record["durations"] = durations
+        return window_record
+
+
+def print_window_record(window_record):
+    """Prints the record of a matched window.
+
+    Args:
+        window_record: The window record.
+    """
+    if window_record["error"] is not None:
+        result_str = f'failed:\n{window_record["error"]}'
+    elif window_record["is_timeout"]:
+        result_str = "timeout"
+    else:
+        result_str = "match" if window_record["is_matching"] else "NO MATCH"
+    print(f'Window {window_record["window_idx"] + 1} (t = {window_record["first_t"]} .. {window_record["last_t"]}, '
+          f'{window_record["row_count"]} rows, {window_record["new_row_count"]} new): {result_str} '
+          f'(latency {window_record["latency"]:.3f}s, lag {window_record["lag"]:.3f}s, '
+          f'{window_record["pending_row_count"]} rows pending)')
+
+
+def monitor_observation_stream(model_file_path, source, output_dir_path, matcher_config=None, monitor_config=None,
+                               matcher_type="All"):
+    """Monitors an observation CSV stream (a growing file or stdin) against a model.
+
+    The model is preprocessed and the matcher is prepared once, and the records of all matched windows are appended to
+    the monitor log of the output directory.
+
+    Args:
+        model_file_path: The path of the model file.
+        source: The path of the observation CSV file, or "-" for stdin.
+        output_dir_path: The path of the output directory.
+        matcher_config: The matcher model configuration (by default, the configuration with all advanced features).
+        monitor_config: The monitor configuration (by default, "default_monitor_config").
+        matcher_type: The matcher type.
+
+    Returns:
+        The summary of the monitoring.
+    """
+    monitor_config = dict(default_monitor_config, **(monitor_config or {}))
+    config = copy.deepcopy(matcher_config if matcher_config is not None else all_matcher_model_configs["All"])
+    init_directories_and_paths(model_file_path=model_file_path, output_dir_path=output_dir_path, config=config)
+
+    # Prepare model and matcher
+    model_cache = PreprocessedModelCache(cache_dir_path=output_dir_path.joinpath("cache/preprocessed_models"))
+    instance_data, preprocessed_model = model_cache.load_preprocessed_model(config=config)
+    observation_matcher = ObservationMatcher(
+        config=config, model=preprocessed_model, instance_data=instance_data, observation_data=None,
+        matcher_type=matcher_type, timeout=monitor_config["run_timeout"])
+    observation_matcher.prepare_matcher_model()
+    row_parser = ObservationRowParser(
+        instance_data=instance_data, rows_file_path=config["temp_data_dir_path"].joinpath(window_rows_file_name))
+
+    with open(output_dir_path.joinpath(monitor_log_file_name), 'a') as log_file:
+        def on_window_matched(window_record):
+            """Prints and logs the record of a matched window."""
+            print_window_record(window_record=window_record)
+            log_file.write(json.dumps(window_record, default=str) + "\n")
+            log_file.flush()
+
+        monitor = OnlineMonitor(
+            observation_matcher=observation_matcher, parse_rows=row_parser.parse,
+            window_size=monitor_config["window_size"], window_step=monitor_config["window_step"],
+            on_window_matched=on_window_matched)
+        if source == stdin_source:
+            print(f'Monitoring observations from stdin ...')
+            summary = monitor.run(lines=follow_lines(stream=sys.stdin, follow=False, stop_event=monitor.stop_event))
+        else:
+            print(f'Monitoring observations from "{source}" ...')
+            with open(source, 'r') as stream:
+                summary = monitor.run(lines=follow_lines(
+                    stream=stream, poll_interval=monitor_config["poll_interval"],
+                    idle_timeout=monitor_config["idle_timeout"], stop_event=monitor.stop_event))
+
+    print(f'Monitoring finished: {summary["window_count"]} windows of {summary["row_count"]} rows matched.')
+    if summary["window_count"]:
+        print(f'Latency (min / max / avg): {summary["latency"]["min"]:.3f}s / {summary["latency"]["max"]:.3f}s / '
+              f'{summary["latency"]["avg"]:.3f}s, lag (min / max / avg): {summary["lag"]["min"]:.3f}s / '
+              f'{summary["lag"]["max"]:.3f}s / {summary["lag"]["avg"]:.3f}s')
+    return summary
@@ -0,0 +1,113 @@
+"""This module contains tests for the online monitoring mode, using a stand-in matcher instead of a prepared matcher."""
+import threading
+import time
+
+from uppyyl_observation_matcher_experiments.backend.experiments.online_monitoring.online_monitor import \
+    OnlineMonitor, follow_lines
+
+
+##########
+# Helper #
+##########
+class StandInMatcher:
+    """A stand-in matcher, which records the matched windows, and matches windows without negative values."""
+
+    def __init__(self, delay=0.0):
+        """Initializes StandInMatcher.
+
+        Args:
+            delay: The duration (in seconds) of each matching.
+        """
+        self.delay = delay
+        self.matched_windows = []
+
+    def match(self, observation_data, return_trace, use_prepared, log_time_to):
+        """Matches an observation.
+
+        Args:
+            observation_data: The observation data.
+            return_trace: Choose whether the matching trace is returned.
+            use_prepared: Choose whether the prepared matcher model is used.
+            log_time_to: The dict and key to which the matching duration is logged.
+
+        Returns:
+            The matching result.
+        """
+        time.sleep(self.delay)
+        self.matched_windows.append([point["t"] for point in observation_data])
+        log_time_to[0][log_time_to[1]] = self.delay
+        is_matching = all(value >= 0 for point in observation_data for value in point["vars"].values())
+        return {"is_matching": is_matching, "is_timeout": False, "matching_trace": None}
+
+
+def parse_rows(header, rows):
+    """Parses CSV rows of time stamps and variable values.
+
+    Args:
+        header: The header line.
+        rows: The row lines.
+
+    Returns:
+        The observation data.
+    """
+    names = header.split(",")
+    observation_data = []
+    for row in rows:
+        values = [int(value) for value in row.split(",")]
+        observation_data.append({"t": values[0], "vars": dict(zip(names[1:], values[1:])), "locs": {}})
+    return observation_data
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_online_monitor_slides_window_over_growing_file(tmp_path):
+    csv_file_path = tmp_path.joinpath("observation.csv")
+    csv_file_path.write_text("t,x\n0,1\n")
+
+    def append_rows():
+        """Appends rows to the file, including a row which is written in two parts."""
+        with open(csv_file_path, 'a') as file:
+            for t in range(1, 6):
+                time.sleep(0.05)
+                file.write(f'{t},{-1 if t == 4 else t}\n')
+                file.flush()
+            file.write("6,")
+            file.flush()
+            time.sleep(0.1)
+            file.write("6\n")
+
+    writer_thread = threading.Thread(target=append_rows)
+    writer_thread.start()
+    matcher = StandInMatcher()
+    monitor = OnlineMonitor(observation_matcher=matcher, parse_rows=parse_rows, window_size=3, window_step=2)
+    with open(csv_file_path) as stream:
+        summary = monitor.run(lines=follow_lines(stream=stream, poll_interval=0.01, idle_timeout=0.5,
+                                                 stop_event=monitor.stop_event))
+    writer_thread.join()
+
+    # The window is matched after every second row, and never exceeds three rows
+    assert matcher.matched_windows == [[0, 1], [1, 2, 3], [3, 4, 5], [4, 5, 6]]
+    assert summary["row_count"] == 7 and summary["window_count"] == 4 and summary["matching_window_count"] == 2
+    assert summary["lag"]["min"] >= 0 and summary["latency"]["max"] < 0.5
+
+
+def test_online_monitor_skips_outdated_windows():
+    matcher = StandInMatcher(delay=0.2)
+    window_records = []
+
+    def generate_lines():
+        """Generates rows faster than they are matched."""
+        yield "t,x"
+        for t in range(0, 10):
+            time.sleep(0.05)
+            yield f'{t},{t}'
+
+    monitor = OnlineMonitor(observation_matcher=matcher, parse_rows=parse_rows, window_size=4,
+                            on_window_matched=window_records.append)
+    summary = monitor.run(lines=generate_lines())
+
+    # Rows arriving during a matching enter the window at once, and the newest rows are always matched
+    assert summary["row_count"] == 10 and summary["window_count"] < 10
+    assert sum(record["new_row_count"] for record in window_records) == 10
+    assert matcher.matched_windows[-1] == [6, 7, 8, 9]
@@ -0,0 +1,106 @@
+"""This module implements adaptive run counts, which are determined by the convergence of the confidence interval of the
+matching durations."""
+import math
+
+from uppyyl_observation_matcher_experiments.backend.helper import \
+    calculate_confidence_interval_float, supported_confidence_levels
+
+########################################################################################################################
+# Adaptive run count configurations #
+########################################################################################################################
+# The minimum run count must be at least 2, since the confidence interval requires a sample variance
+default_adaptive_run_config = {
+    "min_run_count": 5,
+    "max_run_count": 100,
+    "target_relative_ci_width": 0.1,
+    "confidence_level": 0.95,
+}
+
+converged_stop_reason = "converged"
+max_run_count_stop_reason = "max_run_count"
+fixed_run_count_stop_reason = "fixed_run_count"
+
+
+def validate_adaptive_run_config(adaptive_run_config):
+    """Validates an adaptive run count configuration.
+
+    Args:
+        adaptive_run_config: The adaptive run count configuration.
+
+    Raises:
+        ValueError: If the run count bounds, the target relative width, or the confidence level are invalid.
+    """
+    min_run_count = adaptive_run_config["min_run_count"]
+    max_run_count = adaptive_run_config["max_run_count"]
+    if not (2 <= min_run_count <= max_run_count):
+        raise ValueError(f'The run count bounds must satisfy 2 <= min <= max (got min {min_run_count} and max '
+                         f'{max_run_count})')
+    if not adaptive_run_config["target_relative_ci_width"] > 0:
+        raise ValueError(f'The target relative CI width must be positive (got '
+                         f'{adaptive_run_config["target_relative_ci_width"]})')
+    if adaptive_run_config["confidence_level"] not in supported_confidence_levels:
+        raise ValueError(f'Unsupported confidence level {adaptive_run_config["confidence_level"]} (supported '
+                         f'confidence levels: {", ".join(str(level) for level in supported_confidence_levels)})')
+
+
+########################################################################################################################
+# Convergence evaluation #
+########################################################################################################################
+def get_confidence_interval_data(durations, confidence_level):
+    """Gets the confidence interval data of the mean matching duration.
+
+    Args:
+        durations: The matching durations.
+        confidence_level: The confidence level.
+
+    Returns:
+        The confidence interval data (with None values if fewer than two durations are given).
+    """
+    ci_data = {
+        "confidence_level": confidence_level,
+        "bounds": None,
+        "relative_width": None,
+    }
+    if len(durations) < 2:
+        return ci_data
+    ci_lower, ci_upper = calculate_confidence_interval_float(vals=durations, confidence_level=confidence_level)
+    ci_mean = (ci_lower + ci_upper) / 2
+    ci_data["bounds"] = [ci_lower, ci_upper]
+    ci_data["relative_width"] = (ci_upper - ci_lower) / ci_mean if ci_mean > 0 else math.inf
+    return ci_data
+
+
+def evaluate_run_count(durations, adaptive_run_config):
+    """Evaluates whether the runs of a scenario can be stopped, or how many further runs are required.
+
+    Since the width of the confidence interval shrinks with the square root of the run count, the number of further
+    runs is extrapolated from the current width (but at most doubles the run count, as early estimates are noisy).
+
+    Args:
+        durations: The matching durations of the finished runs.
+        adaptive_run_config: The adaptive run count configuration.
+
+    Returns:
+        The stop reason (or None if further runs are required), and the number of further runs.
+    """
+    run_count = len(durations)
+    min_run_count = adaptive_run_config["min_run_count"]
+    max_run_count = adaptive_run_config["max_run_count"]
+    if run_count < min_run_count:
+        return None, min_run_count - run_count
+
+    ci_data = get_confidence_interval_data(
+        durations=durations, confidence_level=adaptive_run_config["confidence_level"])
+    relative_ci_width = ci_data["relative_width"]
+    target_relative_ci_width = adaptive_run_config["target_relative_ci_width"]
+    if relative_ci_width is not None and relative_ci_width <= target_relative_ci_width:
+        return converged_stop_reason, 0
+    if run_count >= max_run_count:
+        return max_run_count_stop_reason, 0
+
+    if relative_ci_width is None or math.isinf(relative_ci_width):
+        required_run_count = 2 * run_count
+    else:
+        required_run_count = math.ceil(run_count * (relative_ci_width / target_relative_ci_width) ** 2)
+    required_run_count = min(required_run_count, 2 * run_count, max_run_count)
+    return None, max(1, required_run_count - run_count)
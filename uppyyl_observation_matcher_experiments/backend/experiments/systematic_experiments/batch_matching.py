@@ -0,0 +1,310 @@
+"""This module implements the matching of batches of observations against one prepared matcher."""
+import concurrent.futures
+import time
+import traceback
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_series import \
+    as_observation_data
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.span_timer import \
+    Span, timed_span
+
+
+########################################################################################################################
+# Batch match results #
+########################################################################################################################
+class BatchMatchResult:
+    """The result of matching a single observation of a batch."""
+
+    def __init__(self, item_idx, observation_data, matching_res=None, durations=None, duration=None, error=None,
+                 is_cached=False, rejection_reason=None, verifier_statistics=None, memory_statistics=None,
+                 span=None):
+        """Initializes BatchMatchResult.
+
+        Args:
+            item_idx: The index of the observation in the batch.
+            observation_data: The observation data.
+            matching_res: The matching result of the matcher (None if the matching failed).
+            durations: The durations recorded by the matcher.
+            duration: The wall-clock duration (in seconds) of the matching.
+            error: The error description (None if the matching succeeded).
+            is_cached: Whether the result was taken from the match result cache (with the durations of the original
+                matching).
+            rejection_reason: The reason why the observation was rejected by the pre-filter without matching it (None
+                if it was not rejected).
+            verifier_statistics: The state space statistics reported by the verifier for the matching (None if no
+                statistics were collected).
+            memory_statistics: The memory usage statistics of the verifier processes of the matching (None if the
+                memory was not sampled).
+            span: The span of the matching, whose child spans are the timed phases of the matching (cf.
+                "span_timer.py").
+        """
+        self.item_idx = item_idx
+        self.observation_data = observation_data
+        self.is_matching = matching_res["is_matching"] if matching_res else False
+        self.is_timeout = matching_res["is_timeout"] if matching_res else False
+        self.matching_trace = matching_res.get("matching_trace") if matching_res else None
+        self.durations = durations if durations is not None else {}
+        self.duration = duration
+        self.error = error
+        self.is_cached = is_cached
+        self.rejection_reason = rejection_reason
+        self.verifier_statistics = verifier_statistics
+        self.memory_statistics = memory_statistics
+        self.span = span
+
+
+########################################################################################################################
+# Batch matcher #
+########################################################################################################################
+class BatchMatcher:
+    """Matches batches of observations against one prepared matcher.
+
+    Since a matcher writes its intermediate files into its own workspace, concurrent matches use independent replicas of
+    the prepared matcher, which are created on demand and kept for subsequent batches. Observations are taken from the
+    batch (and matchers are assigned to them) in the consuming thread only, so that neither the observation source nor
+    the replica callbacks (nor the result cache) need to be thread-safe. A replica whose matching failed is discarded,
+    so that failures stay isolated to their item. With a result cache, observations whose result is cached are not
+    matched again, and with a pre-filter, observations which cannot match the model are rejected right away. If a batch
+    is closed before all of its results are consumed, its running matchings are abandoned (i.e., not waited for). They
+    keep their matchers and count towards the concurrency of subsequent batches until they are finished, and their
+    results are only put into the result cache. With a statistics collector, the verifier statistics of each matching
+    are taken from the matcher which performed it (and the summed duration of its verifier calls is timed as
+    "verifier_execution" span of the matching), and with a memory sampler factory, the memory usage of the verifier
+    processes of each matching is sampled.
+    """
+
+    def __init__(self, observation_matcher, create_replica=None, release_replica=None, concurrency=1,
+                 result_cache=None, matcher_key=None, prefilter=None, collect_statistics=None,
+                 create_memory_sampler=None):
+        """Initializes BatchMatcher.
+
+        Args:
+            observation_matcher: The prepared observation matcher.
+            create_replica: The callback which creates a new replica of the prepared matcher (required if the
+                concurrency is larger than 1).
+            release_replica: The optional callback which receives a replica which is no longer used, and whether it
+                is released after a failure.
+            concurrency: The maximum number of observations which are matched at once.
+            result_cache: The optional match result cache.
+            matcher_key: The key of the prepared matcher in the result cache (required if a result cache is used).
+            prefilter: The optional observation pre-filter.
+            collect_statistics: The optional callback which receives an observation matcher, and returns (and resets)
+                the verifier statistics of its matchings since the last call (or None), optionally including the
+                summed duration of the verifier calls as "call_duration".
+            create_memory_sampler: The optional callback which receives an observation matcher, and creates a memory
+                sampler (cf. "memory_sampler.py") for the verifier processes of its matchings.
+        """
+        self.observation_matcher = observation_matcher
+        self.create_replica = create_replica
+        self.release_replica = release_replica or (lambda _replica, is_failed=False: None)
+        self.concurrency = max(1, concurrency)
+        self.result_cache = result_cache
+        self.matcher_key = matcher_key
+        self.prefilter = prefilter
+        self.collect_statistics = collect_statistics
+        self.create_memory_sampler = create_memory_sampler
+        self.idle_matchers = [observation_matcher]
+        self.abandoned_futures = []
+
+    def match_batch(self, observations, return_trace=False):
+        """Matches a batch of observations (which is consumed lazily).
+
+        Args:
+            observations: The iterable of observation data.
+            return_trace: Choose whether the matching traces are returned.
+
+        Yields:
+            The batch match result of each observation, in the order of completion.
+        """
+        if self.concurrency == 1:
+            for item_idx, observation_data in enumerate(observations):
+                known_result = self._get_known_result(
+                    item_idx=item_idx, observation_data=observation_data, return_trace=return_trace)
+                if known_result is not None:
+                    yield known_result
+                    continue
+                observation_matcher = self.idle_matchers.pop()
+                yield self._finish_item(*self._match_item(
+                    observation_matcher=observation_matcher, item_idx=item_idx, observation_data=observation_data,
+                    return_trace=return_trace))
+            return
+
+        observation_iterator = enumerate(observations)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency)
+        in_flight_futures = {}
+        is_exhausted = False
+        try:
+            while True:
+                self._reap_abandoned_futures()
+                while not is_exhausted and len(in_flight_futures) + len(self.abandoned_futures) < self.concurrency:
+                    next_item = next(observation_iterator, None)
+                    if next_item is None:
+                        is_exhausted = True
+                        break
+                    item_idx, observation_data = next_item
+                    known_result = self._get_known_result(
+                        item_idx=item_idx, observation_data=observation_data, return_trace=return_trace)
+                    if known_result is not None:
+                        yield known_result
+                        continue
+                    try:
+                        observation_matcher = self._acquire_matcher()
+                    except Exception:
+                        yield BatchMatchResult(item_idx=item_idx, observation_data=observation_data,
+                                               error=traceback.format_exc())
+                        continue
+                    in_flight_futures[executor.submit(
+                        self._match_item, observation_matcher=observation_matcher, item_idx=item_idx,
+                        observation_data=observation_data, return_trace=return_trace)] = observation_matcher
+                if not in_flight_futures and (is_exhausted or not self.abandoned_futures):
+                    break
+                done_futures, _ = concurrent.futures.wait(
+                    list(in_flight_futures) + self.abandoned_futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done_futures:
+                    if future in in_flight_futures:
+                        del in_flight_futures[future]
+                        yield self._finish_item(*future.result())
+        finally:
+            # If the batch is closed early (e.g., after a conclusive result), pending matchings are cancelled, and
+            # running ones are abandoned instead of waiting for them
+            for future, observation_matcher in in_flight_futures.items():
+                if future.cancel():
+                    self.idle_matchers.append(observation_matcher)
+                else:
+                    self.abandoned_futures.append(future)
+            executor.shutdown(wait=False)
+
+    def _match_item(self, observation_matcher, item_idx, observation_data, return_trace):
+        """Matches a single observation of a batch.
+
+        Args:
+            observation_matcher: The (idle) observation matcher.
+            item_idx: The index of the observation in the batch.
+            observation_data: The observation data.
+            return_trace: Choose whether the matching trace is returned.
+
+        Returns:
+            The observation matcher and the batch match result.
+        """
+        if self.collect_statistics is not None:
+            self.collect_statistics(observation_matcher)
+        memory_sampler = None
+        if self.create_memory_sampler is not None:
+            memory_sampler = self.create_memory_sampler(observation_matcher)
+            memory_sampler.start()
+        start_time = time.time()
+        durations = {}
+        try:
+            with timed_span(name="matching") as matching_span:
+                matching_res = observation_matcher.match(
+                    observation_data=as_observation_data(observation_data=observation_data), return_trace=return_trace,
+                    use_prepared=True,
+                    log_time_to=(durations, f'matching'))
+        except Exception:
+            return observation_matcher, BatchMatchResult(
+                item_idx=item_idx, observation_data=observation_data, durations=durations,
+                duration=time.time() - start_time, error=traceback.format_exc())
+        finally:
+            if memory_sampler is not None:
+                memory_sampler.stop()
+        duration = time.time() - start_time
+        verifier_statistics = None
+        if self.collect_statistics is not None:
+            verifier_statistics = self.collect_statistics(observation_matcher)
+            if verifier_statistics is not None and "call_duration" in verifier_statistics:
+                matching_span.add_child(name="verifier_execution", duration=verifier_statistics.pop("call_duration"))
+        return observation_matcher, BatchMatchResult(
+            item_idx=item_idx, observation_data=observation_data, matching_res=matching_res, durations=durations,
+            duration=duration, verifier_statistics=verifier_statistics,
+            memory_statistics=memory_sampler.get_statistics() if memory_sampler is not None else None,
+            span=matching_span)
+
+    def _get_known_result(self, item_idx, observation_data, return_trace):
+        """Gets the result of an observation without matching it, i.e., its rejection by the pre-filter or its cached
+        result.
+
+        Args:
+            item_idx: The index of the observation in the batch.
+            observation_data: The observation data.
+            return_trace: Choose whether the matching trace is returned.
+
+        Returns:
+            The batch match result, or None if the observation must be matched.
+        """
+        start_time = time.time()
+        if self.prefilter is not None:
+            rejection_reason = self.prefilter.check(observation_data=observation_data)
+            if rejection_reason is not None:
+                duration = time.time() - start_time
+                return BatchMatchResult(
+                    item_idx=item_idx, observation_data=observation_data,
+                    matching_res={"is_matching": False, "is_timeout": False}, durations={"prefilter": duration},
+                    duration=duration, rejection_reason=rejection_reason,
+                    span=Span(name="prefilter", duration=duration))
+        if self.result_cache is None:
+            return None
+        cached_result = self.result_cache.get(
+            matcher_key=self.matcher_key, observation_data=observation_data, return_trace=return_trace)
+        if cached_result is None:
+            return None
+        duration = time.time() - start_time
+        return BatchMatchResult(item_idx=item_idx, observation_data=observation_data, matching_res=cached_result,
+                                durations=cached_result["durations"], duration=duration, is_cached=True,
+                                span=Span(name="result_cache_lookup", duration=duration))
+
+    def _acquire_matcher(self):
+        """Takes an idle matcher, or creates a new replica if all matchers are busy.
+
+        Returns:
+            The observation matcher.
+        """
+        if self.idle_matchers:
+            return self.idle_matchers.pop()
+        return self.create_replica()
+
+    def _finish_item(self, observation_matcher, result):
+        """Returns the matcher of a matched observation (discarding it if the matching failed), and caches the result.
+
+        The prepared matcher itself is always kept, since a batch cannot continue without it.
+
+        Args:
+            observation_matcher: The observation matcher.
+            result: The batch match result.
+
+        Returns:
+            The batch match result.
+        """
+        if result.error is not None and observation_matcher is not self.observation_matcher:
+            self.release_replica(observation_matcher, is_failed=True)
+        else:
+            self.idle_matchers.append(observation_matcher)
+        if result.error is None and self.result_cache is not None:
+            self.result_cache.put(
+                matcher_key=self.matcher_key, observation_data=result.observation_data,
+                matching_res={"is_matching": result.is_matching, "is_timeout": result.is_timeout,
+                              "matching_trace": result.matching_trace}, durations=result.durations)
+        return result
+
+    def _reap_abandoned_futures(self, wait=False):
+        """Finishes the abandoned matchings which are completed (in the consuming thread).
+
+        Args:
+            wait: Choose whether all abandoned matchings are waited for.
+        """
+        if wait:
+            concurrent.futures.wait(self.abandoned_futures)
+        running_futures = []
+        for future in self.abandoned_futures:
+            if future.done():
+                self._finish_item(*future.result())
+            else:
+                running_futures.append(future)
+        self.abandoned_futures = running_futures
+
+    def close(self):
+        """Waits for the abandoned matchings, and releases all replicas of the prepared matcher."""
+        self._reap_abandoned_futures(wait=True)
+        for observation_matcher in self.idle_matchers:
+            if observation_matcher is not self.observation_matcher:
+                self.release_replica(observation_matcher)
+        self.idle_matchers = [self.observation_matcher]
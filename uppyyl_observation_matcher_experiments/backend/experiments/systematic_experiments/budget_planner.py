@@ -0,0 +1,377 @@
+"""This module implements the planning of experiment runs within a wall-clock time budget, based on the run durations
+of previous experiment logs."""
+import collections
+import numbers
+import time
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.log_reader import \
+    iterate_scenario_runs
+
+########################################################################################################################
+# Time budget configurations #
+########################################################################################################################
+# The budget is spent in two passes: First, every scenario receives "coverage_run_count" runs (round-robin across the
+# models, and coarse-to-fine within sweeps), and then the remaining budget is spread over the scenarios run by run.
+# Scenarios without any recorded durations are estimated with "fallback_run_duration" (bounded by their run timeout).
+default_time_budget_config = {
+    "time_budget": 4 * 60 * 60,
+    "coverage_run_count": 2,
+    "replan_interval": 60,
+    "fallback_run_duration": 10,
+}
+
+time_budget_stop_reason = "time_budget"
+
+
+def format_duration(duration):
+    """Formats a duration (in seconds) as hours, minutes, and seconds.
+
+    Args:
+        duration: The duration.
+
+    Returns:
+        The duration string.
+    """
+    minutes, seconds = divmod(int(round(duration)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}h {minutes:02}m {seconds:02}s'
+
+
+def parse_duration(duration_str):
+    """Parses a duration given in seconds, or with a unit suffix ("s", "m", or "h", e.g., "4h").
+
+    Args:
+        duration_str: The duration string.
+
+    Returns:
+        The duration (in seconds).
+
+    Raises:
+        ValueError: If the duration string is not valid.
+    """
+    units = {"s": 1, "m": 60, "h": 60 * 60}
+    duration_str = duration_str.strip().lower()
+    if duration_str and duration_str[-1] in units:
+        return float(duration_str[:-1]) * units[duration_str[-1]]
+    return float(duration_str)
+
+
+def get_coarse_to_fine_order(count):
+    """Gets the positions of a sweep in coarse-to-fine order (i.e., both ends first, followed by repeatedly bisected
+    intervals), so that any prefix of the order covers the sweep as evenly as possible.
+
+    Args:
+        count: The number of sweep positions.
+
+    Returns:
+        The ordered positions.
+    """
+    if count <= 2:
+        return list(range(0, count))
+    order = [0, count - 1]
+    intervals = collections.deque([(0, count - 1)])
+    while intervals:
+        lower, upper = intervals.popleft()
+        if upper - lower < 2:
+            continue
+        middle = (lower + upper) // 2
+        order.append(middle)
+        intervals.extend([(lower, middle), (middle, upper)])
+    return order
+
+
+########################################################################################################################
+# Run duration estimation #
+########################################################################################################################
+class RunDurationEstimator:
+    """Estimates the durations of scenario runs from the recorded durations of previous and current runs.
+
+    A scenario is estimated by (in this order) its own runs, the closest position of its sweep (scaled by the sweep
+    size), the other scenarios of its model in the same experiment, all scenarios of the experiment, or the fallback
+    duration. All estimates are bounded by the run timeout of the scenario.
+    """
+
+    def __init__(self, fallback_run_duration):
+        """Initializes RunDurationEstimator.
+
+        Args:
+            fallback_run_duration: The run duration assumed if no durations are recorded.
+        """
+        self.fallback_run_duration = fallback_run_duration
+        self.scenario_durations = {}
+
+    @staticmethod
+    def get_run_duration(run_log_data):
+        """Gets the wall-clock duration of a run (or its matching duration for logs which do not record it).
+
+        Args:
+            run_log_data: The run log data.
+
+        Returns:
+            The run duration, or None if the run log data contains no durations.
+        """
+        durations = run_log_data.get("durations", {})
+        if "run" in durations:
+            return durations["run"]
+        return durations.get("matching", {}).get("matching")
+
+    def add_run_duration(self, scenario, duration):
+        """Records the duration of a run of a scenario.
+
+        Args:
+            scenario: The scenario data.
+            duration: The run duration.
+        """
+        if duration is not None:
+            self.scenario_durations.setdefault(scenario["id"], []).append(duration)
+
+    def load_model_log(self, model_scenarios, log_file_path):
+        """Records the run durations contained in an existing model log (read incrementally, without the observation
+        data of the runs).
+
+        Args:
+            model_scenarios: The scenario data list of the model.
+            log_file_path: The path of the model log file.
+        """
+        if not log_file_path.exists():
+            return
+        try:
+            for scenario, _run_idx, run_log_data in iterate_scenario_runs(log_file_path=log_file_path,
+                                                                          scenarios=model_scenarios):
+                self.add_run_duration(scenario=scenario, duration=self.get_run_duration(run_log_data))
+        except ValueError:
+            return
+
+    def estimate_run_duration(self, scenario, scenarios):
+        """Estimates the duration of a single run of a scenario.
+
+        Args:
+            scenario: The scenario data.
+            scenarios: The scenario data list of the experiment.
+
+        Returns:
+            The estimated run duration.
+        """
+        estimate = self._get_mean_duration(scenario_ids=[scenario["id"]])
+        if estimate is None and scenario.get("sweep_position") is not None:
+            estimate = self._estimate_from_sweep(scenario=scenario, scenarios=scenarios)
+        if estimate is None:
+            estimate = self._get_mean_duration(scenario_ids=[
+                s["id"] for s in scenarios
+                if s["experiment"] == scenario["experiment"] and s["model_idx"] == scenario["model_idx"]])
+        if estimate is None:
+            estimate = self._get_mean_duration(scenario_ids=[
+                s["id"] for s in scenarios if s["experiment"] == scenario["experiment"]])
+        if estimate is None:
+            estimate = self.fallback_run_duration
+        return min(estimate, scenario["run_timeout"])
+
+    def _get_mean_duration(self, scenario_ids):
+        """Gets the mean run duration of the given scenarios.
+
+        Args:
+            scenario_ids: The scenario IDs.
+
+        Returns:
+            The mean run duration, or None if no durations are recorded.
+        """
+        durations = [duration for scenario_id in scenario_ids
+                     for duration in self.scenario_durations.get(scenario_id, [])]
+        return sum(durations) / len(durations) if durations else None
+
+    def _estimate_from_sweep(self, scenario, scenarios):
+        """Estimates the run duration of a sweep position from the closest position with recorded durations.
+
+        Args:
+            scenario: The scenario data.
+            scenarios: The scenario data list of the experiment.
+
+        Returns:
+            The estimated run duration, or None if no position of the sweep has recorded durations.
+        """
+        sweep_scenarios = [s for s in scenarios if s["experiment"] == scenario["experiment"] and
+                           s["model_idx"] == scenario["model_idx"] and s.get("sweep_position") is not None and
+                           s["id"] in self.scenario_durations]
+        if not sweep_scenarios:
+            return None
+        closest_scenario = min(sweep_scenarios, key=lambda s: abs(s["sweep_position"] - scenario["sweep_position"]))
+        estimate = self._get_mean_duration(scenario_ids=[closest_scenario["id"]])
+        size, closest_size = scenario["keys"][-1], closest_scenario["keys"][-1]
+        if isinstance(size, numbers.Number) and isinstance(closest_size, numbers.Number) and closest_size > 0:
+            estimate *= size / closest_size
+        return estimate
+
+
+########################################################################################################################
+# Budget planning #
+########################################################################################################################
+class TimeBudgetPlanner:
+    """Plans the run counts of the scenarios of an experiment, such that the projected makespan fits into the time
+    budget, and re-plans them as actual run durations come in.
+
+    The makespan is projected as the estimated duration of all open and planned runs divided by the number of local
+    workers (workers of other nodes serving a shared work queue are not taken into account).
+    """
+
+    def __init__(self, scenarios, time_budget_config, worker_count, run_duration_estimator, finished_run_counts):
+        """Initializes TimeBudgetPlanner.
+
+        Args:
+            scenarios: The scenario data list.
+            time_budget_config: The time budget configuration.
+            worker_count: The number of workers executing the runs in parallel.
+            run_duration_estimator: The run duration estimator.
+            finished_run_counts: The number of already finished runs per scenario ID (e.g., when resuming).
+        """
+        self.scenarios = scenarios
+        self.time_budget_config = time_budget_config
+        self.worker_count = max(1, worker_count)
+        self.run_duration_estimator = run_duration_estimator
+        self.start_time = time.time()
+        self.last_plan_time = None
+
+        self.finished_run_counts = dict((scenario["id"], finished_run_counts.get(scenario["id"], 0))
+                                        for scenario in scenarios)
+        self.scheduled_run_counts = dict(self.finished_run_counts)
+        self.max_run_counts = dict((scenario["id"], scenario["run_count"]) for scenario in scenarios)
+        self.started_scenario_ids = set()
+        self.planned_run_counts = {}
+        self.projected_makespan = 0
+        self.coverage_order = self._get_coverage_order()
+
+    def _get_coverage_order(self):
+        """Gets the order in which the scenarios receive runs, which alternates between the models and covers sweeps
+        from coarse to fine.
+
+        Returns:
+            The ordered scenario data list.
+        """
+        scenarios_per_model = {}
+        for scenario in self.scenarios:
+            scenarios_per_model.setdefault((scenario["experiment"], scenario["model_idx"]), []).append(scenario)
+
+        ordered_model_scenarios = []
+        for model_scenarios in scenarios_per_model.values():
+            sweep_scenarios = [scenario for scenario in model_scenarios if scenario.get("sweep_position") is not None]
+            other_scenarios = [scenario for scenario in model_scenarios if scenario.get("sweep_position") is None]
+            sweep_scenarios.sort(key=lambda scenario: scenario["sweep_position"])
+            ordered_model_scenarios.append(
+                other_scenarios + [sweep_scenarios[position]
+                                   for position in get_coarse_to_fine_order(count=len(sweep_scenarios))])
+
+        coverage_order = []
+        for position in range(0, max(map(len, ordered_model_scenarios), default=0)):
+            for model_scenarios in ordered_model_scenarios:
+                if position < len(model_scenarios):
+                    coverage_order.append(model_scenarios[position])
+        return coverage_order
+
+    def plan(self):
+        """Plans the run counts of all scenarios within the remaining time budget.
+
+        Runs which are already scheduled are kept, so that the run counts of started scenarios can only grow.
+        """
+        self.last_plan_time = time.time()
+        estimates = dict((scenario["id"], self.run_duration_estimator.estimate_run_duration(
+            scenario=scenario, scenarios=self.scenarios)) for scenario in self.scenarios)
+        planned_run_counts = dict(self.scheduled_run_counts)
+        open_work = sum((planned_run_counts[scenario_id] - self.finished_run_counts[scenario_id]) * estimate
+                        for scenario_id, estimate in estimates.items())
+        remaining_work = (self.time_budget_config["time_budget"] - (self.last_plan_time - self.start_time)) * \
+            self.worker_count - open_work
+
+        def allocate_runs(scenario, run_count):
+            """Allocates runs to a scenario as long as they fit into the remaining budget.
+
+            Args:
+                scenario: The scenario data.
+                run_count: The run count which the scenario should reach.
+
+            Returns:
+                True if runs were allocated, False otherwise.
+            """
+            nonlocal remaining_work
+            scenario_id = scenario["id"]
+            run_count = min(run_count, self.max_run_counts[scenario_id])
+            if scenario_id in self.started_scenario_ids and not scenario.get("is_adaptive"):
+                return False
+            added_run_count = run_count - planned_run_counts[scenario_id]
+            if added_run_count <= 0 or added_run_count * estimates[scenario_id] > remaining_work:
+                return False
+            planned_run_counts[scenario_id] = run_count
+            remaining_work -= added_run_count * estimates[scenario_id]
+            return True
+
+        for scenario in self.coverage_order:
+            allocate_runs(scenario=scenario, run_count=self.time_budget_config["coverage_run_count"])
+        is_allocating = True
+        while is_allocating:
+            is_allocating = False
+            for scenario in self.coverage_order:
+                if allocate_runs(scenario=scenario, run_count=planned_run_counts[scenario["id"]] + 1):
+                    is_allocating = True
+
+        self.planned_run_counts = planned_run_counts
+        planned_work = sum((planned_run_counts[scenario_id] - self.finished_run_counts[scenario_id]) * estimate
+                           for scenario_id, estimate in estimates.items())
+        self.projected_makespan = planned_work / self.worker_count
+
+    def print_plan(self, title):
+        """Prints the current plan.
+
+        Args:
+            title: The title of the plan (e.g., "Plan").
+        """
+        planned_scenario_count = sum(1 for run_count in self.planned_run_counts.values() if run_count > 0)
+        elapsed = time.time() - self.start_time
+        print(f'Budget -> {title}: {planned_scenario_count} / {len(self.scenarios)} scenarios, '
+              f'{sum(self.planned_run_counts.values())} / {sum(self.max_run_counts.values())} runs, projected '
+              f'makespan {format_duration(elapsed + self.projected_makespan)} (budget '
+              f'{format_duration(self.time_budget_config["time_budget"])})')
+
+    def restrict_run_indices(self, scenario, run_indices):
+        """Restricts the run indices of a scenario which are about to be scheduled to its planned run count.
+
+        Args:
+            scenario: The scenario data.
+            run_indices: The run indices.
+
+        Returns:
+            The restricted run indices.
+        """
+        scenario_id = scenario["id"]
+        self.started_scenario_ids.add(scenario_id)
+        free_run_count = self.planned_run_counts.get(scenario_id, 0) - self.scheduled_run_counts[scenario_id]
+        restricted_run_indices = list(run_indices)[:max(0, free_run_count)]
+        if len(restricted_run_indices) < len(run_indices):
+            scenario["is_budget_limited"] = True
+        self.scheduled_run_counts[scenario_id] += len(restricted_run_indices)
+        return restricted_run_indices
+
+    def register_run(self, scenario, run_log_data):
+        """Registers a finished run, and re-plans if the re-planning interval has elapsed.
+
+        Args:
+            scenario: The scenario data.
+            run_log_data: The run log data.
+        """
+        self.finished_run_counts[scenario["id"]] += 1
+        self.run_duration_estimator.add_run_duration(
+            scenario=scenario, duration=RunDurationEstimator.get_run_duration(run_log_data=run_log_data))
+        if time.time() - self.last_plan_time >= self.time_budget_config["replan_interval"]:
+            previous_planned_run_counts = self.planned_run_counts
+            self.plan()
+            if self.planned_run_counts != previous_planned_run_counts:
+                self.print_plan(title="Re-plan")
+
+    def register_scenario_finished(self, scenario):
+        """Registers a finished scenario, whose remaining runs are no longer planned.
+
+        Args:
+            scenario: The scenario data.
+        """
+        scenario_id = scenario["id"]
+        self.started_scenario_ids.add(scenario_id)
+        self.max_run_counts[scenario_id] = self.finished_run_counts[scenario_id]
+        self.scheduled_run_counts[scenario_id] = self.finished_run_counts[scenario_id]
+        self.planned_run_counts[scenario_id] = self.finished_run_counts[scenario_id]
@@ -0,0 +1,109 @@
+"""This module implements the timeout-aware early termination of sweeps over increasing observation sizes or extents."""
+import math
+
+########################################################################################################################
+# Early termination configurations #
+########################################################################################################################
+# Once the fraction of timed out runs at a sweep position reaches "max_timeout_fraction", all larger positions of the
+# sweep (i.e., of the same model) are either skipped ("skip"), or only every n-th position is sampled with a reduced
+# number of runs ("sparse")
+default_early_termination_config = {
+    "max_timeout_fraction": 0.5,
+    "mode": "skip",
+    "sparse_sampling_interval": 4,
+    "sparse_run_count": 1,
+}
+
+complete_sweep_status = "complete"
+sampled_sweep_status = "sampled"
+skipped_sweep_status = "skipped"
+early_termination_stop_reason = "early_termination"
+
+
+########################################################################################################################
+# Sweep termination #
+########################################################################################################################
+class SweepTerminationTracker:
+    """Tracks the timeouts of the positions of sweeps, and determines which positions are still executed."""
+
+    def __init__(self, early_termination_config):
+        """Initializes SweepTerminationTracker.
+
+        Args:
+            early_termination_config: The early termination configuration.
+        """
+        self.early_termination_config = early_termination_config
+        self.termination_positions = {}
+
+    @staticmethod
+    def get_sweep_key(scenario):
+        """Gets the key of the sweep of a scenario.
+
+        Args:
+            scenario: The scenario data.
+
+        Returns:
+            The sweep key, or None if the scenario is not part of a sweep.
+        """
+        if scenario.get("sweep_position") is None:
+            return None
+        return scenario["experiment"], scenario["model_idx"]
+
+    def register_scenario_result(self, scenario, timeout_count, run_count):
+        """Registers the result of a finished scenario, which terminates its sweep if too many runs timed out.
+
+        Args:
+            scenario: The scenario data.
+            timeout_count: The number of timed out runs.
+            run_count: The number of executed runs.
+
+        Returns:
+            True if the sweep was terminated at the position of the scenario, False otherwise.
+        """
+        sweep_key = self.get_sweep_key(scenario=scenario)
+        if sweep_key is None or run_count == 0:
+            return False
+        max_timeout_count = math.ceil(self.early_termination_config["max_timeout_fraction"] * run_count)
+        if timeout_count < max(1, max_timeout_count):
+            return False
+        termination_position = self.termination_positions.get(sweep_key)
+        if termination_position is not None and termination_position <= scenario["sweep_position"]:
+            return False
+        self.termination_positions[sweep_key] = scenario["sweep_position"]
+        return True
+
+    def get_sweep_status(self, scenario):
+        """Gets the sweep status of a scenario, i.e., whether it is completely executed, sampled, or skipped.
+
+        Args:
+            scenario: The scenario data.
+
+        Returns:
+            The sweep status.
+        """
+        sweep_key = self.get_sweep_key(scenario=scenario)
+        termination_position = self.termination_positions.get(sweep_key)
+        if sweep_key is None or termination_position is None or scenario["sweep_position"] <= termination_position:
+            return complete_sweep_status
+        if self.early_termination_config["mode"] == "sparse":
+            position_offset = scenario["sweep_position"] - termination_position
+            if position_offset % self.early_termination_config["sparse_sampling_interval"] == 0:
+                return sampled_sweep_status
+        return skipped_sweep_status
+
+    def get_run_indices(self, scenario, run_indices):
+        """Restricts the given run indices of a scenario according to its sweep status.
+
+        Args:
+            scenario: The scenario data.
+            run_indices: The run indices.
+
+        Returns:
+            The restricted run indices.
+        """
+        sweep_status = self.get_sweep_status(scenario=scenario)
+        if sweep_status == skipped_sweep_status:
+            return []
+        if sweep_status == sampled_sweep_status:
+            return [run_idx for run_idx in run_indices if run_idx < self.early_termination_config["sparse_run_count"]]
+        return run_indices
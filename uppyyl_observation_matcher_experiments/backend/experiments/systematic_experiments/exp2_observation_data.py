@@ -1,374 +0,0 @@
-"""The observation data for experiment 2."""
-
-all_exp2_observation_data = {
-    "main-example-model": {
-        "few-short": [
-            {'t': 7, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 11, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 13, 'vars': {'db': 70, 'temp': 3000}, 'locs': {}},
-            {'t': 14, 'vars': {'db': 70, 'temp': 3500}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 5, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 7, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 8, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 9, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 11, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 11, 'vars': {'db': 70, 'temp': 2000}, 'locs': {}},
-            {'t': 12, 'vars': {'db': 70, 'temp': 2500}, 'locs': {}},
-            {'t': 14, 'vars': {'db': 70, 'temp': 3000}, 'locs': {}},
-            {'t': 15, 'vars': {'db': 70, 'temp': 3500}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 18, 'vars': {'db': 70, 'temp': 5000}, 'locs': {}},
-            {'t': 26, 'vars': {'db': 70, 'temp': 2000}, 'locs': {}},
-            {'t': 26, 'vars': {'db': 70, 'temp': 2500}, 'locs': {}},
-            {'t': 42, 'vars': {'db': 50, 'temp': 2000}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 4, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 7, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 11, 'vars': {'db': 70, 'temp': 2000}, 'locs': {}},
-            {'t': 21, 'vars': {'db': 0, 'temp': 4000}, 'locs': {}},
-            {'t': 31, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 33, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 37, 'vars': {'db': 50, 'temp': 2000}, 'locs': {}},
-            {'t': 38, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 41, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-            {'t': 42, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}},
-        ],
-    },
-    "2doors": {
-        "few-short": [
-            {'t': 0, 'vars': {'activated1': 0, 'activated2': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'activated1': 1, 'activated2': 1}, 'locs': {}},
-            {'t': 16, 'vars': {'activated1': 1, 'activated2': 0}, 'locs': {}},
-            {'t': 21, 'vars': {'activated1': 1, 'activated2': 0}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'activated1': 0, 'activated2': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'activated1': 0, 'activated2': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'activated1': 0, 'activated2': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'activated1': 1, 'activated2': 1}, 'locs': {}},
-            {'t': 1, 'vars': {'activated1': 1, 'activated2': 1}, 'locs': {}},
-            {'t': 9, 'vars': {'activated1': 1, 'activated2': 1}, 'locs': {}},
-            {'t': 14, 'vars': {'activated1': 1, 'activated2': 1}, 'locs': {}},
-            {'t': 16, 'vars': {'activated1': 1, 'activated2': 0}, 'locs': {}},
-            {'t': 16, 'vars': {'activated1': 1, 'activated2': 0}, 'locs': {}},
-            {'t': 16, 'vars': {'activated1': 1, 'activated2': 0}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 23, 'vars': {'activated1': 1, 'activated2': 1}, 'locs': {}},
-            {'t': 37, 'vars': {'activated1': 1, 'activated2': 0}, 'locs': {}},
-            {'t': 64, 'vars': {'activated1': 0, 'activated2': 0}, 'locs': {}},
-            {'t': 91, 'vars': {'activated1': 0, 'activated2': 1}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 0, 'vars': {'activated1': 0, 'activated2': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'activated1': 1, 'activated2': 0}, 'locs': {}},
-            {'t': 24, 'vars': {'activated1': 1, 'activated2': 1}, 'locs': {}},
-            {'t': 32, 'vars': {'activated1': 1, 'activated2': 0}, 'locs': {}},
-            {'t': 37, 'vars': {'activated1': 1, 'activated2': 0}, 'locs': {}},
-            {'t': 48, 'vars': {'activated1': 1, 'activated2': 1}, 'locs': {}},
-            {'t': 48, 'vars': {'activated1': 0, 'activated2': 1}, 'locs': {}},
-            {'t': 75, 'vars': {'activated1': 1, 'activated2': 1}, 'locs': {}},
-            {'t': 91, 'vars': {'activated1': 0, 'activated2': 1}, 'locs': {}},
-            {'t': 91, 'vars': {'activated1': 0, 'activated2': 1}, 'locs': {}},
-        ],
-    },
-    "bridge": {
-        "few-short": [
-            {'t': 2, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 25, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 50, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 60, 'vars': {'L': 0}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 6, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 19, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 20, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 20, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 30, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 40, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 40, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 40, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 47, 'vars': {'L': 0}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 20, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 100, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 220, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 223, 'vars': {'L': 0}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 10, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 10, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 40, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 50, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 55, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 70, 'vars': {'L': 0}, 'locs': {}},
-            {'t': 110, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 110, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 155, 'vars': {'L': 1}, 'locs': {}},
-            {'t': 155, 'vars': {'L': 1}, 'locs': {}},
-        ],
-    },
-    "fischer": {
-        "few-short": [
-            {'t': 0, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 1, 'vars': {'id': 3}, 'locs': {}},
-            {'t': 13, 'vars': {'id': 3}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'id': 1}, 'locs': {}},
-            {'t': 1, 'vars': {'id': 3}, 'locs': {}},
-            {'t': 3, 'vars': {'id': 3}, 'locs': {}},
-            {'t': 3, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'id': 2}, 'locs': {}},
-            {'t': 6, 'vars': {'id': 3}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 9, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 18, 'vars': {'id': 1}, 'locs': {}},
-            {'t': 18, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 21, 'vars': {'id': 0}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 0, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 6, 'vars': {'id': 1}, 'locs': {}},
-            {'t': 9, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 9, 'vars': {'id': 0}, 'locs': {}},
-            {'t': 10, 'vars': {'id': 2}, 'locs': {}},
-            {'t': 12, 'vars': {'id': 2}, 'locs': {}},
-            {'t': 15, 'vars': {'id': 2}, 'locs': {}},
-            {'t': 18, 'vars': {'id': 1}, 'locs': {}},
-            {'t': 21, 'vars': {'id': 0}, 'locs': {}},
-        ],
-    },
-    "fischer-symmetry": {
-        "few-short": [
-            {'t': 0, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'set': 1, 'id': 0}, 'locs': {}},
-            {'t': 7, 'vars': {'set': 1, 'id': 2}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'set': 1, 'id': 2}, 'locs': {}},
-            {'t': 1, 'vars': {'set': 1, 'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'set': 1, 'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'set': 1, 'id': 0}, 'locs': {}},
-            {'t': 5, 'vars': {'set': 1, 'id': 2}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 3, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-            {'t': 6, 'vars': {'set': 1, 'id': 2}, 'locs': {}},
-            {'t': 15, 'vars': {'set': 0, 'id': 2}, 'locs': {}},
-            {'t': 23, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 0, 'vars': {'set': 0, 'id': 0}, 'locs': {}},
-            {'t': 3, 'vars': {'set': 0, 'id': 1}, 'locs': {}},
-            {'t': 6, 'vars': {'set': 0, 'id': 1}, 'locs': {}},
-            {'t': 8, 'vars': {'set': 1, 'id': 1}, 'locs': {}},
-            {'t': 11, 'vars': {'set': 1, 'id': 1}, 'locs': {}},
-            {'t': 12, 'vars': {'set': 1, 'id': 1}, 'locs': {}},
-            {'t': 12, 'vars': {'set': 1, 'id': 2}, 'locs': {}},
-            {'t': 18, 'vars': {'set': 0, 'id': 1}, 'locs': {}},
-            {'t': 18, 'vars': {'set': 1, 'id': 1}, 'locs': {}},
-            {'t': 27, 'vars': {'set': 1, 'id': 0}, 'locs': {}},
-        ],
-    },
-    "interrupt": {
-        "few-short": [
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 5}, 'locs': {}},
-            {'t': 10, 'vars': {'count': 6}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 3}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 4}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 5}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 6}, 'locs': {}},
-            {'t': 1, 'vars': {'count': 6}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 1}, 'locs': {}},
-            {'t': 9, 'vars': {'count': 6}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 0, 'vars': {'count': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 2}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'count': 5}, 'locs': {}},
-            {'t': 1, 'vars': {'count': 6}, 'locs': {}},
-        ],
-    },
-    "train-gate": {
-        "few-short": [
-            {'t': 0, 'vars': {'Gate_Tmpl_len': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'Gate_Tmpl_len': 1}, 'locs': {}},
-            {'t': 10, 'vars': {'Gate_Tmpl_len': 4}, 'locs': {}},
-            {'t': 11, 'vars': {'Gate_Tmpl_len': 5}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'Gate_Tmpl_len': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'Gate_Tmpl_len': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'Gate_Tmpl_len': 2}, 'locs': {}},
-            {'t': 0, 'vars': {'Gate_Tmpl_len': 3}, 'locs': {}},
-            {'t': 10, 'vars': {'Gate_Tmpl_len': 3}, 'locs': {}},
-            {'t': 10, 'vars': {'Gate_Tmpl_len': 4}, 'locs': {}},
-            {'t': 13, 'vars': {'Gate_Tmpl_len': 5}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 0, 'vars': {'Gate_Tmpl_len': 2}, 'locs': {}},
-            {'t': 0, 'vars': {'Gate_Tmpl_len': 3}, 'locs': {}},
-            {'t': 70, 'vars': {'Gate_Tmpl_len': 5}, 'locs': {}},
-            {'t': 74, 'vars': {'Gate_Tmpl_len': 5}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 5, 'vars': {'Gate_Tmpl_len': 1}, 'locs': {}},
-            {'t': 13, 'vars': {'Gate_Tmpl_len': 5}, 'locs': {}},
-            {'t': 13, 'vars': {'Gate_Tmpl_len': 5}, 'locs': {}},
-            {'t': 13, 'vars': {'Gate_Tmpl_len': 6}, 'locs': {}},
-            {'t': 21, 'vars': {'Gate_Tmpl_len': 6}, 'locs': {}},
-            {'t': 23, 'vars': {'Gate_Tmpl_len': 5}, 'locs': {}},
-            {'t': 43, 'vars': {'Gate_Tmpl_len': 6}, 'locs': {}},
-            {'t': 44, 'vars': {'Gate_Tmpl_len': 6}, 'locs': {}},
-            {'t': 53, 'vars': {'Gate_Tmpl_len': 5}, 'locs': {}},
-            {'t': 75, 'vars': {'Gate_Tmpl_len': 5}, 'locs': {}},
-        ],
-    },
-    "train-gate-orig": {
-        "few-short": [
-            {'t': 0, 'vars': {'el': 0, 'Queue_Tmpl_len': 0, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'el': 4, 'Queue_Tmpl_len': 1, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'el': 3, 'Queue_Tmpl_len': 2, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'el': 2, 'Queue_Tmpl_len': 3, 'Queue_Tmpl_i': 0}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'el': 0, 'Queue_Tmpl_len': 0, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'el': 2, 'Queue_Tmpl_len': 1, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'el': 1, 'Queue_Tmpl_len': 2, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 10, 'vars': {'el': 1, 'Queue_Tmpl_len': 2, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 10, 'vars': {'el': 4, 'Queue_Tmpl_len': 3, 'Queue_Tmpl_i': 0}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 0, 'vars': {'el': 0, 'Queue_Tmpl_len': 0, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 20, 'vars': {'el': 3, 'Queue_Tmpl_len': 3, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 23, 'vars': {'el': 1, 'Queue_Tmpl_len': 2, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 33, 'vars': {'el': 3, 'Queue_Tmpl_len': 4, 'Queue_Tmpl_i': 0}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 0, 'vars': {'el': 4, 'Queue_Tmpl_len': 1, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'el': 1, 'Queue_Tmpl_len': 2, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 7, 'vars': {'el': 2, 'Queue_Tmpl_len': 4, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 12, 'vars': {'el': 2, 'Queue_Tmpl_len': 4, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 20, 'vars': {'el': 1, 'Queue_Tmpl_len': 3, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 20, 'vars': {'el': 1, 'Queue_Tmpl_len': 3, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 23, 'vars': {'el': 4, 'Queue_Tmpl_len': 4, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 23, 'vars': {'el': 3, 'Queue_Tmpl_len': 3, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 30, 'vars': {'el': 3, 'Queue_Tmpl_len': 3, 'Queue_Tmpl_i': 0}, 'locs': {}},
-            {'t': 32, 'vars': {'el': 1, 'Queue_Tmpl_len': 4, 'Queue_Tmpl_i': 0}, 'locs': {}},
-        ],
-    },
-    "csmacd2": {
-        "few-short": [
-            {'t': 1616, 'vars': {'P0_state': 1, 'P1_state': 1, 'P2_state': 2}, 'locs': {}},
-            {'t': 1616, 'vars': {'P0_state': 2, 'P1_state': 1, 'P2_state': 1}, 'locs': {}},
-            {'t': 1616, 'vars': {'P0_state': 3, 'P1_state': 2, 'P2_state': 1}, 'locs': {}},
-            {'t': 1655, 'vars': {'P0_state': 0, 'P1_state': 2, 'P2_state': 2}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'P0_state': 0, 'P1_state': 0, 'P2_state': 0}, 'locs': {}},
-            {'t': 63, 'vars': {'P0_state': 1, 'P1_state': 0, 'P2_state': 1}, 'locs': {}},
-            {'t': 805, 'vars': {'P0_state': 1, 'P1_state': 2, 'P2_state': 1}, 'locs': {}},
-            {'t': 808, 'vars': {'P0_state': 0, 'P1_state': 2, 'P2_state': 0}, 'locs': {}},
-            {'t': 875, 'vars': {'P0_state': 1, 'P1_state': 1, 'P2_state': 0}, 'locs': {}},
-            {'t': 1607, 'vars': {'P0_state': 1, 'P1_state': 1, 'P2_state': 2}, 'locs': {}},
-            {'t': 1616, 'vars': {'P0_state': 0, 'P1_state': 0, 'P2_state': 2}, 'locs': {}},
-            {'t': 1616, 'vars': {'P0_state': 1, 'P1_state': 1, 'P2_state': 2}, 'locs': {}},
-            {'t': 1616, 'vars': {'P0_state': 2, 'P1_state': 1, 'P2_state': 1}, 'locs': {}},
-            {'t': 1648, 'vars': {'P0_state': 0, 'P1_state': 2, 'P2_state': 2}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 0, 'vars': {'P0_state': 3, 'P1_state': 2, 'P2_state': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 2, 'P1_state': 1, 'P2_state': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 2, 'P1_state': 1, 'P2_state': 1}, 'locs': {}},
-            {'t': 48, 'vars': {'P0_state': 0, 'P1_state': 2, 'P2_state': 2}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 0, 'vars': {'P0_state': 0, 'P1_state': 2, 'P2_state': 2}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 2, 'P1_state': 1, 'P2_state': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 3, 'P1_state': 2, 'P2_state': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 1, 'P1_state': 2, 'P2_state': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 0, 'P1_state': 2, 'P2_state': 2}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 0, 'P1_state': 2, 'P2_state': 2}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 0, 'P1_state': 2, 'P2_state': 2}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 2, 'P1_state': 1, 'P2_state': 1}, 'locs': {}},
-            {'t': 0, 'vars': {'P0_state': 1, 'P1_state': 2, 'P2_state': 1}, 'locs': {}},
-            {'t': 45, 'vars': {'P0_state': 0, 'P1_state': 2, 'P2_state': 2}, 'locs': {}},
-        ],
-    },
-    "tdma": {
-        "few-short": [
-            {'t': 0, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 224, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 381, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 448, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-        ],
-        "many-short": [
-            {'t': 0, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 0, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 49, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 224, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 224, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 224, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-        ],
-        "few-long": [
-            {'t': 0, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 672, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 672, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 1120, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-        ],
-        "many-long": [
-            {'t': 224, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 224, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 448, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 627, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 672, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 896, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 896, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 1120, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 1120, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-            {'t': 1120, 'vars': {'busid': 0, 'n': 0}, 'locs': {}},
-        ],
-    },
-}
@@ -0,0 +1,338 @@
+"""This module implements an asyncio-based driver, which executes experiments as background tasks that can be monitored
+and cancelled."""
+import asyncio
+import collections
+import itertools
+import json
+import os
+import pickle
+import signal
+import sys
+import threading
+import time
+
+from uppyyl_observation_matcher_experiments.definitions import ROOT_DIR
+
+########################################################################################################################
+# Driver configurations #
+########################################################################################################################
+progress_line_prefix = "@progress "
+task_file_name = "task.pickle"
+output_file_name = "output.log"
+max_output_line_length = 16 * 1024 * 1024
+interrupted_exit_status = 130
+
+task_process_code = (
+    'import sys\n'
+    'sys.path.insert(0, {root_dir_path!r})\n'
+    'from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.experiment_driver '
+    'import run_task_file\n'
+    'sys.exit(run_task_file(task_file_path={task_file_path!r}))\n'
+)
+
+
+########################################################################################################################
+# Experiment execution #
+########################################################################################################################
+def run_experiment_functions(experiments, experiment_functions, resume=False):
+    """Executes experiment functions one after another, sharing the time budget of the experiments among them.
+
+    Args:
+        experiments: The systematic experiments whose configuration is used by the experiment functions.
+        experiment_functions: The experiment functions.
+        resume: Choose whether runs already contained in the existing logs are skipped.
+    """
+    experiments.resume = resume
+    time_budget_config = experiments.time_budget_config
+    deadline = time.time() + time_budget_config["time_budget"] if time_budget_config else None
+    try:
+        for exp_idx, experiment_function in enumerate(experiment_functions):
+            if time_budget_config:
+                # Share the remaining budget among the remaining experiments
+                remaining_exp_count = len(experiment_functions) - exp_idx
+                experiments.time_budget_config = dict(
+                    time_budget_config, time_budget=max(0, deadline - time.time()) / remaining_exp_count)
+            experiment_function()
+    finally:
+        experiments.resume = False
+        experiments.time_budget_config = time_budget_config
+
+
+def report_progress(progress):
+    """Reports the progress of an experiment to the driver (executed in the task process).
+
+    Args:
+        progress: The progress dict.
+    """
+    print(f'{progress_line_prefix}{json.dumps(progress)}', flush=True)
+
+
+def run_task_file(task_file_path):
+    """Executes the experiments of a task file (executed in the task process).
+
+    Args:
+        task_file_path: The path of the task file.
+
+    Returns:
+        The exit status of the task process.
+    """
+    with open(task_file_path, 'rb') as file:
+        task_data = pickle.load(file)
+    experiments = task_data["experiments"]
+    experiments.progress_callback = report_progress
+    try:
+        run_experiment_functions(experiments=experiments, experiment_functions=task_data["experiment_functions"],
+                                 resume=task_data["resume"])
+    except KeyboardInterrupt:
+        print(f'Experiment task interrupted.', flush=True)
+        return interrupted_exit_status
+    return 0
+
+
+def _signal_process_group(process_group_id, signal_number):
+    """Sends a signal to all processes of a process group (if any of them still exists).
+
+    Args:
+        process_group_id: The process group ID.
+        signal_number: The signal number.
+    """
+    try:
+        os.killpg(process_group_id, signal_number)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+########################################################################################################################
+# Experiment driver #
+########################################################################################################################
+class ExperimentTask:
+    """A background task executing one or more experiments."""
+
+    def __init__(self, task_id, experiment_names, task_dir_path):
+        """Initializes ExperimentTask.
+
+        Args:
+            task_id: The task ID.
+            experiment_names: The names of the experiments.
+            task_dir_path: The path of the task directory (containing the task file and the output log).
+        """
+        self.task_id = task_id
+        self.experiment_names = experiment_names
+        self.task_dir_path = task_dir_path
+        self.output_file_path = task_dir_path.joinpath(output_file_name)
+        self.status = "queued"
+        self.process_id = None
+        self.progress = None
+        self.exit_status = None
+        self.start_time = None
+        self.end_time = None
+        self.future = None
+
+    @property
+    def is_active(self):
+        """Whether the task is queued or running."""
+        return self.status in ("queued", "running", "cancelling")
+
+    def get_status_string(self):
+        """Constructs the string representation of the task status.
+
+        Returns:
+            The status string.
+        """
+        status_string = f'[{self.task_id}] {self.status}: {", ".join(self.experiment_names)}'
+        if self.start_time is not None:
+            elapsed_time = (self.end_time or time.time()) - self.start_time
+            status_string += f' ({elapsed_time:.0f}s'
+            if self.exit_status is not None:
+                status_string += f', exit status {self.exit_status}'
+            status_string += ')'
+        if self.progress:
+            progress = self.progress
+            status_string += (f' - {progress["experiment"]}: {progress["finished_scenario_count"]} / '
+                              f'{progress["scenario_count"]} scenarios, {progress["finished_run_count"]} runs')
+        return status_string
+
+
+class ExperimentDriver:
+    """Executes experiments as background tasks in an asyncio event loop, which runs in a separate thread.
+
+    Each task runs in a process of its own session, whose output is written to the task directory. At most
+    "max_running_task_count" tasks run at once (bounded by a semaphore), further tasks wait in their submission order.
+    Cancelling a task interrupts its experiment (so that the result streams are compacted, and the experiment can be
+    resumed), and kills all remaining processes of the session, including in-flight verifier processes.
+    """
+
+    def __init__(self, task_dir_path, max_running_task_count=1, cancel_grace_period=10):
+        """Initializes ExperimentDriver.
+
+        Args:
+            task_dir_path: The path of the directory of the task directories.
+            max_running_task_count: The maximum number of tasks running at once.
+            cancel_grace_period: The time (in seconds) an interrupted task may take to stop before it is killed.
+        """
+        self.task_dir_path = task_dir_path
+        self.max_running_task_count = max_running_task_count
+        self.cancel_grace_period = cancel_grace_period
+        self.tasks = collections.OrderedDict()
+        self.task_ids = itertools.count(1)
+        self.loop = None
+        self.loop_thread = None
+        self.semaphore = None
+
+    def _start_loop(self):
+        """Starts the event loop thread (if it is not running yet)."""
+        if self.loop is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        is_loop_ready = threading.Event()
+
+        def run_loop():
+            """Runs the event loop until it is stopped."""
+            asyncio.set_event_loop(self.loop)
+            self.semaphore = asyncio.Semaphore(self.max_running_task_count)
+            is_loop_ready.set()
+            self.loop.run_forever()
+
+        self.loop_thread = threading.Thread(target=run_loop, daemon=True)
+        self.loop_thread.start()
+        is_loop_ready.wait()
+
+    def submit(self, experiments, experiment_functions, experiment_names, resume=False):
+        """Submits a task, which executes experiment functions with the current configuration of the experiments.
+
+        Args:
+            experiments: The systematic experiments whose configuration is used by the experiment functions.
+            experiment_functions: The experiment functions (which must be picklable).
+            experiment_names: The names of the experiments.
+            resume: Choose whether runs already contained in the existing logs are skipped.
+
+        Returns:
+            The task.
+        """
+        self._start_loop()
+        task_id = next(self.task_ids)
+        task_dir_path = self.task_dir_path.joinpath(f'task_{os.getpid()}_{task_id:03}')
+        task_dir_path.mkdir(parents=True, exist_ok=True)
+        task_file_path = task_dir_path.joinpath(task_file_name)
+        with open(task_file_path, 'wb') as file:
+            pickle.dump({"experiments": experiments, "experiment_functions": list(experiment_functions),
+                         "resume": resume}, file)
+
+        task = ExperimentTask(task_id=task_id, experiment_names=list(experiment_names), task_dir_path=task_dir_path)
+        self.tasks[task_id] = task
+        task.future = asyncio.run_coroutine_threadsafe(
+            self._run_task(task=task, task_file_path=task_file_path), self.loop)
+        return task
+
+    def cancel(self, task_id):
+        """Cancels a queued or running task.
+
+        Args:
+            task_id: The task ID.
+
+        Returns:
+            Whether an active task was cancelled.
+        """
+        task = self.tasks.get(task_id)
+        if task is None or not task.is_active:
+            return False
+        task.future.cancel()
+        return True
+
+    def get_active_tasks(self):
+        """Gets all queued or running tasks.
+
+        Returns:
+            The active tasks.
+        """
+        return [task for task in self.tasks.values() if task.is_active]
+
+    def wait(self, task_id, timeout=None):
+        """Waits until a task is stopped.
+
+        Args:
+            task_id: The task ID.
+            timeout: The maximum waiting time (in seconds).
+
+        Returns:
+            Whether the task is stopped.
+        """
+        task = self.tasks[task_id]
+        end_time = time.time() + timeout if timeout is not None else None
+        while task.is_active:
+            if end_time is not None and time.time() >= end_time:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def shutdown(self):
+        """Cancels all active tasks, waits until they are stopped, and stops the event loop."""
+        if self.loop is None:
+            return
+        for task in self.get_active_tasks():
+            self.cancel(task_id=task.task_id)
+        for task in list(self.tasks.values()):
+            self.wait(task_id=task.task_id, timeout=2 * self.cancel_grace_period)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
+        self.loop.close()
+        self.loop = None
+
+    async def _run_task(self, task, task_file_path):
+        """Executes a task in a process of its own session, once the number of running tasks permits it.
+
+        Args:
+            task: The task.
+            task_file_path: The path of the task file.
+        """
+        try:
+            async with self.semaphore:
+                task.status = "running"
+                task.start_time = time.time()
+                code = task_process_code.format(root_dir_path=str(ROOT_DIR), task_file_path=str(task_file_path))
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, "-u", "-c", code, stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT, start_new_session=True, limit=max_output_line_length)
+                task.process_id = process.pid
+                output_relay = asyncio.ensure_future(self._relay_output(task=task, stream=process.stdout))
+                try:
+                    try:
+                        task.exit_status = await process.wait()
+                    except asyncio.CancelledError:
+                        task.status = "cancelling"
+                        _signal_process_group(process_group_id=process.pid, signal_number=signal.SIGINT)
+                        try:
+                            task.exit_status = await asyncio.wait_for(process.wait(), timeout=self.cancel_grace_period)
+                        except asyncio.TimeoutError:
+                            _signal_process_group(process_group_id=process.pid, signal_number=signal.SIGKILL)
+                            task.exit_status = await process.wait()
+                        raise
+                finally:
+                    # Kill remaining processes of the session (e.g., verifier processes of an interrupted run)
+                    _signal_process_group(process_group_id=process.pid, signal_number=signal.SIGKILL)
+                    await output_relay
+            task.status = "finished" if task.exit_status == 0 else "failed"
+        except asyncio.CancelledError:
+            task.status = "cancelled"
+        finally:
+            task.end_time = time.time()
+
+    @staticmethod
+    async def _relay_output(task, stream):
+        """Writes the output of a task process to its output log, and records its progress reports.
+
+        Args:
+            task: The task.
+            stream: The output stream of the task process.
+        """
+        with open(task.output_file_path, 'a') as file:
+            while True:
+                line = await stream.readline()
+                if not line:
+                    break
+                line = line.decode("utf-8", errors="replace")
+                if line.startswith(progress_line_prefix):
+                    task.progress = json.loads(line[len(progress_line_prefix):])
+                else:
+                    file.write(line)
+                    file.flush()
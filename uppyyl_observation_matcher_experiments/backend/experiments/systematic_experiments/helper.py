@@ -5,6 +5,7 @@ import pathlib
 from uppyyl_observation_matcher.backend.helper import save_model_to_file
 from uppyyl_observation_matcher.backend.transformer.model.concrete.preprocessed_model_transformer import \
     PreprocessedModelTransformer
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.span_timer import timed_span
 
 
 def init_directories_and_paths(model_file_path, output_dir_path, config):
@@ -58,6 +59,8 @@ def generate_and_save_preprocess_model(model, instance_data, config):
     preprocessed_model_transformer = PreprocessedModelTransformer()
     preprocessed_model_transformer.set_instance_data(instance_data=instance_data)
     preprocessed_model = model.copy()
-    preprocessed_model_transformer.transform(model=preprocessed_model)
-    save_model_to_file(model=preprocessed_model, model_path=config["preprocessed_model_file_path"])
+    with timed_span(name="transform_model"):
+        preprocessed_model_transformer.transform(model=preprocessed_model)
+    with timed_span(name="save_model_file"):
+        save_model_to_file(model=preprocessed_model, model_path=config["preprocessed_model_file_path"])
     return preprocessed_model
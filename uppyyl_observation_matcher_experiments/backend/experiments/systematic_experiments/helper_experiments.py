@@ -1,60 +1,16 @@
 """This module contains the introduction model example."""
 import copy
 
-from uppyyl_observation_matcher.backend.helper import load_model_from_file, get_instance_data
 from uppyyl_observation_matcher.backend.observation.generator import ObservationGenerator
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.helper import \
-    init_directories_and_paths, generate_and_save_preprocess_model
+    init_directories_and_paths
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_cache import \
+    PreprocessedModelCache
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_data import all_model_data
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_configs import \
     base_observation_config
-
-
-def pretty_print_dict(d, indent_per_level=4):
-    """Pretty prints a given dict.
-
-    Args:
-        d: The dict to pretty print.
-        indent_per_level: The concrete indentation used per indentation level.
-
-    Returns:
-        The pretty printed dict.
-    """
-    string = '{\n'
-    string += pretty_print_dict_rec(d, indent=indent_per_level)
-    string += '}'
-    return string
-
-
-def pretty_print_dict_rec(d, indent=0, indent_per_level=4):
-    """Pretty prints a given dict recursively.
-
-    Args:
-        d: The dict to pretty print.
-        indent: The current indentation level.
-        indent_per_level: The concrete indentation used per indentation level.
-
-    Returns:
-        The pretty printed dict.
-    """
-    string = ""
-    for key, value in d.items():
-        string += ' ' * indent + f'"{key}": '
-        if key in ["few-short", "many-short", "few-long", "many-long"]:
-            string += '[\n'
-            for data_point in value:
-                string += ' ' * (indent + indent_per_level) + str(data_point) + ",\n"
-            string += ' ' * indent + ']'
-        elif isinstance(value, dict):
-            string += "{\n"
-            string += pretty_print_dict_rec(value, indent=indent + indent_per_level)
-            string += ' ' * indent + "}"
-        else:
-            string += str(value)
-
-        string += ",\n"
-
-    return string
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_corpus import \
+    write_model_observation_data
 
 
 ########################################################################################################################
@@ -69,13 +25,16 @@ class HelperExperiments:
         self.experiment_base_dir_path = experiment_base_dir_path
         self.experiment_log_dir_path = (experiment_log_dir_path if experiment_log_dir_path
                                         else self.experiment_base_dir_path.joinpath("logs"))
+        self.model_cache = PreprocessedModelCache(
+            cache_dir_path=self.experiment_base_dir_path.joinpath("cache/preprocessed_models"))
 
     ####################################################################################################################
     # Helper Experiment 1: Generate observations for experiment 2 #
     ####################################################################################################################
     def experiment_generate_observations_for_exp_2(self):
         """Generates fixed observations for experiment 2."""
-        all_observation_data = {}
+        # The corpus files are to be moved to "res/exp2_observation_data" for experiment 2
+        corpus_dir_path = self.experiment_log_dir_path.joinpath("helper", "exp2_observation_data")
         for model_data in all_model_data[:]:
             model_name = model_data["path"].stem
             config = copy.deepcopy(base_observation_config)
@@ -104,10 +63,7 @@ class HelperExperiments:
             })
 
             # Prepare model
-            input_model = load_model_from_file(model_path=config["original_model_file_path"])
-            instance_data = get_instance_data(model=input_model, config=config)
-            preprocessed_model = generate_and_save_preprocess_model(
-                model=input_model, instance_data=instance_data, config=config)
+            _instance_data, preprocessed_model = self.model_cache.load_preprocessed_model(config=config)
 
             model_observation_data = {}
 
@@ -155,15 +111,8 @@ class HelperExperiments:
             model_observation_data["many-long"] = observation_data
             print(observation_data)
 
-            all_observation_data[model_name] = model_observation_data
-
-        print("=== Final data ===")
-        pretty_string = "all_exp2_observation_data = " + pretty_print_dict(d=all_observation_data, indent_per_level=4)
-
-        # Save data to file
-        experiment_log_dir_path = self.experiment_log_dir_path.joinpath("helper")
-        experiment_log_dir_path.mkdir(parents=True, exist_ok=True)
-        experiment_log_file_path = experiment_log_dir_path.joinpath('exp2_observation_data.py')
-        with open(experiment_log_file_path, 'w') as file:
-            file.write(pretty_string)
+            # Save data to the corpus file of the model
+            write_model_observation_data(corpus_dir_path=corpus_dir_path, model_name=model_name,
+                                         model_observation_data=model_observation_data)
 
+        print(f'=== Final data written to "{corpus_dir_path}" ===')
@@ -0,0 +1,328 @@
+"""This module implements an incremental reader of the (possibly huge) JSON experiment logs, which walks the nested
+model, scenario, and run structure of a log and yields its summaries and runs without loading the full log."""
+import itertools
+import json
+import re
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_store import \
+    get_tree_node
+
+########################################################################################################################
+# Reader configurations #
+########################################################################################################################
+default_chunk_size = 1 << 16
+
+# The run log fields which are skipped by default (i.e., never materialized) when reading runs
+default_skipped_run_keys = ("obs_data",)
+
+summary_entry_type = "summary"
+run_entry_type = "run"
+
+_whitespace_pattern = re.compile(r'[ \t\n\r]*')
+_string_pattern = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# Scalars must be followed by a delimiter (or the end of the data), so that a scalar cut off at the end of the buffer
+# (e.g., "1.5" of "1.5e3") is never read as complete
+_scalar_pattern = re.compile(
+    r'(?:-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null|NaN|-?Infinity)(?=[\s,\]}]|$)')
+# The next token of the nesting structure of skipped values, after any scalars and complete strings (a single quote
+# marks a string which is cut off at the end of the buffer)
+_structure_token_pattern = re.compile(r'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*([{}\[\]"])', re.DOTALL)
+
+
+########################################################################################################################
+# JSON event reader #
+########################################################################################################################
+class JsonEventReader:
+    """An incremental pull reader of JSON data, which reads a file chunk-wise and lets the caller decide per value
+    whether it is read, skipped (without building it), or iterated (for objects and arrays).
+
+    The buffered memory is bounded by the chunk size and the largest single string or number of the data.
+    """
+
+    def __init__(self, file, chunk_size=default_chunk_size):
+        """Initializes JsonEventReader.
+
+        Args:
+            file: The (text) file from which the JSON data is read.
+            chunk_size: The number of characters read from the file at once.
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.is_eof = False
+
+    def _fill_buffer(self):
+        """Reads the next chunk of the file into the buffer, dropping the already consumed characters.
+
+        Returns:
+            Whether a chunk could be read (i.e., the end of the file is not yet reached).
+        """
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.is_eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        """Skips the whitespace before the next token."""
+        while True:
+            self.pos = _whitespace_pattern.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill_buffer():
+                return
+
+    def _read_token(self, pattern):
+        """Reads the next token matched by a pattern, extending the buffer until the token is complete.
+
+        Args:
+            pattern: The token pattern.
+
+        Returns:
+            The token string.
+
+        Raises:
+            ValueError: If the next characters do not form a valid token.
+        """
+        while True:
+            match = pattern.match(self.buffer, self.pos)
+            if match is not None and (match.end() < len(self.buffer) or self.is_eof):
+                break
+            if not self._fill_buffer():
+                if match is None:
+                    raise ValueError(f'Invalid JSON token "{self.buffer[self.pos:self.pos + 20]}"')
+                break
+        self.pos = match.end()
+        return match.group()
+
+    def _expect(self, char):
+        """Consumes an expected structural character.
+
+        Args:
+            char: The expected character.
+
+        Raises:
+            ValueError: If the next character is a different one.
+        """
+        next_char = self.peek()
+        if next_char != char:
+            raise ValueError(f'Expected "{char}" in JSON data, but found "{next_char}"')
+        self.pos += 1
+
+    def peek(self):
+        """Gets the next non-whitespace character without consuming it.
+
+        Returns:
+            The next character (e.g., "{" for an object).
+
+        Raises:
+            ValueError: If the end of the data is reached.
+        """
+        self._skip_whitespace()
+        if self.pos >= len(self.buffer):
+            raise ValueError("Unexpected end of JSON data")
+        return self.buffer[self.pos]
+
+    def read_string(self):
+        """Reads the next value, which must be a string.
+
+        Returns:
+            The string.
+        """
+        self._skip_whitespace()
+        return json.loads(self._read_token(pattern=_string_pattern))
+
+    def read_value(self, skipped_keys=()):
+        """Reads (and builds) the next value.
+
+        Args:
+            skipped_keys: The object keys whose values are skipped (on any nesting level).
+
+        Returns:
+            The value.
+        """
+        next_char = self.peek()
+        if next_char == '{':
+            value = {}
+            for key in self.iterate_object():
+                if key in skipped_keys:
+                    self.skip_value()
+                else:
+                    value[key] = self.read_value(skipped_keys=skipped_keys)
+            return value
+        if next_char == '[':
+            return [self.read_value(skipped_keys=skipped_keys) for _ in self.iterate_array()]
+        if next_char == '"':
+            return self.read_string()
+        return json.loads(self._read_token(pattern=_scalar_pattern))
+
+    def skip_value(self):
+        """Skips the next value without building it."""
+        next_char = self.peek()
+        if next_char == '"':
+            self._read_token(pattern=_string_pattern)
+            return
+        if next_char not in '{[':
+            self._read_token(pattern=_scalar_pattern)
+            return
+        depth = 0
+        while True:
+            match = _structure_token_pattern.match(self.buffer, self.pos)
+            token = match.group(1) if match is not None else None
+            if token is None or token == '"':
+                # The buffer holds no further structure token, or the string starting at the token is cut off
+                self.pos = match.start(1) if token is not None else len(self.buffer)
+                if not self._fill_buffer():
+                    raise ValueError("Unexpected end of JSON data")
+                continue
+            self.pos = match.end()
+            depth += 1 if token in '{[' else -1
+            if depth == 0:
+                return
+
+    def iterate_object(self):
+        """Iterates over the next value, which must be an object. For each key, the caller must consume the value
+        (i.e., read or skip it) before the iteration continues.
+
+        Yields:
+            The keys of the object.
+        """
+        self._expect(char='{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self._expect(char=':')
+            yield key
+            next_char = self.peek()
+            self.pos += 1
+            if next_char == '}':
+                return
+            if next_char != ',':
+                raise ValueError(f'Expected "," or "}}" in JSON object, but found "{next_char}"')
+
+    def iterate_array(self):
+        """Iterates over the next value, which must be an array. For each element, the caller must consume it (i.e.,
+        read or skip it) before the iteration continues.
+
+        Yields:
+            The element indices of the array.
+        """
+        self._expect(char='[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        idx = 0
+        while True:
+            yield idx
+            idx += 1
+            next_char = self.peek()
+            self.pos += 1
+            if next_char == ']':
+                return
+            if next_char != ',':
+                raise ValueError(f'Expected "," or "]" in JSON array, but found "{next_char}"')
+
+
+########################################################################################################################
+# Log walker #
+########################################################################################################################
+def iterate_log_entries(log_file_path, include_runs=True, skipped_run_keys=default_skipped_run_keys):
+    """Iterates incrementally over the scenario summaries and runs of an experiment log.
+
+    The log nests the scenarios per model and scenario keys. Summarized scenarios are objects with "runs" and
+    "summary" entries, unsummarized scenarios hold the runs per run index directly, and runs are recognized by their
+    leading "durations" entry.
+
+    Args:
+        log_file_path: The path of the log file.
+        include_runs: Choose whether the runs are read (otherwise, they are skipped and only summaries are yielded).
+        skipped_run_keys: The run log fields which are skipped when reading runs (e.g., the observation data).
+
+    Yields:
+        The entry type (summary or run), the key path of the entry in the log (e.g., [model_name, size, "summary"]),
+        and the entry data.
+    """
+    with open(log_file_path, 'r') as file:
+        reader = JsonEventReader(file=file)
+        yield from _iterate_node_entries(reader=reader, keys=[], include_runs=include_runs,
+                                         skipped_run_keys=skipped_run_keys)
+
+
+def _iterate_node_entries(reader, keys, include_runs, skipped_run_keys):
+    """Iterates over the scenario summaries and runs of the next value of a log reader.
+
+    Args:
+        reader: The log reader.
+        keys: The key path of the value in the log.
+        include_runs: Choose whether the runs are read.
+        skipped_run_keys: The run log fields which are skipped when reading runs.
+
+    Yields:
+        The entry type, key path, and data of the entries.
+    """
+    if reader.peek() != '{':
+        reader.skip_value()
+        return
+    object_keys = reader.iterate_object()
+    for key in object_keys:
+        if key == "durations":
+            run_data = {}
+            for run_key in itertools.chain([key], object_keys):
+                if not include_runs or run_key in skipped_run_keys:
+                    reader.skip_value()
+                else:
+                    run_data[run_key] = reader.read_value()
+            if include_runs:
+                yield run_entry_type, keys, run_data
+            return
+        if key == "summary":
+            yield summary_entry_type, keys + [key], reader.read_value()
+        elif key == "runs" and not include_runs:
+            reader.skip_value()
+        else:
+            yield from _iterate_node_entries(reader=reader, keys=keys + [key], include_runs=include_runs,
+                                             skipped_run_keys=skipped_run_keys)
+
+
+def load_log_tree(log_file_path, include_runs=True, skipped_run_keys=default_skipped_run_keys):
+    """Loads the scenario summaries and runs of an experiment log in its nested structure, without the skipped run log
+    fields.
+
+    Args:
+        log_file_path: The path of the log file.
+        include_runs: Choose whether the runs are loaded (otherwise, only the summaries are loaded).
+        skipped_run_keys: The run log fields which are skipped.
+
+    Returns:
+        The log data (e.g., "log_data[model_name][size]["summary"]").
+    """
+    log_tree = {}
+    for _, keys, data in iterate_log_entries(log_file_path=log_file_path, include_runs=include_runs,
+                                             skipped_run_keys=skipped_run_keys):
+        get_tree_node(tree=log_tree, keys=keys[:-1])[keys[-1]] = data
+    return log_tree
+
+
+def iterate_scenario_runs(log_file_path, scenarios, skipped_run_keys=default_skipped_run_keys):
+    """Iterates incrementally over the runs of the given scenarios which are contained in an experiment log (e.g., to
+    import or estimate them), without loading the full log.
+
+    Args:
+        log_file_path: The path of the log file.
+        scenarios: The scenario data list (e.g., of the model of the log).
+        skipped_run_keys: The run log fields which are skipped (e.g., the observation data).
+
+    Yields:
+        The scenario data, the run index, and the run log data of each run of the scenarios.
+    """
+    scenarios_per_run_key_path = dict(
+        (tuple([scenario["model_name"]] + [str(key) for key in scenario["keys"]]
+               + (["runs"] if scenario["summarize"] else [])), scenario) for scenario in scenarios)
+    for entry_type, keys, run_log_data in iterate_log_entries(log_file_path=log_file_path,
+                                                              skipped_run_keys=skipped_run_keys):
+        scenario = scenarios_per_run_key_path.get(tuple(keys[:-1])) if entry_type == run_entry_type else None
+        if scenario is not None:
+            yield scenario, int(keys[-1]), run_log_data
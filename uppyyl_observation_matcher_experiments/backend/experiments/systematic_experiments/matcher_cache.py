@@ -0,0 +1,371 @@
+"""This module implements a persistent cache for prepared matchers."""
+import collections
+import copy
+import hashlib
+import io
+import json
+import os
+import pathlib
+import pickle
+import shutil
+
+from uppyyl_observation_matcher.backend.matching import ObservationMatcher
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.helper import \
+    init_directories_and_paths
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_cache import \
+    calculate_file_hash, evict_cache_entries, get_cache_version_data, publish_cache_entry
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.span_timer import timed_span
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.verifier_backend import \
+    statistics_file_name
+
+########################################################################################################################
+# Cache configurations #
+########################################################################################################################
+# The configuration fields which influence the prepared matcher (cf. "matcher_model_configs.py")
+matcher_config_keys = [
+    "support_partial_matching",
+    "support_deviating_matching",
+    "support_location_matching",
+    "support_shifted_matching",
+    "support_committed_matching",
+    "allowed_deviations",
+    "maximum_initial_delay",
+    "observed_variables",
+]
+
+cached_matcher_file_name = "prepared_matcher.pickle"
+cached_model_files_dir_name = "models"
+
+
+def get_prepared_matcher_key(config, matcher_type, timeout):
+    """Gets the cache key of a prepared matcher.
+
+    Args:
+        config: The configuration dict containing path data (the preprocessed model file must exist).
+        matcher_type: The matcher type.
+        timeout: The matching timeout.
+
+    Returns:
+        The cache key.
+    """
+    key_data = {
+        "preprocessed_model_hash": calculate_file_hash(file_path=config["preprocessed_model_file_path"]),
+        "model_name": pathlib.Path(config["original_model_file_path"]).stem,
+        "matcher_type": matcher_type,
+        "timeout": timeout,
+        "config": dict((key, config.get(key)) for key in matcher_config_keys),
+        "version": get_cache_version_data(),
+    }
+    key_str = json.dumps(key_data, sort_keys=True, default=str)
+    return hashlib.sha256(key_str.encode("utf-8")).hexdigest()
+
+
+class _SharedObjectPickler(pickle.Pickler):
+    """A pickler which stores references to shared objects instead of the objects themselves."""
+
+    def __init__(self, file, shared_objects):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared_object_names = dict((id(obj), name) for name, obj in shared_objects.items())
+        self.referenced_names = set()
+
+    def persistent_id(self, obj):
+        name = self.shared_object_names.get(id(obj))
+        if name is not None:
+            self.referenced_names.add(name)
+        return name
+
+
+class _SharedObjectUnpickler(pickle.Unpickler):
+    """An unpickler which resolves references to shared objects."""
+
+    def __init__(self, file, shared_objects):
+        super().__init__(file)
+        self.shared_objects = shared_objects
+
+    def persistent_load(self, pid):
+        return self.shared_objects[pid]
+
+
+########################################################################################################################
+# Prepared matcher cache #
+########################################################################################################################
+class _PreparedMatcherEntry:
+    """An in-memory entry of the prepared matcher cache."""
+
+    def __init__(self, key, observation_matcher, config, workspace, preprocessed_model, instance_data, matcher_type,
+                 timeout):
+        self.key = key
+        self.observation_matcher = observation_matcher
+        self.config = config
+        self.workspace = workspace
+        self.preprocessed_model = preprocessed_model
+        self.instance_data = instance_data
+        self.matcher_type = matcher_type
+        self.timeout = timeout
+
+
+class PreparedMatcherCache:
+    """A two-layered cache for matchers on which "prepare_matcher_model()" was executed.
+
+    Each prepared matcher owns a workspace (and a configuration pointing into it), so that it can be shared by all
+    scenarios which only differ in their observations. On disk, the matcher is pickled together with the model files
+    created during preparation; its configuration, model, and instance data are stored as references and rebound on
+    loading, so that a loaded matcher writes into its new workspace.
+    """
+
+    def __init__(self, cache_dir_path=None, max_memory_entry_count=2, max_disk_size=1024 * 1024 * 1024):
+        """Initializes PreparedMatcherCache.
+
+        Args:
+            cache_dir_path: The path of the on-disk cache directory (None disables the on-disk layer).
+            max_memory_entry_count: The maximum number of prepared matchers kept in memory.
+            max_disk_size: The maximum size (in bytes) of the on-disk layer.
+        """
+        self.cache_dir_path = pathlib.Path(cache_dir_path) if cache_dir_path else None
+        self.max_memory_entry_count = max_memory_entry_count
+        self.max_disk_size = max_disk_size
+        self.memory_entries = collections.OrderedDict()
+
+    def __getstate__(self):
+        # The in-process layer is not handed over to other processes
+        state = self.__dict__.copy()
+        state["memory_entries"] = collections.OrderedDict()
+        return state
+
+    def get_prepared_matcher(self, config, preprocessed_model, instance_data, matcher_type, timeout,
+                             workspace_manager):
+        """Gets a prepared matcher, which is loaded from the cache or newly prepared.
+
+        Args:
+            config: The configuration dict containing path data (the preprocessed model file must exist).
+            preprocessed_model: The preprocessed model.
+            instance_data: The instance data of the model.
+            matcher_type: The matcher type.
+            timeout: The matching timeout.
+            workspace_manager: The workspace manager which provides the workspace of a new matcher.
+
+        Returns:
+            The prepared observation matcher.
+        """
+        key = get_prepared_matcher_key(config=config, matcher_type=matcher_type, timeout=timeout)
+        entry = self.memory_entries.get(key)
+        if entry is not None:
+            self.memory_entries.move_to_end(key)
+            return entry.observation_matcher
+
+        model_name = pathlib.Path(config["original_model_file_path"]).stem
+        workspace = workspace_manager.create_workspace(name=f'{model_name}_prepared_matcher')
+        try:
+            matcher_config = copy.deepcopy(config)
+            init_directories_and_paths(
+                model_file_path=config["original_model_file_path"], output_dir_path=workspace.dir_path,
+                config=matcher_config)
+            shutil.copyfile(config["preprocessed_model_file_path"], matcher_config["preprocessed_model_file_path"])
+
+            shared_objects = {"config": matcher_config, "model": preprocessed_model, "instance_data": instance_data}
+            with timed_span(name="load_cached_matcher"):
+                observation_matcher = self._load_from_disk(
+                    key=key, config=matcher_config, shared_objects=shared_objects)
+            if observation_matcher is None:
+                observation_matcher = ObservationMatcher(
+                    config=matcher_config, model=preprocessed_model, instance_data=instance_data,
+                    observation_data=None, matcher_type=matcher_type, timeout=timeout)
+                with timed_span(name="prepare_matcher_model"):
+                    observation_matcher.prepare_matcher_model()
+                self._store_on_disk(key=key, observation_matcher=observation_matcher, config=matcher_config,
+                                    shared_objects=shared_objects)
+        except BaseException:
+            workspace.mark_failed()
+            workspace.close()
+            raise
+
+        self.memory_entries[key] = _PreparedMatcherEntry(
+            key=key, observation_matcher=observation_matcher, config=matcher_config, workspace=workspace,
+            preprocessed_model=preprocessed_model, instance_data=instance_data, matcher_type=matcher_type,
+            timeout=timeout)
+        while len(self.memory_entries) > self.max_memory_entry_count:
+            _key, evicted_entry = self.memory_entries.popitem(last=False)
+            evicted_entry.workspace.close()
+        return observation_matcher
+
+    def discard(self, observation_matcher):
+        """Discards a (potentially broken) prepared matcher from the in-process layer, e.g., after a failed run.
+
+        Args:
+            observation_matcher: The prepared observation matcher.
+        """
+        for key, entry in list(self.memory_entries.items()):
+            if entry.observation_matcher is observation_matcher:
+                del self.memory_entries[key]
+                entry.workspace.mark_failed()
+                entry.workspace.close()
+
+    def create_replicator(self, observation_matcher, workspace_manager):
+        """Creates a replicator for a prepared matcher of the in-process layer, which must currently be idle.
+
+        Args:
+            observation_matcher: The prepared observation matcher.
+            workspace_manager: The workspace manager which provides the workspaces of the replicas.
+
+        Returns:
+            The prepared matcher replicator.
+
+        Raises:
+            ValueError: If the matcher is not contained in the in-process layer.
+        """
+        for entry in self.memory_entries.values():
+            if entry.observation_matcher is observation_matcher:
+                return PreparedMatcherReplicator(entry=entry, workspace_manager=workspace_manager)
+        raise ValueError(f'The observation matcher is not contained in the prepared matcher cache.')
+
+    def clear(self):
+        """Clears the in-process layer and closes the workspaces of all prepared matchers."""
+        while self.memory_entries:
+            _key, entry = self.memory_entries.popitem(last=False)
+            entry.workspace.close()
+
+    def _load_from_disk(self, key, config, shared_objects):
+        """Loads a prepared matcher from the on-disk layer into the workspace given by the config.
+
+        Args:
+            key: The cache key.
+            config: The configuration dict of the new matcher.
+            shared_objects: The objects which are referenced (instead of stored) by the pickled matcher.
+
+        Returns:
+            The prepared observation matcher, or None if no valid entry exists.
+        """
+        if self.cache_dir_path is None:
+            return None
+        entry_dir_path = self.cache_dir_path.joinpath(key)
+        try:
+            with open(entry_dir_path.joinpath(cached_matcher_file_name), 'rb') as file:
+                observation_matcher = _SharedObjectUnpickler(file=file, shared_objects=shared_objects).load()
+            for model_file_path in entry_dir_path.joinpath(cached_model_files_dir_name).iterdir():
+                shutil.copyfile(model_file_path, config["model_output_dir_path"].joinpath(model_file_path.name))
+            os.utime(entry_dir_path)
+        except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+            return None
+        return observation_matcher
+
+    def _store_on_disk(self, key, observation_matcher, config, shared_objects):
+        """Stores a prepared matcher and the model files created during preparation in the on-disk layer.
+
+        Matchers which do not reference the given configuration (e.g., as they copied it) are not stored, since they
+        could not be rebound to a new workspace.
+
+        Args:
+            key: The cache key.
+            observation_matcher: The prepared observation matcher.
+            config: The configuration dict of the matcher.
+            shared_objects: The objects which are referenced (instead of stored) by the pickled matcher.
+        """
+        if self.cache_dir_path is None:
+            return
+
+        def write_entry(entry_dir_path):
+            """Writes the entry files.
+
+            Args:
+                entry_dir_path: The path of the (temporary) entry directory.
+            """
+            with open(entry_dir_path.joinpath(cached_matcher_file_name), 'wb') as file:
+                pickler = _SharedObjectPickler(file=file, shared_objects=shared_objects)
+                pickler.dump(observation_matcher)
+            if "config" not in pickler.referenced_names:
+                raise pickle.PicklingError("The matcher does not reference its configuration")
+            model_files_dir_path = entry_dir_path.joinpath(cached_model_files_dir_name)
+            model_files_dir_path.mkdir()
+            for model_file_path in config["model_output_dir_path"].iterdir():
+                if model_file_path.is_file() and model_file_path != config["preprocessed_model_file_path"] \
+                        and model_file_path.name != statistics_file_name:
+                    shutil.copyfile(model_file_path, model_files_dir_path.joinpath(model_file_path.name))
+
+        try:
+            publish_cache_entry(cache_dir_path=self.cache_dir_path, key=key, write_entry=write_entry)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError) as e:
+            print(f'Prepared matcher for "{config["original_model_file_path"]}" could not be cached on disk: {e}')
+            return
+        evict_cache_entries(cache_dir_path=self.cache_dir_path, max_size=self.max_disk_size)
+
+
+########################################################################################################################
+# Prepared matcher replicas #
+########################################################################################################################
+class PreparedMatcherReplicator:
+    """Creates replicas of a prepared matcher, so that several observations can be matched against it at once.
+
+    Each replica owns a workspace with copies of the prepared model files. The matcher is snapshotted once (while it is
+    idle), and each replica is unpickled from the snapshot with its own configuration; only the configuration is
+    rebound, so that replicas do not share a (potentially mutated) model with the original matcher. Matchers which
+    cannot be snapshotted are prepared anew for each replica.
+    """
+
+    def __init__(self, entry, workspace_manager):
+        """Initializes PreparedMatcherReplicator.
+
+        Args:
+            entry: The prepared matcher cache entry.
+            workspace_manager: The workspace manager which provides the workspaces of the replicas.
+        """
+        self.entry = entry
+        self.workspace_manager = workspace_manager
+        self.replica_workspaces = {}
+
+        self.model_file_names = [file_path.name for file_path in entry.config["model_output_dir_path"].iterdir()
+                                 if file_path.is_file() and file_path.name != statistics_file_name]
+        self.snapshot = None
+        try:
+            snapshot_file = io.BytesIO()
+            pickler = _SharedObjectPickler(file=snapshot_file, shared_objects={"config": entry.config})
+            pickler.dump(entry.observation_matcher)
+            if "config" in pickler.referenced_names:
+                self.snapshot = snapshot_file.getvalue()
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError) as e:
+            print(f'Prepared matcher for "{entry.config["original_model_file_path"]}" could not be snapshotted, so '
+                  f'that it is prepared anew for each replica: {e}')
+
+    def create_replica(self):
+        """Creates a new replica of the prepared matcher.
+
+        Returns:
+            The replica observation matcher.
+        """
+        model_name = pathlib.Path(self.entry.config["original_model_file_path"]).stem
+        workspace = self.workspace_manager.create_workspace(name=f'{model_name}_prepared_matcher_replica')
+        try:
+            replica_config = copy.deepcopy(self.entry.config)
+            init_directories_and_paths(
+                model_file_path=replica_config["original_model_file_path"], output_dir_path=workspace.dir_path,
+                config=replica_config)
+            for model_file_name in self.model_file_names:
+                shutil.copyfile(self.entry.config["model_output_dir_path"].joinpath(model_file_name),
+                                replica_config["model_output_dir_path"].joinpath(model_file_name))
+
+            if self.snapshot is not None:
+                replica = _SharedObjectUnpickler(
+                    file=io.BytesIO(self.snapshot), shared_objects={"config": replica_config}).load()
+            else:
+                replica = ObservationMatcher(
+                    config=replica_config, model=copy.deepcopy(self.entry.preprocessed_model),
+                    instance_data=copy.deepcopy(self.entry.instance_data), observation_data=None,
+                    matcher_type=self.entry.matcher_type, timeout=self.entry.timeout)
+                replica.prepare_matcher_model()
+        except BaseException:
+            workspace.mark_failed()
+            workspace.close()
+            raise
+        self.replica_workspaces[id(replica)] = (replica, workspace)
+        return replica
+
+    def release_replica(self, replica, is_failed=False):
+        """Releases a replica and closes its workspace.
+
+        Args:
+            replica: The replica observation matcher.
+            is_failed: Whether the replica is released after a failure (so that its workspace is kept if configured).
+        """
+        _replica, workspace = self.replica_workspaces.pop(id(replica))
+        if is_failed:
+            workspace.mark_failed()
+        workspace.close()
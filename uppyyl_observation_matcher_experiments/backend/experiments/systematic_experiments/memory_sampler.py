@@ -0,0 +1,191 @@
+"""This module implements the sampling of the memory usage (RSS) of the verifier processes of matchings."""
+import os
+import pathlib
+import threading
+import time
+
+########################################################################################################################
+# Memory sampling configurations #
+########################################################################################################################
+default_memory_sampling_config = {
+    "sample_interval": 0.05,  # The time (in seconds) between two samples
+}
+
+proc_dir_path = pathlib.Path("/proc")
+
+
+########################################################################################################################
+# Process table #
+########################################################################################################################
+def is_memory_sampling_supported():
+    """Checks whether the memory of processes can be sampled on this platform (i.e., via the "/proc" file system).
+
+    Returns:
+        Whether memory sampling is supported.
+    """
+    return proc_dir_path.joinpath("self", "statm").exists()
+
+
+def read_parent_pids():
+    """Reads the parent process IDs of all running processes.
+
+    Returns:
+        The parent PID per PID.
+    """
+    parent_pids = {}
+    for entry_name in os.listdir(proc_dir_path):
+        if not entry_name.isdigit():
+            continue
+        try:
+            with open(proc_dir_path.joinpath(entry_name, "stat"), 'r') as file:
+                stat_str = file.read()
+        except OSError:
+            continue
+        # The process name may contain spaces and parentheses, so the fields are split after its closing parenthesis
+        stat_fields = stat_str[stat_str.rfind(")") + 2:].split()
+        parent_pids[int(entry_name)] = int(stat_fields[1])
+    return parent_pids
+
+
+def read_command_line(pid):
+    """Reads the command line of a process.
+
+    Args:
+        pid: The process ID.
+
+    Returns:
+        The command line (with spaces between the arguments), or an empty string if the process no longer exists.
+    """
+    try:
+        with open(proc_dir_path.joinpath(str(pid), "cmdline"), 'rb') as file:
+            return file.read().replace(b'\0', b' ').decode("utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+def read_rss(pid):
+    """Reads the resident set size of a process.
+
+    Args:
+        pid: The process ID.
+
+    Returns:
+        The RSS (in KB), or 0 if the process no longer exists.
+    """
+    try:
+        with open(proc_dir_path.joinpath(str(pid), "statm"), 'r') as file:
+            resident_page_count = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return resident_page_count * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+########################################################################################################################
+# Memory sampler #
+########################################################################################################################
+class MemorySampler:
+    """Samples the total RSS of the descendant processes of a process in a background thread, e.g., of the verifier
+    processes launched during a matching.
+
+    If a command line pattern is given, only the process subtrees whose root process contains the pattern in its
+    command line are sampled (e.g., the verifier calls on the model files of one matcher), so that the processes of
+    concurrent matchings in the same process are told apart. The average RSS is weighted by the time between the
+    samples, and covers the whole sampling period (including times without verifier processes). Processes which start
+    and end between two samples are not seen, so the sampled peak is only reliable for long calls; the exact peak RSS
+    of each verifier process is recorded by the verifier shim (cf. "verifier_shim.py") instead.
+    """
+
+    def __init__(self, root_pid=None, command_line_pattern=None, sample_interval=0.05):
+        """Initializes MemorySampler.
+
+        Args:
+            root_pid: The ID of the process whose descendants are sampled (None samples the current process).
+            command_line_pattern: The string which the command line of the root of a sampled subtree must contain
+                (None samples all descendants).
+            sample_interval: The time (in seconds) between two samples.
+        """
+        self.root_pid = root_pid if root_pid is not None else os.getpid()
+        self.command_line_pattern = command_line_pattern
+        self.sample_interval = sample_interval
+        self.samples = []
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """Starts sampling in a background thread (if memory sampling is supported)."""
+        if not is_memory_sampling_supported():
+            return
+        self.samples = []
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._sample_periodically, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops sampling, after taking a final sample."""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def _sample_periodically(self):
+        """Takes samples until sampling is stopped."""
+        while True:
+            self.samples.append((time.time(), self.sample_rss()))
+            if self.stop_event.wait(timeout=self.sample_interval):
+                self.samples.append((time.time(), self.sample_rss()))
+                return
+
+    def get_sampled_pids(self):
+        """Gets the IDs of the currently sampled processes.
+
+        Returns:
+            The set of process IDs.
+        """
+        child_pids = {}
+        for pid, parent_pid in read_parent_pids().items():
+            child_pids.setdefault(parent_pid, []).append(pid)
+
+        sampled_pids = set()
+        pending_pids = [(pid, self.command_line_pattern is None) for pid in child_pids.get(self.root_pid, [])]
+        while pending_pids:
+            pid, is_sampled = pending_pids.pop()
+            if not is_sampled:
+                # The command line is read on every sample, since a forked process only shows its own after "exec"
+                is_sampled = self.command_line_pattern in read_command_line(pid=pid)
+            if is_sampled:
+                sampled_pids.add(pid)
+            pending_pids.extend((child_pid, is_sampled) for child_pid in child_pids.get(pid, []))
+        return sampled_pids
+
+    def sample_rss(self):
+        """Samples the total RSS of the sampled processes.
+
+        Returns:
+            The total RSS (in KB).
+        """
+        return sum(read_rss(pid=pid) for pid in self.get_sampled_pids())
+
+    def get_statistics(self):
+        """Gets the statistics of the samples.
+
+        Returns:
+            The peak and time-weighted average RSS (in KB), and the sample count, or None if no samples were taken.
+        """
+        if not self.samples:
+            return None
+        duration = self.samples[-1][0] - self.samples[0][0]
+        weighted_rss_sum = sum(rss * (next_time - sample_time) for (sample_time, rss), (next_time, _next_rss)
+                               in zip(self.samples, self.samples[1:]))
+        return {
+            "peak_rss": max(rss for _sample_time, rss in self.samples),
+            "avg_rss": int(weighted_rss_sum / duration) if duration > 0 else self.samples[0][1],
+            "sample_count": len(self.samples),
+        }
@@ -0,0 +1,287 @@
+"""This module implements a content-hash cache for preprocessed models."""
+import collections
+import copy
+import functools
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import pickle
+import shutil
+import tempfile
+
+from uppyyl_observation_matcher.backend.helper import load_model_from_file, get_instance_data, save_model_to_file
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.helper import \
+    generate_and_save_preprocess_model
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.span_timer import timed_span
+
+########################################################################################################################
+# Cache configurations #
+########################################################################################################################
+# The configuration fields which (may) influence the instance data and the preprocessed model. All other fields (e.g.,
+# observation generation or matcher features) are applied after preprocessing, as exp2 already relies on.
+preprocessing_config_keys = [
+    "observed_variables",
+    "observed_processes_for_locations",
+]
+
+# The version of the format of the cache entries, which has to be increased whenever the cached data changes in a way
+# which is not covered by the cache keys (e.g., the layout of the entry files, or the preprocessing of the experiments)
+cache_format_version = 1
+matcher_package_name = "uppyyl_observation_matcher"
+
+cached_model_file_name = "preprocessed_model.xml"
+cached_data_file_name = "preprocessed_data.pickle"
+
+
+def calculate_file_hash(file_path):
+    """Calculates the SHA-256 hash of the content of a file.
+
+    Args:
+        file_path: The path of the file.
+
+    Returns:
+        The hex digest of the file content.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def get_matcher_package_version():
+    """Gets the installed version of the observation matcher package, which preprocesses the models and prepares the
+    matchers (so that cache entries created by another version are not reused).
+
+    Returns:
+        The package version, or "unknown" if the package metadata is not available (e.g., for a source checkout).
+    """
+    try:
+        return importlib.metadata.version(matcher_package_name)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def get_cache_version_data():
+    """Gets the version data which is part of all cache keys.
+
+    Returns:
+        The cache format version and the version of the observation matcher package.
+    """
+    return {
+        "cache_format_version": cache_format_version,
+        "matcher_package_version": get_matcher_package_version(),
+    }
+
+
+def get_preprocessed_model_key(model_file_path, config):
+    """Gets the cache key of a preprocessed model.
+
+    Args:
+        model_file_path: The path of the original model file.
+        config: The configuration dict.
+
+    Returns:
+        The cache key.
+    """
+    key_data = {
+        "model_hash": calculate_file_hash(file_path=model_file_path),
+        "config": dict((key, config.get(key)) for key in preprocessing_config_keys),
+        "version": get_cache_version_data(),
+    }
+    key_str = json.dumps(key_data, sort_keys=True, default=str)
+    return hashlib.sha256(key_str.encode("utf-8")).hexdigest()
+
+
+def publish_cache_entry(cache_dir_path, key, write_entry):
+    """Writes a new on-disk cache entry into a temporary directory, and publishes it atomically.
+
+    If another process published an entry with the same key in the meantime, its entry is kept. File system errors are
+    ignored, as the entry can always be recreated.
+
+    Args:
+        cache_dir_path: The path of the cache directory.
+        key: The cache key.
+        write_entry: The function which writes the entry files into a given directory path.
+
+    Returns:
+        True if the entry was published, False otherwise.
+    """
+    try:
+        cache_dir_path.mkdir(parents=True, exist_ok=True)
+        temp_dir_path = pathlib.Path(tempfile.mkdtemp(prefix=f'.{key}_', dir=cache_dir_path))
+    except OSError:
+        return False
+    try:
+        write_entry(temp_dir_path)
+        os.rename(temp_dir_path, cache_dir_path.joinpath(key))
+    except OSError:
+        shutil.rmtree(temp_dir_path, ignore_errors=True)
+        return False
+    except BaseException:
+        shutil.rmtree(temp_dir_path, ignore_errors=True)
+        raise
+    return True
+
+
+def evict_cache_entries(cache_dir_path, max_size):
+    """Evicts the least recently used entries of an on-disk cache until its size limit is met.
+
+    Args:
+        cache_dir_path: The path of the cache directory.
+        max_size: The maximum size (in bytes) of the cache.
+    """
+    entries = []
+    total_size = 0
+    for entry_dir_path in cache_dir_path.iterdir():
+        if entry_dir_path.name.startswith("."):
+            continue
+        try:
+            entry_size = sum(f.stat().st_size for f in entry_dir_path.rglob("*") if f.is_file())
+            entries.append((entry_dir_path.stat().st_mtime, entry_size, entry_dir_path))
+        except OSError:
+            continue
+        total_size += entry_size
+
+    for _mtime, entry_size, entry_dir_path in sorted(entries):
+        if total_size <= max_size:
+            break
+        shutil.rmtree(entry_dir_path, ignore_errors=True)
+        total_size -= entry_size
+
+
+########################################################################################################################
+# Preprocessed model cache #
+########################################################################################################################
+class PreprocessedModelCache:
+    """A two-layered cache for preprocessed models and their instance data.
+
+    The in-process layer keeps the most recently used models in memory, and the optional on-disk layer stores them
+    (bounded in size, evicting least recently used entries) so that other workers and later sweeps can reuse them.
+    """
+
+    def __init__(self, cache_dir_path=None, max_memory_entry_count=8, max_disk_size=512 * 1024 * 1024):
+        """Initializes PreprocessedModelCache.
+
+        Args:
+            cache_dir_path: The path of the on-disk cache directory (None disables the on-disk layer).
+            max_memory_entry_count: The maximum number of models kept in memory.
+            max_disk_size: The maximum size (in bytes) of the on-disk layer.
+        """
+        self.cache_dir_path = pathlib.Path(cache_dir_path) if cache_dir_path else None
+        self.max_memory_entry_count = max_memory_entry_count
+        self.max_disk_size = max_disk_size
+        self.memory_entries = collections.OrderedDict()
+
+    def __getstate__(self):
+        # The in-process layer is not handed over to other processes
+        state = self.__dict__.copy()
+        state["memory_entries"] = collections.OrderedDict()
+        return state
+
+    def load_preprocessed_model(self, config):
+        """Loads the preprocessed model of the original model given in the config, using cached data if possible.
+
+        Independent of cache hits, the preprocessed model file is (re-)created at the path given in the config. The
+        loading phases are timed as spans of the current span (cf. "span_timer.py").
+
+        Args:
+            config: The configuration dict containing path data.
+
+        Returns:
+            The instance data and the preprocessed model.
+        """
+        key = get_preprocessed_model_key(model_file_path=config["original_model_file_path"], config=config)
+
+        entry = self.memory_entries.get(key)
+        if entry is not None:
+            self.memory_entries.move_to_end(key)
+            instance_data, preprocessed_model = entry
+            with timed_span(name="save_model_file"):
+                self._save_model_file(key=key, model=preprocessed_model, config=config)
+            return copy.deepcopy(instance_data), preprocessed_model.copy()
+
+        with timed_span(name="load_cached_model"):
+            entry = self._load_from_disk(key=key, config=config)
+        if entry is None:
+            with timed_span(name="load_model_file"):
+                input_model = load_model_from_file(model_path=config["original_model_file_path"])
+            with timed_span(name="get_instance_data"):
+                instance_data = get_instance_data(model=input_model, config=config)
+            preprocessed_model = generate_and_save_preprocess_model(
+                model=input_model, instance_data=instance_data, config=config)
+            entry = (instance_data, preprocessed_model)
+            self._store_on_disk(key=key, entry=entry, config=config)
+
+        self.memory_entries[key] = entry
+        while len(self.memory_entries) > self.max_memory_entry_count:
+            self.memory_entries.popitem(last=False)
+        instance_data, preprocessed_model = entry
+        return copy.deepcopy(instance_data), preprocessed_model.copy()
+
+    def _save_model_file(self, key, model, config):
+        """Saves the preprocessed model file to the path given in the config.
+
+        Args:
+            key: The cache key.
+            model: The preprocessed model.
+            config: The configuration dict containing path data.
+        """
+        entry_dir_path = self.cache_dir_path.joinpath(key) if self.cache_dir_path else None
+        if entry_dir_path and entry_dir_path.joinpath(cached_model_file_name).exists():
+            shutil.copyfile(entry_dir_path.joinpath(cached_model_file_name), config["preprocessed_model_file_path"])
+        else:
+            save_model_to_file(model=model, model_path=config["preprocessed_model_file_path"])
+
+    def _load_from_disk(self, key, config):
+        """Loads a cache entry from the on-disk layer.
+
+        Args:
+            key: The cache key.
+            config: The configuration dict containing path data.
+
+        Returns:
+            The instance data and the preprocessed model, or None if no valid entry exists.
+        """
+        if self.cache_dir_path is None:
+            return None
+        entry_dir_path = self.cache_dir_path.joinpath(key)
+        try:
+            with open(entry_dir_path.joinpath(cached_data_file_name), 'rb') as file:
+                entry = pickle.load(file)
+            shutil.copyfile(entry_dir_path.joinpath(cached_model_file_name), config["preprocessed_model_file_path"])
+            os.utime(entry_dir_path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return entry
+
+    def _store_on_disk(self, key, entry, config):
+        """Stores a cache entry in the on-disk layer, and evicts old entries if the size limit is exceeded.
+
+        Args:
+            key: The cache key.
+            entry: The instance data and the preprocessed model.
+            config: The configuration dict containing path data.
+        """
+        if self.cache_dir_path is None:
+            return
+
+        def write_entry(entry_dir_path):
+            """Writes the entry files.
+
+            Args:
+                entry_dir_path: The path of the (temporary) entry directory.
+            """
+            with open(entry_dir_path.joinpath(cached_data_file_name), 'wb') as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            shutil.copyfile(config["preprocessed_model_file_path"], entry_dir_path.joinpath(cached_model_file_name))
+
+        try:
+            publish_cache_entry(cache_dir_path=self.cache_dir_path, key=key, write_entry=write_entry)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError) as e:
+            print(f'Preprocessed model "{config["original_model_file_path"]}" could not be cached on disk: {e}')
+            return
+        evict_cache_entries(cache_dir_path=self.cache_dir_path, max_size=self.max_disk_size)
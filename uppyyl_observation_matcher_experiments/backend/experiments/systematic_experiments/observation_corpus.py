@@ -0,0 +1,87 @@
+"""This module implements the corpus of fixed observations (e.g., of experiment 2), which is kept in versioned data
+files (one per model) that are loaded on demand."""
+import json
+import os
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_series import \
+    ObservationSeries, as_observation_data
+from uppyyl_observation_matcher_experiments.definitions import RES_DIR
+
+########################################################################################################################
+# Corpus configurations #
+########################################################################################################################
+observation_corpus_version = 1
+exp2_observation_corpus_dir_path = RES_DIR.joinpath("exp2_observation_data")
+
+
+########################################################################################################################
+# Corpus files #
+########################################################################################################################
+def get_observation_corpus_file_path(corpus_dir_path, model_name):
+    """Gets the path of the corpus file of a model.
+
+    Args:
+        corpus_dir_path: The path of the corpus directory.
+        model_name: The model name.
+
+    Returns:
+        The path of the corpus file.
+    """
+    return corpus_dir_path.joinpath(f'{model_name}.json')
+
+
+def load_model_observation_data(corpus_dir_path, model_name):
+    """Loads the fixed observations of a model from its corpus file.
+
+    Args:
+        corpus_dir_path: The path of the corpus directory.
+        model_name: The model name.
+
+    Returns:
+        The observation series per observation type (e.g., "few-short"; None for types without observation data).
+
+    Raises:
+        ValueError: If the corpus file is of another version, or of another model.
+    """
+    corpus_file_path = get_observation_corpus_file_path(corpus_dir_path=corpus_dir_path, model_name=model_name)
+    with open(corpus_file_path, 'r') as file:
+        corpus_data = json.load(file)
+    if corpus_data.get("version") != observation_corpus_version:
+        raise ValueError(f'Unsupported version {corpus_data.get("version")} of observation corpus file '
+                         f'"{corpus_file_path}" (expected version {observation_corpus_version})')
+    if corpus_data.get("model_name") != model_name:
+        raise ValueError(f'Observation corpus file "{corpus_file_path}" belongs to model '
+                         f'"{corpus_data.get("model_name")}" instead of "{model_name}"')
+    return dict((obs_type, ObservationSeries.from_observation_data(observation_data=obs_data)
+                 if obs_data is not None else None) for obs_type, obs_data in corpus_data["observation_data"].items())
+
+
+def write_model_observation_data(corpus_dir_path, model_name, model_observation_data):
+    """Writes the fixed observations of a model to its corpus file (one observation point per line).
+
+    Args:
+        corpus_dir_path: The path of the corpus directory.
+        model_name: The model name.
+        model_observation_data: The observation data per observation type (in the dict form, or as observation
+            series).
+    """
+    lines = ['{', f'    "version": {observation_corpus_version},', f'    "model_name": {json.dumps(model_name)},',
+             '    "observation_data": {']
+    for obs_type_idx, (obs_type, obs_data) in enumerate(model_observation_data.items()):
+        separator = ',' if obs_type_idx < len(model_observation_data) - 1 else ''
+        obs_data = as_observation_data(observation_data=obs_data)
+        if not obs_data:
+            lines.append(f'        {json.dumps(obs_type)}: {json.dumps(obs_data)}{separator}')
+            continue
+        lines.append(f'        {json.dumps(obs_type)}: [')
+        lines.extend(f'            {json.dumps(data_point)}{"," if point_idx < len(obs_data) - 1 else ""}'
+                     for point_idx, data_point in enumerate(obs_data))
+        lines.append(f'        ]{separator}')
+    lines.extend(['    }', '}'])
+
+    corpus_dir_path.mkdir(parents=True, exist_ok=True)
+    corpus_file_path = get_observation_corpus_file_path(corpus_dir_path=corpus_dir_path, model_name=model_name)
+    temp_corpus_file_path = corpus_file_path.with_name(f'.{corpus_file_path.name}.tmp')
+    with open(temp_corpus_file_path, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+    os.replace(temp_corpus_file_path, corpus_file_path)
@@ -0,0 +1,494 @@
+"""This module implements a static pre-filter, which rejects observations that cannot match a model before they are
+verified."""
+import collections
+import hashlib
+import re
+import xml.etree.ElementTree as ElementTree
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_cache import \
+    not_observed_value
+
+########################################################################################################################
+# Pre-filter configurations #
+########################################################################################################################
+default_int_range = (-32768, 32767)
+bool_range = (0, 1)
+max_cached_model_constraint_count = 8
+
+_model_constraints_cache = collections.OrderedDict()
+
+_declaration_pattern = re.compile(r'^(const\s+)?(int|bool)\s*(\[([^\]]*)\])?\s+(.+)$', re.DOTALL)
+_declared_name_pattern = re.compile(r'^(\w+)\s*(\[)?[^=]*(=\s*(.+))?$', re.DOTALL)
+_clock_declaration_pattern = re.compile(r'^clock\s+(.+)$', re.DOTALL)
+_constant_assignment_pattern = re.compile(r'^(\w+)\s*=\s*([^=].*)$', re.DOTALL)
+_reference_parameter_pattern = re.compile(r'\b(?:int|bool|clock)\b(?:\s*\[[^\]]*\])?\s*&\s*\w')
+_process_assignment_pattern = re.compile(r'^(\w+)\s*=\s*(\w+)\s*\(')
+_upper_bound_pattern = re.compile(r'^(\w+)\s*<=?\s*(.+)$', re.DOTALL)
+
+
+########################################################################################################################
+# Model analysis #
+########################################################################################################################
+def _strip_comments(code):
+    """Removes all comments from Uppaal code.
+
+    Args:
+        code: The code.
+
+    Returns:
+        The code without comments.
+    """
+    return re.sub(r'//[^\n]*|/\*.*?\*/', ' ', code or "", flags=re.DOTALL)
+
+
+def _split_top_level(code, separator):
+    """Splits Uppaal code at the occurrences of a separator which are not enclosed in brackets.
+
+    Args:
+        code: The code.
+        separator: The separator character.
+
+    Returns:
+        The (stripped, non-empty) parts of the code.
+    """
+    parts = []
+    depth = 0
+    start_idx = 0
+    for idx, char in enumerate(code):
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(code[start_idx:idx])
+            start_idx = idx + 1
+    parts.append(code[start_idx:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _split_function_bodies(code):
+    """Separates the top-level declarations of Uppaal code from the code enclosed in braces (e.g., function bodies).
+
+    Args:
+        code: The code.
+
+    Returns:
+        The top-level code and the enclosed code.
+    """
+    top_level_chars = []
+    enclosed_chars = []
+    depth = 0
+    for char in code:
+        if char == "{":
+            depth += 1
+            top_level_chars.append(" " if depth > 1 else ";")
+        elif char == "}":
+            depth -= 1
+        elif depth == 0:
+            top_level_chars.append(char)
+        else:
+            enclosed_chars.append(char)
+    return "".join(top_level_chars), "".join(enclosed_chars)
+
+
+def _parse_int_value(expression, constants):
+    """Parses an integer literal, a Boolean literal, or the name of an integer constant.
+
+    Args:
+        expression: The expression string.
+        constants: The values of the known constants.
+
+    Returns:
+        The integer value, or None if the expression is no such value.
+    """
+    expression = expression.strip()
+    if expression in ("true", "false"):
+        return int(expression == "true")
+    if re.fullmatch(r'-?\s*\d+', expression):
+        return int(expression.replace(" ", ""))
+    return constants.get(expression)
+
+
+def _get_write_pattern(name):
+    """Gets the pattern which matches all writes to a variable (i.e., assignments, increments, and decrements).
+
+    Args:
+        name: The variable name.
+
+    Returns:
+        The compiled pattern.
+    """
+    escaped_name = re.escape(name)
+    return re.compile(rf'(?<![\w.]){escaped_name}\s*(?:\[[^\]]*\]\s*)?(?:(?:[-+*/%&|^]|<<|>>)?=(?!=)|\+\+|--)|'
+                      rf'(?:\+\+|--)\s*{escaped_name}\b')
+
+
+def _parse_declarations(code, constants, variables, clocks):
+    """Parses the top-level integer, Boolean, and clock declarations of Uppaal code.
+
+    Arrays (and function signatures) are not tracked, and variables with non-literal initializers have no known
+    initial value.
+
+    Args:
+        code: The top-level code.
+        constants: The dict to which the values of constants are added.
+        variables: The dict to which the ranges and initial values of variables are added.
+        clocks: The set to which the clock names are added.
+    """
+    for statement in _split_top_level(code, separator=";"):
+        clock_match = _clock_declaration_pattern.match(statement)
+        if clock_match:
+            clocks.update(name.strip() for name in _split_top_level(clock_match.group(1), separator=","))
+            continue
+        declaration_match = _declaration_pattern.match(statement)
+        if not declaration_match:
+            continue
+        is_constant, var_type, _, range_str, names_str = declaration_match.groups()
+        value_range = bool_range if var_type == "bool" else default_int_range
+        if range_str is not None:
+            bounds = [_parse_int_value(bound, constants) for bound in _split_top_level(range_str, separator=",")]
+            if len(bounds) == 2 and None not in bounds:
+                value_range = tuple(bounds)
+        for declared_name in _split_top_level(names_str, separator=","):
+            name_match = _declared_name_pattern.match(declared_name)
+            if not name_match or name_match.group(2) or "(" in declared_name.split("=")[0]:
+                continue
+            name, initializer = name_match.group(1), name_match.group(4)
+            initial_value = _parse_int_value(initializer, constants) if initializer is not None else 0
+            if is_constant:
+                if initial_value is not None:
+                    constants[name] = initial_value
+            else:
+                variables[name] = {"range": value_range, "initial_value": initial_value}
+
+
+def _get_reachable_location_ids(template_element):
+    """Gets the locations of a template which are reachable from its initial location (ignoring all guards).
+
+    Args:
+        template_element: The template XML element.
+
+    Returns:
+        The IDs of the reachable locations.
+    """
+    successors = collections.defaultdict(set)
+    for transition_element in template_element.iter("transition"):
+        successors[transition_element.find("source").get("ref")].add(transition_element.find("target").get("ref"))
+    init_element = template_element.find("init")
+    if init_element is None:
+        return set(location_element.get("id") for location_element in template_element.iter("location"))
+    reachable_location_ids = {init_element.get("ref")}
+    open_location_ids = [init_element.get("ref")]
+    while open_location_ids:
+        for target_id in successors[open_location_ids.pop()]:
+            if target_id not in reachable_location_ids:
+                reachable_location_ids.add(target_id)
+                open_location_ids.append(target_id)
+    return reachable_location_ids
+
+
+def _get_process_templates(system_code, template_elements):
+    """Gets the templates of the processes of the system declaration.
+
+    Only processes with a unique name (i.e., instantiated templates or templates without parameters) are considered.
+
+    Args:
+        system_code: The system declaration code.
+        template_elements: The template XML elements by name.
+
+    Returns:
+        The template name of each process name.
+    """
+    instantiations = {}
+    process_names = []
+    for statement in _split_top_level(system_code, separator=";"):
+        assignment_match = _process_assignment_pattern.match(statement)
+        if assignment_match:
+            instantiations[assignment_match.group(1)] = assignment_match.group(2)
+        elif statement.startswith("system"):
+            process_names.extend(name.strip() for name in re.split(r'[,<]', statement[len("system"):]))
+
+    process_templates = {}
+    for process_name in process_names:
+        template_name = instantiations.get(process_name)
+        if template_name is None and process_name in template_elements:
+            parameter_element = template_elements[process_name].find("parameter")
+            if parameter_element is None or not (parameter_element.text or "").strip():
+                template_name = process_name
+        if template_name in template_elements:
+            process_templates[process_name] = template_name
+    return process_templates
+
+
+class ModelConstraints:
+    """The necessary conditions for observations of a model, derived statically from the model file.
+
+    All conditions are over-approximations of the model behavior (e.g., guards are ignored, and variables written in
+    any way other than the assignment of a constant have unknown values), so that no possible observation violates
+    them.
+    """
+
+    def __init__(self, variable_ranges, variable_values, process_locations, time_horizon):
+        """Initializes ModelConstraints.
+
+        Args:
+            variable_ranges: The declared value range of each integer and Boolean variable.
+            variable_values: The finite set of possible values of each variable whose values are known.
+            process_locations: The names of the reachable locations of each process.
+            time_horizon: The maximum time span of any run (None if runs are unbounded).
+        """
+        self.variable_ranges = variable_ranges
+        self.variable_values = variable_values
+        self.process_locations = process_locations
+        self.time_horizon = time_horizon
+
+    @staticmethod
+    def from_model_file(model_file_path):
+        """Derives the constraints of a model from its Uppaal XML file.
+
+        Args:
+            model_file_path: The path of the model file.
+
+        Returns:
+            The model constraints.
+        """
+        with open(model_file_path, 'rb') as file:
+            return ModelConstraints.from_model_data(model_data=file.read())
+
+    @staticmethod
+    def from_model_data(model_data):
+        """Derives the constraints of a model from its Uppaal XML data.
+
+        Args:
+            model_data: The XML data of the model.
+
+        Returns:
+            The model constraints.
+        """
+        root_element = ElementTree.fromstring(model_data)
+        template_elements = collections.OrderedDict(
+            (template_element.findtext("name", default="").strip(), template_element)
+            for template_element in root_element.iter("template"))
+        global_code = _strip_comments(root_element.findtext("declaration"))
+        system_code = _strip_comments(root_element.findtext("system"))
+
+        constants = {}
+        variables = {}
+        global_clocks = set()
+        global_top_level_code, global_enclosed_code = _split_function_bodies(global_code)
+        _parse_declarations(code=global_top_level_code, constants=constants, variables=variables,
+                            clocks=global_clocks)
+
+        # Collect all code which may write variables (besides the top-level declarations)
+        function_codes = [global_enclosed_code, system_code]
+        assignment_codes = []
+        local_clocks = {}
+        for template_name, template_element in template_elements.items():
+            local_code = _strip_comments(template_element.findtext("declaration"))
+            local_top_level_code, _ = _split_function_bodies(local_code)
+            local_clocks[template_name] = set()
+            _parse_declarations(code=local_top_level_code, constants={}, variables={},
+                                clocks=local_clocks[template_name])
+            function_codes.append(local_code)
+            function_codes.append(_strip_comments(template_element.findtext("parameter")))
+            for label_element in template_element.iter("label"):
+                if label_element.get("kind") == "assignment":
+                    assignment_codes.append((template_name, _strip_comments(label_element.text)))
+        has_reference_parameters = any(_reference_parameter_pattern.search(code) for code in function_codes)
+
+        # Derive the possible values of variables which are only assigned constants
+        variable_values = {}
+        for name, variable in variables.items():
+            write_pattern = _get_write_pattern(name=name)
+            values = {variable["initial_value"]}
+            is_known = variable["initial_value"] is not None and not has_reference_parameters
+            is_known = is_known and not any(write_pattern.search(code) for code in function_codes)
+            for _, assignment_code in assignment_codes:
+                if not is_known:
+                    break
+                for assignment in _split_top_level(assignment_code, separator=","):
+                    assignment_match = _constant_assignment_pattern.match(assignment)
+                    if assignment_match and assignment_match.group(1) == name:
+                        value = _parse_int_value(assignment_match.group(2), constants)
+                        values.add(value)
+                        is_known = is_known and value is not None
+                    elif write_pattern.search(assignment):
+                        is_known = False
+            if is_known:
+                low, high = variable["range"]
+                variable_values[name] = set(value for value in values if low <= value <= high)
+
+        # Derive the reachable locations of the processes, and the time horizon of their location invariants
+        process_locations = {}
+        time_horizon = None
+        for process_name, template_name in _get_process_templates(
+                system_code=system_code, template_elements=template_elements).items():
+            template_element = template_elements[template_name]
+            reachable_location_ids = _get_reachable_location_ids(template_element=template_element)
+            reachable_location_elements = [location_element for location_element in template_element.iter("location")
+                                           if location_element.get("id") in reachable_location_ids]
+            process_locations[process_name] = set(
+                location_element.findtext("name").strip() for location_element in reachable_location_elements
+                if location_element.findtext("name"))
+
+            never_reset_clocks = set(
+                clock for clock in global_clocks | local_clocks[template_name]
+                if not any(_get_write_pattern(name=clock).search(code)
+                           for code in function_codes + [code for _, code in assignment_codes]))
+            template_horizon = None
+            for location_element in reachable_location_elements:
+                location_horizon = None
+                for label_element in location_element.iter("label"):
+                    if label_element.get("kind") != "invariant":
+                        continue
+                    for conjunct in _strip_comments(label_element.text).split("&&"):
+                        bound_match = _upper_bound_pattern.match(conjunct.strip())
+                        if bound_match and bound_match.group(1) in never_reset_clocks:
+                            bound = _parse_int_value(bound_match.group(2), constants)
+                            if bound is not None:
+                                location_horizon = bound if location_horizon is None else min(location_horizon, bound)
+                if location_horizon is None:
+                    template_horizon = None
+                    break
+                template_horizon = location_horizon if template_horizon is None else max(template_horizon,
+                                                                                         location_horizon)
+            if template_horizon is not None:
+                time_horizon = template_horizon if time_horizon is None else min(time_horizon, template_horizon)
+
+        variable_ranges = dict((name, variable["range"]) for name, variable in variables.items())
+        return ModelConstraints(variable_ranges=variable_ranges, variable_values=variable_values,
+                                process_locations=process_locations, time_horizon=time_horizon)
+
+
+def load_model_constraints(model_file_path):
+    """Loads the constraints of a model, which are derived only once per model file content (per process).
+
+    Args:
+        model_file_path: The path of the model file.
+
+    Returns:
+        The model constraints.
+    """
+    with open(model_file_path, 'rb') as file:
+        model_data = file.read()
+    key = hashlib.sha256(model_data).hexdigest()
+    model_constraints = _model_constraints_cache.get(key)
+    if model_constraints is None:
+        model_constraints = ModelConstraints.from_model_data(model_data=model_data)
+        _model_constraints_cache[key] = model_constraints
+        while len(_model_constraints_cache) > max_cached_model_constraint_count:
+            _model_constraints_cache.popitem(last=False)
+    else:
+        _model_constraints_cache.move_to_end(key)
+    return model_constraints
+
+
+########################################################################################################################
+# Observation pre-filter #
+########################################################################################################################
+def _is_number(value):
+    """Checks whether an observed value is a number.
+
+    Args:
+        value: The observed value.
+
+    Returns:
+        Whether the value is a number.
+    """
+    return isinstance(value, (int, float))
+
+
+class ObservationPrefilter:
+    """Rejects observations which violate the necessary conditions of a model, so that they need not be verified.
+
+    An observation is rejected if it contains decreasing time stamps, spans more time than any run of the model, or
+    contains a variable value (beyond its allowed deviation) or a location which no run of the model can produce.
+    """
+
+    def __init__(self, model_constraints, config):
+        """Initializes ObservationPrefilter.
+
+        Args:
+            model_constraints: The model constraints.
+            config: The configuration dict containing the matcher features.
+        """
+        self.model_constraints = model_constraints
+        self.config = config
+
+    def _get_value_tolerance(self, variable_name):
+        """Gets the maximum deviation of the observed values of a variable from its actual values.
+
+        Args:
+            variable_name: The variable name.
+
+        Returns:
+            The tolerance, or None if it is unknown.
+        """
+        if not self.config.get("support_deviating_matching"):
+            return 0
+        deviation = (self.config.get("allowed_deviations") or {}).get(variable_name)
+        if isinstance(deviation, (list, tuple)):
+            return max((abs(bound) for bound in deviation), default=0)
+        return abs(deviation) if _is_number(deviation) else None
+
+    def check(self, observation_data):
+        """Checks whether an observation satisfies the necessary conditions of the model.
+
+        Args:
+            observation_data: The observation data.
+
+        Returns:
+            The reason why the observation is rejected, or None if it may match.
+        """
+        model_constraints = self.model_constraints
+        time_stamps = [point.get("t") for point in observation_data if _is_number(point.get("t"))]
+        for point_idx in range(1, len(time_stamps)):
+            if time_stamps[point_idx] < time_stamps[point_idx - 1]:
+                return f'time stamp {time_stamps[point_idx]} precedes time stamp {time_stamps[point_idx - 1]}'
+        if model_constraints.time_horizon is not None and time_stamps:
+            max_time_span = model_constraints.time_horizon
+            if self.config.get("support_shifted_matching"):
+                max_time_span += self.config.get("maximum_initial_delay") or 0
+            if time_stamps[-1] - time_stamps[0] > max_time_span:
+                return f'observed time span {time_stamps[-1] - time_stamps[0]} exceeds the time horizon ' \
+                       f'{model_constraints.time_horizon} of the model'
+
+        for point in observation_data:
+            for variable_name, value in (point.get("vars") or {}).items():
+                if not _is_number(value) or variable_name not in model_constraints.variable_ranges:
+                    continue
+                tolerance = self._get_value_tolerance(variable_name=variable_name)
+                if tolerance is None:
+                    continue
+                low, high = model_constraints.variable_ranges[variable_name]
+                if not low - tolerance <= value <= high + tolerance:
+                    return f'value {value} of variable "{variable_name}" is outside of its range [{low}, {high}]'
+                possible_values = model_constraints.variable_values.get(variable_name)
+                if possible_values is not None and all(abs(value - possible_value) > tolerance
+                                                       for possible_value in possible_values):
+                    return f'value {value} of variable "{variable_name}" is never assigned'
+            for process_name, location_name in (point.get("locs") or {}).items():
+                reachable_location_names = model_constraints.process_locations.get(process_name)
+                if (reachable_location_names is None or not isinstance(location_name, str)
+                        or location_name.strip().upper() == not_observed_value):
+                    continue
+                if location_name not in reachable_location_names:
+                    return f'location "{location_name}" of process "{process_name}" is not reachable'
+        return None
+
+
+def create_observation_prefilter(config):
+    """Creates the observation pre-filter for the preprocessed model given in the config.
+
+    Args:
+        config: The configuration dict containing path data and the matcher features.
+
+    Returns:
+        The observation pre-filter, or None if the model constraints could not be derived.
+    """
+    try:
+        model_constraints = load_model_constraints(model_file_path=config["preprocessed_model_file_path"])
+    except (OSError, ElementTree.ParseError, AttributeError) as e:
+        print(f'Observation pre-filter disabled, as the model constraints could not be derived: {e}')
+        return None
+    return ObservationPrefilter(model_constraints=model_constraints, config=config)
@@ -0,0 +1,278 @@
+"""This module implements a compact, array-backed representation of observation data."""
+import array
+import sys
+
+########################################################################################################################
+# Series configurations #
+########################################################################################################################
+not_observed_value = "NOB"
+
+# The states of the cells of the variable matrix
+absent_value_state = 0  # The variable is not contained in the observation point
+observed_value_state = 1  # The variable has an observed value
+not_observed_value_state = 2  # The variable is explicitly not observed (i.e., "NOB")
+
+absent_location_idx = -1
+observation_point_keys = ("t", "vars", "locs")
+
+
+########################################################################################################################
+# Observation series #
+########################################################################################################################
+class ObservationSeries:
+    """A compact representation of observation data (i.e., a list of observation points like
+    "{'t': 7, 'vars': {'db': 0, 'temp': 2000}, 'locs': {}}"), which holds the time stamps as a vector, the variable
+    values as a matrix (one row per point, one column per variable) with a state mask for not observed or absent
+    values, and the locations as columns of indices into a table of interned location names. Further entries of the
+    observation points (e.g., markers of generators) are kept per point.
+
+    Numbers are kept in typed arrays if all values of a vector (or matrix) are integers or floats, and in lists
+    otherwise, so that the conversion from and to the dict form is lossless. The series can be passed wherever
+    observation data is expected in the experiments: it is a sequence of the observation points (in the dict form),
+    slicing it gives a series again, and it is converted to the dict form where the data leaves the experiments
+    (e.g., for the observation matcher, or in the logs).
+    """
+    __slots__ = ("times", "variable_names", "variable_values", "variable_states", "process_names", "location_names",
+                 "location_indices", "point_entries")
+
+    def __init__(self, times, variable_names, variable_values, variable_states, process_names, location_names,
+                 location_indices, point_entries):
+        """Initializes ObservationSeries.
+
+        Args:
+            times: The time stamps of the observation points.
+            variable_names: The variable names (i.e., the columns of the variable matrix).
+            variable_values: The variable matrix (row-major, with placeholders for not observed or absent values).
+            variable_states: The state of each cell of the variable matrix (observed, not observed, or absent).
+            process_names: The process names (i.e., the location columns).
+            location_names: The table of the (interned) location names.
+            location_indices: The location matrix (row-major) of indices into the location name table (-1 if absent).
+            point_entries: The further entries of the observation points (per index of the points which have any).
+        """
+        self.times = times
+        self.variable_names = variable_names
+        self.variable_values = variable_values
+        self.variable_states = variable_states
+        self.process_names = process_names
+        self.location_names = location_names
+        self.location_indices = location_indices
+        self.point_entries = point_entries
+
+    @classmethod
+    def from_observation_data(cls, observation_data):
+        """Creates an observation series from observation data.
+
+        Args:
+            observation_data: The observation data (in the dict form, or as observation series).
+
+        Returns:
+            The observation series.
+
+        Raises:
+            ValueError: If an observation point lacks the time stamp, variables, or locations.
+        """
+        if isinstance(observation_data, ObservationSeries):
+            return observation_data
+        points = list(observation_data)
+        point_entries = {}
+        for point_idx, point in enumerate(points):
+            if any(key not in point for key in observation_point_keys):
+                raise ValueError(f'Observation point {point} cannot be represented as observation series')
+            if len(point) > len(observation_point_keys):
+                point_entries[point_idx] = dict((key, value) for key, value in point.items()
+                                                if key not in observation_point_keys)
+        variable_names = _get_ordered_keys(dicts=[point["vars"] for point in points])
+        process_names = _get_ordered_keys(dicts=[point["locs"] for point in points])
+
+        variable_values = []
+        variable_states = bytearray()
+        for point in points:
+            for variable_name in variable_names:
+                value = point["vars"].get(variable_name)
+                if variable_name not in point["vars"]:
+                    state = absent_value_state
+                elif isinstance(value, str) and value == not_observed_value:
+                    state, value = not_observed_value_state, None
+                else:
+                    state = observed_value_state
+                variable_states.append(state)
+                variable_values.append(value)
+
+        location_names = []
+        location_name_indices = {}
+        location_indices = array.array('i')
+        for point in points:
+            for process_name in process_names:
+                if process_name not in point["locs"]:
+                    location_indices.append(absent_location_idx)
+                    continue
+                location_name = point["locs"][process_name]
+                if location_name not in location_name_indices:
+                    location_name_indices[location_name] = len(location_names)
+                    location_names.append(sys.intern(location_name) if type(location_name) is str else location_name)
+                location_indices.append(location_name_indices[location_name])
+
+        return cls(times=_create_value_vector(values=[point["t"] for point in points]), variable_names=variable_names,
+                   variable_values=_create_value_vector(values=variable_values), variable_states=variable_states,
+                   process_names=process_names, location_names=location_names, location_indices=location_indices,
+                   point_entries=point_entries)
+
+    def to_observation_data(self):
+        """Converts the observation series to the dict form of observation data.
+
+        Returns:
+            The observation data.
+        """
+        return [self.get_point(point_idx=point_idx) for point_idx in range(len(self.times))]
+
+    def get_point(self, point_idx):
+        """Gets an observation point in the dict form.
+
+        Args:
+            point_idx: The index of the observation point.
+
+        Returns:
+            The observation point.
+        """
+        variables = {}
+        row_offset = point_idx * len(self.variable_names)
+        for cell_idx, variable_name in enumerate(self.variable_names, row_offset):
+            state = self.variable_states[cell_idx]
+            if state == observed_value_state:
+                variables[variable_name] = self.variable_values[cell_idx]
+            elif state == not_observed_value_state:
+                variables[variable_name] = not_observed_value
+        locations = {}
+        row_offset = point_idx * len(self.process_names)
+        for cell_idx, process_name in enumerate(self.process_names, row_offset):
+            location_idx = self.location_indices[cell_idx]
+            if location_idx != absent_location_idx:
+                locations[process_name] = self.location_names[location_idx]
+        point = {"t": self.times[point_idx], "vars": variables, "locs": locations}
+        if point_idx in self.point_entries:
+            point.update(self.point_entries[point_idx])
+        return point
+
+    def _get_rows(self, start_idx, end_idx):
+        """Gets the observation points of a range as observation series.
+
+        Args:
+            start_idx: The index of the first observation point.
+            end_idx: The index after the last observation point.
+
+        Returns:
+            The observation series of the range.
+        """
+        variable_count = len(self.variable_names)
+        process_count = len(self.process_names)
+        return ObservationSeries(
+            times=self.times[start_idx:end_idx], variable_names=self.variable_names,
+            variable_values=self.variable_values[start_idx * variable_count:end_idx * variable_count],
+            variable_states=self.variable_states[start_idx * variable_count:end_idx * variable_count],
+            process_names=self.process_names, location_names=self.location_names,
+            location_indices=self.location_indices[start_idx * process_count:end_idx * process_count],
+            point_entries=dict((point_idx - start_idx, entries) for point_idx, entries in self.point_entries.items()
+                               if start_idx <= point_idx < end_idx))
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        for point_idx in range(len(self.times)):
+            yield self.get_point(point_idx=point_idx)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start_idx, end_idx, step = key.indices(len(self.times))
+            if step == 1:
+                return self._get_rows(start_idx=start_idx, end_idx=max(start_idx, end_idx))
+            return ObservationSeries.from_observation_data(observation_data=self.to_observation_data()[key])
+        if key < 0:
+            key += len(self.times)
+        if not 0 <= key < len(self.times):
+            raise IndexError("Observation point index out of range")
+        return self.get_point(point_idx=key)
+
+    def __eq__(self, other):
+        if isinstance(other, ObservationSeries):
+            return self.to_observation_data() == other.to_observation_data()
+        if isinstance(other, list):
+            return self.to_observation_data() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __str__(self):
+        return str(self.to_observation_data())
+
+    def __repr__(self):
+        return f'ObservationSeries({self.to_observation_data()!r})'
+
+
+def _get_ordered_keys(dicts):
+    """Gets the keys of dicts in the order in which they first occur.
+
+    Args:
+        dicts: The dicts.
+
+    Returns:
+        The keys.
+    """
+    keys = {}
+    for d in dicts:
+        keys.update(dict.fromkeys(d))
+    return list(keys)
+
+
+def _create_value_vector(values):
+    """Creates a typed array of values if all (non-placeholder) values are integers or floats, and a list otherwise.
+
+    Args:
+        values: The values (placeholders are None).
+
+    Returns:
+        The value vector.
+    """
+    value_types = set(type(value) for value in values if value is not None)
+    if value_types == {int}:
+        try:
+            return array.array('q', [0 if value is None else value for value in values])
+        except OverflowError:
+            return list(values)
+    if value_types == {float}:
+        return array.array('d', [0.0 if value is None else value for value in values])
+    return list(values)
+
+
+########################################################################################################################
+# Conversion #
+########################################################################################################################
+def as_observation_data(observation_data):
+    """Gets observation data in the dict form, e.g., for the observation matcher.
+
+    Args:
+        observation_data: The observation data (in the dict form, or as observation series).
+
+    Returns:
+        The observation data in the dict form (None if no observation data is given).
+    """
+    if isinstance(observation_data, ObservationSeries):
+        return observation_data.to_observation_data()
+    return observation_data
+
+
+def encode_observation_series(value):
+    """Encodes observation series in the dict form for the JSON serialization (i.e., as "default" of "json.dumps").
+
+    Args:
+        value: The value which is not serializable by default.
+
+    Returns:
+        The observation data in the dict form.
+
+    Raises:
+        TypeError: If the value is no observation series.
+    """
+    if isinstance(value, ObservationSeries):
+        return value.to_observation_data()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
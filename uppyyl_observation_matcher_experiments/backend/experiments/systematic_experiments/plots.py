@@ -1,6 +1,6 @@
 """This module provides all plot functions for the DBM state construction experiments."""
 
-import json
+import math
 import os
 import pprint
 import pathlib
@@ -9,6 +9,17 @@ import matplotlib.pyplot as plt
 from matplotlib.ticker import FuncFormatter, MultipleLocator
 from matplotlib.font_manager import FontProperties
 
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.early_termination import \
+    sampled_sweep_status
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.log_reader import \
+    load_log_tree
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_store import \
+    ResultStore, result_store_file_name
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.span_timer import \
+    get_dominant_phase, get_phase_durations
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.summary_index import \
+    load_summary_data
+
 pp = pprint.PrettyPrinter(indent=4, compact=True)
 
 ########################################################################################################################
@@ -17,9 +28,13 @@ pp = pprint.PrettyPrinter(indent=4, compact=True)
 output_dir_path = pathlib.Path("/media/temp_disk/experiments")
 output_data_dir_path = output_dir_path.joinpath("log")
 
+# The log sub-directories of the experiments whose run span trees are included in the phase duration summary
+phase_summary_experiment_log_sub_dir_names = [
+    "exp1_pos_neg_runs", "exp2_matcher_models", "exp3_obs_types", "exp4_obs_size", "exp5_obs_extents"]
+
 
 def load_all_model_data_from_folder(data_folder):
-    """Loads all existing model data found in a given folder.
+    """Loads all existing model data found in a given folder (read incrementally, without the observation data).
 
     Args:
         data_folder: The data folder.
@@ -35,12 +50,103 @@ def load_all_model_data_from_folder(data_folder):
         model_num, model_name = tuple(data_file_name.split("_", maxsplit=1))
 
         data_file_path = f'{data_folder}/{data_file_name_with_ext}'
-        with open(data_file_path, 'r') as file:
-            all_model_data[model_name] = json.load(file)
+        all_model_data[model_name] = load_log_tree(log_file_path=data_file_path)
 
     return all_model_data
 
 
+def get_sweep_plot_values(measure_data):
+    """Gets the plot values of the average matching times of a size sweep.
+
+    Sizes which were skipped due to early termination have no matching times, and are left as gaps (NaN values) in
+    the plot. Sparsely sampled sizes are additionally returned separately, so that they can be highlighted.
+
+    Args:
+        measure_data: The measure data per size.
+
+    Returns:
+        The x and y values of all sizes, and the x and y values of the sampled sizes.
+    """
+    x_vals, y_vals, sampled_x_vals, sampled_y_vals = [], [], [], []
+    for size, measure in measure_data.items():
+        summary = measure["summary"]
+        y_val = summary["min_max_avg"][2] if "min_max_avg" in summary else math.nan
+        x_vals.append(int(size))
+        y_vals.append(y_val)
+        if summary.get("sweep_status") == sampled_sweep_status:
+            sampled_x_vals.append(int(size))
+            sampled_y_vals.append(y_val)
+    return x_vals, y_vals, sampled_x_vals, sampled_y_vals
+
+
+def get_sweep_statistics_plot_values(measure_data, statistics_key):
+    """Gets the plot values of the average verifier statistics (e.g., the explored states) of a size sweep.
+
+    Sizes without collected verifier statistics are left as gaps (NaN values) in the plot.
+
+    Args:
+        measure_data: The measure data per size.
+        statistics_key: The key of the verifier statistic (e.g., "states_explored").
+
+    Returns:
+        The x and y values of all sizes.
+    """
+    x_vals, y_vals = [], []
+    for size, measure in measure_data.items():
+        statistics_summary = measure["summary"].get("verifier_statistics", {}).get(statistics_key)
+        x_vals.append(int(size))
+        y_vals.append(statistics_summary["min_max_avg"][2] if statistics_summary else math.nan)
+    return x_vals, y_vals
+
+
+def load_sweep_data(data_path):
+    """Loads the model log data of a sweep experiment (e.g., Exp4 or Exp5), read incrementally without the observation
+    data of the runs.
+
+    Args:
+        data_path: The path of the log directory of the experiment.
+
+    Returns:
+        The measure data per size per model.
+    """
+    sweep_data = {}
+    file_paths = sorted([f for f in pathlib.Path(data_path).iterdir() if f.is_file()])
+    for file_path in file_paths:
+        sweep_data.update(load_log_tree(log_file_path=file_path))
+    return sweep_data
+
+
+def get_run_span_trees(log_data):
+    """Gets the span trees of all runs contained in (a part of) the log data of a model.
+
+    Args:
+        log_data: The log data, in which the runs are found at any depth (e.g., per scenario and run index).
+
+    Returns:
+        The span tree dicts of the runs (runs logged without spans are skipped).
+    """
+    if not isinstance(log_data, dict):
+        return []
+    if "spans" in log_data:
+        return [log_data["spans"]]
+    return [span_data for value in log_data.values() for span_data in get_run_span_trees(log_data=value)]
+
+
+def get_average_phase_durations(span_trees):
+    """Gets the average exclusive durations of the phases of runs.
+
+    Args:
+        span_trees: The span tree dicts of the runs.
+
+    Returns:
+        The average exclusive duration (in seconds) per run per phase path.
+    """
+    phase_durations = {}
+    for span_data in span_trees:
+        get_phase_durations(span_data=span_data, phase_durations=phase_durations)
+    return dict((phase_path, duration / len(span_trees)) for phase_path, duration in phase_durations.items())
+
+
 ################################################################################
 
 class Plots:
@@ -51,6 +157,54 @@ class Plots:
         self.experiment_log_dir_path = experiment_log_dir_path
         self.plot_output_dir_path = plot_output_dir_path
 
+    def _open_result_store(self, experiment_log_sub_dir_name):
+        """Opens the result store of the experiment logs (cf. "result_store.py"), if it contains the given experiment.
+
+        Args:
+            experiment_log_sub_dir_name: The name of the log sub-directory of the experiment.
+
+        Returns:
+            The result store, or None if the experiment is not stored.
+        """
+        if not pathlib.Path(self.experiment_log_dir_path).joinpath(result_store_file_name).exists():
+            return None
+        result_store = ResultStore(store_dir_path=self.experiment_log_dir_path)
+        if not result_store.has_experiment(experiment=experiment_log_sub_dir_name):
+            result_store.close()
+            return None
+        return result_store
+
+    def _load_summary_data(self, experiment_log_sub_dir_name):
+        """Loads the scenario summaries of an experiment from the summary indexes of its model logs (cf.
+        "summary_index.py"), which are only (re-)created from the full logs if they are missing or outdated.
+
+        Args:
+            experiment_log_sub_dir_name: The name of the log sub-directory of the experiment.
+
+        Returns:
+            The summary data per scenario key per model (empty if the experiment has no results).
+        """
+        experiment_data_path = pathlib.Path(self.experiment_log_dir_path).joinpath(experiment_log_sub_dir_name)
+        return load_summary_data(data_path=experiment_data_path) if experiment_data_path.exists() else {}
+
+    def _load_run_data(self, experiment_log_sub_dir_name, columns):
+        """Loads columns of the runs of an experiment (with unsummarized scenarios) from the result store, or from the
+        full model logs if the experiment is not stored.
+
+        Args:
+            experiment_log_sub_dir_name: The name of the log sub-directory of the experiment.
+            columns: The names of the run columns (cf. "result_store.py").
+
+        Returns:
+            The run data per run index per scenario key per model (empty if the experiment has no results).
+        """
+        result_store = self._open_result_store(experiment_log_sub_dir_name=experiment_log_sub_dir_name)
+        if result_store is not None:
+            with result_store:
+                return result_store.load_run_tree(experiment=experiment_log_sub_dir_name, columns=columns)
+        experiment_data_path = pathlib.Path(self.experiment_log_dir_path).joinpath(experiment_log_sub_dir_name)
+        return load_sweep_data(data_path=experiment_data_path) if experiment_data_path.exists() else {}
+
     ####################################################################################################################
     # Experiment 1: Execute full workflow with positive and negative observations #
     ####################################################################################################################
@@ -63,15 +217,10 @@ class Plots:
             save_plot: Choose whether the generated plot should be saved.
             show_plot: Choose whether the generated plot should be shown.
         """
-        experiment_data_path = self.experiment_log_dir_path.joinpath('exp1_pos_neg_runs')
         plot_output_dir_path = self.plot_output_dir_path.joinpath('exp1_pos_neg_runs')
         if all_data is None:
-            all_data = {}
-            file_paths = sorted([f for f in pathlib.Path(experiment_data_path).iterdir() if f.is_file()])
-            for file_path in file_paths:
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-                    all_data.update(data)
+            all_data = self._load_run_data(experiment_log_sub_dir_name='exp1_pos_neg_runs',
+                                           columns=["is_matching", "is_included"])
 
         csv_data = [["modelname", "true_pos", "false_pos", "true_neg", "false_neg"]]
         for model_name, model_runs_data in all_data.items():
@@ -108,15 +257,9 @@ class Plots:
             save_plot: Choose whether the generated plot should be saved.
             show_plot: Choose whether the generated plot should be shown.
         """
-        experiment_data_path = self.experiment_log_dir_path.joinpath('exp2_matcher_models')
         plot_output_dir_path = self.plot_output_dir_path.joinpath('exp2_matcher_models')
         if all_data is None:
-            all_data = {}
-            file_paths = sorted([f for f in pathlib.Path(experiment_data_path).iterdir() if f.is_file()])
-            for file_path in file_paths:
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-                    all_data.update(data)
+            all_data = self._load_summary_data(experiment_log_sub_dir_name='exp2_matcher_models')
         scenario_names = list(list(all_data.values())[0]["few-short"].keys())
 
         # Create CSV data
@@ -125,7 +268,7 @@ class Plots:
             for obs_type, obs_log_data in model_log_data.items():
                 model_details_row = [model_name, obs_type]
                 for scenario_name, scenario_log_data in obs_log_data.items():
-                    min_max_avg = scenario_log_data["summary"]["min_max_avg"]
+                    min_max_avg = scenario_log_data["summary"].get("min_max_avg")
                     if min_max_avg:
                         model_details_row.append(f'{min_max_avg[2]:.3f}')
                     else:
@@ -159,7 +302,7 @@ class Plots:
                     latex_row_data.append(" " * first_cell_max_length)
                 latex_row_data.append(f'\\texttt{{{obs_type.replace("-", ",")}}}')
                 for scenario_name, scenario_log_data in obs_log_data.items():
-                    min_max_avg = scenario_log_data["summary"]["min_max_avg"]
+                    min_max_avg = scenario_log_data["summary"].get("min_max_avg")
                     if min_max_avg:
                         latex_row_data.append(f'${min_max_avg[2]:.3f}$')
                     else:
@@ -195,15 +338,9 @@ class Plots:
             save_plot: Choose whether the generated plot should be saved.
             show_plot: Choose whether the generated plot should be shown.
         """
-        experiment_data_path = self.experiment_log_dir_path.joinpath('exp3_obs_types')
         plot_output_dir_path = self.plot_output_dir_path.joinpath('exp3_obs_types')
         if all_data is None:
-            all_data = {}
-            file_paths = sorted([f for f in pathlib.Path(experiment_data_path).iterdir() if f.is_file()])
-            for file_path in file_paths:
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-                    all_data.update(data)
+            all_data = self._load_summary_data(experiment_log_sub_dir_name='exp3_obs_types')
         scenario_names = list(list(all_data.values())[0].keys())
 
         # Create CSV data
@@ -211,7 +348,7 @@ class Plots:
         for model_name, model_log_data in all_data.items():
             model_details_row = [model_name]
             for obs_type, obs_log_data in model_log_data.items():
-                min_max_avg = obs_log_data["summary"]["min_max_avg"]
+                min_max_avg = obs_log_data["summary"].get("min_max_avg")
                 if min_max_avg:
                     model_details_row.append(f'{min_max_avg[2]:.3f}')
                 else:
@@ -240,7 +377,7 @@ class Plots:
             first_cell = f'\\texttt{{{model_name}}}'
             latex_model_data.append(first_cell + " " * (first_cell_max_length - len(first_cell)))
             for obs_type, obs_log_data in model_log_data.items():
-                min_max_avg = obs_log_data["summary"]["min_max_avg"]
+                min_max_avg = obs_log_data["summary"].get("min_max_avg")
                 if min_max_avg:
                     latex_model_data.append(f'${min_max_avg[2]:.3f}$')
                 else:
@@ -271,24 +408,10 @@ class Plots:
             save_plot: Choose whether the generated plot should be saved.
             show_plot: Choose whether the generated plot should be shown.
         """
-        experiment_4_data_path = self.experiment_log_dir_path.joinpath('exp4_obs_size')
-        experiment_5_data_path = self.experiment_log_dir_path.joinpath('exp5_obs_extents')
         plot_output_dir_path = self.plot_output_dir_path.joinpath('exp_obs_size_obs_extents')
         if all_data is None:
-            all_data = {
-                "exp4_obs_size": {},
-                "exp5_obs_extents": {}
-            }
-            file_paths = sorted([f for f in pathlib.Path(experiment_4_data_path).iterdir() if f.is_file()])
-            for file_path in file_paths:
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-                    all_data["exp4_obs_size"].update(data)
-            file_paths = sorted([f for f in pathlib.Path(experiment_5_data_path).iterdir() if f.is_file()])
-            for file_path in file_paths:
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-                    all_data["exp5_obs_extents"].update(data)
+            all_data = dict((sub_dir_name, self._load_summary_data(experiment_log_sub_dir_name=sub_dir_name))
+                            for sub_dir_name in ["exp4_obs_size", "exp5_obs_extents"])
 
         # plt.clf()
         dpi = 300
@@ -305,10 +428,11 @@ class Plots:
         ax_left = plt.subplot(1, 2, 1)
 
         for model_name, measure_data in all_data["exp4_obs_size"].items():
-            x_vals = [int(x) for x in measure_data.keys()]
-            y_vals = list(map(lambda measure: measure["summary"]["min_max_avg"][2], measure_data.values()))
-            _model_plot, = ax_left.plot(x_vals, y_vals, 'x-', markersize=markersize, markeredgewidth=0.5, linewidth=1,
-                                        label=f'"{model_name}"')
+            x_vals, y_vals, sampled_x_vals, sampled_y_vals = get_sweep_plot_values(measure_data=measure_data)
+            model_plot, = ax_left.plot(x_vals, y_vals, 'x-', markersize=markersize, markeredgewidth=0.5, linewidth=1,
+                                       label=f'"{model_name}"')
+            ax_left.plot(sampled_x_vals, sampled_y_vals, 'o', color=model_plot.get_color(), markerfacecolor='none',
+                         markersize=markersize + 1, markeredgewidth=0.5)
 
         ax_left.set_xlabel('observation size')
         ax_left.set_ylabel('average matching time [s]')
@@ -346,10 +470,11 @@ class Plots:
         ax_right = plt.subplot(1, 2, 2)
 
         for model_name, measure_data in all_data["exp5_obs_extents"].items():
-            x_vals = [int(x) for x in measure_data.keys()]
-            y_vals = list(map(lambda measure: measure["summary"]["min_max_avg"][2], measure_data.values()))
-            _model_plot, = ax_right.plot(x_vals, y_vals, 'x-', markersize=markersize, markeredgewidth=0.5, linewidth=1,
-                                         label=f'"{model_name}"')
+            x_vals, y_vals, sampled_x_vals, sampled_y_vals = get_sweep_plot_values(measure_data=measure_data)
+            model_plot, = ax_right.plot(x_vals, y_vals, 'x-', markersize=markersize, markeredgewidth=0.5, linewidth=1,
+                                        label=f'"{model_name}"')
+            ax_right.plot(sampled_x_vals, sampled_y_vals, 'o', color=model_plot.get_color(), markerfacecolor='none',
+                          markersize=markersize + 1, markeredgewidth=0.5)
 
         ax_right.set_xlabel('transition count')
         ax_right.set_ylabel('average matching time [s]')
@@ -390,3 +515,114 @@ class Plots:
             print(f'File "{output_file_path}" saved.')
         if show_plot:
             plt.show()
+
+    ####################################################################################################################
+    # Experiment 4+5: Compare verifier statistics of observation sizes and extents #
+    ####################################################################################################################
+    def create_plot_for_verifier_statistics_of_observation_sizes_and_extents(
+            self, all_data=None, statistics_key="states_explored", save_plot=False, show_plot=False):
+        """Creates a plot of the verifier statistics (e.g., the explored states) over the observation sizes and
+        extents, which requires logs recorded with verifier statistics (cf. "verifier_backend.py").
+
+        Args:
+            all_data: All model details.
+            statistics_key: The key of the plotted verifier statistic ("states_explored", "states_stored",
+                "virtual_memory", or "resident_memory").
+            save_plot: Choose whether the generated plot should be saved.
+            show_plot: Choose whether the generated plot should be shown.
+        """
+        plot_output_dir_path = self.plot_output_dir_path.joinpath('exp_obs_size_obs_extents')
+        if all_data is None:
+            all_data = dict((sub_dir_name, self._load_summary_data(experiment_log_sub_dir_name=sub_dir_name))
+                            for sub_dir_name in ["exp4_obs_size", "exp5_obs_extents"])
+        y_label = f'average {statistics_key.replace("_", " ")}'
+        if statistics_key in ["virtual_memory", "resident_memory"]:
+            y_label += ' [KB]'
+
+        dpi = 300
+        plt.figure(figsize=(1920 / dpi, 1080 / dpi), dpi=dpi)
+
+        markersize = 2
+        font_p = FontProperties()
+        font_p.set_size(8)
+
+        for plot_idx, (data_key, x_label) in enumerate([("exp4_obs_size", 'observation size'),
+                                                        ("exp5_obs_extents", 'transition count')], 1):
+            ax = plt.subplot(1, 2, plot_idx)
+            for model_name, measure_data in all_data[data_key].items():
+                x_vals, y_vals = get_sweep_statistics_plot_values(
+                    measure_data=measure_data, statistics_key=statistics_key)
+                ax.plot(x_vals, y_vals, 'x-', markersize=markersize, markeredgewidth=0.5, linewidth=1,
+                        label=f'"{model_name}"')
+            ax.set_xlabel(x_label)
+            ax.set_ylabel(y_label)
+            ax.grid(which='both', alpha=0.5)
+            ax.set_yscale("log")
+            ax.xaxis.set_major_locator(MultipleLocator(40))
+            if plot_idx == 1:
+                ax.legend(bbox_to_anchor=(-0.27, -0.2, 2.65, -0.1), loc="upper left", mode="expand", borderaxespad=0,
+                          ncol=5, prop=font_p, handletextpad=0.3)
+
+        plt.tight_layout()
+        if save_plot:
+            plot_output_dir_path.mkdir(parents=True, exist_ok=True)
+
+            output_file_path = plot_output_dir_path.joinpath(
+                f'exp4-exp5-obs-sizes-and-extents-{statistics_key.replace("_", "-")}.png')
+            plt.savefig(output_file_path, dpi=300)
+            print(f'File "{output_file_path}" saved.')
+        if show_plot:
+            plt.show()
+
+    ####################################################################################################################
+    # All experiments: Summarize the phase durations of the runs #
+    ####################################################################################################################
+    def create_csv_file_for_phase_durations(self, all_data=None, save_plot=False, show_plot=False):
+        """Creates a CSV file of the average exclusive durations of the timed phases of the runs (cf. "span_timer.py")
+        per model over all experiments, and shows which phase dominates per model.
+
+        Args:
+            all_data: All model details per experiment log sub-directory.
+            save_plot: Choose whether the generated plot should be saved.
+            show_plot: Choose whether the generated plot should be shown.
+        """
+        plot_output_dir_path = self.plot_output_dir_path.joinpath('phase_durations')
+        if all_data is None:
+            all_data = {}
+            for sub_dir_name in phase_summary_experiment_log_sub_dir_names:
+                experiment_data_path = self.experiment_log_dir_path.joinpath(sub_dir_name)
+                if experiment_data_path.is_dir():
+                    all_data[sub_dir_name] = load_sweep_data(data_path=experiment_data_path)
+
+        span_trees_per_model = {}
+        for experiment_data in all_data.values():
+            for model_name, model_log_data in experiment_data.items():
+                span_trees_per_model.setdefault(model_name, []).extend(get_run_span_trees(log_data=model_log_data))
+
+        csv_data = [["modelname", "run_count", "phase", "avg_duration", "share"]]
+        dominant_phase_strs = []
+        for model_name, span_trees in span_trees_per_model.items():
+            if not span_trees:
+                continue
+            phase_durations = get_average_phase_durations(span_trees=span_trees)
+            total_duration = sum(phase_durations.values())
+            for phase_path, duration in sorted(phase_durations.items(), key=lambda item: -item[1]):
+                share = duration / total_duration if total_duration > 0 else 0.0
+                csv_data.append([model_name, str(len(span_trees)), phase_path, f'{duration:.6f}', f'{share:.3f}'])
+            dominant_phase = get_dominant_phase(phase_durations=phase_durations)
+            if dominant_phase is not None:
+                dominant_phase_strs.append(f'{model_name}: {dominant_phase[0]} ({dominant_phase[1]:.1%} of '
+                                           f'{total_duration:.3f} s per run, {len(span_trees)} runs)')
+
+        csv_str = "\n".join(list(map(lambda row_: ";".join(row_), csv_data)))
+
+        if show_plot:
+            print(csv_str)
+        print("Dominant phase per model:\n" + ("\n".join(dominant_phase_strs) or "(no runs with spans logged)"))
+        if save_plot:
+            plot_output_dir_path.mkdir(parents=True, exist_ok=True)
+
+            output_csv_file_path = plot_output_dir_path.joinpath('phase_durations_table.csv')
+            with open(output_csv_file_path, 'w') as file:
+                file.write(csv_str)
+            print(f'File "{output_csv_file_path}" saved.')
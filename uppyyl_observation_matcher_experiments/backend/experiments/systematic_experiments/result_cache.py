@@ -0,0 +1,264 @@
+"""This module implements a persistent cache for the match results of observations."""
+import collections
+import contextlib
+import copy
+import hashlib
+import json
+import pathlib
+import pickle
+import sqlite3
+import time
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_series import \
+    as_observation_data, not_observed_value
+
+########################################################################################################################
+# Cache configurations #
+########################################################################################################################
+# Timing runs (i.e., runs of summarized scenarios) bypass the cache by default, so that their durations are measured
+default_result_cache_config = {
+    "max_memory_entry_count": 10000,
+    "max_disk_size": 256 * 1024 * 1024,
+    "bypass_timing_runs": True,
+}
+
+result_cache_file_name = "match_results.sqlite"
+
+result_cache_schema = """
+CREATE TABLE IF NOT EXISTS match_results (
+    result_key TEXT PRIMARY KEY,
+    result BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS match_results_last_used_index ON match_results (last_used);
+"""
+
+
+def _canonicalize_value(value):
+    """Canonicalizes a value of observation data.
+
+    Args:
+        value: The value.
+
+    Returns:
+        The canonical value.
+    """
+    if isinstance(value, dict):
+        return dict((str(key), _canonicalize_value(sub_value)) for key, sub_value in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize_value(sub_value) for sub_value in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().upper() == not_observed_value:
+        return not_observed_value
+    return value
+
+
+def canonicalize_observation(observation_data):
+    """Gets the canonical form of observation data, in which the keys are sorted, integral numbers are integers, and
+    all spellings of not observed ("NOB") values are normalized.
+
+    Args:
+        observation_data: The observation data.
+
+    Returns:
+        The canonical observation string.
+    """
+    observation_data = as_observation_data(observation_data=observation_data)
+    return json.dumps(_canonicalize_value(observation_data), sort_keys=True, separators=(',', ':'), default=str)
+
+
+def get_match_result_key(matcher_key, observation_data):
+    """Gets the cache key of the match result of an observation.
+
+    Args:
+        matcher_key: The key of the prepared matcher (i.e., the hash of its model and configuration).
+        observation_data: The observation data.
+
+    Returns:
+        The cache key.
+    """
+    key_str = f'{matcher_key}:{canonicalize_observation(observation_data=observation_data)}'
+    return hashlib.sha256(key_str.encode("utf-8")).hexdigest()
+
+
+########################################################################################################################
+# Match result cache #
+########################################################################################################################
+class MatchResultCache:
+    """A two-layered cache for the match results of observations against prepared matchers.
+
+    The in-process layer keeps the most recently used results in memory, and the optional on-disk layer stores them in
+    an SQLite database (bounded in size, evicting least recently used results), so that other workers and later
+    experiments can reuse them. Only definite results are cached, i.e., results of timed out matchings are not.
+    """
+
+    def __init__(self, cache_dir_path=None, max_memory_entry_count=10000, max_disk_size=256 * 1024 * 1024,
+                 eviction_interval=100):
+        """Initializes MatchResultCache.
+
+        Args:
+            cache_dir_path: The path of the on-disk cache directory (None disables the on-disk layer).
+            max_memory_entry_count: The maximum number of results kept in memory.
+            max_disk_size: The maximum size (in bytes) of the stored results of the on-disk layer.
+            eviction_interval: The number of stored results after which the size of the on-disk layer is checked.
+        """
+        self.cache_dir_path = pathlib.Path(cache_dir_path) if cache_dir_path else None
+        self.max_memory_entry_count = max_memory_entry_count
+        self.max_disk_size = max_disk_size
+        self.eviction_interval = eviction_interval
+        self.memory_entries = collections.OrderedDict()
+        self.stored_result_count = 0
+        self.is_disk_layer_initialized = False
+
+    def __getstate__(self):
+        # The in-process layer is not handed over to other processes
+        state = self.__dict__.copy()
+        state["memory_entries"] = collections.OrderedDict()
+        state["is_disk_layer_initialized"] = False
+        return state
+
+    def get(self, matcher_key, observation_data, return_trace=False):
+        """Gets the cached match result of an observation.
+
+        Args:
+            matcher_key: The key of the prepared matcher.
+            observation_data: The observation data.
+            return_trace: Choose whether the result must contain the matching trace.
+
+        Returns:
+            The match result (containing "is_matching", "is_timeout", "matching_trace", and the "durations" of the
+            original matching), or None if no suitable result is cached.
+        """
+        result_key = get_match_result_key(matcher_key=matcher_key, observation_data=observation_data)
+        result = self.memory_entries.get(result_key)
+        if result is not None:
+            self.memory_entries.move_to_end(result_key)
+        else:
+            result = self._load_from_disk(result_key=result_key)
+            if result is not None:
+                self._store_in_memory(result_key=result_key, result=result)
+        if result is None or (return_trace and result["is_matching"] and result["matching_trace"] is None):
+            return None
+        return dict(result, durations=copy.deepcopy(result["durations"]))
+
+    def put(self, matcher_key, observation_data, matching_res, durations):
+        """Caches the match result of an observation (unless the matching timed out).
+
+        Args:
+            matcher_key: The key of the prepared matcher.
+            observation_data: The observation data.
+            matching_res: The matching result of the matcher.
+            durations: The durations recorded by the matcher.
+        """
+        if matching_res["is_timeout"]:
+            return
+        result_key = get_match_result_key(matcher_key=matcher_key, observation_data=observation_data)
+        result = {
+            "is_matching": matching_res["is_matching"],
+            "is_timeout": False,
+            "matching_trace": matching_res.get("matching_trace"),
+            "durations": durations,
+        }
+        self._store_in_memory(result_key=result_key, result=result)
+        self._store_on_disk(result_key=result_key, result=result)
+
+    def clear(self):
+        """Clears the in-process layer."""
+        self.memory_entries.clear()
+
+    def _store_in_memory(self, result_key, result):
+        """Stores a result in the in-process layer, evicting the least recently used results.
+
+        Args:
+            result_key: The cache key.
+            result: The match result.
+        """
+        self.memory_entries[result_key] = result
+        self.memory_entries.move_to_end(result_key)
+        while len(self.memory_entries) > self.max_memory_entry_count:
+            self.memory_entries.popitem(last=False)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Opens a connection to the on-disk layer (creating the database if necessary).
+
+        Yields:
+            The database connection.
+        """
+        if not self.is_disk_layer_initialized:
+            self.cache_dir_path.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.cache_dir_path.joinpath(result_cache_file_name)), timeout=60)
+        try:
+            if not self.is_disk_layer_initialized:
+                connection.executescript(result_cache_schema)
+                self.is_disk_layer_initialized = True
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _load_from_disk(self, result_key):
+        """Loads a result from the on-disk layer.
+
+        Args:
+            result_key: The cache key.
+
+        Returns:
+            The match result, or None if no valid result is stored.
+        """
+        if self.cache_dir_path is None:
+            return None
+        try:
+            with self._connect() as connection:
+                row = connection.execute("SELECT result FROM match_results WHERE result_key = ?",
+                                         (result_key,)).fetchone()
+                if row is None:
+                    return None
+                connection.execute("UPDATE match_results SET last_used = ? WHERE result_key = ?",
+                                   (time.time(), result_key))
+            return pickle.loads(row[0])
+        except (sqlite3.Error, OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def _store_on_disk(self, result_key, result):
+        """Stores a result in the on-disk layer, and evicts the least recently used results periodically.
+
+        Results whose matching trace cannot be pickled are stored without it.
+
+        Args:
+            result_key: The cache key.
+            result: The match result.
+        """
+        if self.cache_dir_path is None:
+            return
+        try:
+            result_data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            result_data = pickle.dumps(dict(result, matching_trace=None), protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO match_results (result_key, result, size, last_used) VALUES (?, ?, ?, ?)",
+                    (result_key, result_data, len(result_data), time.time()))
+            self.stored_result_count += 1
+            if self.stored_result_count % self.eviction_interval == 0:
+                self._evict_from_disk()
+        except (sqlite3.Error, OSError) as e:
+            print(f'Match result could not be cached on disk: {e}')
+
+    def _evict_from_disk(self):
+        """Evicts the least recently used results of the on-disk layer until its size limit is met."""
+        with self._connect() as connection:
+            total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM match_results").fetchone()[0]
+            if total_size <= self.max_disk_size:
+                return
+            evicted_result_keys = []
+            for result_key, size in connection.execute(
+                    "SELECT result_key, size FROM match_results ORDER BY last_used"):
+                if total_size <= self.max_disk_size:
+                    break
+                evicted_result_keys.append((result_key,))
+                total_size -= size
+            connection.executemany("DELETE FROM match_results WHERE result_key = ?", evicted_result_keys)
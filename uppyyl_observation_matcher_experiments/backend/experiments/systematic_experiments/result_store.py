@@ -0,0 +1,277 @@
+"""This module implements a columnar (SQLite) store of the experiment results, which can be queried by column."""
+import json
+import pathlib
+import sqlite3
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_stream import \
+    ResultStreamIndex, read_result_record
+
+########################################################################################################################
+# Store configurations #
+########################################################################################################################
+result_store_file_name = "results.sqlite"
+observation_store_file_name = "observations.sqlite"
+
+# The columns of the scenario and run tables (besides the scenario keys), and the values from which they are taken
+scenario_columns = {
+    "summarize": lambda record, summary: int(record["summarize"]),
+    "run_count": lambda record, summary: summary.get("run_count", record["run_count"]),
+    "min_duration": lambda record, summary: summary["min_max_avg"][0] if "min_max_avg" in summary else None,
+    "max_duration": lambda record, summary: summary["min_max_avg"][1] if "min_max_avg" in summary else None,
+    "avg_duration": lambda record, summary: summary["min_max_avg"][2] if "min_max_avg" in summary else None,
+    "timeout_count": lambda record, summary: summary.get("timeout_count"),
+    "stop_reason": lambda record, summary: summary.get("stop_reason"),
+    "sweep_status": lambda record, summary: summary.get("sweep_status"),
+}
+run_columns = {
+    "matching_duration": lambda data: data["durations"].get("matching", {}).get("matching"),
+    "run_duration": lambda data: data["durations"].get("run"),
+    "is_matching": lambda data: data.get("is_matching"),
+    "is_timeout": lambda data: data.get("is_timeout"),
+    "is_simulated": lambda data: data.get("is_simulated"),
+    "is_included": lambda data: data.get("is_included"),
+    "is_cached": lambda data: data.get("is_cached", False),
+    "is_rejected": lambda data: "rejected_by_prefilter" in data,
+}
+key_columns = ["experiment", "model_idx", "model_name", "scenario_key"]
+
+# The run log fields which are not stored in the run table, but as payload in the separate observation store
+observation_payload_keys = ["obs_data"]
+
+
+########################################################################################################################
+# Result store #
+########################################################################################################################
+class ResultStore:
+    """A columnar store of the results of the experiments, which holds one row per scenario (with its summary) and one
+    row per run (with its durations and flags), so that plots can query the columns they need without parsing the
+    full logs.
+
+    The scenarios and runs are identified by the experiment (i.e., its log sub-directory name), the model, and the
+    scenario keys (joined by "/", e.g., "few-short/All"). The bulky observation data of the runs is kept in a separate
+    store file, so that queries of the scenario and run columns never read it.
+    """
+
+    def __init__(self, store_dir_path):
+        """Initializes ResultStore.
+
+        Args:
+            store_dir_path: The path of the directory of the store files.
+        """
+        self.store_dir_path = pathlib.Path(store_dir_path)
+        self.store_dir_path.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.store_dir_path.joinpath(result_store_file_name), timeout=60)
+        self.connection.execute("ATTACH DATABASE ? AS payload",
+                                (str(self.store_dir_path.joinpath(observation_store_file_name)),))
+        key_column_defs = "experiment TEXT, model_idx INTEGER, model_name TEXT, scenario_key TEXT"
+        with self.connection:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS scenarios (scenario_id TEXT PRIMARY KEY, {key_column_defs}, '
+                f'scenario_keys TEXT, scenario_idx INTEGER, '
+                f'{", ".join(f"{column} {get_column_type(column)}" for column in scenario_columns)})')
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS runs (scenario_id TEXT, run_idx INTEGER, {key_column_defs}, '
+                f'{", ".join(f"{column} {get_column_type(column)}" for column in run_columns)}, '
+                f'PRIMARY KEY (scenario_id, run_idx))')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS payload.observations (scenario_id TEXT, run_idx INTEGER, data TEXT, '
+                'PRIMARY KEY (scenario_id, run_idx))')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Closes the store."""
+        self.connection.close()
+
+    def store_result_stream(self, stream_file_path, experiment, model_name):
+        """Stores the finished scenarios (and their valid runs) of the result stream of a model, replacing the rows of
+        previous executions of the scenarios.
+
+        Args:
+            stream_file_path: The path of the stream file.
+            experiment: The experiment (i.e., the name of its log sub-directory).
+            model_name: The model name.
+        """
+        stream_index = ResultStreamIndex(stream_file_path=stream_file_path)
+        with self.connection, open(stream_file_path, 'rb') as stream_file:
+            for record in stream_index.scenario_records.values():
+                scenario_id = record["scenario_id"]
+                model_idx = int(scenario_id.split("/")[1])
+                scenario_key = "/".join(str(key) for key in record["keys"])
+                key_values = (experiment, model_idx, model_name, scenario_key)
+                summary = record["summary"] or {}
+                self.connection.execute(
+                    f'INSERT OR REPLACE INTO scenarios VALUES ({", ".join(["?"] * (len(scenario_columns) + 7))})',
+                    (scenario_id, *key_values, json.dumps(record["keys"]), record["scenario_idx"],
+                     *(get_value(record, summary) for get_value in scenario_columns.values())))
+                self.connection.execute('DELETE FROM runs WHERE scenario_id = ?', (scenario_id,))
+                self.connection.execute('DELETE FROM payload.observations WHERE scenario_id = ?', (scenario_id,))
+                run_offsets = stream_index.get_run_offsets(
+                    scenario_id=scenario_id, config_fingerprint=record["config_fingerprint"],
+                    run_count=record["run_count"])
+                for run_idx, offset in run_offsets.items():
+                    run_log_data = read_result_record(file=stream_file, offset=offset)["data"]
+                    self.connection.execute(
+                        f'INSERT INTO runs VALUES ({", ".join(["?"] * (len(run_columns) + 6))})',
+                        (scenario_id, run_idx, *key_values,
+                         *(get_value(run_log_data) for get_value in run_columns.values())))
+                    payload = dict((key, run_log_data[key]) for key in observation_payload_keys if key in run_log_data)
+                    if payload:
+                        self.connection.execute('INSERT INTO payload.observations VALUES (?, ?, ?)',
+                                                (scenario_id, run_idx, json.dumps(payload)))
+
+    def has_experiment(self, experiment):
+        """Checks whether the store contains scenarios of an experiment.
+
+        Args:
+            experiment: The experiment (i.e., the name of its log sub-directory).
+
+        Returns:
+            Whether scenarios of the experiment are stored.
+        """
+        return self.connection.execute(
+            'SELECT 1 FROM scenarios WHERE experiment = ? LIMIT 1', (experiment,)).fetchone() is not None
+
+    def query_scenarios(self, experiment, columns):
+        """Queries columns of the scenarios of an experiment.
+
+        Args:
+            experiment: The experiment (i.e., the name of its log sub-directory).
+            columns: The names of the queried columns.
+
+        Returns:
+            The model name, the scenario keys, and the queried column values of each scenario (as tuple), ordered by
+            model and scenario position.
+        """
+        check_columns(columns=columns, valid_columns=key_columns + list(scenario_columns))
+        rows = self.connection.execute(
+            f'SELECT model_name, scenario_keys{"".join(f", {column}" for column in columns)} FROM scenarios '
+            f'WHERE experiment = ? ORDER BY model_idx, scenario_idx', (experiment,))
+        return [(model_name, json.loads(scenario_keys), *values) for model_name, scenario_keys, *values in rows]
+
+    def query_runs(self, experiment, columns):
+        """Queries columns of the runs of an experiment.
+
+        Args:
+            experiment: The experiment (i.e., the name of its log sub-directory).
+            columns: The names of the queried columns.
+
+        Returns:
+            The model name, the scenario keys, the run index, and the queried column values of each run (as tuple),
+            ordered by model, scenario position, and run index.
+        """
+        check_columns(columns=columns, valid_columns=key_columns + list(run_columns))
+        rows = self.connection.execute(
+            f'SELECT scenarios.model_name, scenarios.scenario_keys, runs.run_idx'
+            f'{"".join(f", runs.{column}" for column in columns)} FROM runs '
+            f'JOIN scenarios ON runs.scenario_id = scenarios.scenario_id WHERE runs.experiment = ? '
+            f'ORDER BY scenarios.model_idx, scenarios.scenario_idx, runs.run_idx', (experiment,))
+        return [(model_name, json.loads(scenario_keys), *values) for model_name, scenario_keys, *values in rows]
+
+    def load_observation_data(self, scenario_id, run_idx):
+        """Loads the observation data of a run from the observation store.
+
+        Args:
+            scenario_id: The scenario ID.
+            run_idx: The run index.
+
+        Returns:
+            The observation data, or None if the run has no observation data.
+        """
+        row = self.connection.execute('SELECT data FROM payload.observations WHERE scenario_id = ? AND run_idx = ?',
+                                      (scenario_id, run_idx)).fetchone()
+        return json.loads(row[0])["obs_data"] if row is not None else None
+
+    def load_summary_tree(self, experiment):
+        """Loads the summaries of the summarized scenarios of an experiment in the nested structure of the experiment
+        logs (per model and scenario key), restricted to the summary fields stored as columns.
+
+        Args:
+            experiment: The experiment (i.e., the name of its log sub-directory).
+
+        Returns:
+            The summary data per scenario key per model (e.g., "all_data[model_name][size]["summary"]").
+        """
+        summary_tree = {}
+        for model_name, scenario_keys, summarize, min_duration, max_duration, avg_duration, run_count, timeout_count, \
+                stop_reason, sweep_status in self.query_scenarios(experiment=experiment, columns=[
+                    "summarize", "min_duration", "max_duration", "avg_duration", "run_count", "timeout_count",
+                    "stop_reason", "sweep_status"]):
+            if not summarize:
+                continue
+            summary = {"run_count": run_count}
+            if avg_duration is not None:
+                summary.update(min_max_avg=[min_duration, max_duration, avg_duration], timeout_count=timeout_count)
+            if stop_reason is not None:
+                summary["stop_reason"] = stop_reason
+            if sweep_status is not None:
+                summary["sweep_status"] = sweep_status
+            get_tree_node(tree=summary_tree, keys=[model_name] + scenario_keys)["summary"] = summary
+        return summary_tree
+
+    def load_run_tree(self, experiment, columns):
+        """Loads columns of the runs of an experiment in the nested structure of the experiment logs of unsummarized
+        scenarios (per model, scenario key, and run index).
+
+        Args:
+            experiment: The experiment (i.e., the name of its log sub-directory).
+            columns: The names of the queried columns.
+
+        Returns:
+            The queried column values per run index per scenario key per model.
+        """
+        run_tree = {}
+        for model_name, scenario_keys, run_idx, *values in self.query_runs(experiment=experiment, columns=columns):
+            get_tree_node(tree=run_tree, keys=[model_name] + scenario_keys)[str(run_idx)] = dict(zip(columns, values))
+        return run_tree
+
+
+def get_column_type(column):
+    """Gets the SQLite type of a scenario or run column.
+
+    Args:
+        column: The column name.
+
+    Returns:
+        The column type.
+    """
+    if column.startswith("is_") or column.endswith("_count") or column == "summarize":
+        return "INTEGER"
+    if column.endswith("_duration"):
+        return "REAL"
+    return "TEXT"
+
+
+def check_columns(columns, valid_columns):
+    """Checks that queried columns exist (since the column names are inserted into the queries).
+
+    Args:
+        columns: The names of the queried columns.
+        valid_columns: The names of the existing columns.
+
+    Raises:
+        ValueError: If a queried column does not exist.
+    """
+    invalid_columns = [column for column in columns if column not in valid_columns]
+    if invalid_columns:
+        raise ValueError(f'Unknown result store column(s): {", ".join(invalid_columns)}')
+
+
+def get_tree_node(tree, keys):
+    """Gets (and creates) the node of a nested dict at the given key path.
+
+    Args:
+        tree: The nested dict.
+        keys: The key path (keys are converted to strings, as in the JSON logs).
+
+    Returns:
+        The node dict.
+    """
+    node = tree
+    for key in keys:
+        node = node.setdefault(str(key), {})
+    return node
@@ -0,0 +1,262 @@
+"""This module implements append-only result streams, and their compaction into the nested experiment logs."""
+import json
+import os
+import pathlib
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_series import \
+    encode_observation_series
+
+########################################################################################################################
+# Stream configurations #
+########################################################################################################################
+run_record_type = "run"
+scenario_record_type = "scenario"
+json_separators = (',', ':')
+
+
+########################################################################################################################
+# Stream writing #
+########################################################################################################################
+class ResultStreamWriter:
+    """Appends run and scenario records (one JSON object per line) to a result stream file.
+
+    Each record is flushed as soon as it is written, so that the results of finished runs survive interruptions, and
+    the writer never has to keep (or rewrite) previous results.
+    """
+
+    def __init__(self, stream_file_path, append=False):
+        """Initializes ResultStreamWriter.
+
+        Args:
+            stream_file_path: The path of the stream file.
+            append: Choose whether records are appended to an existing stream (otherwise, the stream is restarted).
+        """
+        self.stream_file_path = pathlib.Path(stream_file_path)
+        self.stream_file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.stream_file_path, 'a' if append else 'w')
+        if self.file.tell() > 0:
+            # Terminate a record which was only partially written before an interruption (it is skipped on reading)
+            with open(self.stream_file_path, 'rb') as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    self.file.write('\n')
+
+    def write_record(self, record):
+        """Appends a record to the stream.
+
+        Args:
+            record: The record dict.
+        """
+        self.file.write(json.dumps(record, separators=json_separators, default=encode_observation_series) + '\n')
+        self.file.flush()
+
+    def write_run_record(self, scenario, run_idx, run_log_data):
+        """Appends the record of a finished run to the stream.
+
+        Args:
+            scenario: The scenario data.
+            run_idx: The run index.
+            run_log_data: The run log data.
+        """
+        self.write_record({
+            "type": run_record_type,
+            "scenario_id": scenario["id"],
+            "run_idx": run_idx,
+            "config_fingerprint": run_log_data.get("config_fingerprint"),
+            "data": run_log_data,
+        })
+
+    def write_scenario_record(self, scenario, scenario_idx, summary):
+        """Appends the record of a finished scenario to the stream.
+
+        Args:
+            scenario: The scenario data.
+            scenario_idx: The position of the scenario in the log of its model.
+            summary: The scenario summary (or None if the scenario is not summarized).
+        """
+        self.write_record({
+            "type": scenario_record_type,
+            "scenario_id": scenario["id"],
+            "scenario_idx": scenario_idx,
+            "keys": list(scenario["keys"]),
+            "summarize": scenario["summarize"],
+            "run_count": scenario["run_count"],
+            "config_fingerprint": scenario["config_fingerprint"],
+            "summary": summary,
+        })
+
+    def close(self):
+        """Closes the stream file."""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+########################################################################################################################
+# Stream reading #
+########################################################################################################################
+def iterate_result_stream(stream_file_path):
+    """Iterates over the complete records of a result stream (partially written records are skipped).
+
+    Args:
+        stream_file_path: The path of the stream file.
+
+    Yields:
+        The byte offset and the record dict of each record.
+    """
+    with open(stream_file_path, 'rb') as file:
+        offset = 0
+        for line in file:
+            record_offset = offset
+            offset += len(line)
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            yield record_offset, record
+
+
+def read_result_record(file, offset):
+    """Reads a single record of a result stream.
+
+    Args:
+        file: The stream file (opened in binary mode).
+        offset: The byte offset of the record.
+
+    Returns:
+        The record dict.
+    """
+    file.seek(offset)
+    return json.loads(file.readline())
+
+
+class ResultStreamIndex:
+    """The index of a result stream, which holds the latest record of each finished scenario and the byte offsets of
+    the run records (instead of the run data itself)."""
+
+    def __init__(self, stream_file_path):
+        """Initializes ResultStreamIndex.
+
+        Args:
+            stream_file_path: The path of the stream file (which may not exist yet).
+        """
+        self.stream_file_path = pathlib.Path(stream_file_path)
+        self.scenario_records = {}
+        self.run_offsets = {}
+        if not self.stream_file_path.exists():
+            return
+        for offset, record in iterate_result_stream(stream_file_path=self.stream_file_path):
+            if record.get("type") == run_record_type:
+                scenario_run_offsets = self.run_offsets.setdefault(
+                    (record["scenario_id"], record["config_fingerprint"]), {})
+                scenario_run_offsets[record["run_idx"]] = offset
+            elif record.get("type") == scenario_record_type:
+                self.scenario_records[record["scenario_id"]] = record
+
+    def get_run_offsets(self, scenario_id, config_fingerprint, run_count):
+        """Gets the offsets of the valid run records of a scenario (i.e., the latest record of each run which was
+        executed with the given configuration).
+
+        Args:
+            scenario_id: The scenario ID.
+            config_fingerprint: The config fingerprint of the scenario.
+            run_count: The number of runs of the scenario.
+
+        Returns:
+            The record offsets per run index, ordered by run index.
+        """
+        scenario_run_offsets = self.run_offsets.get((scenario_id, config_fingerprint), {})
+        return dict(sorted((run_idx, offset) for run_idx, offset in scenario_run_offsets.items()
+                           if run_idx < run_count))
+
+
+########################################################################################################################
+# Stream compaction #
+########################################################################################################################
+class _ScenarioLeaf:
+    """A leaf of the log data tree, which refers to the record of a finished scenario."""
+
+    def __init__(self, record):
+        self.record = record
+
+
+def compact_result_stream(stream_file_path, log_file_path, model_name):
+    """Compacts the result stream of a model into the nested log structure (as read by "Plots").
+
+    Only finished scenarios are included, in the order of their scenario index. The log is written incrementally (one
+    run at a time), so that the memory usage does not depend on the size of the stream.
+
+    Args:
+        stream_file_path: The path of the stream file.
+        log_file_path: The path of the model log file.
+        model_name: The model name.
+
+    Returns:
+        True if a log file was written, False if the stream contains no finished scenario.
+    """
+    stream_index = ResultStreamIndex(stream_file_path=stream_file_path)
+    if not stream_index.scenario_records:
+        return False
+
+    log_data_tree = {}
+    for record in sorted(stream_index.scenario_records.values(), key=lambda r: r["scenario_idx"]):
+        parent_node = log_data_tree
+        for key in record["keys"][:-1]:
+            parent_node = parent_node.setdefault(str(key), {})
+        parent_node[str(record["keys"][-1])] = _ScenarioLeaf(record=record)
+
+    log_file_path = pathlib.Path(log_file_path)
+    log_file_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_log_file_path = log_file_path.with_name(f'.{log_file_path.name}.tmp')
+    with open(stream_file_path, 'rb') as stream_file, open(temp_log_file_path, 'w') as log_file:
+        log_file.write('{' + json.dumps(model_name) + ':')
+        _write_log_data_node(node=log_data_tree, stream_index=stream_index, stream_file=stream_file, log_file=log_file)
+        log_file.write('}')
+    os.replace(temp_log_file_path, log_file_path)
+    return True
+
+
+def _write_log_data_node(node, stream_index, stream_file, log_file):
+    """Writes a node of the log data tree as JSON.
+
+    Args:
+        node: The node (either a dict of child nodes or a scenario leaf).
+        stream_index: The result stream index.
+        stream_file: The stream file (opened in binary mode).
+        log_file: The log file.
+    """
+    if not isinstance(node, _ScenarioLeaf):
+        log_file.write('{')
+        for position, (key, child_node) in enumerate(node.items()):
+            log_file.write((',' if position > 0 else '') + json.dumps(key) + ':')
+            _write_log_data_node(node=child_node, stream_index=stream_index, stream_file=stream_file,
+                                 log_file=log_file)
+        log_file.write('}')
+        return
+
+    record = node.record
+    if record["summarize"] and record["run_count"] == 0:
+        # Insert dummy "None" data into the log when no observation data is provided
+        log_file.write(json.dumps({"runs": None, "summary": {}}, separators=json_separators))
+        return
+
+    if record["summarize"]:
+        log_file.write('{"runs":')
+    run_offsets = stream_index.get_run_offsets(
+        scenario_id=record["scenario_id"], config_fingerprint=record["config_fingerprint"],
+        run_count=record["run_count"])
+    log_file.write('{')
+    for position, (run_idx, offset) in enumerate(run_offsets.items()):
+        run_log_data = read_result_record(file=stream_file, offset=offset)["data"]
+        log_file.write((',' if position > 0 else '') + json.dumps(str(run_idx)) + ':')
+        json.dump(run_log_data, log_file, separators=json_separators)
+    log_file.write('}')
+    if record["summarize"]:
+        log_file.write(',"summary":' + json.dumps(record["summary"], separators=json_separators) + '}')
@@ -0,0 +1,1026 @@
+"""This module implements the sequential and parallel execution of experiment scenario runs."""
+import collections
+import concurrent.futures
+import copy
+import multiprocessing
+import os
+import random
+import threading
+import time
+import traceback
+
+from uppyyl_observation_matcher.backend.matching import ObservationMatcher
+from uppyyl_observation_matcher.backend.observation.generator import ObservationGenerator
+from uppyyl_observation_matcher.backend.trace.simulator import EdgeTraceSimulator
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.batch_matching import \
+    BatchMatcher
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.helper import \
+    init_directories_and_paths
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.matcher_cache import \
+    get_prepared_matcher_key
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.memory_sampler import \
+    MemorySampler
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_prefilter import \
+    create_observation_prefilter
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_series import \
+    ObservationSeries, as_observation_data
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.span_timer import \
+    Span, timed_span
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.verifier_backend import \
+    collect_verifier_statistics
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.work_queue import \
+    get_worker_id
+
+########################################################################################################################
+# Worker state #
+########################################################################################################################
+_worker_state = {
+    "workspace_manager": None,
+    "model_cache": None,
+    "matcher_cache": None,
+    "verifier_shim": None,
+    "result_cache": None,
+    "runner": None,
+}
+
+
+def init_worker(workspace_manager, model_cache, matcher_cache, verifier_shim=None, result_cache=None):
+    """Initializes the state of the (current) worker process.
+
+    Args:
+        workspace_manager: The workspace manager which provides the workspaces of the scenario runners.
+        model_cache: The preprocessed model cache.
+        matcher_cache: The prepared matcher cache.
+        verifier_shim: The verifier shim via which the verifier is called (None calls the verifier directly).
+        result_cache: The match result cache (None disables the caching of match results).
+    """
+    _worker_state["workspace_manager"] = workspace_manager
+    _worker_state["model_cache"] = model_cache
+    _worker_state["matcher_cache"] = matcher_cache
+    _worker_state["verifier_shim"] = verifier_shim
+    _worker_state["result_cache"] = result_cache
+    _worker_state["runner"] = None
+
+
+def init_pool_worker(workspace_manager, model_cache, matcher_cache, verifier_shim=None, result_cache=None):
+    """Initializes a worker process of the process pool.
+
+    Args:
+        workspace_manager: The workspace manager which provides the workspaces of the scenario runners.
+        model_cache: The preprocessed model cache.
+        matcher_cache: The prepared matcher cache.
+        verifier_shim: The verifier shim via which the verifier is called (None calls the verifier directly).
+        result_cache: The match result cache (None disables the caching of match results).
+    """
+    # Forked workers inherit the random state of the parent, so that all workers would generate identical observations
+    random.seed()
+    init_worker(workspace_manager=workspace_manager, model_cache=model_cache, matcher_cache=matcher_cache,
+                verifier_shim=verifier_shim, result_cache=result_cache)
+
+
+def release_scenario_runner():
+    """Releases the current scenario runner of the worker, and closes its workspace."""
+    runner = _worker_state["runner"]
+    _worker_state["runner"] = None
+    if runner is not None:
+        runner.close()
+
+
+def release_worker_resources():
+    """Releases the current scenario runner and all prepared matchers of the worker."""
+    release_scenario_runner()
+    if _worker_state["matcher_cache"] is not None:
+        _worker_state["matcher_cache"].clear()
+
+
+def get_scenario_runner(scenario):
+    """Gets the scenario runner of the worker for a given scenario, and creates it if necessary.
+
+    Only the runner of the most recent scenario is kept, and the workspace of a replaced runner is closed.
+
+    Args:
+        scenario: The scenario data.
+
+    Returns:
+        The scenario runner.
+    """
+    runner = _worker_state["runner"]
+    if runner is None or runner.scenario["id"] != scenario["id"]:
+        release_scenario_runner()
+        workspace = _worker_state["workspace_manager"].create_workspace(name=scenario["id"])
+        try:
+            runner = ScenarioRunner(
+                scenario=scenario, workspace=workspace, model_cache=_worker_state["model_cache"],
+                matcher_cache=_worker_state["matcher_cache"], workspace_manager=_worker_state["workspace_manager"],
+                verifier_shim=_worker_state["verifier_shim"], result_cache=_worker_state["result_cache"])
+        except BaseException:
+            workspace.mark_failed()
+            workspace.close()
+            raise
+        _worker_state["runner"] = runner
+    return runner
+
+
+def iterate_scenario_runs(scenario, run_indices):
+    """Executes runs of a scenario in the current worker.
+
+    Besides the durations recorded by the runs themselves, the wall-clock duration of each run is recorded as "run"
+    duration, to which the preparation of a new scenario runner is added for the first finished run (also as first
+    child span of its "run" span).
+
+    Args:
+        scenario: The scenario data.
+        run_indices: The indices of the runs.
+
+    Yields:
+        The run index and the run log data of each finished run.
+    """
+    with timed_span(name="preparation") as preparation_span:
+        runner = get_scenario_runner(scenario=scenario)
+    try:
+        for run_idx, run_log_data in runner.execute_runs(run_indices=run_indices):
+            if preparation_span is not None:
+                run_log_data["durations"]["run"] += preparation_span.duration
+                run_log_data["spans"]["duration"] += preparation_span.duration
+                run_log_data["spans"]["children"].insert(0, preparation_span.to_dict())
+                preparation_span = None
+            yield run_idx, run_log_data
+    except GeneratorExit:
+        raise
+    except BaseException:
+        runner.workspace.mark_failed()
+        _worker_state["matcher_cache"].discard(observation_matcher=runner.observation_matcher)
+        release_scenario_runner()
+        raise
+
+
+def execute_scenario_run(scenario, run_idx):
+    """Executes a single run of a scenario in the current worker.
+
+    Args:
+        scenario: The scenario data.
+        run_idx: The index of the run.
+
+    Returns:
+        The scenario ID, the run index, and the run log data.
+    """
+    [(_run_idx, run_log_data)] = list(iterate_scenario_runs(scenario=scenario, run_indices=[run_idx]))
+    return scenario["id"], run_idx, run_log_data
+
+
+def execute_scenario_runs(scenario, run_indices):
+    """Executes runs of a scenario in the current worker, and keeps the results of finished runs if a run fails.
+
+    Args:
+        scenario: The scenario data.
+        run_indices: The indices of the runs.
+
+    Returns:
+        The scenario ID, the run indices and run log data of the finished runs, and the error description of the
+        first failed run (None if all runs succeeded).
+    """
+    run_results = []
+    try:
+        for run_idx, run_log_data in iterate_scenario_runs(scenario=scenario, run_indices=run_indices):
+            run_results.append((run_idx, run_log_data))
+    except Exception:
+        return scenario["id"], run_results, traceback.format_exc()
+    return scenario["id"], run_results, None
+
+
+def get_run_index_chunks(scenario, run_indices, max_chunk_size=None):
+    """Splits the run indices of a scenario into the chunks executed at once by a worker.
+
+    Runs of scenarios with batch matching are chunked, so that their observations can be matched as a batch; all
+    other runs are executed one by one.
+
+    Args:
+        scenario: The scenario data.
+        run_indices: The indices of the runs.
+        max_chunk_size: The maximum size of a chunk (None keeps all runs of a batch matching scenario in one chunk).
+
+    Returns:
+        The run index chunks.
+    """
+    if not scenario.get("use_batch_matching"):
+        return [[run_idx] for run_idx in run_indices]
+    chunk_size = max(1, max_chunk_size or len(run_indices))
+    return [run_indices[i:i + chunk_size] for i in range(0, len(run_indices), chunk_size)]
+
+
+########################################################################################################################
+# Scenario runner #
+########################################################################################################################
+class ScenarioRunner:
+    """Prepares the models of a scenario once and executes its runs.
+
+    The run type of the scenario selects how each run is performed:
+    - "generated": Matches a randomly generated observation against the (cached) prepared matcher.
+    - "positive": Like "generated", but additionally re-simulates and checks the matching trace.
+    - "negative": Matches a randomly generated negative observation, which must not match.
+    - "fixed": Matches the fixed observation of the scenario against a dedicated matcher model.
+
+    Except for fixed runs, the observations of the runs are matched via a batch matcher, which matches several
+    observations at once if batch matching is enabled for the scenario. The phases of the preparation and of each run
+    are timed as spans (cf. "span_timer.py"), and the span tree of each run is recorded as "spans" in its run log
+    data.
+    """
+
+    def __init__(self, scenario, workspace, model_cache, matcher_cache, workspace_manager, verifier_shim=None,
+                 result_cache=None):
+        """Initializes ScenarioRunner.
+
+        Args:
+            scenario: The scenario data.
+            workspace: The workspace for the temporary model and trace files of the runs.
+            model_cache: The preprocessed model cache.
+            matcher_cache: The prepared matcher cache.
+            workspace_manager: The workspace manager which provides the workspaces of newly prepared matchers.
+            verifier_shim: The verifier shim via which the verifier is called (None calls the verifier directly).
+            result_cache: The match result cache (None disables the caching of match results).
+        """
+        self.scenario = scenario
+        self.workspace = workspace
+        self.run_type = scenario["run_type"]
+
+        config = copy.deepcopy(scenario["config"])
+        init_directories_and_paths(
+            model_file_path=scenario["model_path"], output_dir_path=workspace.dir_path, config=config)
+        config["matcher_model_file_path"] = config["model_output_dir_path"].joinpath(
+            f'{scenario["matcher_model_name"]}.xml')
+        if verifier_shim is not None:
+            verifier_shim.apply(config=config)
+        self.config = config
+        self.is_using_verifier_shim = verifier_shim is not None
+        self.memory_sampling_config = scenario.get("memory_sampling_config")
+
+        # Prepare model
+        with timed_span(name="load_model"):
+            self.instance_data, self.preprocessed_model = model_cache.load_preprocessed_model(config=config)
+
+        # Prepare trace generator, matcher, and edge trace simulator
+        self.observation_generator = None
+        self.edge_trace_simulator = None
+        self.batch_matcher = None
+        if self.run_type == "fixed":
+            self.observation_matcher = ObservationMatcher(
+                config=config, model=self.preprocessed_model, instance_data=self.instance_data,
+                observation_data=as_observation_data(observation_data=scenario["observation_data"]),
+                matcher_type=scenario["matcher_type"],
+                timeout=scenario["run_timeout"])
+            with timed_span(name="create_matcher_model"):
+                self.observation_matcher.create_matcher_model()
+        else:
+            self.observation_generator = ObservationGenerator(config=config, model=self.preprocessed_model)
+            with timed_span(name="get_prepared_matcher"):
+                self.observation_matcher = matcher_cache.get_prepared_matcher(
+                    config=config, preprocessed_model=self.preprocessed_model, instance_data=self.instance_data,
+                    matcher_type=scenario["matcher_type"], timeout=scenario["run_timeout"],
+                    workspace_manager=workspace_manager)
+            batch_matcher_kwargs = {}
+            if self.is_using_verifier_shim:
+                batch_matcher_kwargs.update(collect_statistics=get_matcher_verifier_statistics)
+            if self.memory_sampling_config:
+                batch_matcher_kwargs.update(create_memory_sampler=self._create_memory_sampler)
+            if result_cache is not None and scenario.get("use_result_cache"):
+                batch_matcher_kwargs.update(result_cache=result_cache, matcher_key=get_prepared_matcher_key(
+                    config=config, matcher_type=scenario["matcher_type"], timeout=scenario["run_timeout"]))
+            if scenario.get("use_prefilter"):
+                batch_matcher_kwargs.update(prefilter=create_observation_prefilter(config=config))
+            batch_concurrency = scenario.get("batch_concurrency", 1) if scenario.get("use_batch_matching") else 1
+            if batch_concurrency > 1:
+                replicator = matcher_cache.create_replicator(
+                    observation_matcher=self.observation_matcher, workspace_manager=workspace_manager)
+                self.batch_matcher = BatchMatcher(
+                    observation_matcher=self.observation_matcher, create_replica=replicator.create_replica,
+                    release_replica=replicator.release_replica, concurrency=batch_concurrency, **batch_matcher_kwargs)
+            else:
+                self.batch_matcher = BatchMatcher(observation_matcher=self.observation_matcher, **batch_matcher_kwargs)
+        if self.run_type == "positive":
+            self.edge_trace_simulator = EdgeTraceSimulator(
+                config=config, model=self.preprocessed_model, instance_data=self.instance_data)
+
+    def execute_run(self, run_idx):
+        """Executes a single run of the scenario.
+
+        Args:
+            run_idx: The index of the run.
+
+        Returns:
+            The run log data.
+        """
+        [(_run_idx, run_log_data)] = list(self.execute_runs(run_indices=[run_idx]))
+        return run_log_data
+
+    def execute_runs(self, run_indices):
+        """Executes runs of the scenario.
+
+        The observations of generated, positive, and negative runs are matched as a batch against the prepared matcher
+        (with the batch concurrency of the scenario), and checked once their matching is finished. A failed run does
+        not abort the other runs of the batch.
+
+        Args:
+            run_indices: The indices of the runs.
+
+        Yields:
+            The run index and the run log data of each finished run, in the order of completion.
+
+        Raises:
+            Exception: The error of the first failed run, once all other runs are finished.
+        """
+        if self.run_type == "fixed":
+            for run_idx in run_indices:
+                start_time = time.time()
+                with timed_span(name="run") as run_span:
+                    self._print_run_header(run_idx=run_idx)
+                    run_log_data = self._execute_fixed_run()
+                run_log_data["durations"]["run"] = time.time() - start_time
+                run_log_data["spans"] = run_span.to_dict()
+                yield run_idx, run_log_data
+            return
+
+        batch_runs = []
+
+        def generate_observations():
+            """Generates the observations of the runs right before they are matched.
+
+            Yields:
+                The observation data.
+            """
+            for run_idx in run_indices:
+                with timed_span(name="generation") as generation_span:
+                    self._print_run_header(run_idx=run_idx)
+                    run_log_data = self._create_run_log_data()
+                    if self.run_type == "negative":
+                        observation_data = self.observation_generator.generate_negative()
+                    else:
+                        observation_data = self.observation_generator.generate()
+                    observation_data = ObservationSeries.from_observation_data(observation_data=observation_data)
+                    run_log_data["obs_data"] = observation_data
+                    print(f'Observation data:\n{observation_data}')
+                batch_runs.append((run_idx, run_log_data, generation_span))
+                yield observation_data
+
+        first_error = None
+        batch_results = self.batch_matcher.match_batch(
+            observations=generate_observations(), return_trace=(self.run_type != "generated"))
+        for batch_result in batch_results:
+            run_idx, run_log_data, generation_span = batch_runs[batch_result.item_idx]
+            run_log_data["durations"].update(batch_result.durations)
+            try:
+                if batch_result.error is not None:
+                    raise RuntimeError(f'Matching of run {run_idx} failed:\n{batch_result.error}')
+                with timed_span(name="check") as check_span:
+                    self._check_matching_result(run_log_data=run_log_data, batch_result=batch_result)
+            except Exception as e:
+                print(f'Run {run_idx} of scenario "{self.scenario["id"]}" failed: {e}')
+                first_error = first_error or e
+                continue
+            run_duration = generation_span.duration + batch_result.duration + check_span.duration
+            run_log_data["durations"]["run"] = run_duration
+            run_span_children = [generation_span, batch_result.span, check_span]
+            run_log_data["spans"] = Span(name="run", duration=run_duration, children=[
+                child_span for child_span in run_span_children if child_span is not None]).to_dict()
+            yield run_idx, run_log_data
+        if first_error is not None:
+            raise first_error
+
+    def _print_run_header(self, run_idx):
+        """Prints the header of a run.
+
+        Args:
+            run_idx: The index of the run.
+        """
+        print(f'\n--- Execute {self.run_type} run {run_idx + 1} / {self.scenario["run_count"]} of model '
+              f'"{self.scenario["model_name"]}" ({self.scenario["description"]}) ---')
+
+    def _create_run_log_data(self):
+        """Creates the initial log data of a generated, positive, or negative run.
+
+        Returns:
+            The run log data.
+        """
+        if self.run_type == "positive":
+            return {
+                "durations": {}, "obs_data": [], "is_matching": False, "is_simulated": False,
+                "is_included": False
+            }
+        return {"durations": {}, "obs_data": [], "is_matching": False}
+
+    def _execute_fixed_run(self):
+        """Executes a run matching the fixed observation of the scenario.
+
+        Returns:
+            The run log data.
+        """
+        run_log_data = {"durations": {}, "is_matching": False}
+
+        if self.is_using_verifier_shim:
+            get_matcher_verifier_statistics(observation_matcher=self.observation_matcher)
+        memory_sampler = None
+        if self.memory_sampling_config:
+            memory_sampler = self._create_memory_sampler(observation_matcher=self.observation_matcher)
+            memory_sampler.start()
+        try:
+            with timed_span(name="matching") as matching_span:
+                matching_res = self.observation_matcher.match(
+                    return_trace=False, use_existing_matcher=True,
+                    log_time_to=(run_log_data["durations"], f'matching'))
+        finally:
+            if memory_sampler is not None:
+                memory_sampler.stop()
+        if memory_sampler is not None and memory_sampler.get_statistics() is not None:
+            run_log_data["memory_statistics"] = memory_sampler.get_statistics()
+        if self.is_using_verifier_shim:
+            verifier_statistics = get_matcher_verifier_statistics(observation_matcher=self.observation_matcher)
+            if verifier_statistics is not None and "call_duration" in verifier_statistics:
+                matching_span.add_child(name="verifier_execution", duration=verifier_statistics.pop("call_duration"))
+            if verifier_statistics is not None:
+                run_log_data["verifier_statistics"] = verifier_statistics
+        assert (matching_res["is_matching"] or matching_res["is_timeout"]), \
+            f'No matching trace found even though one or more should match.'
+
+        run_log_data["is_matching"] = matching_res["is_matching"]
+        run_log_data["is_timeout"] = matching_res["is_timeout"]
+        return run_log_data
+
+    def _check_matching_result(self, run_log_data, batch_result):
+        """Records the matching result of a run, and checks it according to the run type.
+
+        Generated runs must match (or time out), positive runs must match with a matching trace which can be
+        re-simulated on the original model, and negative runs must not match. Results taken from the match result cache
+        are checked in the same way, and marked as cached. Observations rejected by the pre-filter do not match, and
+        the reason of their rejection is recorded as "rejected_by_prefilter". For matchings via the verifier shim, the
+        verifier call data (i.e., the call count, the durations spent waiting for a free slot and in the shim, which
+        are contained in the matching duration, the peak RSS of the verifier processes, and the state space statistics
+        reported by the verifier, if collected) are recorded as "verifier_statistics", and the sampled memory usage of
+        the verifier processes (if sampled) as "memory_statistics".
+
+        Args:
+            run_log_data: The run log data.
+            batch_result: The batch match result of the observation of the run.
+        """
+        run_log_data["is_matching"] = batch_result.is_matching
+        run_log_data["is_timeout"] = batch_result.is_timeout
+        if batch_result.is_cached:
+            run_log_data["is_cached"] = True
+        if batch_result.rejection_reason is not None:
+            run_log_data["rejected_by_prefilter"] = batch_result.rejection_reason
+        if batch_result.verifier_statistics is not None:
+            run_log_data["verifier_statistics"] = batch_result.verifier_statistics
+        if batch_result.memory_statistics is not None:
+            run_log_data["memory_statistics"] = batch_result.memory_statistics
+        observation_data = batch_result.observation_data
+        matched_trace = batch_result.matching_trace
+
+        if self.run_type == "generated":
+            assert (batch_result.is_matching or batch_result.is_timeout), \
+                f'No matching trace found even though one or more should match.'
+        elif self.run_type == "negative":
+            assert not batch_result.is_matching, \
+                f'Matching trace found even though none should match.\n\n ' \
+                f'Matched trace:\n{matched_trace}\n\n' \
+                f'Observation data:\n{observation_data}'
+        elif self.run_type == "positive":
+            assert batch_result.rejection_reason is None, \
+                f'Observation rejected by the pre-filter even though it should match: {batch_result.rejection_reason}'
+            assert batch_result.is_matching, f'No matching trace found even though one or more should match.'
+
+            # Re-simulate matching trace edges
+            edge_trace = [tr.triggered_edges for tr in matched_trace.transitions]
+            with timed_span(name="simulate_edge_trace"):
+                is_simulated, simulated_trace = self.edge_trace_simulator.simulate_edge_trace(
+                    edge_trace=edge_trace)
+            run_log_data["is_simulated"] = is_simulated
+            assert is_simulated, f'Matching edge trace could not be simulated on the original model.'
+
+            # Check if the matching trace is included in the re-simulated trace
+            with timed_span(name="check_trace_inclusion"):
+                is_included = simulated_trace.includes(trace=matched_trace)
+            run_log_data["is_included"] = is_included
+            assert is_included, \
+                f'The simulated trace does not include the matched trace:\n\n' \
+                f'Simulated trace:\n{simulated_trace}\n\n' \
+                f'Matched trace:\n{matched_trace}\n\n' \
+                f'Observation data:\n{observation_data}'
+
+    def _create_memory_sampler(self, observation_matcher):
+        """Creates a memory sampler for the verifier processes of the matchings of an observation matcher, which are
+        recognized by the model directory of the matcher in their command lines.
+
+        Args:
+            observation_matcher: The observation matcher.
+
+        Returns:
+            The memory sampler.
+        """
+        model_dir_path_str = f'{observation_matcher.config["model_output_dir_path"]}{os.sep}'
+        return MemorySampler(command_line_pattern=model_dir_path_str,
+                             sample_interval=self.memory_sampling_config["sample_interval"])
+
+    def close(self):
+        """Releases the matcher replicas of the runner, and closes its workspace."""
+        if self.batch_matcher is not None:
+            self.batch_matcher.close()
+        self.workspace.close()
+
+
+def get_matcher_verifier_statistics(observation_matcher):
+    """Gets (and resets) the verifier statistics of the matchings of an observation matcher, which are recorded by the
+    verifier shim in the model directory of the matcher.
+
+    Args:
+        observation_matcher: The observation matcher.
+
+    Returns:
+        The verifier statistics (including the summed durations of the verifier calls as "call_duration", of the
+        waits for a free slot as "queue_duration", and of the shim as "shim_duration"), or None if no verifier calls
+        were recorded.
+    """
+    return collect_verifier_statistics(model_dir_path=observation_matcher.config["model_output_dir_path"],
+                                       include_call_duration=True)
+
+
+########################################################################################################################
+# Scenario executor #
+########################################################################################################################
+class ScenarioExecutor:
+    """Executes the runs of experiment scenarios, either sequentially or spread across a process pool."""
+
+    def __init__(self, workspace_manager, model_cache, matcher_cache, worker_count=1, verifier_shim=None,
+                 result_cache=None):
+        """Initializes ScenarioExecutor.
+
+        Args:
+            workspace_manager: The workspace manager which provides the isolated workspaces of the scenario runners.
+            model_cache: The preprocessed model cache.
+            matcher_cache: The prepared matcher cache.
+            worker_count: The number of worker processes (1 executes all runs sequentially in the current process).
+            verifier_shim: The verifier shim via which the verifier is called (None calls the verifier directly).
+            result_cache: The match result cache (None disables the caching of match results).
+        """
+        self.workspace_manager = workspace_manager
+        self.model_cache = model_cache
+        self.matcher_cache = matcher_cache
+        self.worker_count = max(1, worker_count)
+        self.verifier_shim = verifier_shim
+        self.result_cache = result_cache
+
+    def execute(self, scenarios, on_run_finished, on_scenario_finished, get_initial_run_indices=None,
+                get_additional_run_indices=None):
+        """Executes all runs of the given scenarios.
+
+        The results are handed over as soon as they are available, so that the executor does not keep the log data of
+        finished runs.
+
+        Args:
+            scenarios: The scenario data list.
+            on_run_finished: The callback which receives the scenario data, the run index, and the run log data of
+                each finished run.
+            on_scenario_finished: The callback which receives the scenario data as soon as all runs of a scenario are
+                finished.
+            get_initial_run_indices: The optional callback which receives the scenario data right before the first run
+                of a scenario is scheduled, and returns the indices of its runs (by default, the "run_indices" of the
+                scenario).
+            get_additional_run_indices: The optional callback which receives the scenario data once all scheduled
+                runs of a scenario are finished, and returns the indices of further runs (an empty list finishes the
+                scenario).
+        """
+        scenario_callbacks = ScenarioCallbacks(
+            on_run_finished=on_run_finished, on_scenario_finished=on_scenario_finished,
+            get_initial_run_indices=get_initial_run_indices, get_additional_run_indices=get_additional_run_indices)
+        self.workspace_manager.open_session()
+        try:
+            if self.worker_count == 1:
+                self._execute_sequentially(scenarios=scenarios, scenario_callbacks=scenario_callbacks)
+            else:
+                self._execute_in_pool(scenarios=scenarios, scenario_callbacks=scenario_callbacks)
+        finally:
+            self.workspace_manager.cleanup()
+
+    def _execute_sequentially(self, scenarios, scenario_callbacks):
+        """Executes all runs of the given scenarios one after another in the current process.
+
+        Args:
+            scenarios: The scenario data list.
+            scenario_callbacks: The scenario callbacks.
+        """
+        init_worker(
+            workspace_manager=self.workspace_manager, model_cache=self.model_cache, matcher_cache=self.matcher_cache,
+            verifier_shim=self.verifier_shim, result_cache=self.result_cache)
+        try:
+            for scenario in scenarios:
+                run_indices = scenario_callbacks.start_scenario(scenario=scenario)
+                while run_indices:
+                    for run_index_chunk in get_run_index_chunks(scenario=scenario, run_indices=run_indices):
+                        for run_idx, run_log_data in iterate_scenario_runs(
+                                scenario=scenario, run_indices=run_index_chunk):
+                            scenario_callbacks.on_run_finished(scenario, run_idx, run_log_data)
+                    run_indices = scenario_callbacks.continue_scenario(scenario=scenario)
+        finally:
+            release_worker_resources()
+            init_worker(workspace_manager=None, model_cache=None, matcher_cache=None)
+
+    def _execute_in_pool(self, scenarios, scenario_callbacks):
+        """Executes all runs of the given scenarios in a process pool.
+
+        Scenarios are started lazily in their order, so that workers mostly keep using the same prepared matcher (and
+        the runs of a scenario can depend on the results of previous scenarios). Further runs of a scenario are
+        submitted before all other pending runs, and finished runs and scenarios are reported in their order of
+        completion. Runs of batch matching scenarios are submitted in chunks of the batch concurrency.
+
+        Args:
+            scenarios: The scenario data list.
+            scenario_callbacks: The scenario callbacks.
+        """
+        scenarios_by_id = dict((scenario["id"], scenario) for scenario in scenarios)
+        scenario_open_run_counts = {}
+        pending_scenarios = collections.deque(scenarios)
+        pending_tasks = collections.deque()
+
+        max_in_flight_count = 2 * self.worker_count
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.worker_count, initializer=init_pool_worker,
+                initargs=(self.workspace_manager, self.model_cache, self.matcher_cache,
+                          self.verifier_shim, self.result_cache)) as executor:
+            in_flight_futures = set()
+            try:
+                while pending_scenarios or pending_tasks or in_flight_futures:
+                    while len(in_flight_futures) < max_in_flight_count:
+                        if pending_tasks:
+                            scenario, run_index_chunk = pending_tasks.popleft()
+                            in_flight_futures.add(executor.submit(execute_scenario_runs, scenario, run_index_chunk))
+                        elif pending_scenarios:
+                            scenario = pending_scenarios.popleft()
+                            run_indices = scenario_callbacks.start_scenario(scenario=scenario)
+                            scenario_open_run_counts[scenario["id"]] = len(run_indices)
+                            run_index_chunks = get_run_index_chunks(
+                                scenario=scenario, run_indices=run_indices,
+                                max_chunk_size=scenario.get("batch_concurrency"))
+                            pending_tasks.extend((scenario, run_index_chunk) for run_index_chunk in run_index_chunks)
+                        else:
+                            break
+                    if not in_flight_futures:
+                        continue
+
+                    done_futures, in_flight_futures = concurrent.futures.wait(
+                        in_flight_futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done_futures:
+                        scenario_id, run_results, error = future.result()
+                        scenario = scenarios_by_id[scenario_id]
+                        for run_idx, run_log_data in run_results:
+                            scenario_callbacks.on_run_finished(scenario, run_idx, run_log_data)
+                        if error is not None:
+                            raise RuntimeError(f'A run of scenario "{scenario_id}" failed:\n{error}')
+
+                        scenario_open_run_counts[scenario_id] -= len(run_results)
+                        if scenario_open_run_counts[scenario_id] == 0:
+                            run_indices = scenario_callbacks.continue_scenario(scenario=scenario)
+                            scenario_open_run_counts[scenario_id] = len(run_indices)
+                            run_index_chunks = get_run_index_chunks(
+                                scenario=scenario, run_indices=run_indices,
+                                max_chunk_size=scenario.get("batch_concurrency"))
+                            pending_tasks.extendleft(
+                                (scenario, run_index_chunk) for run_index_chunk in reversed(run_index_chunks))
+            except BaseException:
+                for future in in_flight_futures:
+                    future.cancel()
+                raise
+
+
+class ScenarioCallbacks:
+    """The callbacks with which the executors hand over results, and request the runs of a scenario."""
+
+    def __init__(self, on_run_finished, on_scenario_finished, get_initial_run_indices=None,
+                 get_additional_run_indices=None):
+        """Initializes ScenarioCallbacks.
+
+        Args:
+            on_run_finished: The callback for finished runs.
+            on_scenario_finished: The callback for finished scenarios.
+            get_initial_run_indices: The optional callback for the runs of a scenario which is started.
+            get_additional_run_indices: The optional callback for further runs of a scenario whose scheduled runs are
+                finished.
+        """
+        self.on_run_finished = on_run_finished
+        self.on_scenario_finished = on_scenario_finished
+        self.get_initial_run_indices = get_initial_run_indices or (lambda scenario: scenario["run_indices"])
+        self.get_additional_run_indices = get_additional_run_indices or (lambda _scenario: [])
+
+    def start_scenario(self, scenario):
+        """Gets the run indices of a scenario which is started, and finishes it directly if it has no runs.
+
+        Args:
+            scenario: The scenario data.
+
+        Returns:
+            The run indices.
+        """
+        run_indices = self.get_initial_run_indices(scenario)
+        if not run_indices:
+            run_indices = self.continue_scenario(scenario=scenario)
+        return run_indices
+
+    def continue_scenario(self, scenario):
+        """Gets the indices of further runs of a scenario whose scheduled runs are finished, and finishes it if no
+        further runs are required.
+
+        Args:
+            scenario: The scenario data.
+
+        Returns:
+            The run indices.
+        """
+        run_indices = self.get_additional_run_indices(scenario)
+        if not run_indices:
+            self.on_scenario_finished(scenario)
+        return run_indices
+
+
+########################################################################################################################
+# Work queue execution #
+########################################################################################################################
+def execute_queue_task(work_queue, task, worker_id):
+    """Executes a task claimed from the work queue, renewing its lease while the run is executed.
+
+    Args:
+        work_queue: The work queue.
+        task: The claimed task.
+        worker_id: The ID of the worker holding the lease.
+    """
+    is_finished = threading.Event()
+
+    def renew_lease():
+        """Renews the lease of the task periodically until the run is finished."""
+        while not is_finished.wait(timeout=work_queue.lease_duration / 3):
+            if not work_queue.renew_lease(task_id=task.task_id, worker_id=worker_id):
+                return
+
+    lease_renewal_thread = threading.Thread(target=renew_lease, daemon=True)
+    lease_renewal_thread.start()
+    try:
+        _scenario_id, _run_idx, run_log_data = execute_scenario_run(scenario=task.scenario, run_idx=task.run_idx)
+    except Exception:
+        work_queue.fail(task_id=task.task_id, worker_id=worker_id, error=traceback.format_exc())
+        print(f'Run {task.run_idx} of scenario "{task.scenario["id"]}" failed (attempt {task.attempt_count}).')
+        return
+    finally:
+        is_finished.set()
+        lease_renewal_thread.join()
+    work_queue.complete(task_id=task.task_id, run_log_data=run_log_data)
+
+
+def run_queue_worker(work_queue, workspace_manager, model_cache, matcher_cache, idle_timeout=None, poll_interval=5,
+                     verifier_shim=None, result_cache=None):
+    """Executes tasks of the work queue in the current process.
+
+    Args:
+        work_queue: The work queue.
+        workspace_manager: The workspace manager which provides the workspaces of the scenario runners.
+        model_cache: The preprocessed model cache.
+        matcher_cache: The prepared matcher cache.
+        idle_timeout: The time (in seconds) after which the worker stops if the queue has no open tasks (None keeps
+            the worker waiting for new tasks).
+        poll_interval: The time (in seconds) between two attempts to claim a task.
+        verifier_shim: The verifier shim via which the verifier is called (None calls the verifier directly).
+        result_cache: The match result cache (None disables the caching of match results).
+    """
+    worker_id = get_worker_id()
+    init_worker(workspace_manager=workspace_manager, model_cache=model_cache, matcher_cache=matcher_cache,
+                verifier_shim=verifier_shim, result_cache=result_cache)
+    try:
+        idle_start_time = None
+        while True:
+            task = work_queue.claim(worker_id=worker_id)
+            if task is not None:
+                idle_start_time = None
+                execute_queue_task(work_queue=work_queue, task=task, worker_id=worker_id)
+                continue
+
+            # Tasks leased by other workers may still be returned to the queue if their leases expire
+            if idle_timeout is not None and work_queue.get_open_task_count() == 0:
+                idle_start_time = idle_start_time if idle_start_time is not None else time.monotonic()
+                if time.monotonic() - idle_start_time >= idle_timeout:
+                    break
+            else:
+                idle_start_time = None
+            time.sleep(poll_interval)
+    finally:
+        release_worker_resources()
+        init_worker(workspace_manager=None, model_cache=None, matcher_cache=None)
+
+
+def run_queue_worker_process(work_queue, workspace_manager, model_cache, matcher_cache, idle_timeout, poll_interval,
+                             verifier_shim, result_cache):
+    """Executes tasks of the work queue in a separate worker process.
+
+    Args:
+        work_queue: The work queue.
+        workspace_manager: The workspace manager which provides the workspaces of the scenario runners.
+        model_cache: The preprocessed model cache.
+        matcher_cache: The prepared matcher cache.
+        idle_timeout: The time (in seconds) after which the worker stops if the queue has no open tasks.
+        poll_interval: The time (in seconds) between two attempts to claim a task.
+        verifier_shim: The verifier shim via which the verifier is called (None calls the verifier directly).
+        result_cache: The match result cache (None disables the caching of match results).
+    """
+    random.seed()
+    try:
+        run_queue_worker(work_queue=work_queue, workspace_manager=workspace_manager, model_cache=model_cache,
+                         matcher_cache=matcher_cache, idle_timeout=idle_timeout, poll_interval=poll_interval,
+                         verifier_shim=verifier_shim, result_cache=result_cache)
+    except KeyboardInterrupt:
+        pass
+
+
+def start_queue_worker_processes(work_queue, workspace_manager, model_cache, matcher_cache, worker_count,
+                                 idle_timeout, poll_interval, verifier_shim=None, result_cache=None):
+    """Starts worker processes which execute tasks of the work queue.
+
+    Args:
+        work_queue: The work queue.
+        workspace_manager: The workspace manager which provides the workspaces of the scenario runners.
+        model_cache: The preprocessed model cache.
+        matcher_cache: The prepared matcher cache.
+        worker_count: The number of worker processes.
+        idle_timeout: The time (in seconds) after which a worker stops if the queue has no open tasks.
+        poll_interval: The time (in seconds) between two attempts to claim a task.
+        verifier_shim: The verifier shim via which the verifier is called (None calls the verifier directly).
+        result_cache: The match result cache (None disables the caching of match results).
+
+    Returns:
+        The worker processes.
+    """
+    worker_processes = []
+    for _ in range(0, worker_count):
+        worker_process = multiprocessing.Process(
+            target=run_queue_worker_process,
+            args=(work_queue, workspace_manager, model_cache, matcher_cache, idle_timeout, poll_interval,
+                  verifier_shim, result_cache))
+        worker_process.start()
+        worker_processes.append(worker_process)
+    return worker_processes
+
+
+def stop_queue_worker_processes(worker_processes):
+    """Stops the given worker processes (their leased tasks are claimed again once the leases expire).
+
+    Args:
+        worker_processes: The worker processes.
+    """
+    for worker_process in worker_processes:
+        if worker_process.is_alive():
+            worker_process.terminate()
+    for worker_process in worker_processes:
+        worker_process.join()
+
+
+class QueueScenarioExecutor:
+    """Executes the runs of experiment scenarios via a (shared) work queue.
+
+    The runs are submitted to the queue and executed by local worker processes, as well as by any other workers
+    serving the same queue (e.g., on other nodes). The results are collected from the queue by this executor only.
+    """
+
+    def __init__(self, work_queue, workspace_manager, model_cache, matcher_cache, worker_count=1, poll_interval=2,
+                 max_open_run_count=100, verifier_shim=None, result_cache=None, resume=False):
+        """Initializes QueueScenarioExecutor.
+
+        Args:
+            work_queue: The work queue.
+            workspace_manager: The workspace manager which provides the isolated workspaces of the scenario runners.
+            model_cache: The preprocessed model cache.
+            matcher_cache: The prepared matcher cache.
+            worker_count: The number of local worker processes (0 leaves all runs to other workers).
+            poll_interval: The time (in seconds) between two polls of the queue.
+            max_open_run_count: The maximum number of submitted runs which are not finished yet.
+            verifier_shim: The verifier shim via which the local workers call the verifier (None calls the verifier
+                directly).
+            result_cache: The match result cache (None disables the caching of match results).
+            resume: Choose whether the results of runs which were finished in the queue before (e.g., by workers of
+                an interrupted execution) are reused, instead of executing the runs again.
+        """
+        self.work_queue = work_queue
+        self.workspace_manager = workspace_manager
+        self.model_cache = model_cache
+        self.matcher_cache = matcher_cache
+        self.worker_count = max(0, worker_count)
+        self.poll_interval = poll_interval
+        self.max_open_run_count = max_open_run_count
+        self.verifier_shim = verifier_shim
+        self.result_cache = result_cache
+        self.resume = resume
+
+    def execute(self, scenarios, on_run_finished, on_scenario_finished, get_initial_run_indices=None,
+                get_additional_run_indices=None):
+        """Executes all runs of the given scenarios.
+
+        Scenarios are submitted lazily in their order (keeping at most "max_open_run_count" runs open), so that the
+        runs of a scenario can depend on the results of previous scenarios.
+
+        Args:
+            scenarios: The scenario data list.
+            on_run_finished: The callback which receives the scenario data, the run index, and the run log data of
+                each finished run.
+            on_scenario_finished: The callback which receives the scenario data as soon as all runs of a scenario are
+                finished.
+            get_initial_run_indices: The optional callback which receives the scenario data right before the runs of
+                a scenario are submitted, and returns the indices of its runs (by default, the "run_indices" of the
+                scenario).
+            get_additional_run_indices: The optional callback which receives the scenario data once all scheduled
+                runs of a scenario are finished, and returns the indices of further runs (an empty list finishes the
+                scenario).
+
+        Raises:
+            RuntimeError: If a run failed in all of its attempts.
+        """
+        scenario_callbacks = ScenarioCallbacks(
+            on_run_finished=on_run_finished, on_scenario_finished=on_scenario_finished,
+            get_initial_run_indices=get_initial_run_indices, get_additional_run_indices=get_additional_run_indices)
+        scenarios_by_id = dict((scenario["id"], scenario) for scenario in scenarios)
+        pending_scenarios = collections.deque(scenarios)
+        open_run_indices = {}
+
+        def submit_pending_scenarios():
+            """Submits pending scenarios until enough runs are open."""
+            while pending_scenarios and sum(map(len, open_run_indices.values())) < self.max_open_run_count:
+                pending_scenario = pending_scenarios.popleft()
+                run_indices = scenario_callbacks.start_scenario(scenario=pending_scenario)
+                if run_indices:
+                    open_run_indices[pending_scenario["id"]] = set(run_indices)
+                    self.work_queue.submit(scenarios=[dict(pending_scenario, run_indices=run_indices)],
+                                           resume=self.resume)
+
+        self.workspace_manager.open_session()
+        submit_pending_scenarios()
+        worker_processes = start_queue_worker_processes(
+            work_queue=self.work_queue, workspace_manager=self.workspace_manager, model_cache=self.model_cache,
+            matcher_cache=self.matcher_cache, worker_count=self.worker_count, idle_timeout=5 * self.poll_interval,
+            poll_interval=self.poll_interval, verifier_shim=self.verifier_shim, result_cache=self.result_cache)
+        try:
+            while open_run_indices or pending_scenarios:
+                open_scenarios = [scenarios_by_id[scenario_id] for scenario_id in open_run_indices]
+                collected_results = self.work_queue.collect_results(scenarios=open_scenarios)
+                for scenario_id, run_idx, run_log_data in collected_results:
+                    if run_idx not in open_run_indices.get(scenario_id, ()):
+                        continue
+                    scenario = scenarios_by_id[scenario_id]
+                    scenario_callbacks.on_run_finished(scenario, run_idx, run_log_data)
+                    open_run_indices[scenario_id].remove(run_idx)
+                    if not open_run_indices[scenario_id]:
+                        run_indices = scenario_callbacks.continue_scenario(scenario=scenario)
+                        if run_indices:
+                            open_run_indices[scenario_id].update(run_indices)
+                            self.work_queue.submit(scenarios=[dict(scenario, run_indices=run_indices)],
+                                                   resume=self.resume)
+                        else:
+                            del open_run_indices[scenario_id]
+                submit_pending_scenarios()
+
+                if not collected_results:
+                    failed_tasks = self.work_queue.get_failed_tasks(scenarios=open_scenarios)
+                    if failed_tasks:
+                        scenario_key, run_idx, error = failed_tasks[0]
+                        raise RuntimeError(f'Run {run_idx} of scenario "{scenario_key}" failed:\n{error}')
+                    is_any_worker_alive = any(worker_process.is_alive() for worker_process in worker_processes)
+                    if self.worker_count > 0 and not is_any_worker_alive and self.work_queue.get_open_task_count():
+                        # Tasks were returned to the queue after the local workers stopped (e.g., expired leases)
+                        worker_processes = start_queue_worker_processes(
+                            work_queue=self.work_queue, workspace_manager=self.workspace_manager,
+                            model_cache=self.model_cache, matcher_cache=self.matcher_cache,
+                            worker_count=self.worker_count, idle_timeout=5 * self.poll_interval,
+                            poll_interval=self.poll_interval, verifier_shim=self.verifier_shim,
+                            result_cache=self.result_cache)
+                    time.sleep(self.poll_interval)
+        finally:
+            stop_queue_worker_processes(worker_processes=worker_processes)
+            self.workspace_manager.cleanup()
+
+
+def serve_work_queue(work_queue, workspace_manager, model_cache, matcher_cache, worker_count=1, idle_timeout=None,
+                     poll_interval=5, verifier_shim=None, result_cache=None):
+    """Executes tasks of the work queue (submitted by other nodes) until the queue is idle.
+
+    Args:
+        work_queue: The work queue.
+        workspace_manager: The workspace manager which provides the isolated workspaces of the scenario runners.
+        model_cache: The preprocessed model cache.
+        matcher_cache: The prepared matcher cache.
+        worker_count: The number of worker processes.
+        idle_timeout: The time (in seconds) after which the workers stop if the queue has no open tasks (None keeps
+            the workers waiting for new tasks).
+        poll_interval: The time (in seconds) between two attempts to claim a task.
+        verifier_shim: The verifier shim via which the verifier is called (None calls the verifier directly).
+        result_cache: The match result cache (None disables the caching of match results).
+    """
+    workspace_manager.open_session()
+    worker_processes = start_queue_worker_processes(
+        work_queue=work_queue, workspace_manager=workspace_manager, model_cache=model_cache,
+        matcher_cache=matcher_cache, worker_count=max(1, worker_count), idle_timeout=idle_timeout,
+        poll_interval=poll_interval, verifier_shim=verifier_shim, result_cache=result_cache)
+    try:
+        for worker_process in worker_processes:
+            worker_process.join()
+    finally:
+        stop_queue_worker_processes(worker_processes=worker_processes)
+        workspace_manager.cleanup()
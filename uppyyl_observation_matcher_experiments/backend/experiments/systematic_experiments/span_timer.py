@@ -0,0 +1,136 @@
+"""This module implements the hierarchical timing of the phases of the matching pipeline (i.e., spans)."""
+import contextlib
+import threading
+import time
+
+########################################################################################################################
+# Span configurations #
+########################################################################################################################
+# The separator of the span names in the phase paths of a span tree (e.g., "run/matching/verifier_execution")
+phase_path_separator = "/"
+
+_span_state = threading.local()
+
+
+########################################################################################################################
+# Spans #
+########################################################################################################################
+class Span:
+    """A timed phase, which contains the timed phases executed within it as child spans."""
+
+    def __init__(self, name, duration=0.0, children=None):
+        """Initializes Span.
+
+        Args:
+            name: The name of the phase.
+            duration: The duration (in seconds) of the phase.
+            children: The child spans.
+        """
+        self.name = name
+        self.duration = duration
+        self.children = children if children is not None else []
+
+    def add_child(self, name, duration):
+        """Adds a child span whose duration was measured elsewhere (e.g., in the verifier backend).
+
+        Args:
+            name: The name of the phase.
+            duration: The duration (in seconds) of the phase.
+
+        Returns:
+            The child span.
+        """
+        child_span = Span(name=name, duration=duration)
+        self.children.append(child_span)
+        return child_span
+
+    def to_dict(self):
+        """Converts the span tree into a dict (e.g., for the run logs).
+
+        Returns:
+            The span tree dict.
+        """
+        span_data = {"name": self.name, "duration": self.duration}
+        if self.children:
+            span_data["children"] = [child_span.to_dict() for child_span in self.children]
+        return span_data
+
+
+def get_current_span():
+    """Gets the innermost span which is currently timed in the current thread.
+
+    Returns:
+        The current span, or None if no span is timed.
+    """
+    return getattr(_span_state, "current_span", None)
+
+
+@contextlib.contextmanager
+def timed_span(name):
+    """Times a phase as child span of the current span of the current thread (or as root span if there is none).
+
+    Since the current span is tracked per thread, phases executed in other threads (e.g., concurrent matchings) are
+    timed as separate root spans. A timed block must not yield to other code of the same thread (e.g., within a
+    generator), since the other code would be timed as part of the phase.
+
+    Args:
+        name: The name of the phase.
+
+    Yields:
+        The span of the phase (whose duration is set once the phase is finished).
+    """
+    parent_span = get_current_span()
+    span = Span(name=name)
+    if parent_span is not None:
+        parent_span.children.append(span)
+    _span_state.current_span = span
+    start_time = time.time()
+    try:
+        yield span
+    finally:
+        span.duration = time.time() - start_time
+        _span_state.current_span = parent_span
+
+
+########################################################################################################################
+# Span summaries #
+########################################################################################################################
+def get_phase_durations(span_data, phase_durations=None, parent_path=None):
+    """Gets the exclusive durations of the phases of a span tree, i.e., the durations not covered by child spans.
+
+    For instance, the exclusive duration of a matching span with a verifier execution child is the time spent in the
+    matcher itself (i.e., matcher model generation and trace parsing). Concurrent child spans may overlap, in which
+    case the exclusive duration of their parent is 0.
+
+    Args:
+        span_data: The span tree dict.
+        phase_durations: The dict to which the durations are added (None creates a new dict).
+        parent_path: The phase path of the parent span.
+
+    Returns:
+        The summed exclusive durations per phase path.
+    """
+    phase_durations = phase_durations if phase_durations is not None else {}
+    path = f'{parent_path}{phase_path_separator}{span_data["name"]}' if parent_path else span_data["name"]
+    child_spans_data = span_data.get("children", [])
+    exclusive_duration = span_data["duration"] - sum(child_data["duration"] for child_data in child_spans_data)
+    phase_durations[path] = phase_durations.get(path, 0.0) + max(0.0, exclusive_duration)
+    for child_span_data in child_spans_data:
+        get_phase_durations(span_data=child_span_data, phase_durations=phase_durations, parent_path=path)
+    return phase_durations
+
+
+def get_dominant_phase(phase_durations):
+    """Gets the phase with the largest exclusive duration.
+
+    Args:
+        phase_durations: The exclusive durations per phase path.
+
+    Returns:
+        The phase path and its share of the total duration, or None if no durations are given.
+    """
+    total_duration = sum(phase_durations.values())
+    if not phase_durations or total_duration <= 0:
+        return None
+    phase_path = max(phase_durations, key=phase_durations.get)
+    return phase_path, phase_durations[phase_path] / total_duration
@@ -0,0 +1,171 @@
+"""This module implements the summary indexes of the experiment logs, which hold the scenario summaries of a log file
+so that the plots never have to parse the full logs."""
+import json
+import os
+import pathlib
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.log_reader import \
+    load_log_tree
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_cache import \
+    calculate_file_hash
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_store import \
+    get_tree_node
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_stream import \
+    ResultStreamIndex
+
+########################################################################################################################
+# Index configurations #
+########################################################################################################################
+# The index files are kept in a sub-directory of the log directory, so that they are not read as model logs
+summary_index_dir_name = ".summary_index"
+summary_index_version = 1
+
+
+########################################################################################################################
+# Summary trees #
+########################################################################################################################
+def create_summary_tree_from_stream(stream_file_path, model_name):
+    """Creates the summary tree of a model log from the result stream which is compacted into it (i.e., from the
+    records of the finished summarized scenarios).
+
+    Args:
+        stream_file_path: The path of the stream file.
+        model_name: The model name.
+
+    Returns:
+        The summary data per scenario key per model (e.g., "summary_tree[model_name][size]["summary"]").
+    """
+    summary_tree = {}
+    stream_index = ResultStreamIndex(stream_file_path=stream_file_path)
+    for record in sorted(stream_index.scenario_records.values(), key=lambda r: r["scenario_idx"]):
+        if record["summarize"]:
+            get_tree_node(tree=summary_tree, keys=[model_name] + record["keys"])["summary"] = record["summary"] or {}
+    return summary_tree
+
+
+########################################################################################################################
+# Summary index files #
+########################################################################################################################
+def get_summary_index_file_path(log_file_path):
+    """Gets the path of the summary index file of a log file.
+
+    Args:
+        log_file_path: The path of the log file.
+
+    Returns:
+        The path of the index file.
+    """
+    log_file_path = pathlib.Path(log_file_path)
+    return log_file_path.parent.joinpath(summary_index_dir_name, log_file_path.name)
+
+
+def get_log_file_state(log_file_path, file_hash=None):
+    """Gets the state of a log file by which its summary index is validated.
+
+    Args:
+        log_file_path: The path of the log file.
+        file_hash: The content hash of the log file (None calculates it).
+
+    Returns:
+        The modification time, size, and content hash of the log file.
+    """
+    file_stat = os.stat(log_file_path)
+    return {
+        "mtime_ns": file_stat.st_mtime_ns,
+        "size": file_stat.st_size,
+        "sha256": file_hash if file_hash is not None else calculate_file_hash(file_path=log_file_path),
+    }
+
+
+def write_summary_index(log_file_path, summary_tree):
+    """Writes the summary index of a log file (which must exist).
+
+    Args:
+        log_file_path: The path of the log file.
+        summary_tree: The summary tree of the log file.
+    """
+    index_file_path = get_summary_index_file_path(log_file_path=log_file_path)
+    index_file_path.parent.mkdir(parents=True, exist_ok=True)
+    index_data = {
+        "version": summary_index_version,
+        "log_file": get_log_file_state(log_file_path=log_file_path),
+        "summary_tree": summary_tree,
+    }
+    temp_index_file_path = index_file_path.with_name(f'.{index_file_path.name}.tmp')
+    with open(temp_index_file_path, 'w') as file:
+        json.dump(index_data, file)
+    os.replace(temp_index_file_path, index_file_path)
+
+
+def read_summary_index(log_file_path):
+    """Reads the summary index of a log file, if it is still valid.
+
+    The index is valid if the modification time and size of the log file are unchanged. If only the modification time
+    changed (e.g., for a copied log), the content hash of the log file decides, and the index is updated if it is
+    still valid.
+
+    Args:
+        log_file_path: The path of the log file.
+
+    Returns:
+        The summary tree of the log file, or None if there is no valid index.
+    """
+    index_file_path = get_summary_index_file_path(log_file_path=log_file_path)
+    try:
+        with open(index_file_path, 'r') as file:
+            index_data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if index_data.get("version") != summary_index_version:
+        return None
+    indexed_state = index_data["log_file"]
+    file_stat = os.stat(log_file_path)
+    if file_stat.st_size != indexed_state["size"]:
+        return None
+    if file_stat.st_mtime_ns != indexed_state["mtime_ns"]:
+        if calculate_file_hash(file_path=log_file_path) != indexed_state["sha256"]:
+            return None
+        index_data["log_file"] = get_log_file_state(log_file_path=log_file_path, file_hash=indexed_state["sha256"])
+        try:
+            with open(index_file_path, 'w') as file:
+                json.dump(index_data, file)
+        except OSError:
+            pass
+    return index_data["summary_tree"]
+
+
+def load_log_summary_tree(log_file_path):
+    """Loads the summary tree of a log file from its summary index, and (re-)creates the index from the full log if
+    it is missing or outdated (reading only the summaries of the log incrementally).
+
+    Args:
+        log_file_path: The path of the log file.
+
+    Returns:
+        The summary tree of the log file.
+    """
+    summary_tree = read_summary_index(log_file_path=log_file_path)
+    if summary_tree is not None:
+        return summary_tree
+    summary_tree = load_log_tree(log_file_path=log_file_path, include_runs=False)
+    try:
+        write_summary_index(log_file_path=log_file_path, summary_tree=summary_tree)
+    except OSError:
+        pass
+    return summary_tree
+
+
+def load_summary_data(data_path):
+    """Loads the summary trees of all model logs of an experiment (e.g., Exp4) via their summary indexes.
+
+    Args:
+        data_path: The path of the log directory of the experiment.
+
+    Returns:
+        The summary data per scenario key per model.
+    """
+    summary_data = {}
+    file_paths = sorted([f for f in pathlib.Path(data_path).iterdir() if f.is_file() and not f.name.startswith('.')])
+    for file_path in file_paths:
+        summary_data.update(load_log_summary_tree(log_file_path=file_path))
+    return summary_data
@@ -1,34 +1,633 @@
 """This module contains the introduction model example."""
 import copy
+import hashlib
+import itertools
 import json
 
-from uppyyl_observation_matcher.backend.helper import load_model_from_file, get_instance_data
-from uppyyl_observation_matcher.backend.matching import ObservationMatcher
-from uppyyl_observation_matcher.backend.observation.generator import ObservationGenerator
-from uppyyl_observation_matcher.backend.trace.simulator import EdgeTraceSimulator
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.adaptive_run_counts import \
+    default_adaptive_run_config, evaluate_run_count, fixed_run_count_stop_reason, get_confidence_interval_data, \
+    validate_adaptive_run_config
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.budget_planner import \
+    RunDurationEstimator, TimeBudgetPlanner, time_budget_stop_reason
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.early_termination import \
+    SweepTerminationTracker, complete_sweep_status, early_termination_stop_reason
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.log_reader import \
+    iterate_scenario_runs
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.matcher_cache import \
+    PreparedMatcherCache
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.matcher_model_configs import \
     base_matcher_model_config, all_matcher_model_configs
-from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.helper import \
-    init_directories_and_paths, generate_and_save_preprocess_model
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_cache import \
+    PreprocessedModelCache, calculate_file_hash
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_data import all_model_data
-from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.exp2_observation_data import \
-    all_exp2_observation_data
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_configs import \
     all_observation_configs, base_observation_config
-from uppyyl_observation_matcher_experiments.backend.helper import calculate_min_max_avg_float
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_corpus import \
+    exp2_observation_corpus_dir_path, load_model_observation_data
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_series import \
+    as_observation_data
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_cache import \
+    MatchResultCache
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_store import \
+    ResultStore
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_stream import \
+    ResultStreamIndex, ResultStreamWriter, compact_result_stream, read_result_record
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.scenario_executor import \
+    ScenarioExecutor, QueueScenarioExecutor, serve_work_queue
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.summary_index import \
+    create_summary_tree_from_stream, write_summary_index
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.verifier_backend import \
+    VerifierShim
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.work_queue import WorkQueue
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.workspace import \
+    WorkspaceManager
+from uppyyl_observation_matcher_experiments.backend.helper import \
+    calculate_min_max_avg_float, calculate_min_max_avg_int
 
 
 ########################################################################################################################
 # Experiment configurations #
 ########################################################################################################################
+# The keys of the run log data under which resource statistics are recorded, which are summarized per scenario
+resource_statistics_keys = ["verifier_statistics", "memory_statistics"]
+
+
 class SystematicExperiments:
     """The systematic experiments class."""
 
-    def __init__(self, experiment_base_dir_path, experiment_log_dir_path=None):
-        """Initializes SystematicExperiments."""
+    def __init__(self, experiment_base_dir_path, experiment_log_dir_path=None, worker_count=1,
+                 use_memory_backed_workspaces=False, keep_failed_workspaces=False, resume=False,
+                 work_queue_file_path=None, adaptive_run_config=None, early_termination_config=None,
+                 time_budget_config=None, verifier_backend_config=None, batch_concurrency=1, result_cache_config=None,
+                 use_observation_prefilter=False, memory_sampling_config=None, progress_callback=None):
+        """Initializes SystematicExperiments.
+
+        Args:
+            experiment_base_dir_path: The path of the base directory for temporary experiment data.
+            experiment_log_dir_path: The path of the directory for the experiment logs.
+            worker_count: The number of worker processes across which the scenario runs are spread
+                (1 executes all runs sequentially).
+            use_memory_backed_workspaces: Choose whether the run workspaces are placed on a tmpfs (e.g., "/dev/shm").
+            keep_failed_workspaces: Choose whether the workspaces of failed runs are kept for debugging.
+            resume: Choose whether runs already contained in existing result streams or logs (with the same
+                configuration) are skipped.
+            work_queue_file_path: The path of a (shared) work queue file, via which the runs are distributed to the
+                local workers and the workers of other nodes serving the same queue (None executes all runs locally).
+            adaptive_run_config: The adaptive run count configuration (cf. "adaptive_run_counts.py"), with which the
+                runs of summarized scenarios are repeated until the confidence interval of the matching duration
+                converges (None executes the fixed run counts of the experiments).
+            early_termination_config: The early termination configuration (cf. "early_termination.py"), with which
+                the larger sizes of the observation size and extent sweeps are skipped (or sparsely sampled) once too
+                many runs time out (None executes all sizes).
+            time_budget_config: The time budget configuration (cf. "budget_planner.py"), with which the run counts of
+                each experiment execution are planned to fit into the wall-clock time budget, based on the run
+                durations of the existing logs (None executes all runs).
+            verifier_backend_config: The verifier backend configuration (cf. "verifier_backend.py"), with which all
+                verifier calls are executed by a bounded pool of verifier processes per node (None lets the matcher
+                launch the verifier directly). If it collects statistics, the state space statistics reported by the
+                verifier for each matching are recorded in the run logs, and summarized per scenario.
+            batch_concurrency: The number of observations which are matched at once against the prepared matcher in
+                the batch matching experiments (i.e., Exp1 and Exp3) per worker (1 matches them one after another).
+            result_cache_config: The match result cache configuration (cf. "result_cache.py"), with which the results
+                of recurring observations are reused instead of matching them again (None matches all observations).
+            use_observation_prefilter: Choose whether the observations of the positive and negative runs (i.e., Exp1)
+                are checked against the statically derived necessary conditions of the model (cf.
+                "observation_prefilter.py"), so that impossible observations are rejected without verifying them.
+            memory_sampling_config: The memory sampling configuration (cf. "memory_sampler.py"), with which the peak
+                and average RSS of the verifier processes of each matching are recorded in the run logs, and
+                summarized per scenario (None does not sample the memory usage).
+            progress_callback: The optional callback which receives the progress dict of the executed experiment
+                (cf. "experiment_driver.py") whenever a run or scenario is finished.
+
+        Raises:
+            ValueError: If the adaptive run count configuration is invalid (e.g., of an unsupported confidence level).
+        """
         self.experiment_base_dir_path = experiment_base_dir_path
         self.experiment_log_dir_path = (experiment_log_dir_path if experiment_log_dir_path
                                         else self.experiment_base_dir_path.joinpath("logs"))
+        self.worker_count = worker_count
+        self.use_memory_backed_workspaces = use_memory_backed_workspaces
+        self.keep_failed_workspaces = keep_failed_workspaces
+        self.resume = resume
+        self.work_queue_file_path = work_queue_file_path
+        if adaptive_run_config is not None:
+            validate_adaptive_run_config(adaptive_run_config=adaptive_run_config)
+        self.adaptive_run_config = adaptive_run_config
+        self.early_termination_config = early_termination_config
+        self.time_budget_config = time_budget_config
+        self.verifier_backend_config = verifier_backend_config
+        self.batch_concurrency = batch_concurrency
+        self.result_cache_config = result_cache_config
+        self.use_observation_prefilter = use_observation_prefilter
+        self.memory_sampling_config = memory_sampling_config
+        self.progress_callback = progress_callback
+        self.model_cache = PreprocessedModelCache(
+            cache_dir_path=self.experiment_base_dir_path.joinpath("cache/preprocessed_models"))
+        self.matcher_cache = PreparedMatcherCache(
+            cache_dir_path=self.experiment_base_dir_path.joinpath("cache/prepared_matchers"))
+
+    ####################################################################################################################
+    # Scenario execution #
+    ####################################################################################################################
+    @staticmethod
+    def _create_scenario(experiment, model_idx, model_data, keys, description, run_type, config, matcher_model_name,
+                         run_count, run_timeout, matcher_type="All", observation_data=None, summarize=True,
+                         sweep_position=None, use_batch_matching=False):
+        """Creates the data of a single experiment scenario.
+
+        Args:
+            experiment: The experiment name (e.g., "Exp3").
+            model_idx: The index of the model.
+            model_data: The model data.
+            keys: The keys under which the scenario is stored in the model log data.
+            description: The scenario description.
+            run_type: The run type ("generated", "positive", "negative", or "fixed").
+            config: The scenario configuration (without path data).
+            matcher_model_name: The file name (without extension) of the matcher model.
+            run_count: The number of runs.
+            run_timeout: The timeout of each run.
+            matcher_type: The matcher type.
+            observation_data: The fixed observation data (only for run type "fixed").
+            summarize: Choose whether the scenario log contains the runs and a summary, or only the runs.
+            sweep_position: The position of the scenario in the size sweep of its model (None if it is not part of a
+                sweep).
+            use_batch_matching: Choose whether the observations of the runs are matched as batches (with the batch
+                concurrency of the experiments).
+
+        Returns:
+            The scenario data.
+        """
+        model_name = model_data["path"].stem
+        fingerprint_data = {
+            "model_hash": calculate_file_hash(file_path=model_data["path"]),
+            "run_type": run_type,
+            "matcher_type": matcher_type,
+            "run_timeout": run_timeout,
+            "config": config,
+            "observation_data": as_observation_data(observation_data=observation_data),
+        }
+        fingerprint_str = json.dumps(fingerprint_data, sort_keys=True, default=str)
+        scenario = {
+            "id": "/".join([experiment, f'{model_idx:02}', model_name] + [str(key) for key in keys]),
+            "experiment": experiment,
+            "model_idx": model_idx,
+            "model_name": model_name,
+            "model_path": model_data["path"],
+            "keys": tuple(keys),
+            "description": description,
+            "run_type": run_type,
+            "config": config,
+            "matcher_model_name": matcher_model_name,
+            "matcher_type": matcher_type,
+            "observation_data": observation_data,
+            "run_count": run_count,
+            "run_indices": list(range(0, run_count)),
+            "run_timeout": run_timeout,
+            "summarize": summarize,
+            "sweep_position": sweep_position,
+            "use_batch_matching": use_batch_matching,
+            "config_fingerprint": hashlib.sha256(fingerprint_str.encode("utf-8")).hexdigest()[:16],
+        }
+        return scenario
+
+    def _create_workspace_manager(self):
+        """Creates the workspace manager for the scenario runs.
+
+        Returns:
+            The workspace manager.
+        """
+        return WorkspaceManager(
+            base_dir_path=self.experiment_base_dir_path, use_memory_backed_root=self.use_memory_backed_workspaces,
+            keep_on_failure=self.keep_failed_workspaces)
+
+    def _create_verifier_shim(self):
+        """Creates and installs the verifier shim for the scenario runs (if a verifier backend is configured).
+
+        Returns:
+            The verifier shim, or None if the verifier is called directly.
+        """
+        if not self.verifier_backend_config:
+            return None
+        verifier_shim = VerifierShim(shim_dir_path=self.experiment_base_dir_path.joinpath("verifier"),
+                                     verifier_backend_config=self.verifier_backend_config)
+        verifier_shim.install(default_executable_path=base_matcher_model_config["verifyta_path"])
+        return verifier_shim
+
+    def _create_result_cache(self):
+        """Creates the match result cache for the scenario runs (if a result cache is configured).
+
+        Returns:
+            The match result cache, or None if all observations are matched.
+        """
+        if not self.result_cache_config:
+            return None
+        return MatchResultCache(cache_dir_path=self.experiment_base_dir_path.joinpath("cache/match_results"),
+                                max_memory_entry_count=self.result_cache_config["max_memory_entry_count"],
+                                max_disk_size=self.result_cache_config["max_disk_size"])
+
+    def serve_work_queue(self, idle_timeout=None):
+        """Executes runs of the work queue which were submitted by other nodes (using "worker_count" processes).
+
+        The results are collected by the submitting node, which writes them into its log directory.
+
+        Args:
+            idle_timeout: The time (in seconds) after which the workers stop if the queue has no open tasks (None keeps
+                the workers waiting for new tasks).
+        """
+        serve_work_queue(
+            work_queue=WorkQueue(queue_file_path=self.work_queue_file_path),
+            workspace_manager=self._create_workspace_manager(), model_cache=self.model_cache,
+            matcher_cache=self.matcher_cache, worker_count=self.worker_count, idle_timeout=idle_timeout,
+            verifier_shim=self._create_verifier_shim(), result_cache=self._create_result_cache())
+
+    def _get_model_log_file_paths(self, experiment_log_sub_dir_name, experiment_log_file_prefix, scenario):
+        """Gets the paths of the log file and the result stream file of the model of a scenario.
+
+        The stream files are kept in a separate "streams" directory, so that only the compacted logs are found in the
+        experiment log directories.
+
+        Args:
+            experiment_log_sub_dir_name: The name of the log sub-directory of the experiment.
+            experiment_log_file_prefix: The prefix of the log file names (e.g., "exp3").
+            scenario: The scenario data.
+
+        Returns:
+            The log file path and the stream file path.
+        """
+        file_name = f'{experiment_log_file_prefix}_{scenario["model_idx"]:02}_{scenario["model_name"]}_log'
+        log_file_path = self.experiment_log_dir_path.joinpath(experiment_log_sub_dir_name, f'{file_name}.json')
+        stream_file_path = self.experiment_log_dir_path.joinpath(
+            "streams", experiment_log_sub_dir_name, f'{file_name}.jsonl')
+        return log_file_path, stream_file_path
+
+    @staticmethod
+    def _import_model_log_into_stream(model_scenarios, log_file_path, stream_writer):
+        """Imports the runs of an existing model log (without a result stream) into the result stream of the model.
+
+        The log is read incrementally, so that only a single run (including its observation data, which is kept in the
+        stream) is held in memory at once.
+
+        Args:
+            model_scenarios: The scenario data list of the model.
+            log_file_path: The path of the model log file.
+            stream_writer: The result stream writer of the model.
+        """
+        for scenario, run_idx, run_log_data in iterate_scenario_runs(
+                log_file_path=log_file_path, scenarios=model_scenarios, skipped_run_keys=()):
+            stream_writer.write_run_record(scenario=scenario, run_idx=run_idx, run_log_data=run_log_data)
+
+    def _restrict_to_missing_runs(self, model_scenarios, stream_file_path, scenario_run_stats):
+        """Restricts the scenarios of a model to the runs which are not yet contained in its result stream.
+
+        A run only counts as completed if it was executed with the same scenario configuration (i.e., if its config
+        fingerprint matches), so that stale results are re-executed instead of being mixed in.
+
+        Args:
+            model_scenarios: The scenario data list of the model (whose run indices are updated).
+            stream_file_path: The path of the result stream file of the model.
+            scenario_run_stats: The run statistics per run index per scenario ID (which are extended by the
+                completed runs).
+        """
+        stream_index = ResultStreamIndex(stream_file_path=stream_file_path)
+        with open(stream_file_path, 'rb') as stream_file:
+            for scenario in model_scenarios:
+                run_offsets = stream_index.get_run_offsets(
+                    scenario_id=scenario["id"], config_fingerprint=scenario["config_fingerprint"],
+                    run_count=scenario["run_count"])
+                scenario["run_indices"] = [run_idx for run_idx in scenario["run_indices"] if run_idx not in run_offsets]
+                if scenario["summarize"]:
+                    for run_idx, offset in run_offsets.items():
+                        run_log_data = read_result_record(file=stream_file, offset=offset)["data"]
+                        scenario_run_stats[scenario["id"]][run_idx] = self._get_run_stats(run_log_data=run_log_data)
+                if run_offsets:
+                    print(f'Resume -> {scenario["id"]}: {len(run_offsets)} / {scenario["run_count"]} runs already '
+                          f'completed')
+
+    @staticmethod
+    def _get_run_stats(run_log_data):
+        """Gets the statistics of a run which are required for summaries and run count decisions.
+
+        Args:
+            run_log_data: The run log data.
+
+        Returns:
+            The matching duration, whether the matching timed out, and the recorded resource statistics (i.e., the
+            verifier and memory statistics) per statistics key.
+        """
+        resource_statistics = dict((statistics_key, run_log_data[statistics_key])
+                                   for statistics_key in resource_statistics_keys if statistics_key in run_log_data)
+        return (run_log_data["durations"]["matching"]["matching"], bool(run_log_data.get("is_timeout", False)),
+                resource_statistics)
+
+    @staticmethod
+    def _get_finished_run_count(scenario, run_stats):
+        """Gets the number of runs of a scenario which are already finished (e.g., when resuming).
+
+        Args:
+            scenario: The scenario data.
+            run_stats: The run statistics per run index (only recorded for summarized scenarios).
+
+        Returns:
+            The number of finished runs.
+        """
+        if scenario["summarize"]:
+            return len(run_stats)
+        return scenario["run_count"] - len(scenario["run_indices"])
+
+    def _create_scenario_summary(self, scenario, run_stats):
+        """Creates the summary of a finished (summarized) scenario.
+
+        Args:
+            scenario: The scenario data.
+            run_stats: The run statistics per run index.
+
+        Returns:
+            The scenario summary.
+        """
+        sweep_status = scenario.get("sweep_status")
+        if not run_stats:
+            return {
+                "run_count": 0,
+                "stop_reason": (early_termination_stop_reason if sweep_status not in (None, complete_sweep_status)
+                                else time_budget_stop_reason),
+                "sweep_status": sweep_status,
+                "config_fingerprint": scenario["config_fingerprint"],
+            }
+
+        durations = [duration for duration, _is_timeout, _statistics in run_stats.values()]
+        if sweep_status not in (None, complete_sweep_status):
+            stop_reason = early_termination_stop_reason
+            confidence_level = default_adaptive_run_config["confidence_level"]
+        elif scenario.get("is_adaptive"):
+            stop_reason, _further_run_count = evaluate_run_count(
+                durations=durations, adaptive_run_config=self.adaptive_run_config)
+            confidence_level = self.adaptive_run_config["confidence_level"]
+        else:
+            stop_reason = fixed_run_count_stop_reason
+            confidence_level = default_adaptive_run_config["confidence_level"]
+        if scenario.get("is_budget_limited") and stop_reason in (None, fixed_run_count_stop_reason):
+            stop_reason = time_budget_stop_reason
+        summary = {
+            "min_max_avg": calculate_min_max_avg_float(durations),
+            "confidence_interval": get_confidence_interval_data(durations=durations, confidence_level=confidence_level),
+            "run_count": len(durations),
+            "timeout_count": sum(1 for _duration, is_timeout, _statistics in run_stats.values() if is_timeout),
+            "stop_reason": stop_reason,
+            "config_fingerprint": scenario["config_fingerprint"],
+        }
+        for statistics_key in resource_statistics_keys:
+            statistics_summary = self._create_resource_statistics_summary(
+                run_stats=run_stats, statistics_key=statistics_key)
+            if statistics_summary:
+                summary[statistics_key] = statistics_summary
+        if sweep_status is not None:
+            summary["sweep_status"] = sweep_status
+        print(f'{scenario["experiment"]} -> Model: {scenario["model_name"]}, {scenario["description"]} => '
+              f'{summary["min_max_avg"]} ({summary["run_count"]} runs, {stop_reason})')
+        return summary
+
+    @staticmethod
+    def _create_resource_statistics_summary(run_stats, statistics_key):
+        """Creates the summary of the resource statistics (e.g., the verifier statistics) of the runs of a scenario.
+
+        Args:
+            run_stats: The run statistics per run index.
+            statistics_key: The key of the resource statistics (e.g., "verifier_statistics").
+
+        Returns:
+            The minimum, maximum, and average value of each statistic over the runs reporting it (empty if no run
+            reported the resource statistics). Durations (e.g., "queue_duration") are summarized as floats, and all
+            other statistics as integers.
+        """
+        values_per_key = {}
+        for _duration, _is_timeout, resource_statistics in run_stats.values():
+            for key, value in resource_statistics.get(statistics_key, {}).items():
+                values_per_key.setdefault(key, []).append(value)
+        return dict((key, {"min_max_avg": (calculate_min_max_avg_float(values) if key.endswith("_duration")
+                                           else calculate_min_max_avg_int(values)), "run_count": len(values)})
+                    for key, values in values_per_key.items())
+
+    def _execute_scenarios(self, scenarios, experiment_log_sub_dir_name, experiment_log_file_prefix):
+        """Executes all runs of the given scenarios and stores the results in the per-model log files.
+
+        Each finished run is appended to the result stream of its model, and the stream is compacted into the model
+        log file (keeping the scenarios in the order in which they are listed) and stored in the result store once all
+        scenarios of the model are finished, or the execution is interrupted. In resume mode, only the runs missing in
+        the existing streams (or logs) are executed. In adaptive mode, the runs of summarized scenarios are extended
+        until the confidence interval of their matching durations converges. With early termination, the larger
+        positions of a sweep are skipped (or sparsely sampled) once too many runs of a position timed out. With a time
+        budget, the run counts are planned (and re-planned) such that the projected makespan fits into the budget.
+
+        Args:
+            scenarios: The scenario data list.
+            experiment_log_sub_dir_name: The name of the log sub-directory of the experiment.
+            experiment_log_file_prefix: The prefix of the log file names (e.g., "exp3").
+        """
+        scenarios_per_model = {}
+        scenario_indices = {}
+        for scenario_idx, scenario in enumerate(scenarios):
+            scenarios_per_model.setdefault(scenario["model_idx"], []).append(scenario)
+            scenario_indices[scenario["id"]] = scenario_idx
+            scenario["batch_concurrency"] = self.batch_concurrency
+            scenario["memory_sampling_config"] = self.memory_sampling_config
+            # The runs of summarized scenarios measure the matching durations, which cached results would distort
+            scenario["use_result_cache"] = bool(self.result_cache_config) and not (
+                scenario["summarize"] and self.result_cache_config["bypass_timing_runs"])
+            scenario["use_prefilter"] = (self.use_observation_prefilter
+                                         and scenario["run_type"] in ["positive", "negative"])
+            if self.adaptive_run_config and scenario["summarize"] and scenario["run_count"] > 0:
+                # The run count only bounds the adaptively executed runs
+                scenario["is_adaptive"] = True
+                scenario["run_count"] = self.adaptive_run_config["max_run_count"]
+                scenario["run_indices"] = list(range(0, self.adaptive_run_config["min_run_count"]))
+        scenario_run_stats = dict((scenario["id"], {}) for scenario in scenarios)
+        sweep_termination_tracker = (SweepTerminationTracker(early_termination_config=self.early_termination_config)
+                                     if self.early_termination_config else None)
+        run_duration_estimator = None
+        if self.time_budget_config:
+            run_duration_estimator = RunDurationEstimator(
+                fallback_run_duration=self.time_budget_config["fallback_run_duration"])
+
+        model_file_paths = {}
+        stream_writers = {}
+        unfinished_scenario_counts = {}
+        progress = {"experiment": experiment_log_file_prefix, "scenario_count": len(scenarios),
+                    "finished_scenario_count": 0, "finished_run_count": 0}
+        try:
+            for model_idx, model_scenarios in scenarios_per_model.items():
+                log_file_path, stream_file_path = self._get_model_log_file_paths(
+                    experiment_log_sub_dir_name=experiment_log_sub_dir_name,
+                    experiment_log_file_prefix=experiment_log_file_prefix, scenario=model_scenarios[0])
+                model_file_paths[model_idx] = (log_file_path, stream_file_path)
+                is_stream_existing = stream_file_path.exists()
+                stream_writers[model_idx] = ResultStreamWriter(stream_file_path=stream_file_path, append=self.resume)
+                unfinished_scenario_counts[model_idx] = len(model_scenarios)
+                if self.resume:
+                    if not is_stream_existing and log_file_path.exists():
+                        self._import_model_log_into_stream(
+                            model_scenarios=model_scenarios, log_file_path=log_file_path,
+                            stream_writer=stream_writers[model_idx])
+                    self._restrict_to_missing_runs(
+                        model_scenarios=model_scenarios, stream_file_path=stream_file_path,
+                        scenario_run_stats=scenario_run_stats)
+                if run_duration_estimator is not None:
+                    run_duration_estimator.load_model_log(model_scenarios=model_scenarios, log_file_path=log_file_path)
+
+            time_budget_planner = None
+            if self.time_budget_config:
+                time_budget_planner = TimeBudgetPlanner(
+                    scenarios=scenarios, time_budget_config=self.time_budget_config, worker_count=self.worker_count,
+                    run_duration_estimator=run_duration_estimator,
+                    finished_run_counts=dict((scenario["id"], self._get_finished_run_count(
+                        scenario=scenario, run_stats=scenario_run_stats[scenario["id"]])) for scenario in scenarios))
+                time_budget_planner.plan()
+                time_budget_planner.print_plan(title="Plan")
+
+            def on_run_finished(scenario, run_idx, run_log_data):
+                """Appends a finished run to the result stream of its model.
+
+                Args:
+                    scenario: The scenario data.
+                    run_idx: The run index.
+                    run_log_data: The run log data.
+                """
+                run_log_data["config_fingerprint"] = scenario["config_fingerprint"]
+                stream_writers[scenario["model_idx"]].write_run_record(
+                    scenario=scenario, run_idx=run_idx, run_log_data=run_log_data)
+                if scenario["summarize"]:
+                    scenario_run_stats[scenario["id"]][run_idx] = self._get_run_stats(run_log_data=run_log_data)
+                if time_budget_planner is not None:
+                    time_budget_planner.register_run(scenario=scenario, run_log_data=run_log_data)
+                progress["finished_run_count"] += 1
+                if self.progress_callback is not None:
+                    self.progress_callback(progress)
+
+            def get_initial_run_indices(scenario):
+                """Gets the indices of the runs of a scenario which is started, skipping runs of terminated sweeps and
+                runs which do not fit into the time budget.
+
+                Args:
+                    scenario: The scenario data.
+
+                Returns:
+                    The run indices.
+                """
+                run_indices = scenario["run_indices"]
+                if sweep_termination_tracker is not None:
+                    scenario["sweep_status"] = sweep_termination_tracker.get_sweep_status(scenario=scenario)
+                    run_indices = sweep_termination_tracker.get_run_indices(scenario=scenario, run_indices=run_indices)
+                if time_budget_planner is not None:
+                    run_indices = time_budget_planner.restrict_run_indices(scenario=scenario, run_indices=run_indices)
+                return run_indices
+
+            def get_additional_run_indices(scenario):
+                """Gets the indices of further runs of an adaptive scenario whose scheduled runs are finished.
+
+                Args:
+                    scenario: The scenario data.
+
+                Returns:
+                    The run indices (empty if the scenario is finished).
+                """
+                if not scenario.get("is_adaptive") or scenario.get("sweep_status", complete_sweep_status) != \
+                        complete_sweep_status:
+                    return []
+                run_stats = scenario_run_stats[scenario["id"]]
+                stop_reason, further_run_count = evaluate_run_count(
+                    durations=[duration for duration, _is_timeout, _statistics in run_stats.values()],
+                    adaptive_run_config=self.adaptive_run_config)
+                if stop_reason is not None:
+                    return []
+                free_run_indices = (run_idx for run_idx in range(0, scenario["run_count"]) if run_idx not in run_stats)
+                run_indices = list(itertools.islice(free_run_indices, further_run_count))
+                if time_budget_planner is not None:
+                    run_indices = time_budget_planner.restrict_run_indices(scenario=scenario, run_indices=run_indices)
+                return run_indices
+
+            def on_scenario_finished(scenario):
+                """Appends the summary of a finished scenario to the result stream of its model, and compacts the
+                stream once all scenarios of the model are finished.
+
+                Args:
+                    scenario: The scenario data.
+                """
+                run_stats = scenario_run_stats.pop(scenario["id"])
+                summary = None
+                if scenario["summarize"] and scenario["run_count"] > 0:
+                    summary = self._create_scenario_summary(scenario=scenario, run_stats=run_stats)
+                if sweep_termination_tracker is not None:
+                    timeout_count = sum(1 for _duration, is_timeout, _statistics in run_stats.values() if is_timeout)
+                    if sweep_termination_tracker.register_scenario_result(
+                            scenario=scenario, timeout_count=timeout_count, run_count=len(run_stats)):
+                        termination_action = ("skipped" if self.early_termination_config["mode"] == "skip"
+                                              else "sampled sparsely")
+                        print(f'{scenario["experiment"]} -> Model: {scenario["model_name"]}, '
+                              f'{scenario["description"]} => {timeout_count} / {len(run_stats)} runs timed out, '
+                              f'larger sizes are {termination_action}')
+                if time_budget_planner is not None:
+                    time_budget_planner.register_scenario_finished(scenario=scenario)
+                model_idx = scenario["model_idx"]
+                stream_writers[model_idx].write_scenario_record(
+                    scenario=scenario, scenario_idx=scenario_indices[scenario["id"]], summary=summary)
+
+                unfinished_scenario_counts[model_idx] -= 1
+                if unfinished_scenario_counts[model_idx] == 0:
+                    stream_writers.pop(model_idx).close()
+                    log_file_path, stream_file_path = model_file_paths[model_idx]
+                    self._publish_model_results(
+                        stream_file_path=stream_file_path, log_file_path=log_file_path,
+                        experiment_log_sub_dir_name=experiment_log_sub_dir_name, model_name=scenario["model_name"])
+                progress["finished_scenario_count"] += 1
+                if self.progress_callback is not None:
+                    self.progress_callback(progress)
+
+            workspace_manager = self._create_workspace_manager()
+            verifier_shim = self._create_verifier_shim()
+            result_cache = self._create_result_cache()
+            if self.work_queue_file_path:
+                scenario_executor = QueueScenarioExecutor(
+                    work_queue=WorkQueue(queue_file_path=self.work_queue_file_path),
+                    workspace_manager=workspace_manager, model_cache=self.model_cache,
+                    matcher_cache=self.matcher_cache, worker_count=self.worker_count, verifier_shim=verifier_shim,
+                    result_cache=result_cache, resume=self.resume)
+            else:
+                scenario_executor = ScenarioExecutor(
+                    workspace_manager=workspace_manager, model_cache=self.model_cache,
+                    matcher_cache=self.matcher_cache, worker_count=self.worker_count, verifier_shim=verifier_shim,
+                    result_cache=result_cache)
+            scenario_executor.execute(scenarios=scenarios, on_run_finished=on_run_finished,
+                                      on_scenario_finished=on_scenario_finished,
+                                      get_initial_run_indices=get_initial_run_indices,
+                                      get_additional_run_indices=get_additional_run_indices)
+        finally:
+            # Compact the streams of all models whose scenarios were not finished (e.g., after an interruption)
+            for model_idx, stream_writer in stream_writers.items():
+                stream_writer.close()
+                log_file_path, stream_file_path = model_file_paths[model_idx]
+                self._publish_model_results(
+                    stream_file_path=stream_file_path, log_file_path=log_file_path,
+                    experiment_log_sub_dir_name=experiment_log_sub_dir_name,
+                    model_name=scenarios_per_model[model_idx][0]["model_name"])
+
+    def _publish_model_results(self, stream_file_path, log_file_path, experiment_log_sub_dir_name, model_name):
+        """Compacts the result stream of a model into its log file, writes the summary index of the log file (cf.
+        "summary_index.py"), and stores its results in the result store (cf. "result_store.py") of the experiment log
+        directory.
+
+        Args:
+            stream_file_path: The path of the stream file.
+            log_file_path: The path of the model log file.
+            experiment_log_sub_dir_name: The name of the log sub-directory of the experiment.
+            model_name: The model name.
+        """
+        if not compact_result_stream(stream_file_path=stream_file_path, log_file_path=log_file_path,
+                                     model_name=model_name):
+            return
+        write_summary_index(log_file_path=log_file_path, summary_tree=create_summary_tree_from_stream(
+            stream_file_path=stream_file_path, model_name=model_name))
+        with ResultStore(store_dir_path=self.experiment_log_dir_path) as result_store:
+            result_store.store_result_stream(
+                stream_file_path=stream_file_path, experiment=experiment_log_sub_dir_name, model_name=model_name)
 
     ####################################################################################################################
     # Experiment 1: Execute full workflow with positive and negative observations #
@@ -43,19 +642,16 @@ class SystematicExperiments:
         max_deviation = 5
         max_initial_delay = 10
 
+        scenarios = []
         indexed_model_data = list(enumerate(all_model_data, 1))
         for model_idx, model_data in indexed_model_data[0:8]:
             model_name = model_data["path"].stem
             config = copy.deepcopy(all_matcher_model_configs["All"])
-            init_directories_and_paths(
-                model_file_path=model_data["path"], output_dir_path=self.experiment_base_dir_path, config=config)
 
             matcher_model_name = f'{model_name}_exp1_matcher'
             observed_variables = model_data["variables"]
 
             config.update({
-                "matcher_model_file_path": config["model_output_dir_path"].joinpath(
-                    f'{matcher_model_name}.xml'),
                 "allowed_deviations": dict([(v, max_deviation) for v in observed_variables]),
                 "maximum_initial_delay": max_initial_delay,
             })
@@ -69,103 +665,26 @@ class SystematicExperiments:
                 "force_keep_last_observation": True,
             })
 
-            # Prepare model
-            input_model = load_model_from_file(model_path=config["original_model_file_path"])
-            instance_data = get_instance_data(model=input_model, config=config)
-            preprocessed_model = generate_and_save_preprocess_model(
-                model=input_model, instance_data=instance_data, config=config)
-
-            # Prepare trace generator, matcher, and edge trace simulator
-            observation_generator = ObservationGenerator(config=config, model=preprocessed_model)
-            observation_matcher = ObservationMatcher(
-                config=config, model=preprocessed_model, instance_data=instance_data,
-                observation_data=None, matcher_type="All", timeout=run_timeout)
-            observation_matcher.prepare_matcher_model()
-            edge_trace_simulator = EdgeTraceSimulator(
-                config=config, model=preprocessed_model, instance_data=instance_data
-            )
-
             # Perform "n" runs with the current model and different randomized positive observation data
-            positive_runs_log_data = {}
-            for run_idx in range(0, positive_run_count):
-                run_log_data = {
-                    "durations": {}, "obs_data": [], "is_matching": False, "is_simulated": False,
-                    "is_included": False
-                }
-                print(
-                    f'\n--- Execute positive run {run_idx + 1} / {positive_run_count} of model "{model_name}" ---')
-                observation_data = observation_generator.generate()
-                run_log_data["obs_data"] = observation_data
-                print(f'Observation data:\n{observation_data}')
-
-                # Obtain matching trace
-                matching_res = observation_matcher.match(
-                    observation_data=observation_data, return_trace=True, use_prepared=True,
-                    log_time_to=(run_log_data["durations"], f'matching'))
-                run_log_data["is_matching"] = matching_res["is_matching"]
-                run_log_data["is_timeout"] = matching_res["is_timeout"]
-                matched_trace = matching_res["matching_trace"]
-                assert matching_res["is_matching"], f'No matching trace found even though one or more should match.'
-
-                # Re-simulate matching trace edges
-                edge_trace = [tr.triggered_edges for tr in matched_trace.transitions]
-                is_simulated, simulated_trace = edge_trace_simulator.simulate_edge_trace(
-                    edge_trace=edge_trace)
-                run_log_data["is_simulated"] = is_simulated
-                assert is_simulated, f'Matching edge trace could not be simulated on the original model.'
-
-                # Check if the matching trace is included in the re-simulated trace
-                is_included = simulated_trace.includes(trace=matched_trace)
-                run_log_data["is_included"] = is_included
-                assert is_included, \
-                    f'The simulated trace does not include the matched trace:\n\n' \
-                    f'Simulated trace:\n{simulated_trace}\n\n' \
-                    f'Matched trace:\n{matched_trace}\n\n' \
-                    f'Observation data:\n{observation_data}'
-
-                positive_runs_log_data[run_idx] = run_log_data
+            scenarios.append(self._create_scenario(
+                experiment="Exp1", model_idx=model_idx, model_data=model_data, keys=["positives"],
+                description="positive observations", run_type="positive", config=config,
+                matcher_model_name=matcher_model_name, run_count=positive_run_count, run_timeout=run_timeout,
+                summarize=False, use_batch_matching=True))
 
-            config.update({
+            # Perform "n" runs with the current model and different randomized negative observation data
+            negative_config = copy.deepcopy(config)
+            negative_config.update({
                 "allow_partial_observations": False,
             })
+            scenarios.append(self._create_scenario(
+                experiment="Exp1", model_idx=model_idx, model_data=model_data, keys=["negatives"],
+                description="negative observations", run_type="negative", config=negative_config,
+                matcher_model_name=matcher_model_name, run_count=negative_run_count, run_timeout=run_timeout,
+                summarize=False, use_batch_matching=True))
 
-            # Perform "n" runs with the current model and different randomized negative observation data
-            negative_runs_log_data = {}
-            for run_idx in range(0, negative_run_count):
-                run_log_data = {
-                    "durations": {}, "obs_data": [], "is_matching": False
-                }
-                print(
-                    f'\n--- Execute negative run {run_idx + 1} / {negative_run_count} of model "{model_name}" ---')
-                observation_data = observation_generator.generate_negative()
-                run_log_data["obs_data"] = observation_data
-                print(f'Observation data:\n{observation_data}')
-
-                # Check that no matching trace exists
-                matching_res = observation_matcher.match(
-                    observation_data=observation_data, return_trace=True, use_prepared=True,
-                    log_time_to=(run_log_data["durations"], f'matching'))
-                run_log_data["is_matching"] = matching_res["is_matching"]
-                run_log_data["is_timeout"] = matching_res["is_timeout"]
-                matched_trace = matching_res["matching_trace"]
-                assert not matching_res["is_matching"], \
-                    f'Matching trace found even though none should match.\n\n ' \
-                    f'Matched trace:\n{matched_trace}\n\n' \
-                    f'Observation data:\n{observation_data}'
-
-                negative_runs_log_data[run_idx] = run_log_data
-
-            model_log_data = {model_name: {
-                "positives": positive_runs_log_data,
-                "negatives": negative_runs_log_data
-            }}
-
-            # Save data to file
-            experiment_log_dir_path = self.experiment_log_dir_path.joinpath('exp1_pos_neg_runs')
-            experiment_log_dir_path.mkdir(parents=True, exist_ok=True)
-            experiment_log_file_path = experiment_log_dir_path.joinpath(f'exp1_{model_idx:02}_{model_name}_log.json')
-            with open(experiment_log_file_path, 'w') as file:
-                json.dump(model_log_data, file, sort_keys=False, separators=(',', ':'))
+        self._execute_scenarios(
+            scenarios=scenarios, experiment_log_sub_dir_name='exp1_pos_neg_runs', experiment_log_file_prefix='exp1')
 
     ####################################################################################################################
     # Experiment 2: Compare performance of matcher models #
@@ -190,85 +709,29 @@ class SystematicExperiments:
         runs_per_scenario = 10  # 100
         run_timeout = 30
 
-        # experiment_log_data = {}
+        scenarios = []
         indexed_model_data = list(enumerate(all_model_data, 1))
         for model_idx, model_data in indexed_model_data[:]:
-            config = copy.deepcopy(base_matcher_model_config)
-            init_directories_and_paths(model_file_path=model_data["path"],
-                                       output_dir_path=self.experiment_base_dir_path, config=config)
-
-            input_model = load_model_from_file(model_path=config["original_model_file_path"])
-            instance_data = get_instance_data(model=input_model, config=config)
-            preprocessed_model = generate_and_save_preprocess_model(
-                model=input_model, instance_data=instance_data, config=config)
-
             model_name = model_data["path"].stem
-            model_log_data = {}
-            model_obs_data = all_exp2_observation_data[model_name]
+            model_obs_data = load_model_observation_data(corpus_dir_path=exp2_observation_corpus_dir_path,
+                                                         model_name=model_name)
             for obs_type, obs_data in model_obs_data.items():
-                obs_log_data = {}
                 for matcher_type, matcher_model_config in all_matcher_model_configs.items():
-                    # Insert dummy "None" data into the log when no observation data is provided
-                    if not obs_data:
-                        obs_log_data[matcher_type] = {
-                            "runs": None,
-                            "summary": {}
-                        }
-                        continue
-
                     # Adapt the configuration for the concrete observation type
+                    config = copy.deepcopy(base_matcher_model_config)
                     config.update(matcher_model_config)
                     matcher_model_name = f'{model_name}_{matcher_type.replace("+", "_")}'
-                    config["matcher_model_file_path"] = config["model_output_dir_path"].joinpath(
-                        f'{matcher_model_name}.xml')
-
-                    # Prepare the observation matcher
-                    observation_matcher = ObservationMatcher(
-                        config=config, model=preprocessed_model, instance_data=instance_data,
-                        observation_data=obs_data, matcher_type=matcher_type, timeout=run_timeout)
-                    observation_matcher.create_matcher_model()
-
-                    # Execute runs
-                    runs_log_data = {}
-                    for run_idx in range(0, runs_per_scenario):
-                        print(f'Run {run_idx + 1} ...')
-                        run_log_data = {"durations": {}, "is_matching": False}
-
-                        matching_res = observation_matcher.match(
-                            return_trace=False, use_existing_matcher=True,
-                            log_time_to=(run_log_data["durations"], f'matching'))
-                        assert (matching_res["is_matching"] or matching_res["is_timeout"]), \
-                            f'No matching trace found even though one or more should match.'
-
-                        run_log_data["is_matching"] = matching_res["is_matching"]
-                        run_log_data["is_timeout"] = matching_res["is_timeout"]
-
-                        runs_log_data[run_idx] = run_log_data
-
-                    # Obtain derived values
-                    scenario_matching_durations = [run_log["durations"]["matching"]["matching"] for
-                                                   run_log in runs_log_data.values()]
-                    min_max_avg_durations = calculate_min_max_avg_float(scenario_matching_durations)
-
-                    # Gather data
-                    obs_log_data[matcher_type] = {
-                        "runs": runs_log_data,
-                        "summary": {
-                            "min_max_avg": min_max_avg_durations
-                        }
-                    }
-
-                    print(f'Exp2 -> Model: {model_name}, obs-type: {obs_type}, matcher-type: {matcher_type} => '
-                          f'{obs_log_data[matcher_type]["summary"]["min_max_avg"]}')
-                model_log_data[obs_type] = obs_log_data
-
-            # Save data to file
-            stored_model_log_data = {model_name: model_log_data}
-            experiment_log_dir_path = self.experiment_log_dir_path.joinpath('exp2_matcher_models')
-            experiment_log_dir_path.mkdir(parents=True, exist_ok=True)
-            experiment_log_file_path = experiment_log_dir_path.joinpath(f'exp2_{model_idx:02}_{model_name}_log.json')
-            with open(experiment_log_file_path, 'w') as file:
-                json.dump(stored_model_log_data, file, sort_keys=False, separators=(',', ':'))
+
+                    # Scenarios without observation data have no runs, and are logged with dummy "None" data
+                    scenarios.append(self._create_scenario(
+                        experiment="Exp2", model_idx=model_idx, model_data=model_data, keys=[obs_type, matcher_type],
+                        description=f'obs-type: {obs_type}, matcher-type: {matcher_type}', run_type="fixed",
+                        config=config, matcher_model_name=matcher_model_name,
+                        run_count=(runs_per_scenario if obs_data else 0), run_timeout=run_timeout,
+                        matcher_type=matcher_type, observation_data=obs_data))
+
+        self._execute_scenarios(
+            scenarios=scenarios, experiment_log_sub_dir_name='exp2_matcher_models', experiment_log_file_prefix='exp2')
 
     ####################################################################################################################
     # Experiment 3: Compare performance of observation types #
@@ -295,25 +758,20 @@ class SystematicExperiments:
         max_deviation = 5
         max_initial_delay = 10
 
+        scenarios = []
         indexed_model_data = list(enumerate(all_model_data, 1))
         for model_idx, model_data in indexed_model_data[:]:
             model_name = model_data["path"].stem
             model_base_config = copy.deepcopy(all_matcher_model_configs["All"])
-            init_directories_and_paths(
-                model_file_path=model_data["path"], output_dir_path=self.experiment_base_dir_path,
-                config=model_base_config)
 
             matcher_model_name = f'{model_name}_exp3_matcher'
             observed_variables = model_data["variables"]
 
             model_base_config.update({
-                "matcher_model_file_path": model_base_config["model_output_dir_path"].joinpath(
-                    f'{matcher_model_name}.xml'),
                 "allowed_deviations": dict([(v, max_deviation) for v in observed_variables]),
                 "maximum_initial_delay": max_initial_delay,
             })
 
-            model_log_data = {}
             for obs_type, obs_config in all_observation_configs.items():
                 # Update config
                 config = copy.deepcopy(model_base_config)
@@ -326,61 +784,14 @@ class SystematicExperiments:
                     "force_keep_last_observation": True,
                 })
 
-                # Prepare model
-                input_model = load_model_from_file(model_path=config["original_model_file_path"])
-                instance_data = get_instance_data(model=input_model, config=config)
-                preprocessed_model = generate_and_save_preprocess_model(
-                    model=input_model, instance_data=instance_data, config=config)
-
-                # Prepare trace generator, matcher, and edge trace simulator
-                observation_generator = ObservationGenerator(config=config, model=preprocessed_model)
-                observation_matcher = ObservationMatcher(
-                    config=config, model=preprocessed_model, instance_data=instance_data,
-                    observation_data=None, matcher_type="All", timeout=run_timeout)
-                observation_matcher.prepare_matcher_model()
-
-                runs_log_data = {}
-                for run_idx in range(0, runs_per_scenario):
-                    print(
-                        f'\n--- Execute run {run_idx + 1} / {runs_per_scenario} of model "{model_name}" '
-                        f'(obs type: "{obs_type}") ---')
-                    run_log_data = {"durations": {}, "obs_data": [], "is_matching": False}
-
-                    observation_data = observation_generator.generate()
-                    print(f'Observation data:\n{observation_data}')
-
-                    matching_res = observation_matcher.match(
-                        observation_data=observation_data, return_trace=False, use_prepared=True,
-                        log_time_to=(run_log_data["durations"], f'matching'))
-                    assert (matching_res["is_matching"] or matching_res["is_timeout"]), \
-                        f'No matching trace found even though one or more should match.'
-
-                    run_log_data["is_matching"] = matching_res["is_matching"]
-                    run_log_data["is_timeout"] = matching_res["is_timeout"]
-                    run_log_data["obs_data"] = observation_data
-
-                    runs_log_data[run_idx] = run_log_data
-
-                scenario_matching_durations = [run_log["durations"]["matching"]["matching"] for
-                                               run_log in runs_log_data.values()]
-                model_log_data[obs_type] = {
-                    "runs": runs_log_data,
-                    "summary": {
-                        "min_max_avg": calculate_min_max_avg_float(scenario_matching_durations)
-                    }
-                }
-
-                print(f'Exp3 -> Model: {model_name}, obs-type: {obs_type}, matcher-type: All => '
-                      f'{model_log_data[obs_type]["summary"]["min_max_avg"]}')
-
-                # Save data to file
-                stored_model_log_data = {model_name: model_log_data}
-                experiment_log_dir_path = self.experiment_log_dir_path.joinpath('exp3_obs_types')
-                experiment_log_dir_path.mkdir(parents=True, exist_ok=True)
-                experiment_log_file_path = experiment_log_dir_path.joinpath(
-                    f'exp3_{model_idx:02}_{model_name}_log.json')
-                with open(experiment_log_file_path, 'w') as file:
-                    json.dump(stored_model_log_data, file, sort_keys=False, separators=(',', ':'))
+                scenarios.append(self._create_scenario(
+                    experiment="Exp3", model_idx=model_idx, model_data=model_data, keys=[obs_type],
+                    description=f'obs-type: {obs_type}, matcher-type: All', run_type="generated", config=config,
+                    matcher_model_name=matcher_model_name, run_count=runs_per_scenario, run_timeout=run_timeout,
+                    use_batch_matching=True))
+
+        self._execute_scenarios(
+            scenarios=scenarios, experiment_log_sub_dir_name='exp3_obs_types', experiment_log_file_prefix='exp3')
 
     ####################################################################################################################
     # Experiment 4: Compare performance of observation sizes #
@@ -393,94 +804,44 @@ class SystematicExperiments:
         step_count = 200
         observation_count_step_size = 10  # 5
 
+        scenarios = []
         indexed_model_data = list(enumerate(all_model_data, 1))
         for model_idx, model_data in indexed_model_data[1:]:
             model_name = model_data["path"].stem
-            config = copy.deepcopy(all_matcher_model_configs["All"])
-            init_directories_and_paths(
-                model_file_path=model_data["path"], output_dir_path=self.experiment_base_dir_path, config=config)
+            model_base_config = copy.deepcopy(all_matcher_model_configs["All"])
 
             matcher_model_name = f'{model_name}_exp4_matcher'
             observed_variables = model_data["variables"]
 
-            config.update({
-                "matcher_model_file_path": config["model_output_dir_path"].joinpath(
-                    f'{matcher_model_name}.xml'),
+            model_base_config.update({
                 "allowed_deviations": {},
                 "maximum_initial_delay": 0,
             })
 
-            config.update(base_observation_config)
-            config.update({
+            model_base_config.update(base_observation_config)
+            model_base_config.update({
                 "step_count": step_count,
                 "observed_variables": observed_variables,
                 "force_keep_first_observation": False,
                 "force_keep_last_observation": True,
             })
 
-            model_log_data = {}
             observation_counts = list(range(1, step_count+2, observation_count_step_size))
-            for obs_count in observation_counts:
+            for sweep_position, obs_count in enumerate(observation_counts):
                 # Update config
+                config = copy.deepcopy(model_base_config)
                 config.update({
                     "observation_count_bounds": (obs_count, obs_count),
                 })
 
-                # Prepare model
-                input_model = load_model_from_file(model_path=config["original_model_file_path"])
-                instance_data = get_instance_data(model=input_model, config=config)
-                preprocessed_model = generate_and_save_preprocess_model(
-                    model=input_model, instance_data=instance_data, config=config)
-
-                # Prepare trace generator, matcher, and edge trace simulator
-                observation_generator = ObservationGenerator(config=config, model=preprocessed_model)
-                observation_matcher = ObservationMatcher(
-                    config=config, model=preprocessed_model, instance_data=instance_data,
-                    observation_data=None, matcher_type="All", timeout=run_timeout)
-                observation_matcher.prepare_matcher_model()
-
-                runs_log_data = {}
-                for run_idx in range(0, runs_per_scenario):
-                    print(
-                        f'\n--- Execute run {run_idx + 1} / {runs_per_scenario} of model "{model_name}" '
-                        f'(obs-count: {obs_count}) ---')
-                    run_log_data = {"durations": {}, "obs_data": [], "is_matching": False}
-
-                    observation_data = observation_generator.generate()
-                    print(f'Observation data:\n{observation_data}')
-
-                    matching_res = observation_matcher.match(
-                        observation_data=observation_data, return_trace=False, use_prepared=True,
-                        log_time_to=(run_log_data["durations"], f'matching'))
-                    assert (matching_res["is_matching"] or matching_res["is_timeout"]), \
-                        f'No matching trace found even though one or more should match.'
-
-                    run_log_data["is_matching"] = matching_res["is_matching"]
-                    run_log_data["is_timeout"] = matching_res["is_timeout"]
-                    run_log_data["obs_data"] = observation_data
-
-                    runs_log_data[run_idx] = run_log_data
-
-                scenario_matching_durations = [run_log["durations"]["matching"]["matching"] for
-                                               run_log in runs_log_data.values()]
-                model_log_data[obs_count] = {
-                    "runs": runs_log_data,
-                    "summary": {
-                        "min_max_avg": calculate_min_max_avg_float(scenario_matching_durations)
-                    }
-                }
-
-                print(f'Exp4 -> Model: {model_name}, obs-count: {obs_count}, matcher-type: All => '
-                      f'{model_log_data[obs_count]["summary"]["min_max_avg"]}')
-
-                # Save data to file
-                stored_model_log_data = {model_name: model_log_data}
-                experiment_log_dir_path = self.experiment_log_dir_path.joinpath('exp4_obs_size')
-                experiment_log_dir_path.mkdir(parents=True, exist_ok=True)
-                experiment_log_file_path = experiment_log_dir_path.joinpath(
-                    f'exp4_{model_idx:02}_{model_name}_log.json')
-                with open(experiment_log_file_path, 'w') as file:
-                    json.dump(stored_model_log_data, file, sort_keys=False, separators=(',', ':'))
+                scenarios.append(self._create_scenario(
+                    experiment="Exp4", model_idx=model_idx, model_data=model_data, keys=[obs_count],
+                    description=f'obs-count: {obs_count}, matcher-type: All', run_type="generated", config=config,
+                    matcher_model_name=matcher_model_name, run_count=runs_per_scenario, run_timeout=run_timeout,
+                    sweep_position=sweep_position))
+
+        self._execute_scenarios(
+            scenarios=scenarios, experiment_log_sub_dir_name='exp4_obs_size', experiment_log_file_prefix='exp4')
 
     ####################################################################################################################
     # Experiment 5: Compare performance of temporal observation extents #
@@ -495,91 +856,41 @@ class SystematicExperiments:
         step_count_step_size = 10  # 5
         observation_count = 10
 
+        scenarios = []
         indexed_model_data = list(enumerate(all_model_data, 1))
         for model_idx, model_data in indexed_model_data[:]:
             model_name = model_data["path"].stem
-            config = copy.deepcopy(all_matcher_model_configs["All"])
-            init_directories_and_paths(
-                model_file_path=model_data["path"], output_dir_path=self.experiment_base_dir_path, config=config)
+            model_base_config = copy.deepcopy(all_matcher_model_configs["All"])
 
             matcher_model_name = f'{model_name}_exp5_matcher'
             observed_variables = model_data["variables"]
 
-            config.update({
-                "matcher_model_file_path": config["model_output_dir_path"].joinpath(
-                    f'{matcher_model_name}.xml'),
+            model_base_config.update({
                 "allowed_deviations": {},
                 "maximum_initial_delay": 0,
             })
 
-            config.update(base_observation_config)
-            config.update({
+            model_base_config.update(base_observation_config)
+            model_base_config.update({
                 "observed_variables": observed_variables,
                 "observation_count_bounds": (observation_count, observation_count),
                 "force_keep_first_observation": True,
                 "force_keep_last_observation": True,
             })
 
-            model_log_data = {}
             step_counts = list(range(observation_count, max_step_count+1, step_count_step_size))
-            for step_count in step_counts:
+            for sweep_position, step_count in enumerate(step_counts):
                 # Update config
+                config = copy.deepcopy(model_base_config)
                 config.update({
                     "step_count": step_count,
                 })
 
-                # Prepare model
-                input_model = load_model_from_file(model_path=config["original_model_file_path"])
-                instance_data = get_instance_data(model=input_model, config=config)
-                preprocessed_model = generate_and_save_preprocess_model(
-                    model=input_model, instance_data=instance_data, config=config)
-
-                # Prepare trace generator, matcher, and edge trace simulator
-                observation_generator = ObservationGenerator(config=config, model=preprocessed_model)
-                observation_matcher = ObservationMatcher(
-                    config=config, model=preprocessed_model, instance_data=instance_data,
-                    observation_data=None, matcher_type="All", timeout=run_timeout)
-                observation_matcher.prepare_matcher_model()
-
-                runs_log_data = {}
-                for run_idx in range(0, runs_per_scenario):
-                    print(
-                        f'\n--- Execute run {run_idx + 1} / {runs_per_scenario} of model "{model_name}" '
-                        f'(step-count: {step_count}) ---')
-                    run_log_data = {"durations": {}, "obs_data": [], "is_matching": False}
-
-                    observation_data = observation_generator.generate()
-                    print(f'Observation data:\n{observation_data}')
-
-                    matching_res = observation_matcher.match(
-                        observation_data=observation_data, return_trace=False, use_prepared=True,
-                        log_time_to=(run_log_data["durations"], f'matching'))
-                    assert (matching_res["is_matching"] or matching_res["is_timeout"]), \
-                        f'No matching trace found even though one or more should match.'
-
-                    run_log_data["is_matching"] = matching_res["is_matching"]
-                    run_log_data["is_timeout"] = matching_res["is_timeout"]
-                    run_log_data["obs_data"] = observation_data
-
-                    runs_log_data[run_idx] = run_log_data
-
-                scenario_matching_durations = [run_log["durations"]["matching"]["matching"] for
-                                               run_log in runs_log_data.values()]
-                model_log_data[step_count] = {
-                    "runs": runs_log_data,
-                    "summary": {
-                        "min_max_avg": calculate_min_max_avg_float(scenario_matching_durations)
-                    }
-                }
-
-                print(f'Exp5 -> Model: {model_name}, step-count: {step_count}, matcher-type: All => '
-                      f'{model_log_data[step_count]["summary"]["min_max_avg"]}')
-
-                # Save data to file
-                stored_model_log_data = {model_name: model_log_data}
-                experiment_log_dir_path = self.experiment_log_dir_path.joinpath('exp5_obs_extents')
-                experiment_log_dir_path.mkdir(parents=True, exist_ok=True)
-                experiment_log_file_path = experiment_log_dir_path.joinpath(
-                    f'exp5_{model_idx:02}_{model_name}_log.json')
-                with open(experiment_log_file_path, 'w') as file:
-                    json.dump(stored_model_log_data, file, sort_keys=False, separators=(',', ':'))
+                scenarios.append(self._create_scenario(
+                    experiment="Exp5", model_idx=model_idx, model_data=model_data, keys=[step_count],
+                    description=f'step-count: {step_count}, matcher-type: All', run_type="generated", config=config,
+                    matcher_model_name=matcher_model_name, run_count=runs_per_scenario, run_timeout=run_timeout,
+                    sweep_position=sweep_position))
+
+        self._execute_scenarios(
+            scenarios=scenarios, experiment_log_sub_dir_name='exp5_obs_extents', experiment_log_file_prefix='exp5')
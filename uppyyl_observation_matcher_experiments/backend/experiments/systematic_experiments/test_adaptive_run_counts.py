@@ -0,0 +1,58 @@
+"""This module contains tests for the adaptive run counts."""
+import math
+
+import pytest
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.adaptive_run_counts import \
+    converged_stop_reason, default_adaptive_run_config, evaluate_run_count, get_confidence_interval_data, \
+    max_run_count_stop_reason, validate_adaptive_run_config
+from uppyyl_observation_matcher_experiments.backend.helper import get_t_distribution_critical_value
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_confidence_interval_data_uses_the_t_distribution():
+    ci_data = get_confidence_interval_data(durations=[1.0], confidence_level=0.95)
+    assert ci_data == {"confidence_level": 0.95, "bounds": None, "relative_width": None}
+
+    # Mean 2, sample standard deviation 1, and critical value 4.303 for 2 degrees of freedom
+    ci_data = get_confidence_interval_data(durations=[1.0, 2.0, 3.0], confidence_level=0.95)
+    half_width = 4.303 / math.sqrt(3)
+    assert ci_data["bounds"] == pytest.approx([2 - half_width, 2 + half_width])
+    assert ci_data["relative_width"] == pytest.approx(2 * half_width / 2)
+    assert get_confidence_interval_data(durations=[0.0, 0.0], confidence_level=0.95)["relative_width"] == math.inf
+
+    # Beyond the tabulated degrees of freedom, the critical values approach the normal distribution from above
+    for confidence_level, exact_values in [(0.95, {40: 2.021, 60: 2.000, 120: 1.980}),
+                                           (0.99, {40: 2.704, 60: 2.660, 120: 2.617})]:
+        for degrees_of_freedom, exact_value in exact_values.items():
+            assert get_t_distribution_critical_value(degrees_of_freedom=degrees_of_freedom,
+                                                     confidence_level=confidence_level) == \
+                pytest.approx(exact_value, abs=0.001)
+    with pytest.raises(ValueError):
+        get_confidence_interval_data(durations=[1.0, 2.0], confidence_level=0.8)
+
+
+def test_run_count_evaluation_extrapolates_until_convergence():
+    adaptive_run_config = dict(default_adaptive_run_config, min_run_count=4, max_run_count=20,
+                               target_relative_ci_width=0.1)
+    assert evaluate_run_count(durations=[1.0, 2.0], adaptive_run_config=adaptive_run_config) == (None, 2)
+    assert evaluate_run_count(durations=[1.0] * 4, adaptive_run_config=adaptive_run_config) == \
+        (converged_stop_reason, 0)
+    # Noisy durations require further runs, but at most double the run count per step
+    assert evaluate_run_count(durations=[1.0, 3.0, 1.0, 3.0], adaptive_run_config=adaptive_run_config) == (None, 4)
+    assert evaluate_run_count(durations=[1.0, 3.0] * 10, adaptive_run_config=adaptive_run_config) == \
+        (max_run_count_stop_reason, 0)
+    # Slightly too wide intervals are extrapolated by the square root law
+    durations = [1.0, 1.2] * 5
+    stop_reason, further_run_count = evaluate_run_count(durations=durations, adaptive_run_config=adaptive_run_config)
+    assert stop_reason is None and 0 < further_run_count < len(durations)
+
+
+def test_adaptive_run_config_validation_rejects_unsupported_settings():
+    validate_adaptive_run_config(adaptive_run_config=default_adaptive_run_config)
+    for invalid_settings in [{"confidence_level": 0.8}, {"min_run_count": 1}, {"min_run_count": 10, "max_run_count": 5},
+                             {"target_relative_ci_width": 0.0}]:
+        with pytest.raises(ValueError):
+            validate_adaptive_run_config(adaptive_run_config=dict(default_adaptive_run_config, **invalid_settings))
@@ -0,0 +1,116 @@
+"""This module contains tests for the batch matching, using a stand-in matcher instead of a prepared matcher."""
+import threading
+import time
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.batch_matching import \
+    BatchMatcher
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_cache import \
+    MatchResultCache
+
+
+##########
+# Helper #
+##########
+class StandInMatcher:
+    """A stand-in matcher, which interprets each observation as (delay, outcome), with outcome "match", "timeout",
+    "mismatch", or "error"."""
+
+    active_count = 0
+    max_active_count = 0
+    lock = threading.Lock()
+
+    def match(self, observation_data, return_trace, use_prepared, log_time_to):
+        """Matches an observation.
+
+        Args:
+            observation_data: The observation data.
+            return_trace: Choose whether the matching trace is returned.
+            use_prepared: Choose whether the prepared matcher model is used.
+            log_time_to: The dict and key to which the matching duration is logged.
+
+        Returns:
+            The matching result.
+        """
+        delay, outcome = observation_data
+        with StandInMatcher.lock:
+            StandInMatcher.active_count += 1
+            StandInMatcher.max_active_count = max(StandInMatcher.max_active_count, StandInMatcher.active_count)
+        try:
+            time.sleep(delay)
+        finally:
+            with StandInMatcher.lock:
+                StandInMatcher.active_count -= 1
+        if outcome == "error":
+            raise RuntimeError("Stand-in matching failed")
+        log_time_to[0][log_time_to[1]] = delay
+        return {"is_matching": outcome == "match", "is_timeout": outcome == "timeout",
+                "matching_trace": "trace" if return_trace else None}
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_batch_matcher_yields_results_in_completion_order():
+    released_replicas = []
+    batch_matcher = BatchMatcher(
+        observation_matcher=StandInMatcher(), create_replica=StandInMatcher,
+        release_replica=lambda replica, is_failed=False: released_replicas.append(is_failed), concurrency=3)
+    StandInMatcher.max_active_count = 0
+    observations = [(0.6, "match"), (0.1, "timeout"), (0.3, "error"), (0.0, "mismatch")]
+    results = list(batch_matcher.match_batch(observations=observations, return_trace=True))
+
+    assert [result.item_idx for result in results] == [1, 3, 2, 0]
+    assert StandInMatcher.max_active_count == 3
+    assert [(result.is_matching, result.is_timeout) for result in results] == \
+        [(False, True), (False, False), (False, False), (True, False)]
+    assert results[2].error is not None and "Stand-in matching failed" in results[2].error
+    assert results[3].durations == {"matching": 0.6} and results[3].matching_trace == "trace"
+
+    # The replica of the failed item was discarded, the others are kept until the batch matcher is closed
+    assert released_replicas == [True]
+    batch_matcher.close()
+    assert released_replicas == [True, False]
+
+
+def test_batch_matcher_without_concurrency_matches_in_order():
+    batch_matcher = BatchMatcher(observation_matcher=StandInMatcher())
+    results = list(batch_matcher.match_batch(observations=[(0.1, "match"), (0.0, "error"), (0.0, "match")]))
+    assert [(result.item_idx, result.is_matching, result.error is None) for result in results] == \
+        [(0, True, True), (1, False, False), (2, True, True)]
+
+
+def test_batch_matcher_reuses_cached_results():
+    result_cache = MatchResultCache()
+    batch_matcher = BatchMatcher(observation_matcher=StandInMatcher(), create_replica=StandInMatcher, concurrency=2,
+                                 result_cache=result_cache, matcher_key="matcher")
+    observations = [(0.1, "match"), (0.1, "timeout"), (0.0, "error")]
+    first_results = sorted(batch_matcher.match_batch(observations=observations), key=lambda result: result.item_idx)
+    second_results = sorted(batch_matcher.match_batch(observations=observations), key=lambda result: result.item_idx)
+
+    # Only definite results are reused (with the durations of the original matching)
+    assert [result.is_cached for result in first_results] == [False, False, False]
+    assert [result.is_cached for result in second_results] == [True, False, False]
+    assert second_results[0].is_matching and second_results[0].durations == {"matching": 0.1}
+    assert second_results[2].error is not None
+
+
+def test_batch_matcher_abandons_running_matchings_of_closed_batches():
+    released_replicas = []
+    batch_matcher = BatchMatcher(
+        observation_matcher=StandInMatcher(), create_replica=StandInMatcher,
+        release_replica=lambda replica, is_failed=False: released_replicas.append(is_failed), concurrency=2)
+    start_time = time.time()
+    results = batch_matcher.match_batch(observations=[(0.5, "match"), (0.0, "mismatch"), (0.0, "match")])
+    first_result = next(results)
+    results.close()
+
+    # The slow matching is not waited for, but still occupies its share of the concurrency until it is finished
+    assert first_result.item_idx == 1 and time.time() - start_time < 0.3
+    assert len(batch_matcher.abandoned_futures) == 1
+    StandInMatcher.max_active_count = 0
+    assert [result.item_idx for result in batch_matcher.match_batch(observations=[(0.1, "match")] * 2)] == [0, 1]
+    assert StandInMatcher.max_active_count == 2
+
+    # Closing the batch matcher waits for the abandoned matching, and releases its replica
+    batch_matcher.close()
+    assert not batch_matcher.abandoned_futures and released_replicas == [False]
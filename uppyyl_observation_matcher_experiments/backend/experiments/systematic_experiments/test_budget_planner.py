@@ -0,0 +1,74 @@
+"""This module contains tests for the time budget planner, using historical run durations."""
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.budget_planner import \
+    RunDurationEstimator, TimeBudgetPlanner, get_coarse_to_fine_order, parse_duration
+
+
+##########
+# Helper #
+##########
+def create_sweep_scenarios(model_idx, sizes, run_count):
+    """Creates minimal scenario data of a size sweep for the planner.
+
+    Args:
+        model_idx: The model index.
+        sizes: The sweep sizes.
+        run_count: The number of runs per scenario.
+
+    Returns:
+        The scenario data list.
+    """
+    return [{"id": f'Exp4/{model_idx:02}/model/{size}', "experiment": "Exp4", "model_idx": model_idx, "keys": (size,),
+             "run_count": run_count, "run_timeout": 30, "sweep_position": sweep_position}
+            for sweep_position, size in enumerate(sizes)]
+
+
+def create_planner(scenarios, time_budget, worker_count=1):
+    """Creates and executes a planner, with a recorded duration of 1 second for the first scenario of each model.
+
+    Args:
+        scenarios: The scenario data list.
+        time_budget: The time budget.
+        worker_count: The worker count.
+
+    Returns:
+        The planner.
+    """
+    run_duration_estimator = RunDurationEstimator(fallback_run_duration=1)
+    for scenario in scenarios:
+        if scenario["sweep_position"] == 0:
+            run_duration_estimator.add_run_duration(scenario=scenario, duration=1.0)
+    time_budget_planner = TimeBudgetPlanner(
+        scenarios=scenarios, time_budget_config={"time_budget": time_budget, "coverage_run_count": 2,
+                                                 "replan_interval": 60, "fallback_run_duration": 1},
+        worker_count=worker_count, run_duration_estimator=run_duration_estimator, finished_run_counts={})
+    time_budget_planner.plan()
+    return time_budget_planner
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_coarse_to_fine_order_covers_all_positions_starting_with_the_ends():
+    assert get_coarse_to_fine_order(count=5) == [0, 4, 2, 1, 3]
+    assert sorted(get_coarse_to_fine_order(count=21)) == list(range(0, 21))
+    assert parse_duration("4h") == 4 * 60 * 60 and parse_duration("90") == 90
+
+
+def test_budget_planner_covers_all_models_before_adding_runs():
+    scenarios = create_sweep_scenarios(model_idx=1, sizes=[10, 20, 30], run_count=5) + \
+        create_sweep_scenarios(model_idx=2, sizes=[10, 20, 30], run_count=5)
+
+    # Sizes are scaled from the recorded duration of size 10, i.e., a run takes 1, 2, and 3 seconds
+    time_budget_planner = create_planner(scenarios=scenarios, time_budget=16.5)
+    planned_run_counts = time_budget_planner.planned_run_counts
+    assert [planned_run_counts[scenario["id"]] for scenario in scenarios] == [2, 0, 2, 2, 0, 2]
+    assert time_budget_planner.projected_makespan <= 16.5
+
+    time_budget_planner = create_planner(scenarios=scenarios, time_budget=1000, worker_count=2)
+    assert all(run_count == 5 for run_count in time_budget_planner.planned_run_counts.values())
+    assert time_budget_planner.projected_makespan == 5 * (1 + 2 + 3)
+
+    scenario = scenarios[1]
+    time_budget_planner = create_planner(scenarios=scenarios, time_budget=16.5)
+    assert time_budget_planner.restrict_run_indices(scenario=scenario, run_indices=[0, 1, 2, 3, 4]) == []
+    assert scenario["is_budget_limited"]
@@ -0,0 +1,64 @@
+"""This module contains tests for the early termination of sweeps."""
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.early_termination import \
+    SweepTerminationTracker, complete_sweep_status, default_early_termination_config, sampled_sweep_status, \
+    skipped_sweep_status
+
+
+##########
+# Helper #
+##########
+def create_scenario(sweep_position, model_idx=1):
+    """Creates the data of a scenario of an observation size sweep.
+
+    Args:
+        sweep_position: The position of the scenario in the sweep of its model (None if it is not part of a sweep).
+        model_idx: The index of the model.
+
+    Returns:
+        The scenario data.
+    """
+    return {"experiment": "Exp4", "model_idx": model_idx, "sweep_position": sweep_position}
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_sweep_termination_skips_larger_positions_of_the_terminated_sweep():
+    tracker = SweepTerminationTracker(early_termination_config=dict(default_early_termination_config, mode="skip"))
+    assert not tracker.register_scenario_result(scenario=create_scenario(sweep_position=0), timeout_count=1,
+                                                run_count=4)
+    assert not tracker.register_scenario_result(scenario=create_scenario(sweep_position=None), timeout_count=4,
+                                                run_count=4)
+    assert tracker.register_scenario_result(scenario=create_scenario(sweep_position=2), timeout_count=2, run_count=4)
+    # A later termination at a larger position does not move the termination position
+    assert not tracker.register_scenario_result(scenario=create_scenario(sweep_position=3), timeout_count=4,
+                                                run_count=4)
+
+    run_indices = [0, 1, 2, 3]
+    for sweep_position, sweep_status in [(1, complete_sweep_status), (2, complete_sweep_status),
+                                         (3, skipped_sweep_status), (7, skipped_sweep_status)]:
+        scenario = create_scenario(sweep_position=sweep_position)
+        assert tracker.get_sweep_status(scenario=scenario) == sweep_status
+        expected_run_indices = run_indices if sweep_status == complete_sweep_status else []
+        assert tracker.get_run_indices(scenario=scenario, run_indices=run_indices) == expected_run_indices
+    # The sweeps of other models are not affected
+    assert tracker.get_run_indices(scenario=create_scenario(sweep_position=7, model_idx=2),
+                                   run_indices=run_indices) == run_indices
+
+
+def test_sparse_sweep_termination_samples_every_nth_larger_position():
+    tracker = SweepTerminationTracker(early_termination_config=dict(
+        default_early_termination_config, mode="sparse", sparse_sampling_interval=2, sparse_run_count=2))
+    assert tracker.register_scenario_result(scenario=create_scenario(sweep_position=1), timeout_count=3, run_count=4)
+
+    run_indices = [0, 1, 2, 3]
+    for sweep_position, sweep_status, expected_run_indices in [(1, complete_sweep_status, run_indices),
+                                                               (2, skipped_sweep_status, []),
+                                                               (3, sampled_sweep_status, [0, 1]),
+                                                               (4, skipped_sweep_status, []),
+                                                               (5, sampled_sweep_status, [0, 1])]:
+        scenario = create_scenario(sweep_position=sweep_position)
+        assert tracker.get_sweep_status(scenario=scenario) == sweep_status
+        assert tracker.get_run_indices(scenario=scenario, run_indices=run_indices) == expected_run_indices
+    # Sampled positions only keep the run indices below the sparse run count (e.g., when resuming)
+    assert tracker.get_run_indices(scenario=create_scenario(sweep_position=3), run_indices=[1, 2, 3]) == [1]
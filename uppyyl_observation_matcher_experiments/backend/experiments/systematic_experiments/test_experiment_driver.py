@@ -0,0 +1,89 @@
+"""This module contains tests for the experiment driver, using stand-in experiment functions."""
+import functools
+import json
+import pathlib
+import subprocess
+import time
+import types
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.experiment_driver import \
+    ExperimentDriver, progress_line_prefix
+
+
+##########
+# Helper #
+##########
+def create_stand_in_experiments():
+    """Creates a stand-in for the systematic experiments, which only holds the configuration used by the driver.
+
+    Returns:
+        The stand-in experiments.
+    """
+    return types.SimpleNamespace(resume=False, time_budget_config=None, progress_callback=None)
+
+
+def is_process_group_alive(process_group_id):
+    """Checks whether any (non-zombie) process of a process group still exists (Linux only).
+
+    Args:
+        process_group_id: The process group ID.
+
+    Returns:
+        Whether the process group is alive.
+    """
+    for stat_file_path in pathlib.Path("/proc").glob("[0-9]*/stat"):
+        try:
+            stat_fields = stat_file_path.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if stat_fields[0] != "Z" and int(stat_fields[2]) == process_group_id:
+            return True
+    return False
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_experiment_driver_reports_progress_and_output(tmp_path):
+    experiment_driver = ExperimentDriver(task_dir_path=tmp_path)
+    progress = {"experiment": "exp3", "scenario_count": 5, "finished_scenario_count": 2, "finished_run_count": 20}
+    try:
+        task = experiment_driver.submit(
+            experiments=create_stand_in_experiments(), experiment_names=["exp.systematic.obs_types"],
+            experiment_functions=[functools.partial(print, "Stand-in experiment"),
+                                  functools.partial(print, f'{progress_line_prefix}{json.dumps(progress)}')])
+        assert experiment_driver.wait(task_id=task.task_id, timeout=60)
+    finally:
+        experiment_driver.shutdown()
+    assert (task.status, task.exit_status, task.progress) == ("finished", 0, progress)
+    assert task.output_file_path.read_text() == "Stand-in experiment\n"
+    assert "2 / 5 scenarios, 20 runs" in task.get_status_string()
+
+
+def test_experiment_driver_cancels_tasks_and_kills_their_processes(tmp_path):
+    experiment_driver = ExperimentDriver(task_dir_path=tmp_path, max_running_task_count=1, cancel_grace_period=2)
+    # The stand-in verifier process ignores the interruption, so that it must be killed
+    stand_in_experiment = functools.partial(subprocess.run, ["sh", "-c", "trap '' INT; sleep 60"])
+    try:
+        running_task = experiment_driver.submit(
+            experiments=create_stand_in_experiments(), experiment_functions=[stand_in_experiment],
+            experiment_names=["exp.systematic.obs_sizes"])
+        queued_task = experiment_driver.submit(
+            experiments=create_stand_in_experiments(), experiment_functions=[stand_in_experiment],
+            experiment_names=["exp.systematic.obs_extents"])
+        time.sleep(1)
+        assert (running_task.status, queued_task.status) == ("running", "queued")
+
+        assert experiment_driver.cancel(task_id=queued_task.task_id)
+        assert experiment_driver.wait(task_id=queued_task.task_id, timeout=10)
+        assert queued_task.status == "cancelled" and queued_task.process_id is None
+
+        start_time = time.time()
+        assert experiment_driver.cancel(task_id=running_task.task_id)
+        assert experiment_driver.wait(task_id=running_task.task_id, timeout=30)
+        assert time.time() - start_time < 30
+        assert running_task.status == "cancelled"
+        assert not is_process_group_alive(process_group_id=running_task.process_id)
+        assert not experiment_driver.cancel(task_id=running_task.task_id)
+    finally:
+        experiment_driver.shutdown()
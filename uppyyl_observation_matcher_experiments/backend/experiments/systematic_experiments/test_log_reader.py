@@ -0,0 +1,45 @@
+"""This module contains tests for the incremental reader of the experiment logs."""
+import io
+import json
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.log_reader import \
+    JsonEventReader, iterate_log_entries, iterate_scenario_runs, load_log_tree
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_json_event_reader_reads_and_skips_values_across_chunks():
+    data = {"a": [1, -2.5e-3, True, None, "x\"}]\\yä"], "b": {"obs_data": [{"t": 12345, "vars": {"x": 1}}]},
+            "c": [[], {}, 1e10]}
+    reader = JsonEventReader(file=io.StringIO(json.dumps(data, indent=2)), chunk_size=3)
+    assert reader.read_value(skipped_keys=["obs_data"]) == {"a": data["a"], "b": {}, "c": data["c"]}
+
+    reader = JsonEventReader(file=io.StringIO(json.dumps(data)), chunk_size=5)
+    assert [(key, reader.skip_value()) for key in reader.iterate_object()] == [("a", None), ("b", None), ("c", None)]
+
+
+def test_log_entries_are_read_without_observation_data(tmp_path):
+    run = {"durations": {"matching": {"matching": 1.0}}, "obs_data": [{"t": 0, "vars": {"x": 1}, "locs": {}}] * 50,
+           "is_matching": True}
+    log_file_path = tmp_path.joinpath("exp2_01_model_log.json")
+    log_file_path.write_text(json.dumps({"model": {
+        "few-short": {"All": {"runs": {"0": run}, "summary": {"min_max_avg": [1.0] * 3}}},
+        "positives": {"0": run, "1": run},
+    }}, indent=4))
+
+    run_without_obs_data = {"durations": {"matching": {"matching": 1.0}}, "is_matching": True}
+    assert load_log_tree(log_file_path=log_file_path) == {"model": {
+        "few-short": {"All": {"runs": {"0": run_without_obs_data}, "summary": {"min_max_avg": [1.0] * 3}}},
+        "positives": {"0": run_without_obs_data, "1": run_without_obs_data},
+    }}
+    assert list(iterate_log_entries(log_file_path=log_file_path, include_runs=False)) == [
+        ("summary", ["model", "few-short", "All", "summary"], {"min_max_avg": [1.0] * 3})]
+
+    # The runs are assigned to the scenarios whose keys lead to them (summarized scenarios keep them under "runs")
+    scenarios = [{"id": "a", "model_name": "model", "keys": ["few-short", "All"], "summarize": True},
+                 {"id": "b", "model_name": "model", "keys": ["positives"], "summarize": False}]
+    assert [(scenario["id"], run_idx, "obs_data" in run_log_data) for scenario, run_idx, run_log_data
+            in iterate_scenario_runs(log_file_path=log_file_path, scenarios=scenarios)] == \
+        [("a", 0, False), ("b", 0, False), ("b", 1, False)]
+    assert next(iterate_scenario_runs(log_file_path=log_file_path, scenarios=scenarios, skipped_run_keys=()))[2] == run
@@ -0,0 +1,41 @@
+"""This module contains tests for the memory sampler, using stand-in processes instead of verifier processes."""
+import subprocess
+import sys
+import time
+
+import pytest
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.memory_sampler import \
+    MemorySampler, is_memory_sampling_supported
+
+allocating_process_code = """
+import sys
+import time
+data = bytearray(int(sys.argv[1]) * 1024 * 1024)
+for idx in range(0, len(data), 4096):
+    data[idx] = 1
+time.sleep(float(sys.argv[2]))
+"""
+
+
+################################################################################
+# Tests #
+################################################################################
+@pytest.mark.skipif(not is_memory_sampling_supported(), reason="Memory sampling requires the /proc file system")
+def test_memory_sampler_only_samples_processes_matching_the_pattern(tmp_path):
+    marked_dir_path = tmp_path.joinpath("matcher_workspace")
+    with MemorySampler(command_line_pattern=str(marked_dir_path), sample_interval=0.02) as memory_sampler:
+        # The unmarked process allocates more memory, but must not be sampled
+        processes = [
+            subprocess.Popen([sys.executable, "-c", allocating_process_code, "64", "0.5", str(marked_dir_path)]),
+            subprocess.Popen([sys.executable, "-c", allocating_process_code, "128", "0.5"]),
+        ]
+        for process in processes:
+            process.wait(timeout=30)
+        time.sleep(0.2)
+    statistics = memory_sampler.get_statistics()
+
+    assert 64 * 1024 <= statistics["peak_rss"] < 128 * 1024
+    # The average covers the time after the process ended, too
+    assert 0 < statistics["avg_rss"] < statistics["peak_rss"]
+    assert statistics["sample_count"] > 10
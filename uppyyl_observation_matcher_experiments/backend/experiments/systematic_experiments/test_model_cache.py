@@ -0,0 +1,130 @@
+"""This module contains tests for the preprocessed model cache, using stand-in models instead of Uppaal models."""
+import os
+
+import pytest
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments import model_cache
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_cache import \
+    PreprocessedModelCache, evict_cache_entries, get_preprocessed_model_key
+
+
+##########
+# Helper #
+##########
+class StandInModel:
+    """A stand-in for a loaded model, which holds the model file content."""
+
+    def __init__(self, content):
+        self.content = content
+
+    def copy(self):
+        return StandInModel(content=self.content)
+
+
+@pytest.fixture
+def loaded_model_paths(monkeypatch):
+    """A fixture which replaces the model loading and preprocessing of the observation matcher by stand-ins.
+
+    Returns:
+        The list of the paths of the models loaded (i.e., preprocessed) so far.
+    """
+    loaded_model_paths = []
+
+    def load_model_from_file(model_path):
+        loaded_model_paths.append(model_path)
+        with open(model_path, 'r') as file:
+            return StandInModel(content=file.read())
+
+    def save_model_to_file(model, model_path):
+        with open(model_path, 'w') as file:
+            file.write(model.content)
+
+    def generate_and_save_preprocess_model(model, instance_data, config):
+        preprocessed_model = StandInModel(content=f'preprocessed {model.content}')
+        save_model_to_file(model=preprocessed_model, model_path=config["preprocessed_model_file_path"])
+        return preprocessed_model
+
+    monkeypatch.setattr(model_cache, "load_model_from_file", load_model_from_file)
+    monkeypatch.setattr(model_cache, "save_model_to_file", save_model_to_file)
+    monkeypatch.setattr(model_cache, "get_instance_data", lambda model, config: {"instances": ["Ctrl"]})
+    monkeypatch.setattr(model_cache, "generate_and_save_preprocess_model", generate_and_save_preprocess_model)
+    return loaded_model_paths
+
+
+def create_config(tmp_path):
+    """Creates the configuration dict of a model.
+
+    Args:
+        tmp_path: The path of the temporary directory.
+
+    Returns:
+        The configuration dict.
+    """
+    model_file_path = tmp_path.joinpath("model.xml")
+    if not model_file_path.exists():
+        model_file_path.write_text("<nta/>")
+    return {"original_model_file_path": model_file_path, "observed_variables": ["db"],
+            "preprocessed_model_file_path": tmp_path.joinpath("preprocessed_model.xml"), "allowed_deviations": 0}
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_preprocessed_model_key_depends_on_model_preprocessing_config_and_versions(tmp_path, monkeypatch):
+    config = create_config(tmp_path=tmp_path)
+    key = get_preprocessed_model_key(model_file_path=config["original_model_file_path"], config=config)
+
+    # Matcher settings are applied after preprocessing, and share the preprocessed model
+    assert get_preprocessed_model_key(model_file_path=config["original_model_file_path"],
+                                      config=dict(config, allowed_deviations=5)) == key
+    assert get_preprocessed_model_key(model_file_path=config["original_model_file_path"],
+                                      config=dict(config, observed_variables=["temp"])) != key
+    monkeypatch.setattr(model_cache, "get_matcher_package_version", lambda: "0.0.0-other")
+    assert get_preprocessed_model_key(model_file_path=config["original_model_file_path"], config=config) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(model_cache, "cache_format_version", model_cache.cache_format_version + 1)
+    assert get_preprocessed_model_key(model_file_path=config["original_model_file_path"], config=config) != key
+    monkeypatch.undo()
+
+    config["original_model_file_path"].write_text("<nta><declaration/></nta>")
+    assert get_preprocessed_model_key(model_file_path=config["original_model_file_path"], config=config) != key
+
+
+def test_preprocessed_models_are_reused_from_memory_and_disk(tmp_path, loaded_model_paths):
+    config = create_config(tmp_path=tmp_path)
+    cache = PreprocessedModelCache(cache_dir_path=tmp_path.joinpath("cache"))
+    instance_data, preprocessed_model = cache.load_preprocessed_model(config=config)
+    assert (instance_data, preprocessed_model.content) == ({"instances": ["Ctrl"]}, "preprocessed <nta/>")
+    assert len(loaded_model_paths) == 1
+
+    # The model file is re-created for every hit, and the returned data can be modified by the caller
+    config["preprocessed_model_file_path"].unlink()
+    instance_data["instances"].append("Env")
+    instance_data, _preprocessed_model = cache.load_preprocessed_model(config=config)
+    assert instance_data == {"instances": ["Ctrl"]} and len(loaded_model_paths) == 1
+    assert config["preprocessed_model_file_path"].read_text() == "preprocessed <nta/>"
+
+    # Other workers (i.e., caches without the in-memory entries) reuse the on-disk entry
+    config["preprocessed_model_file_path"].unlink()
+    _instance_data, preprocessed_model = PreprocessedModelCache(
+        cache_dir_path=tmp_path.joinpath("cache")).load_preprocessed_model(config=config)
+    assert preprocessed_model.content == "preprocessed <nta/>" and len(loaded_model_paths) == 1
+    assert config["preprocessed_model_file_path"].read_text() == "preprocessed <nta/>"
+
+    PreprocessedModelCache(cache_dir_path=None).load_preprocessed_model(config=config)
+    assert len(loaded_model_paths) == 2
+
+
+def test_cache_eviction_removes_least_recently_used_entries(tmp_path):
+    cache_dir_path = tmp_path.joinpath("cache")
+    for entry_name in ["recent", "old", "middle", ".temp"]:
+        entry_dir_path = cache_dir_path.joinpath(entry_name)
+        entry_dir_path.mkdir(parents=True)
+        entry_dir_path.joinpath("data").write_bytes(b'x' * 100)
+    for entry_name, mtime in [("old", 1000), ("middle", 2000), ("recent", 3000), (".temp", 0)]:
+        os.utime(cache_dir_path.joinpath(entry_name), (mtime, mtime))
+
+    evict_cache_entries(cache_dir_path=cache_dir_path, max_size=250)
+    assert sorted(path.name for path in cache_dir_path.iterdir()) == [".temp", "middle", "recent"]
+    evict_cache_entries(cache_dir_path=cache_dir_path, max_size=100)
+    assert sorted(path.name for path in cache_dir_path.iterdir()) == [".temp", "recent"]
@@ -0,0 +1,40 @@
+"""This module contains tests for the corpus of fixed observations."""
+import json
+
+import pytest
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_data import all_model_data
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_corpus import \
+    exp2_observation_corpus_dir_path, get_observation_corpus_file_path, load_model_observation_data, \
+    write_model_observation_data
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_observation_corpus_files_are_written_and_loaded_per_model(tmp_path):
+    model_observation_data = {
+        "few-short": [{"t": 7, "vars": {"db": 0, "temp": 2000}, "locs": {}},
+                      {"t": 11, "vars": {"db": 70, "temp": "NOB"}, "locs": {"Ctrl": "idle"}}],
+        "many-short": None,
+    }
+    write_model_observation_data(corpus_dir_path=tmp_path, model_name="model",
+                                 model_observation_data=model_observation_data)
+
+    loaded_observation_data = load_model_observation_data(corpus_dir_path=tmp_path, model_name="model")
+    assert loaded_observation_data["few-short"].to_observation_data() == model_observation_data["few-short"]
+    assert loaded_observation_data["many-short"] is None
+
+    corpus_file_path = get_observation_corpus_file_path(corpus_dir_path=tmp_path, model_name="model")
+    corpus_data = json.loads(corpus_file_path.read_text())
+    corpus_file_path.write_text(json.dumps(dict(corpus_data, version=0)))
+    with pytest.raises(ValueError):
+        load_model_observation_data(corpus_dir_path=tmp_path, model_name="model")
+
+
+def test_observation_corpus_covers_all_models():
+    for model_data in all_model_data:
+        model_name = model_data["path"].stem
+        model_observation_data = load_model_observation_data(corpus_dir_path=exp2_observation_corpus_dir_path,
+                                                             model_name=model_name)
+        assert list(model_observation_data) == ["few-short", "many-short", "few-long", "many-long"]
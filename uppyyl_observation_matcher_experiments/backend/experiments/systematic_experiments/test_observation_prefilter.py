@@ -0,0 +1,93 @@
+"""This module contains tests for the static observation pre-filter."""
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.batch_matching import \
+    BatchMatcher
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_prefilter import \
+    ModelConstraints, ObservationPrefilter
+from uppyyl_observation_matcher_experiments.definitions import RES_DIR
+
+##########
+# Helper #
+##########
+bounded_model_xml = """<?xml version="1.0" encoding="utf-8"?>
+<nta>
+    <declaration>clock t; const int MAX = 3; int[0,MAX] mode; int level = 1; int count;
+void tick() { count++; }</declaration>
+    <template>
+        <name>Ctrl_Tmpl</name>
+        <declaration>clock x;</declaration>
+        <location id="id0"><name>Idle</name><label kind="invariant">t &lt;= 100 &amp;&amp; x &lt;= 5</label></location>
+        <location id="id1"><name>Busy</name><label kind="invariant">t &lt; 80</label></location>
+        <location id="id2"><name>Broken</name></location>
+        <init ref="id0"/>
+        <transition><source ref="id0"/><target ref="id1"/>
+            <label kind="assignment">mode = 2, level = 4, x = 0, tick()</label></transition>
+        <transition><source ref="id1"/><target ref="id0"/><label kind="assignment">level = MAX</label></transition>
+        <transition><source ref="id2"/><target ref="id0"/></transition>
+    </template>
+    <system>Ctrl = Ctrl_Tmpl();
+system Ctrl;</system>
+</nta>
+"""
+
+
+def create_observation(*points):
+    """Creates observation data from (time stamp, variable values, location values) points.
+
+    Args:
+        *points: The observation points.
+
+    Returns:
+        The observation data.
+    """
+    return [{"t": t, "vars": var_values, "locs": loc_values} for t, var_values, loc_values in points]
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_model_constraints_are_derived_conservatively(tmp_path):
+    model_file_path = tmp_path.joinpath("bounded_model.xml")
+    model_file_path.write_text(bounded_model_xml)
+    model_constraints = ModelConstraints.from_model_file(model_file_path=model_file_path)
+
+    assert model_constraints.variable_ranges == {"mode": (0, 3), "level": (-32768, 32767), "count": (-32768, 32767)}
+    assert model_constraints.variable_values == {"mode": {0, 2}, "level": {1, 3, 4}}
+    assert model_constraints.process_locations == {"Ctrl": {"Idle", "Busy"}}
+    assert model_constraints.time_horizon == 100
+
+    prefilter = ObservationPrefilter(model_constraints=model_constraints, config={
+        "support_deviating_matching": True, "allowed_deviations": {"level": 1, "mode": 0}})
+    assert prefilter.check(create_observation((0, {"mode": 2, "level": 5, "count": 99}, {"Ctrl": "Busy"}))) is None
+    assert prefilter.check(create_observation((0, {"mode": 2, "level": "NOB"}, {"Ctrl": "NOB"}))) is None
+    assert "never assigned" in prefilter.check(create_observation((0, {"level": 7}, {})))
+    # Without a known deviation, the values of a variable are not checked
+    assert prefilter.check(create_observation((0, {"count": -5, "level": 2}, {}))) is None
+    assert "never assigned" in prefilter.check(create_observation((0, {"mode": 1}, {})))
+    assert "outside of its range" in prefilter.check(create_observation((0, {"mode": 4}, {})))
+    assert "not reachable" in prefilter.check(create_observation((0, {}, {"Ctrl": "Broken"})))
+    assert "precedes" in prefilter.check(create_observation((5, {}, {}), (4, {}, {})))
+    assert "time horizon" in prefilter.check(create_observation((10, {}, {}), (111, {}, {})))
+
+
+def test_batch_matcher_rejects_impossible_observations_without_matching():
+    model_file_path = RES_DIR.joinpath("example_models/introduction_example/main-example-model.xml")
+    model_constraints = ModelConstraints.from_model_file(model_file_path=model_file_path)
+    prefilter = ObservationPrefilter(model_constraints=model_constraints, config={
+        "support_deviating_matching": True, "allowed_deviations": {"db": 5}})
+
+    class RecordingMatcher:
+        """A stand-in matcher which records the matched observations."""
+        matched_observations = []
+
+        def match(self, observation_data, return_trace, use_prepared, log_time_to):
+            self.matched_observations.append(observation_data)
+            return {"is_matching": True, "is_timeout": False, "matching_trace": None}
+
+    observations = [create_observation((0, {"db": 33, "temp": 2000}, {})),
+                    create_observation((0, {"db": 52, "temp": 2500}, {"Drink_Machine": "Make_Water"}))]
+    batch_matcher = BatchMatcher(observation_matcher=RecordingMatcher(), prefilter=prefilter)
+    results = list(batch_matcher.match_batch(observations=observations))
+
+    assert [(result.is_matching, result.rejection_reason is None) for result in results] == \
+        [(False, False), (True, True)]
+    assert RecordingMatcher.matched_observations == observations[1:]
@@ -0,0 +1,32 @@
+"""This module contains tests for the array-backed observation series."""
+import json
+import pickle
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_series import \
+    ObservationSeries, encode_observation_series
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_cache import \
+    canonicalize_observation
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_observation_series_converts_losslessly_from_and_to_the_dict_form():
+    observation_data = [
+        {"t": 7, "vars": {"db": 0, "temp": 2000}, "locs": {}},
+        {"t": 11, "vars": {"temp": "NOB", "level": 2.5}, "locs": {"Ctrl": "idle"}},
+        {"t": 12, "vars": {"db": 70, "temp": 3000.0}, "locs": {"Ctrl": "idle", "Env": "NOB"}, "is_shifted": True},
+    ]
+    observation_series = ObservationSeries.from_observation_data(observation_data=observation_data)
+
+    assert observation_series.to_observation_data() == observation_data
+    assert list(observation_series) == observation_data and len(observation_series) == 3
+    assert observation_series.times.typecode == 'q' and observation_series.location_names == ["idle", "NOB"]
+    # Slices are observation series again, and the series survives the transfer to worker processes and the logs
+    assert isinstance(observation_series[1:], ObservationSeries) and observation_series[1:] == observation_data[1:]
+    assert observation_series[-1] == observation_data[-1]
+    assert pickle.loads(pickle.dumps(observation_series)) == observation_series
+    assert json.loads(json.dumps({"obs_data": observation_series}, default=encode_observation_series)) == \
+        {"obs_data": observation_data}
+    assert canonicalize_observation(observation_data=observation_series) == \
+        canonicalize_observation(observation_data=observation_data)
@@ -0,0 +1,43 @@
+"""This module contains tests for the match result cache."""
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_cache import \
+    MatchResultCache, get_match_result_key
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_match_result_key_is_canonical():
+    observation_data = {"t": [0, 2.0, 5], "vars": [{"x": 1, "y": "NOB"}], "locs": [{"P": "idle"}]}
+    reordered_observation_data = {"locs": [{"P": "idle"}], "vars": [{"y": " nob", "x": 1.0}], "t": [0.0, 2, 5.0]}
+    key = get_match_result_key(matcher_key="matcher", observation_data=observation_data)
+
+    assert get_match_result_key(matcher_key="matcher", observation_data=reordered_observation_data) == key
+    assert get_match_result_key(matcher_key="other_matcher", observation_data=observation_data) != key
+    assert get_match_result_key(matcher_key="matcher", observation_data=dict(observation_data, t=[0, 2.5, 5])) != key
+
+
+def test_match_result_cache_layers(tmp_path):
+    result_cache = MatchResultCache(cache_dir_path=tmp_path, max_memory_entry_count=1)
+    result_cache.put(matcher_key="matcher", observation_data=[1], durations={"matching": 1.0},
+                     matching_res={"is_matching": True, "is_timeout": False, "matching_trace": "trace"})
+    result_cache.put(matcher_key="matcher", observation_data=[2], durations={"matching": 2.0},
+                     matching_res={"is_matching": False, "is_timeout": False, "matching_trace": None})
+    result_cache.put(matcher_key="matcher", observation_data=[3], durations={"matching": 3.0},
+                     matching_res={"is_matching": False, "is_timeout": True, "matching_trace": None})
+
+    # Evicted from memory, but still stored on disk (timed out results are not cached at all)
+    assert list(result_cache.memory_entries) == [get_match_result_key(matcher_key="matcher", observation_data=[2])]
+    assert result_cache.get(matcher_key="matcher", observation_data=[1], return_trace=True)["matching_trace"] == "trace"
+    assert result_cache.get(matcher_key="matcher", observation_data=[3]) is None
+
+    # The on-disk layer is shared with other cache instances
+    other_result_cache = MatchResultCache(cache_dir_path=tmp_path)
+    cached_result = other_result_cache.get(matcher_key="matcher", observation_data=[2])
+    assert cached_result["is_matching"] is False and cached_result["durations"] == {"matching": 2.0}
+
+    # Without the on-disk layer, results are only kept in memory
+    memory_result_cache = MatchResultCache(max_memory_entry_count=1)
+    memory_result_cache.put(matcher_key="matcher", observation_data=[1], durations={},
+                            matching_res={"is_matching": True, "is_timeout": False, "matching_trace": None})
+    assert memory_result_cache.get(matcher_key="matcher", observation_data=[1]) is not None
+    assert memory_result_cache.get(matcher_key="matcher", observation_data=[1], return_trace=True) is None
@@ -0,0 +1,75 @@
+"""This module contains tests for the columnar result store."""
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_store import \
+    ResultStore, result_store_file_name
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_stream import \
+    ResultStreamWriter
+
+
+##########
+# Helper #
+##########
+def create_scenario(size, summarize=True):
+    """Creates the data of a scenario of the second model of an experiment.
+
+    Args:
+        size: The scenario key.
+        summarize: Choose whether the scenario is summarized.
+
+    Returns:
+        The scenario data.
+    """
+    return {"id": f'Exp4/02/model/{size}', "keys": [size], "summarize": summarize, "run_count": 2,
+            "config_fingerprint": "fingerprint"}
+
+
+def create_run_log_data(duration, is_timeout=False):
+    """Creates the log data of a run.
+
+    Args:
+        duration: The matching duration.
+        is_timeout: Choose whether the matching timed out.
+
+    Returns:
+        The run log data.
+    """
+    return {"durations": {"matching": {"matching": duration}, "run": duration + 1}, "is_matching": not is_timeout,
+            "is_timeout": is_timeout, "obs_data": [{"t": 0, "vars": {"x": 1}, "locs": {}}],
+            "config_fingerprint": "fingerprint"}
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_result_store_queries_columns_of_stored_streams(tmp_path):
+    stream_file_path = tmp_path.joinpath("stream.jsonl")
+    with ResultStreamWriter(stream_file_path=stream_file_path) as stream_writer:
+        for scenario_idx, (size, durations) in enumerate([(20, [1.0, 3.0]), (10, [5.0])]):
+            scenario = create_scenario(size=size)
+            for run_idx, duration in enumerate(durations):
+                run_log_data = create_run_log_data(duration=duration, is_timeout=(size == 10))
+                stream_writer.write_run_record(scenario=scenario, run_idx=run_idx, run_log_data=run_log_data)
+            stream_writer.write_scenario_record(scenario=scenario, scenario_idx=scenario_idx, summary={
+                "min_max_avg": [min(durations), max(durations), sum(durations) / len(durations)],
+                "run_count": len(durations), "timeout_count": int(size == 10), "stop_reason": "fixed_run_count"})
+
+    with ResultStore(store_dir_path=tmp_path) as result_store:
+        result_store.store_result_stream(stream_file_path=stream_file_path, experiment="exp4_obs_size",
+                                         model_name="model")
+        # Storing a stream again replaces its rows
+        result_store.store_result_stream(stream_file_path=stream_file_path, experiment="exp4_obs_size",
+                                         model_name="model")
+
+    assert tmp_path.joinpath(result_store_file_name).exists()
+    with ResultStore(store_dir_path=tmp_path) as result_store:
+        assert result_store.has_experiment(experiment="exp4_obs_size")
+        assert not result_store.has_experiment(experiment="exp5_obs_extents")
+        assert result_store.query_runs(experiment="exp4_obs_size", columns=["matching_duration", "is_timeout"]) == [
+            ("model", [20], 0, 1.0, 0), ("model", [20], 1, 3.0, 0), ("model", [10], 0, 5.0, 1)]
+        assert result_store.load_summary_tree(experiment="exp4_obs_size") == {"model": {
+            "20": {"summary": {"min_max_avg": [1.0, 3.0, 2.0], "run_count": 2, "timeout_count": 0,
+                               "stop_reason": "fixed_run_count"}},
+            "10": {"summary": {"min_max_avg": [5.0, 5.0, 5.0], "run_count": 1, "timeout_count": 1,
+                               "stop_reason": "fixed_run_count"}},
+        }}
+        assert result_store.load_observation_data(scenario_id="Exp4/02/model/10", run_idx=0) == \
+            [{"t": 0, "vars": {"x": 1}, "locs": {}}]
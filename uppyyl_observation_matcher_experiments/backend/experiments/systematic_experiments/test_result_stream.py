@@ -0,0 +1,88 @@
+"""This module contains tests for the append-only result streams."""
+import json
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_stream import \
+    ResultStreamWriter, compact_result_stream
+
+
+##########
+# Helper #
+##########
+def create_scenario(keys, summarize=True, run_count=2, config_fingerprint="fingerprint"):
+    """Creates the data of a scenario.
+
+    Args:
+        keys: The scenario keys.
+        summarize: Choose whether the scenario is summarized.
+        run_count: The number of runs.
+        config_fingerprint: The config fingerprint of the scenario.
+
+    Returns:
+        The scenario data.
+    """
+    return {"id": "/".join(str(key) for key in keys), "keys": keys, "summarize": summarize, "run_count": run_count,
+            "config_fingerprint": config_fingerprint}
+
+
+def create_run_log_data(duration, config_fingerprint="fingerprint"):
+    """Creates the log data of a run.
+
+    Args:
+        duration: The matching duration.
+        config_fingerprint: The config fingerprint of the run.
+
+    Returns:
+        The run log data.
+    """
+    return {"durations": {"matching": {"matching": duration}}, "is_matching": True,
+            "obs_data": [{"t": 0, "vars": {"x": 1}, "locs": {}}], "config_fingerprint": config_fingerprint}
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_compacted_result_stream_matches_the_nested_log_structure(tmp_path):
+    stream_file_path = tmp_path.joinpath("stream.jsonl")
+    positive_scenario = create_scenario(keys=["Exp1", "pos"])
+    sweep_scenario = create_scenario(keys=["Exp4", 10], summarize=False, run_count=1)
+    empty_scenario = create_scenario(keys=["Exp2", "few-short"], run_count=0)
+    with ResultStreamWriter(stream_file_path=stream_file_path) as stream_writer:
+        # Runs of a stale configuration, and runs beyond the run count, are excluded from the log
+        stream_writer.write_run_record(scenario=positive_scenario, run_idx=0,
+                                       run_log_data=create_run_log_data(duration=9.0, config_fingerprint="stale"))
+        stream_writer.write_run_record(scenario=sweep_scenario, run_idx=0,
+                                       run_log_data=create_run_log_data(duration=7.0))
+        stream_writer.write_run_record(scenario=sweep_scenario, run_idx=1,
+                                       run_log_data=create_run_log_data(duration=8.0))
+        stream_writer.write_scenario_record(scenario=sweep_scenario, scenario_idx=2, summary=None)
+        for run_idx, duration in enumerate([1.0, 2.0]):
+            stream_writer.write_run_record(scenario=positive_scenario, run_idx=run_idx,
+                                           run_log_data=create_run_log_data(duration=duration))
+        stream_writer.write_scenario_record(scenario=positive_scenario, scenario_idx=0, summary={"count": 1})
+        # A re-executed run and a later scenario record supersede the earlier ones
+        stream_writer.write_run_record(scenario=positive_scenario, run_idx=1,
+                                       run_log_data=create_run_log_data(duration=3.0))
+        stream_writer.write_scenario_record(scenario=positive_scenario, scenario_idx=0, summary={"count": 2})
+        stream_writer.write_scenario_record(scenario=empty_scenario, scenario_idx=1, summary={})
+        # Runs of unfinished scenarios are not included
+        stream_writer.write_run_record(scenario=create_scenario(keys=["Exp5", 20]), run_idx=0,
+                                       run_log_data=create_run_log_data(duration=4.0))
+    with open(stream_file_path, 'a') as file:
+        file.write('{"type":"scenario","scenario_id":"Exp5/2')
+
+    log_file_path = tmp_path.joinpath("logs", "model.json")
+    assert compact_result_stream(stream_file_path=stream_file_path, log_file_path=log_file_path, model_name="model")
+
+    expected_log_data = {"model": {
+        "Exp1": {"pos": {"runs": {"0": create_run_log_data(duration=1.0), "1": create_run_log_data(duration=3.0)},
+                         "summary": {"count": 2}}},
+        "Exp2": {"few-short": {"runs": None, "summary": {}}},
+        "Exp4": {"10": {"0": create_run_log_data(duration=7.0)}},
+    }}
+    with open(log_file_path, 'r') as file:
+        log_data = json.load(file)
+    assert log_data == json.loads(json.dumps(expected_log_data))
+    assert list(log_data["model"]) == ["Exp1", "Exp2", "Exp4"]
+
+    assert not compact_result_stream(stream_file_path=tmp_path.joinpath("missing.jsonl"),
+                                     log_file_path=tmp_path.joinpath("missing.json"), model_name="model")
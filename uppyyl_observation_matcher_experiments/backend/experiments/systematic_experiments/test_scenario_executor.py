@@ -0,0 +1,119 @@
+"""This module contains tests for the execution of scenario runs in a process pool, using a stand-in scenario runner."""
+import os
+import time
+
+import pytest
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments import scenario_executor
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.scenario_executor import \
+    ScenarioExecutor
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.workspace import \
+    WorkspaceManager
+
+
+##########
+# Helper #
+##########
+def iterate_stand_in_scenario_runs(scenario, run_indices):
+    """Executes runs of a scenario like "iterate_scenario_runs", sleeping for the run duration of the scenario.
+
+    Args:
+        scenario: The scenario data.
+        run_indices: The indices of the runs.
+
+    Yields:
+        The run index and the run log data of each finished run.
+    """
+    for run_idx in run_indices:
+        time.sleep(scenario["run_durations"][run_idx])
+        if run_idx in scenario.get("failing_run_indices", []):
+            raise RuntimeError(f'Run {run_idx} failed')
+        yield run_idx, {"pid": os.getpid()}
+
+
+def create_scenario(scenario_id, run_durations, use_batch_matching=False, **scenario_data):
+    """Creates the data of a scenario of the stand-in scenario runner.
+
+    Args:
+        scenario_id: The scenario ID.
+        run_durations: The duration of each run, which also defines the run indices.
+        use_batch_matching: Choose whether the runs are executed in chunks of two.
+        **scenario_data: Further scenario data.
+
+    Returns:
+        The scenario data.
+    """
+    return dict({"id": scenario_id, "run_indices": list(range(0, len(run_durations))),
+                 "run_durations": run_durations, "use_batch_matching": use_batch_matching, "batch_concurrency": 2},
+                **scenario_data)
+
+
+@pytest.fixture
+def pool_executor(tmp_path, monkeypatch):
+    """A fixture which provides a two-worker scenario executor, whose (forked) workers use the stand-in runner.
+
+    Returns:
+        The scenario executor.
+    """
+    monkeypatch.setattr(scenario_executor, "iterate_scenario_runs", iterate_stand_in_scenario_runs)
+    return ScenarioExecutor(workspace_manager=WorkspaceManager(base_dir_path=tmp_path), model_cache=None,
+                            matcher_cache=None, worker_count=2)
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_pool_execution_reports_every_run_once_and_finishes_scenarios_in_order(pool_executor):
+    # The runs of the first scenario finish in reverse order, and the batch scenario is executed in chunks
+    scenarios = [create_scenario(scenario_id="reversed", run_durations=[0.4, 0.3, 0.2, 0.1]),
+                 create_scenario(scenario_id="batch", run_durations=[0.1] * 5, use_batch_matching=True),
+                 create_scenario(scenario_id="continued", run_durations=[0.1] * 4, run_indices=[0, 1])]
+    events = []
+    continued_scenario_ids = set()
+
+    def get_additional_run_indices(scenario):
+        if scenario["id"] != "continued" or scenario["id"] in continued_scenario_ids:
+            return []
+        continued_scenario_ids.add(scenario["id"])
+        return [2, 3]
+
+    pool_executor.execute(
+        scenarios=scenarios,
+        on_run_finished=lambda scenario, run_idx, run_log_data: events.append(
+            (scenario["id"], run_idx, run_log_data["pid"])),
+        on_scenario_finished=lambda scenario: events.append((scenario["id"], None, None)),
+        get_additional_run_indices=get_additional_run_indices)
+
+    run_events = [event for event in events if event[1] is not None]
+    assert sorted((scenario_id, run_idx) for scenario_id, run_idx, _pid in run_events) == sorted(
+        (scenario["id"], run_idx) for scenario in scenarios for run_idx in range(0, len(scenario["run_durations"])))
+    reversed_run_indices = [run_idx for scenario_id, run_idx, _pid in run_events if scenario_id == "reversed"]
+    assert reversed_run_indices.index(1) < reversed_run_indices.index(0)
+    assert len(set(pid for _scenario_id, _run_idx, pid in run_events) - {os.getpid()}) == 2
+
+    finished_scenario_ids = [event[0] for event in events if event[1] is None]
+    assert finished_scenario_ids == ["reversed", "batch", "continued"]
+    for scenario_id in finished_scenario_ids:
+        # A scenario is only finished after all of its runs were reported
+        scenario_events = [event for event in events if event[0] == scenario_id]
+        assert scenario_events[-1][1] is None and len(scenario_events) == len(set(scenario_events))
+    assert pool_executor.workspace_manager.session_dir_path is None
+
+
+def test_pool_execution_raises_on_a_failed_run(pool_executor):
+    scenarios = [create_scenario(scenario_id="failing", run_durations=[0.05, 0.05, 0.05, 0.05],
+                                 use_batch_matching=True, failing_run_indices=[3]),
+                 create_scenario(scenario_id="pending", run_durations=[0.05] * 20)]
+    reported_runs = []
+    finished_scenario_ids = []
+    with pytest.raises(RuntimeError, match='A run of scenario "failing" failed') as exc_info:
+        pool_executor.execute(
+            scenarios=scenarios,
+            on_run_finished=lambda scenario, run_idx, run_log_data: reported_runs.append((scenario["id"], run_idx)),
+            on_scenario_finished=lambda scenario: finished_scenario_ids.append(scenario["id"]))
+    assert "Run 3 failed" in str(exc_info.value)
+
+    # The finished run of the failed chunk is still reported, but the scenario is never finished
+    assert ("failing", 2) in reported_runs
+    assert ("failing", 3) not in reported_runs and "failing" not in finished_scenario_ids
+    assert pool_executor.workspace_manager.session_dir_path is None
@@ -0,0 +1,42 @@
+"""This module contains tests for the hierarchical timing of the matching pipeline phases."""
+import threading
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.span_timer import \
+    Span, get_dominant_phase, get_phase_durations, timed_span
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_timed_spans_are_nested_per_thread():
+    other_thread_spans = []
+
+    def time_other_span():
+        with timed_span(name="other") as other_span:
+            other_thread_spans.append(other_span)
+
+    with timed_span(name="run") as run_span:
+        with timed_span(name="matching") as matching_span:
+            # Spans timed in other threads (e.g., concurrent matchings) do not become children of the current span
+            thread = threading.Thread(target=time_other_span)
+            thread.start()
+            thread.join()
+        with timed_span(name="check"):
+            pass
+
+    assert [child_span.name for child_span in run_span.children] == ["matching", "check"]
+    assert matching_span.children == [] and other_thread_spans[0].children == []
+    assert run_span.duration >= matching_span.duration >= 0
+
+
+def test_phase_durations_exclude_child_spans():
+    matching_span = Span(name="matching", duration=3.0)
+    matching_span.add_child(name="verifier_execution", duration=2.5)
+    run_span_data = Span(name="run", duration=4.0, children=[Span(name="generation", duration=0.5),
+                                                             matching_span]).to_dict()
+
+    phase_durations = get_phase_durations(span_data=run_span_data)
+
+    assert phase_durations == {"run": 0.5, "run/generation": 0.5, "run/matching": 0.5,
+                               "run/matching/verifier_execution": 2.5}
+    assert get_dominant_phase(phase_durations=phase_durations) == ("run/matching/verifier_execution", 0.625)
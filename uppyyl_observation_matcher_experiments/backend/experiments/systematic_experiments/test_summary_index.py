@@ -0,0 +1,60 @@
+"""This module contains tests for the summary indexes of the experiment logs."""
+import json
+import os
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_stream import \
+    ResultStreamWriter, compact_result_stream
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.summary_index import \
+    create_summary_tree_from_stream, get_summary_index_file_path, load_summary_data, write_summary_index
+
+
+##########
+# Helper #
+##########
+def write_stream(stream_file_path, avg_duration):
+    """Writes the result stream of a model with a summarized and an unsummarized scenario.
+
+    Args:
+        stream_file_path: The path of the stream file.
+        avg_duration: The average duration in the summary of the summarized scenario.
+    """
+    with ResultStreamWriter(stream_file_path=stream_file_path) as stream_writer:
+        for scenario_idx, (keys, summarize) in enumerate([(["few-short", "All"], True), (["positives"], False)]):
+            scenario = {"id": f'Exp/01/model/{"/".join(keys)}', "keys": keys, "summarize": summarize, "run_count": 1,
+                        "config_fingerprint": "fingerprint"}
+            stream_writer.write_run_record(scenario=scenario, run_idx=0, run_log_data={
+                "durations": {"matching": {"matching": avg_duration}}, "obs_data": [], "is_matching": True,
+                "config_fingerprint": "fingerprint"})
+            stream_writer.write_scenario_record(scenario=scenario, scenario_idx=scenario_idx, summary={
+                "min_max_avg": [avg_duration] * 3, "run_count": 1} if summarize else None)
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_summary_index_is_used_until_the_log_changes(tmp_path):
+    log_file_path = tmp_path.joinpath("logs", "exp2_01_model_log.json")
+    stream_file_path = tmp_path.joinpath("stream.jsonl")
+    write_stream(stream_file_path=stream_file_path, avg_duration=1.0)
+    compact_result_stream(stream_file_path=stream_file_path, log_file_path=log_file_path, model_name="model")
+    summary_tree = create_summary_tree_from_stream(stream_file_path=stream_file_path, model_name="model")
+    write_summary_index(log_file_path=log_file_path, summary_tree=summary_tree)
+
+    expected_summary_data = {"model": {"few-short": {"All": {"summary": {"min_max_avg": [1.0] * 3, "run_count": 1}}}}}
+    assert load_summary_data(data_path=log_file_path.parent) == expected_summary_data
+
+    # An index whose log was only touched (e.g., copied) stays valid, so that the (altered) index is used
+    index_file_path = get_summary_index_file_path(log_file_path=log_file_path)
+    index_data = json.loads(index_file_path.read_text())
+    index_data["summary_tree"]["model"]["few-short"]["All"]["summary"]["is_indexed"] = True
+    index_file_path.write_text(json.dumps(index_data))
+    os.utime(log_file_path, ns=(0, 0))
+    assert load_summary_data(data_path=log_file_path.parent)["model"]["few-short"]["All"]["summary"]["is_indexed"]
+
+    # A changed log invalidates the index, which is re-created from the log
+    write_stream(stream_file_path=stream_file_path, avg_duration=22.0)
+    compact_result_stream(stream_file_path=stream_file_path, log_file_path=log_file_path, model_name="model")
+    assert load_summary_data(data_path=log_file_path.parent) == \
+        {"model": {"few-short": {"All": {"summary": {"min_max_avg": [22.0] * 3, "run_count": 1}}}}}
+    assert json.loads(index_file_path.read_text())["summary_tree"] == \
+        create_summary_tree_from_stream(stream_file_path=stream_file_path, model_name="model")
@@ -1,8 +1,11 @@
 """This module contains the introduction example experiment as test."""
+import json
 import pathlib
 
 import pytest
 
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments import systematic_experiments
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.model_data import all_model_data
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.systematic_experiments import \
     SystematicExperiments
 from uppyyl_observation_matcher_experiments.definitions import RES_DIR
@@ -28,6 +31,37 @@ def print_header(text):
     return header
 
 
+class RecordingScenarioExecutor:
+    """A scenario executor which records the executed runs instead of matching observations, and is interrupted
+    after a given number of runs."""
+    executed_runs = []
+    max_run_count = None
+
+    def __init__(self, **_kwargs):
+        pass
+
+    def execute(self, scenarios, on_run_finished, on_scenario_finished, get_initial_run_indices,
+                get_additional_run_indices):
+        """Executes the runs of the scenarios.
+
+        Args:
+            scenarios: The scenario data list.
+            on_run_finished: The callback for finished runs.
+            on_scenario_finished: The callback for finished scenarios.
+            get_initial_run_indices: The function which gets the run indices of a started scenario.
+            get_additional_run_indices: The function which gets the further run indices of a scenario.
+        """
+        for scenario in scenarios:
+            for run_idx in get_initial_run_indices(scenario):
+                if len(self.executed_runs) == self.max_run_count:
+                    raise KeyboardInterrupt
+                self.executed_runs.append((scenario["id"], run_idx))
+                on_run_finished(scenario=scenario, run_idx=run_idx, run_log_data={
+                    "durations": {"matching": {"matching": 1.0 + run_idx}, "run": 2.0 + run_idx},
+                    "is_matching": True, "is_timeout": False, "obs_data": [], "run_timeout": scenario["run_timeout"]})
+            on_scenario_finished(scenario=scenario)
+
+
 @pytest.fixture(scope="module")
 def experiments():
     """A fixture for an Experiments instance.
@@ -70,3 +104,43 @@ def test_experiment_compare_performance_of_observation_sizes(experiments):
 def test_experiment_compare_performance_of_observation_extents(experiments):
     print_header("Compares matching run times for different observation extents")
     experiments.experiment_compare_performance_of_observation_extents()
+
+
+################################################################################
+# Resume #
+################################################################################
+def test_resumed_execution_only_executes_missing_and_stale_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(systematic_experiments, "ScenarioExecutor", RecordingScenarioExecutor)
+
+    def execute(run_timeout, resume, max_run_count=None):
+        RecordingScenarioExecutor.executed_runs = []
+        RecordingScenarioExecutor.max_run_count = max_run_count
+        experiments = SystematicExperiments(experiment_base_dir_path=tmp_path.joinpath("temp"),
+                                            experiment_log_dir_path=tmp_path.joinpath("logs"), resume=resume)
+        scenario = experiments._create_scenario(
+            experiment="Exp", model_idx=1, model_data=all_model_data[0], keys=["few-short", "All"],
+            description="Resume", run_type="generated", config={}, matcher_model_name="model_exp_matcher",
+            run_count=4, run_timeout=run_timeout)
+        experiments._execute_scenarios(scenarios=[scenario], experiment_log_sub_dir_name="exp",
+                                       experiment_log_file_prefix="exp")
+        return [run_idx for _scenario_id, run_idx in RecordingScenarioExecutor.executed_runs]
+
+    def load_scenario_log_data():
+        [log_file_path] = tmp_path.joinpath("logs", "exp").glob("*_log.json")
+        with open(log_file_path, 'r') as file:
+            [model_log_data] = json.load(file).values()
+        return model_log_data["few-short"]["All"]
+
+    with pytest.raises(KeyboardInterrupt):
+        execute(run_timeout=10, resume=False, max_run_count=2)
+    # The partial stream only lacks the last runs, which are all that is executed with the same configuration
+    assert execute(run_timeout=10, resume=True) == [2, 3]
+    assert execute(run_timeout=10, resume=True) == []
+    assert [run_log_data["run_timeout"] for run_log_data in load_scenario_log_data()["runs"].values()] == [10] * 4
+
+    # With another configuration, the stale runs are executed again, and excluded from the compacted log
+    assert execute(run_timeout=20, resume=True) == [0, 1, 2, 3]
+    scenario_log_data = load_scenario_log_data()
+    assert list(scenario_log_data["runs"]) == ["0", "1", "2", "3"]
+    assert [run_log_data["run_timeout"] for run_log_data in scenario_log_data["runs"].values()] == [20] * 4
+    assert scenario_log_data["summary"]["run_count"] == 4
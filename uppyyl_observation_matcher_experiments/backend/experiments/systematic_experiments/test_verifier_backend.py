@@ -0,0 +1,162 @@
+"""This module contains tests for the verifier backend, using a stand-in executable instead of "verifyta"."""
+import concurrent.futures
+import inspect
+import json
+import pathlib
+import subprocess
+import sys
+import time
+
+import pytest
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.verifier_backend import \
+    VerifierShim, collect_verifier_statistics, default_verifier_backend_config
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.verifier_shim import \
+    SubprocessVerifierBackend, VerifierSlotPool, timeout_exit_status
+
+stand_in_verifier_code = """#!{python_path}
+import sys
+import time
+time.sleep(float(sys.argv[1]))
+print("Formula is satisfied:", " ".join(sys.argv[2:]))
+print("Stand-in verifier", file=sys.stderr)
+sys.exit(int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+"""
+
+stand_in_statistics_verifier_code = """#!{python_path}
+import sys
+print(" -- Formula is satisfied.")
+if "-u" in sys.argv:
+    print("-- States explored : 12 states")
+    print("-- States stored : 7 states")
+    print("-- CPU user time used : 0 ms")
+    print("-- Virtual memory used : 3000 KB")
+    print("-- Resident memory used : 1000 KB")
+"""
+
+stand_in_allocating_verifier_code = """#!{python_path}
+import sys
+data = bytearray(int(sys.argv[1]) * 1024 * 1024)
+for idx in range(0, len(data), 4096):
+    data[idx] = 1
+"""
+
+
+##########
+# Helper #
+##########
+@pytest.fixture
+def stand_in_verifier_path(tmp_path):
+    """A fixture for a stand-in verifier, which sleeps for the given time, and exits with the given exit status.
+
+    Returns:
+        The path of the stand-in verifier executable.
+    """
+    verifier_path = tmp_path.joinpath("stand_in_verifyta")
+    verifier_path.write_text(stand_in_verifier_code.format(python_path=sys.executable))
+    verifier_path.chmod(0o755)
+    return verifier_path
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_verifier_backend_captures_outputs_and_times_out(tmp_path, stand_in_verifier_path):
+    slot_pool = VerifierSlotPool(slot_dir_path=tmp_path.joinpath("slots"), slot_count=1)
+    verifier_backend = SubprocessVerifierBackend(
+        executable_path=stand_in_verifier_path, slot_pool=slot_pool, call_timeout=5)
+    result = verifier_backend.execute(args=["0", "3"])
+    assert (result.exit_status, result.is_timeout) == (3, False)
+    assert result.stdout == "Formula is satisfied: 3\n" and result.stderr == "Stand-in verifier\n"
+
+    verifier_backend.call_timeout = 0.2
+    result = verifier_backend.execute(args=["10"])
+    assert (result.exit_status, result.is_timeout) == (timeout_exit_status, True)
+    assert result.duration < 5
+
+
+def test_verifier_backend_records_the_peak_rss_of_short_calls(tmp_path):
+    verifier_path = tmp_path.joinpath("stand_in_verifyta")
+    verifier_path.write_text(stand_in_allocating_verifier_code.format(python_path=sys.executable))
+    verifier_path.chmod(0o755)
+    slot_pool = VerifierSlotPool(slot_dir_path=tmp_path.joinpath("slots"), slot_count=1)
+    verifier_backend = SubprocessVerifierBackend(executable_path=verifier_path, slot_pool=slot_pool)
+
+    # The process ends right after allocating, which sampling would likely miss
+    peak_rss_values = [verifier_backend.execute(args=[str(size)]).peak_rss for size in [1, 64]]
+    assert peak_rss_values[0] < 64 * 1024 <= peak_rss_values[1] < 128 * 1024
+
+
+def test_verifier_backend_bounds_concurrent_processes(tmp_path, stand_in_verifier_path):
+    slot_pool = VerifierSlotPool(slot_dir_path=tmp_path.joinpath("slots"), slot_count=2, poll_interval=0.01)
+    verifier_backend = SubprocessVerifierBackend(executable_path=stand_in_verifier_path, slot_pool=slot_pool)
+
+    start_time = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: verifier_backend.execute(args=["0.5"]), range(0, 4)))
+    assert time.time() - start_time >= 1.0
+    assert all(result.exit_status == 0 for result in results)
+    assert sum(1 for result in results if result.queue_duration >= 0.4) == 2
+
+
+def test_verifier_shim_relays_calls_and_logs_them(tmp_path, stand_in_verifier_path):
+    verifier_backend_config = dict(default_verifier_backend_config, slot_dir_path=tmp_path.joinpath("slots"))
+    verifier_shim = VerifierShim(shim_dir_path=tmp_path.joinpath("verifier"),
+                                 verifier_backend_config=verifier_backend_config)
+    verifier_shim.install(default_executable_path=stand_in_verifier_path)
+    config = {"verifyta_path": "verifyta"}
+    verifier_shim.apply(config=config)
+
+    process = subprocess.run([config["verifyta_path"], "0", "2"], capture_output=True, text=True, timeout=60)
+    assert (process.returncode, process.stdout) == (2, "Formula is satisfied: 2\n")
+    with open(verifier_shim.call_log_file_path) as file:
+        call_log_records = [json.loads(line) for line in file]
+    assert [(record["args"], record["exit_status"]) for record in call_log_records] == [(["0", "2"], 2)]
+
+    # Calls on a model file are recorded next to it with the time spent waiting for a slot and in the shim
+    model_file_path = tmp_path.joinpath("matcher_workspace", "matcher_model.xml")
+    model_file_path.parent.mkdir()
+    model_file_path.write_text("<nta/>")
+    process = subprocess.run([config["verifyta_path"], "0", "0", str(model_file_path)], capture_output=True,
+                             text=True, timeout=60)
+    assert process.returncode == 0
+    call_statistics = collect_verifier_statistics(model_dir_path=model_file_path.parent, include_call_duration=True)
+    assert set(call_statistics) == {"call_count", "call_duration", "queue_duration", "shim_duration", "peak_rss"}
+    assert call_statistics["call_count"] == 1 and call_statistics["shim_duration"] >= 0
+
+
+def test_verifier_shim_starts_without_heavy_imports():
+    # The shim module is imported standalone by the shim script, without the package or heavy standard modules
+    module_dir_path = pathlib.Path(inspect.getfile(VerifierSlotPool)).parent
+    process = subprocess.run(
+        [sys.executable, "-S", "-c", f'import sys; sys.path.insert(0, {str(module_dir_path)!r}); '
+                                     f'import verifier_shim; print("\\n".join(sys.modules))'],
+        capture_output=True, text=True, timeout=60)
+    imported_module_names = process.stdout.split()
+    assert "verifier_shim" in imported_module_names
+    assert not [name for name in imported_module_names if name.startswith("uppyyl_observation_matcher_experiments")
+                or name in ["json", "re", "subprocess", "signal", "pathlib"]]
+
+
+def test_verifier_shim_collects_statistics_per_model_directory(tmp_path):
+    verifier_path = tmp_path.joinpath("stand_in_verifyta")
+    verifier_path.write_text(stand_in_statistics_verifier_code.format(python_path=sys.executable))
+    verifier_path.chmod(0o755)
+    verifier_backend_config = dict(default_verifier_backend_config, slot_dir_path=tmp_path.joinpath("slots"),
+                                   collect_statistics=True)
+    verifier_shim = VerifierShim(shim_dir_path=tmp_path.joinpath("verifier"),
+                                 verifier_backend_config=verifier_backend_config)
+    verifier_shim.install(default_executable_path=verifier_path)
+    model_file_path = tmp_path.joinpath("matcher_workspace", "matcher_model.xml")
+    model_file_path.parent.mkdir()
+    model_file_path.write_text("<nta/>")
+
+    for _ in range(0, 2):
+        process = subprocess.run([str(verifier_shim.shim_file_path), str(model_file_path)], capture_output=True,
+                                 text=True, timeout=60)
+        # The added summary option does not change the output relayed to the caller
+        assert (process.returncode, process.stdout) == (0, " -- Formula is satisfied.\n")
+
+    assert collect_verifier_statistics(model_dir_path=model_file_path.parent) == {
+        "call_count": 2, "states_explored": 24, "states_stored": 14, "virtual_memory": 3000, "resident_memory": 1000}
+    assert collect_verifier_statistics(model_dir_path=model_file_path.parent) is None
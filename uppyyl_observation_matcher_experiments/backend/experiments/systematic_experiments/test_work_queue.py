@@ -0,0 +1,143 @@
+"""This module contains tests for the work queue, using several worker processes on one machine."""
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.work_queue import \
+    WorkQueue, get_worker_id, done_state, failed_state
+
+
+##########
+# Helper #
+##########
+def create_scenario(scenario_id, run_count):
+    """Creates minimal scenario data for the queue.
+
+    Args:
+        scenario_id: The scenario ID.
+        run_count: The number of runs.
+
+    Returns:
+        The scenario data.
+    """
+    return {"id": scenario_id, "config_fingerprint": "0123456789abcdef", "run_indices": list(range(0, run_count))}
+
+
+def drain_queue(queue_file_path, lease_duration):
+    """Claims and completes tasks until the queue has no open tasks (executed in a worker process).
+
+    Args:
+        queue_file_path: The path of the queue database file.
+        lease_duration: The lease duration.
+    """
+    work_queue = WorkQueue(queue_file_path=queue_file_path, lease_duration=lease_duration)
+    worker_id = get_worker_id()
+    while True:
+        task = work_queue.claim(worker_id=worker_id)
+        if task is None:
+            if work_queue.get_open_task_count() == 0:
+                return
+            time.sleep(0.05)
+            continue
+        work_queue.complete(task_id=task.task_id, run_log_data={"run_idx": task.run_idx, "worker_id": worker_id})
+
+
+def claim_and_crash(queue_file_path, lease_duration):
+    """Claims a single task and exits without completing it (executed in a worker process).
+
+    Args:
+        queue_file_path: The path of the queue database file.
+        lease_duration: The lease duration.
+    """
+    work_queue = WorkQueue(queue_file_path=queue_file_path, lease_duration=lease_duration)
+    work_queue.claim(worker_id=get_worker_id())
+    os._exit(1)
+
+
+@pytest.fixture
+def queue_file_path(tmp_path):
+    """A fixture for the path of a fresh queue database file.
+
+    Returns:
+        The queue file path.
+    """
+    return tmp_path.joinpath("work_queue.sqlite")
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_work_queue_tasks_are_executed_exactly_once_by_several_workers(queue_file_path):
+    scenarios = [create_scenario(scenario_id=f'Exp3/01/model/{obs_type}', run_count=20) for obs_type in "BPD"]
+    work_queue = WorkQueue(queue_file_path=queue_file_path)
+    work_queue.submit(scenarios=scenarios)
+
+    workers = [multiprocessing.Process(target=drain_queue, args=(queue_file_path, 60)) for _ in range(0, 4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    assert work_queue.get_state_counts() == {done_state: 60}
+    collected_results = work_queue.collect_results(scenarios=scenarios, max_result_count=1000)
+    assert sorted((scenario_id, run_idx) for scenario_id, run_idx, _data in collected_results) == \
+        sorted((scenario["id"], run_idx) for scenario in scenarios for run_idx in scenario["run_indices"])
+    assert all(data["run_idx"] == run_idx for _scenario_id, run_idx, data in collected_results)
+    assert work_queue.collect_results(scenarios=scenarios) == []
+
+    # Resuming hands out the results of the (already finished) runs again, without executing them again
+    work_queue.submit(scenarios=scenarios[:1], resume=True)
+    assert len(work_queue.collect_results(scenarios=scenarios)) == 20
+    assert work_queue.get_open_task_count() == 0
+
+    # A fresh execution of the same scenarios executes the runs again, instead of replaying the old results
+    work_queue.submit(scenarios=scenarios[:1])
+    assert work_queue.collect_results(scenarios=scenarios) == []
+    assert work_queue.get_state_counts() == {"pending": 20, done_state: 40}
+    drain_queue(queue_file_path=queue_file_path, lease_duration=60)
+    collected_results = work_queue.collect_results(scenarios=scenarios)
+    assert sorted(run_idx for _scenario_id, run_idx, _data in collected_results) == list(range(0, 20))
+    assert all(data["worker_id"] == get_worker_id() for _scenario_id, _run_idx, data in collected_results)
+
+
+def test_work_queue_tasks_of_crashed_workers_are_claimed_again(queue_file_path):
+    scenarios = [create_scenario(scenario_id="Exp1/01/model/positives", run_count=3)]
+    work_queue = WorkQueue(queue_file_path=queue_file_path, lease_duration=0.5)
+    work_queue.submit(scenarios=scenarios)
+
+    crashed_worker = multiprocessing.Process(target=claim_and_crash, args=(queue_file_path, 0.5))
+    crashed_worker.start()
+    crashed_worker.join(timeout=60)
+    assert work_queue.get_state_counts() == {"leased": 1, "pending": 2}
+
+    workers = [multiprocessing.Process(target=drain_queue, args=(queue_file_path, 60)) for _ in range(0, 2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    assert work_queue.get_state_counts() == {done_state: 3}
+    assert len(work_queue.collect_results(scenarios=scenarios)) == 3
+
+
+def test_work_queue_tasks_fail_after_max_attempts_and_are_retried_on_resubmit(queue_file_path):
+    scenarios = [create_scenario(scenario_id="Exp2/01/model/few-short/B", run_count=1)]
+    work_queue = WorkQueue(queue_file_path=queue_file_path, max_attempt_count=2)
+    work_queue.submit(scenarios=scenarios)
+
+    worker_id = get_worker_id()
+    for _ in range(0, 2):
+        task = work_queue.claim(worker_id=worker_id)
+        work_queue.fail(task_id=task.task_id, worker_id=worker_id, error="Matching failed")
+    assert work_queue.claim(worker_id=worker_id) is None
+    assert work_queue.get_state_counts() == {failed_state: 1}
+    assert work_queue.get_failed_tasks(scenarios=scenarios)[0][2] == "Matching failed"
+
+    work_queue.submit(scenarios=scenarios)
+    task = work_queue.claim(worker_id=worker_id)
+    assert task.attempt_count == 1
+    assert task.scenario["id"] == scenarios[0]["id"]
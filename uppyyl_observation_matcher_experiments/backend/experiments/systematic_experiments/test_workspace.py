@@ -0,0 +1,76 @@
+"""This module contains tests for the isolated workspaces of experiment runs."""
+import os
+
+import pytest
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments import workspace
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.workspace import \
+    WorkspaceManager, failure_marker_file_name
+
+
+################################################################################
+# Tests #
+################################################################################
+def test_workspaces_are_unique_and_sanitized(tmp_path):
+    workspace_manager = WorkspaceManager(base_dir_path=tmp_path)
+    session_dir_path = workspace_manager.open_session()
+    assert session_dir_path.parent == tmp_path.joinpath("workspaces")
+
+    workspaces = [workspace_manager.create_workspace(name="Exp3/01 model:run 0") for _ in range(0, 3)]
+    dir_paths = [run_workspace.dir_path for run_workspace in workspaces]
+    assert len(set(dir_paths)) == 3
+    for dir_path in dir_paths:
+        assert dir_path.parent == session_dir_path and dir_path.is_dir()
+        assert dir_path.name.startswith("Exp3_01_model_run_0_")
+
+
+def test_workspaces_of_failed_runs_are_kept_on_cleanup(tmp_path):
+    workspace_manager = WorkspaceManager(base_dir_path=tmp_path, keep_on_failure=True)
+    workspace_manager.open_session()
+    session_dir_path = workspace_manager.session_dir_path
+
+    with workspace_manager.create_workspace(name="succeeded") as succeeded_workspace:
+        succeeded_workspace.dir_path.joinpath("model.xml").write_text("<nta/>")
+    assert not succeeded_workspace.dir_path.exists()
+
+    with pytest.raises(RuntimeError):
+        with workspace_manager.create_workspace(name="failed") as failed_workspace:
+            raise RuntimeError("Matching failed")
+    assert failed_workspace.dir_path.joinpath(failure_marker_file_name).exists()
+
+    # A workspace which is still open at cleanup (e.g., of an interrupted run) is removed
+    open_workspace = workspace_manager.create_workspace(name="open")
+    workspace_manager.cleanup()
+    assert not open_workspace.dir_path.exists()
+    assert [path.name for path in session_dir_path.iterdir()] == [failed_workspace.dir_path.name]
+
+
+def test_workspaces_are_removed_on_cleanup_unless_kept(tmp_path):
+    workspace_manager = WorkspaceManager(base_dir_path=tmp_path, keep_on_failure=False)
+    with pytest.raises(RuntimeError):
+        with workspace_manager.create_workspace(name="failed") as failed_workspace:
+            raise RuntimeError("Matching failed")
+    assert not failed_workspace.dir_path.exists()
+
+    session_dir_path = workspace_manager.session_dir_path
+    workspace_manager.create_workspace(name="open")
+    workspace_manager.cleanup()
+    assert not session_dir_path.exists() and workspace_manager.session_dir_path is None
+
+
+def test_memory_backed_root_falls_back_to_the_base_directory(tmp_path, monkeypatch):
+    memory_dir_path = tmp_path.joinpath("shm")
+    memory_dir_path.mkdir()
+    monkeypatch.setattr(workspace, "memory_backed_dir_path", memory_dir_path)
+    workspace_manager = WorkspaceManager(base_dir_path=tmp_path.joinpath("base"), use_memory_backed_root=True)
+    assert workspace_manager.open_session().parent == memory_dir_path.joinpath("uppyyl_observation_matcher_experiments")
+    workspace_manager.cleanup()
+
+    # An unwritable directory (simulated via the access check, since root may write anywhere) or a missing one
+    real_access = os.access
+    monkeypatch.setattr(workspace.os, "access", lambda path, mode: (
+        os.fspath(path) != str(memory_dir_path) and real_access(path, mode)))
+    assert workspace_manager.open_session().parent == tmp_path.joinpath("base", "workspaces")
+    workspace_manager.cleanup()
+    monkeypatch.setattr(workspace, "memory_backed_dir_path", tmp_path.joinpath("missing"))
+    assert workspace_manager.root_dir_path == tmp_path.joinpath("base", "workspaces")
@@ -0,0 +1,164 @@
+"""This module implements the verifier backend, which owns the launching of verifier (i.e., "verifyta") processes, and
+bounds the number of verifier processes running on a node at once."""
+import json
+import os
+import pathlib
+import sys
+import tempfile
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments import verifier_shim
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.verifier_shim import \
+    call_log_file_name, statistics_file_name, summed_statistics_keys
+
+########################################################################################################################
+# Verifier backend configurations #
+########################################################################################################################
+# The slot directory must be local to the node (it bounds the verifier processes of all experiment processes of the
+# node); "executable_path" None uses the "verifyta_path" of the matcher configuration (cf. "res/config.ini")
+default_verifier_backend_config = {
+    "backend": "subprocess",
+    "executable_path": None,
+    "max_process_count": os.cpu_count() or 1,
+    "call_timeout": None,
+    "slot_dir_path": pathlib.Path(tempfile.gettempdir()).joinpath("uppyyl_verifier_slots"),
+    "max_logged_output_length": 2000,
+    "collect_statistics": False,
+}
+
+shim_file_name = "verifyta"
+
+
+########################################################################################################################
+# Verifier statistics #
+########################################################################################################################
+def merge_verifier_statistics(all_statistics):
+    """Merges the statistics of several verifier calls (e.g., of a single matching).
+
+    Args:
+        all_statistics: The statistics dicts of the calls.
+
+    Returns:
+        The merged statistics dict (including the number of calls), or None if no statistics are given.
+    """
+    if not all_statistics:
+        return None
+    merged_statistics = {"call_count": len(all_statistics)}
+    for statistics in all_statistics:
+        for key, value in statistics.items():
+            if key not in merged_statistics:
+                merged_statistics[key] = value
+            elif key in summed_statistics_keys:
+                merged_statistics[key] += value
+            else:
+                merged_statistics[key] = max(merged_statistics[key], value)
+    return merged_statistics
+
+
+def collect_verifier_statistics(model_dir_path, include_call_duration=False):
+    """Collects (and resets) the statistics of the verifier calls on the model files of a directory, e.g., of the
+    matchings of an observation matcher which owns the directory.
+
+    Args:
+        model_dir_path: The path of the model directory.
+        include_call_duration: Choose whether the summed durations (in seconds) of the calls are included, i.e., of
+            the verifier processes as "call_duration", of the waits for a free slot as "queue_duration", and of the
+            shim itself as "shim_duration", together with the maximum peak RSS (in KB) of the verifier processes as
+            "peak_rss" (which also covers calls without statistics in their output).
+
+    Returns:
+        The merged statistics dict, or None if no statistics were recorded.
+    """
+    statistics_file_path = pathlib.Path(model_dir_path).joinpath(statistics_file_name)
+    try:
+        with open(statistics_file_path, 'r') as file:
+            lines = file.readlines()
+        os.remove(statistics_file_path)
+    except FileNotFoundError:
+        return None
+    records = [json.loads(line) for line in lines if line.strip()]
+    if include_call_duration:
+        all_statistics = []
+        for record in records:
+            statistics = dict(record["statistics"] or {}, call_duration=record["duration"],
+                              queue_duration=record.get("queue_duration", 0.0),
+                              shim_duration=record.get("shim_duration", 0.0))
+            if record.get("peak_rss") is not None:
+                statistics["peak_rss"] = record["peak_rss"]
+            all_statistics.append(statistics)
+        return merge_verifier_statistics(all_statistics=all_statistics)
+    return merge_verifier_statistics(
+        all_statistics=[record["statistics"] for record in records if record["statistics"] is not None])
+
+
+########################################################################################################################
+# Verifier shim #
+########################################################################################################################
+class VerifierShim:
+    """An executable which replaces the verifier in the matcher configuration ("verifyta_path"), so that all verifier
+    calls of the observation matcher are executed by the verifier backend.
+
+    The shim is a standalone script (cf. "verifier_shim.py"), which holds its backend configuration, and starts
+    without importing the package. It relays the outputs and the exit status of each call, and appends a structured
+    record of the call to the call log of the shim directory. Each call is additionally recorded next to its model
+    file with the durations of the verifier process, of the wait for a free slot, and of the shim itself, since the
+    latter two are contained in the matching durations measured by the caller (cf. "collect_verifier_statistics()"),
+    and with the peak RSS of the verifier process, which the shim takes from the kernel when it reaps the process (so
+    that even short calls are measured exactly).
+    If statistics are collected, the summary option is added to calls which do not request it (and the summary is
+    removed from their relayed output), and the parsed statistics of each call are added to its record.
+    """
+
+    def __init__(self, shim_dir_path, verifier_backend_config):
+        """Initializes VerifierShim.
+
+        Args:
+            shim_dir_path: The path of the shim directory.
+            verifier_backend_config: The verifier backend configuration.
+        """
+        self.shim_dir_path = pathlib.Path(shim_dir_path)
+        self.verifier_backend_config = verifier_backend_config
+        self.shim_file_path = self.shim_dir_path.joinpath(shim_file_name)
+        self.call_log_file_path = self.shim_dir_path.joinpath(call_log_file_name)
+
+    def install(self, default_executable_path):
+        """Writes the shim executable, which holds its backend configuration.
+
+        The shim script imports the shim module directly from its directory (without the site packages), so that its
+        start only costs the start of the interpreter.
+
+        Args:
+            default_executable_path: The verifier executable used if the configuration sets no "executable_path".
+        """
+        backend_config = dict(self.verifier_backend_config)
+        if not backend_config.get("executable_path"):
+            backend_config["executable_path"] = default_executable_path
+        backend_config["call_log_file_path"] = self.call_log_file_path
+        backend_config = dict((key, str(value) if isinstance(value, pathlib.PurePath) else value)
+                              for key, value in backend_config.items())
+
+        self.shim_dir_path.mkdir(parents=True, exist_ok=True)
+        shim_code = (
+            f'#!{sys.executable} -S\n'
+            f'import time\n'
+            f'start_time = time.time()\n'
+            f'import sys\n'
+            f'sys.path.insert(0, {os.path.dirname(os.path.abspath(verifier_shim.__file__))!r})\n'
+            f'from verifier_shim import run_verifier_shim\n'
+            f'backend_config = {backend_config!r}\n'
+            f'sys.exit(run_verifier_shim(backend_config=backend_config, args=sys.argv[1:], start_time=start_time))\n'
+        )
+        temp_shim_file_path = self.shim_file_path.with_name(f'.{shim_file_name}.{os.getpid()}.tmp')
+        with open(temp_shim_file_path, 'w') as file:
+            file.write(shim_code)
+        os.chmod(temp_shim_file_path, 0o755)
+        os.replace(temp_shim_file_path, self.shim_file_path)
+
+    def apply(self, config):
+        """Replaces the verifier of a matcher configuration by the shim.
+
+        Args:
+            config: The configuration dict.
+        """
+        config["verifyta_path"] = str(self.shim_file_path)
+
+
@@ -0,0 +1,450 @@
+"""This module implements the verifier shim, i.e., the script which is executed in place of the verifier (cf.
+"VerifierShim" in "verifier_backend.py"), and which launches the verifier processes in the slots of the node.
+
+The shim is executed standalone (i.e., without importing the package), and only imports lightweight modules of the
+standard library at startup, since its start is paid by every verifier call."""
+import fcntl
+import os
+import select
+import sys
+import time
+
+########################################################################################################################
+# Verifier shim configurations #
+########################################################################################################################
+timeout_exit_status = 124
+call_log_file_name = "verifier_calls.jsonl"
+statistics_file_name = "verifier_statistics.jsonl"
+
+# The signal number of SIGKILL (taken as is, since importing the "signal" module costs more than the whole shim)
+kill_signal_number = 9
+
+# The verifier option which prints a summary of the explored state space after each query, and the summary lines (the
+# patterns are only compiled if statistics are collected)
+statistics_arg = "-u"
+verifier_statistics_patterns = {
+    "states_explored": r'^\s*-- States explored\s*:\s*(\d+) states\s*$',
+    "states_stored": r'^\s*-- States stored\s*:\s*(\d+) states\s*$',
+    "virtual_memory": r'^\s*-- Virtual memory used\s*:\s*(\d+) KB\s*$',
+    "resident_memory": r'^\s*-- Resident memory used\s*:\s*(\d+) KB\s*$',
+}
+summed_statistics_keys = ["states_explored", "states_stored", "call_duration", "queue_duration", "shim_duration"]
+statistics_summary_line_pattern = (
+    r'^\s*-- (States explored|States stored|CPU user time used|Virtual memory used|Resident memory used)\s*:.*\n?')
+
+
+class VerifierCallResult:
+    """The result of a single verifier call."""
+
+    def __init__(self, args, exit_status, stdout, stderr, duration, queue_duration, is_timeout, peak_rss=None):
+        """Initializes VerifierCallResult.
+
+        Args:
+            args: The arguments of the call.
+            exit_status: The exit status of the verifier process (negative if it was killed by a signal).
+            stdout: The captured standard output.
+            stderr: The captured standard error output.
+            duration: The duration (in seconds) of the verifier process.
+            queue_duration: The time (in seconds) the call waited for a free process slot.
+            is_timeout: Whether the call was aborted after the call timeout.
+            peak_rss: The peak RSS (in KB) of the verifier process, as reported by the kernel when it was reaped
+                (None if unknown).
+        """
+        self.args = args
+        self.exit_status = exit_status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.queue_duration = queue_duration
+        self.is_timeout = is_timeout
+        self.peak_rss = peak_rss
+
+    def get_log_data(self, max_output_length):
+        """Gets the log data of the call, in which the captured outputs are truncated.
+
+        Args:
+            max_output_length: The maximum number of logged characters per output (from its end).
+
+        Returns:
+            The log data.
+        """
+        return {
+            "args": self.args,
+            "exit_status": self.exit_status,
+            "is_timeout": self.is_timeout,
+            "durations": {"verifier": self.duration, "queue": self.queue_duration},
+            "peak_rss": self.peak_rss,
+            "stdout": self.stdout[-max_output_length:] if max_output_length else "",
+            "stderr": self.stderr[-max_output_length:] if max_output_length else "",
+            "stdout_length": len(self.stdout),
+            "stderr_length": len(self.stderr),
+        }
+
+
+########################################################################################################################
+# Verifier statistics #
+########################################################################################################################
+def parse_verifier_statistics(output):
+    """Parses the state space statistics from the output of a verifier call (with the summary option).
+
+    The numbers of explored and stored states are summed over all queries of the call, and the memory usage (in KB)
+    is the maximum reported by any query.
+
+    Args:
+        output: The standard output of the call.
+
+    Returns:
+        The statistics dict, or None if the output contains no statistics.
+    """
+    import re
+    statistics = {}
+    for key, pattern in verifier_statistics_patterns.items():
+        values = [int(value) for value in re.findall(pattern, output, re.MULTILINE)]
+        if values:
+            statistics[key] = sum(values) if key in summed_statistics_keys else max(values)
+    return statistics or None
+
+
+def strip_verifier_statistics(output):
+    """Removes the state space summary lines from the output of a verifier call.
+
+    Args:
+        output: The standard output of the call.
+
+    Returns:
+        The output without summary lines.
+    """
+    import re
+    return re.sub(statistics_summary_line_pattern, '', output, flags=re.MULTILINE)
+
+
+def get_model_dir_path(args):
+    """Gets the directory of the model file of a verifier call, in which the statistics of the call are recorded.
+
+    Args:
+        args: The arguments of the call.
+
+    Returns:
+        The directory path, or None if the arguments contain no existing model file.
+    """
+    for arg in args:
+        if os.path.splitext(arg)[1] in [".xml", ".xta"] and os.path.isfile(arg):
+            return os.path.dirname(os.path.abspath(arg))
+    return None
+
+
+########################################################################################################################
+# Call log records #
+########################################################################################################################
+_json_string_escapes = dict([(code, f'\\u{code:04x}') for code in range(0x20)]
+                            + [(ord('"'), '\\"'), (ord('\\'), '\\\\')])
+
+
+def encode_json_value(value):
+    """Encodes a value (of the types occurring in the call log records) as JSON, without importing the "json" module.
+
+    Args:
+        value: The value (None, a bool, number, string, list, or dict with string keys).
+
+    Returns:
+        The JSON string.
+    """
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value != value:
+            return 'NaN'
+        if value in [float('inf'), float('-inf')]:
+            return 'Infinity' if value > 0 else '-Infinity'
+        return repr(value)
+    if isinstance(value, str):
+        return f'"{value.translate(_json_string_escapes)}"'
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{encode_json_value(str(key))}:{encode_json_value(item)}'
+                              for key, item in value.items()) + '}'
+    return '[' + ','.join(encode_json_value(item) for item in value) + ']'
+
+
+def append_call_log_record(call_log_file_path, record):
+    """Appends a record to a call log (which is shared by all processes using the shim).
+
+    Args:
+        call_log_file_path: The path of the call log file.
+        record: The record dict.
+    """
+    with open(call_log_file_path, 'a', encoding="utf-8") as file:
+        fcntl.lockf(file, fcntl.LOCK_EX)
+        try:
+            file.write(encode_json_value(record) + '\n')
+        finally:
+            fcntl.lockf(file, fcntl.LOCK_UN)
+
+
+########################################################################################################################
+# Process slots #
+########################################################################################################################
+class VerifierSlot:
+    """A verifier process slot, which is held until it is released (or its context is left)."""
+
+    def __init__(self, slot_idx, slot_file):
+        """Initializes VerifierSlot.
+
+        Args:
+            slot_idx: The slot index.
+            slot_file: The locked slot file.
+        """
+        self.slot_idx = slot_idx
+        self.slot_file = slot_file
+
+    def release(self):
+        """Releases the slot."""
+        if self.slot_file is not None:
+            fcntl.flock(self.slot_file, fcntl.LOCK_UN)
+            self.slot_file.close()
+            self.slot_file = None
+
+    def __enter__(self):
+        return self.slot_idx
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class VerifierSlotPool:
+    """A node-wide pool of verifier process slots, which are held as exclusive (BSD) locks on slot files.
+
+    Since the locks are released by the operating system when a process dies, slots of crashed processes are never
+    lost. Calls which find no free slot queue up on the (blocking) lock of a queue file, so that only the call at the
+    head of the queue waits for a slot to be released, and no later call can take a released slot before it.
+    """
+
+    def __init__(self, slot_dir_path, slot_count, poll_interval=0.01):
+        """Initializes VerifierSlotPool.
+
+        Args:
+            slot_dir_path: The path of the (node-local) slot directory.
+            slot_count: The number of slots (i.e., of verifier processes which may run at once).
+            poll_interval: The time (in seconds) between two attempts of the head of the queue to acquire a slot.
+        """
+        self.slot_dir_path = str(slot_dir_path)
+        self.slot_count = max(1, slot_count)
+        self.poll_interval = poll_interval
+
+    def _try_acquire(self):
+        """Tries to acquire a free slot without waiting.
+
+        Returns:
+            The slot, or None if all slots are taken.
+        """
+        for slot_idx in range(0, self.slot_count):
+            slot_file = open(os.path.join(self.slot_dir_path, f'slot_{slot_idx:03}.lock'), 'a')
+            try:
+                fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                slot_file.close()
+                continue
+            return VerifierSlot(slot_idx=slot_idx, slot_file=slot_file)
+        return None
+
+    def acquire(self):
+        """Acquires a free slot, and waits in the queue until a slot is released if necessary.
+
+        Returns:
+            The slot (whose context yields the slot index).
+        """
+        os.makedirs(self.slot_dir_path, exist_ok=True)
+        with open(os.path.join(self.slot_dir_path, 'queue.lock'), 'a') as queue_file:
+            fcntl.flock(queue_file, fcntl.LOCK_EX)
+            try:
+                while True:
+                    slot = self._try_acquire()
+                    if slot is not None:
+                        return slot
+                    time.sleep(self.poll_interval)
+            finally:
+                fcntl.flock(queue_file, fcntl.LOCK_UN)
+
+
+########################################################################################################################
+# Verifier backends #
+########################################################################################################################
+def _get_parent_death_signal_setter():
+    """Gets the function which makes the current (child) process receive SIGKILL once its parent dies (Linux only), so
+    that verifier processes do not outlive a killed shim. It is loaded before the verifier process is forked, so that
+    no module is imported in the forked process.
+
+    Returns:
+        The function, or None if it is not available.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        libc = ctypes.CDLL("libc.so.6", use_errno=True)
+    except (OSError, AttributeError):
+        return None
+    pr_set_pdeathsig = 1
+    return lambda: libc.prctl(pr_set_pdeathsig, kill_signal_number)
+
+
+def run_verifier_process(command, timeout=None):
+    """Runs a verifier process, and captures its outputs (forking it directly, without the "subprocess" module).
+
+    Args:
+        command: The executable path and the arguments.
+        timeout: The timeout (in seconds), after which the process is killed (None waits until it finishes).
+
+    Returns:
+        The exit status (negative if the process was killed by a signal), the captured standard output and standard
+        error output (as bytes), whether the process was killed after the timeout, and the peak RSS (in KB) of the
+        process (and its reaped descendants), which the kernel reports when it is reaped.
+    """
+    set_parent_death_signal = _get_parent_death_signal_setter()
+    pipes = [os.pipe(), os.pipe()]
+    pid = os.fork()
+    if pid == 0:
+        try:
+            for target_fd, (_read_fd, write_fd) in zip([1, 2], pipes):
+                os.dup2(write_fd, target_fd)
+            for pipe_fd in [fd for pipe in pipes for fd in pipe]:
+                os.close(pipe_fd)
+            if set_parent_death_signal is not None:
+                set_parent_death_signal()
+            os.execv(command[0], command)
+        finally:
+            os._exit(127)
+
+    for _read_fd, write_fd in pipes:
+        os.close(write_fd)
+    outputs = dict((read_fd, []) for read_fd, _write_fd in pipes)
+    open_fds = list(outputs)
+    deadline = time.time() + timeout if timeout is not None else None
+    is_timeout = False
+    while open_fds:
+        if deadline is not None and time.time() >= deadline:
+            os.kill(pid, kill_signal_number)
+            deadline = None
+            is_timeout = True
+        readable_fds, _, _ = select.select(open_fds, [], [], None if deadline is None else deadline - time.time())
+        for fd in readable_fds:
+            chunk = os.read(fd, 1 << 16)
+            if chunk:
+                outputs[fd].append(chunk)
+            else:
+                open_fds.remove(fd)
+                os.close(fd)
+    _, wait_status, resource_usage = os.wait4(pid, 0)
+    stdout, stderr = [b''.join(outputs[read_fd]) for read_fd, _write_fd in pipes]
+    return os.waitstatus_to_exitcode(wait_status), stdout, stderr, is_timeout, resource_usage.ru_maxrss
+
+
+class SubprocessVerifierBackend:
+    """Launches the verifier executable as a subprocess in a slot of the slot pool, and captures its outputs."""
+
+    def __init__(self, executable_path, slot_pool, call_timeout=None):
+        """Initializes SubprocessVerifierBackend.
+
+        Args:
+            executable_path: The path of the verifier executable.
+            slot_pool: The verifier slot pool.
+            call_timeout: The timeout (in seconds) of each call (None waits until the verifier finishes).
+        """
+        self.executable_path = executable_path
+        self.slot_pool = slot_pool
+        self.call_timeout = call_timeout
+
+    def execute(self, args):
+        """Executes a verifier call.
+
+        Args:
+            args: The arguments of the call.
+
+        Returns:
+            The call result.
+        """
+        queue_start_time = time.time()
+        with self.slot_pool.acquire():
+            start_time = time.time()
+            exit_status, stdout, stderr, is_timeout, peak_rss = run_verifier_process(
+                command=[str(self.executable_path)] + list(args), timeout=self.call_timeout)
+            end_time = time.time()
+        return VerifierCallResult(
+            args=list(args), exit_status=timeout_exit_status if is_timeout else exit_status,
+            stdout=stdout.decode("utf-8", errors="replace"), stderr=stderr.decode("utf-8", errors="replace"),
+            duration=end_time - start_time, queue_duration=start_time - queue_start_time, is_timeout=is_timeout,
+            peak_rss=peak_rss)
+
+
+verifier_backend_classes = {
+    "subprocess": SubprocessVerifierBackend,
+}
+
+
+def create_verifier_backend(verifier_backend_config):
+    """Creates the verifier backend of a verifier backend configuration.
+
+    Args:
+        verifier_backend_config: The verifier backend configuration (with a set "executable_path").
+
+    Returns:
+        The verifier backend.
+    """
+    backend_class = verifier_backend_classes[verifier_backend_config["backend"]]
+    slot_pool = VerifierSlotPool(slot_dir_path=verifier_backend_config["slot_dir_path"],
+                                 slot_count=verifier_backend_config["max_process_count"])
+    return backend_class(executable_path=verifier_backend_config["executable_path"], slot_pool=slot_pool,
+                         call_timeout=verifier_backend_config["call_timeout"])
+
+
+########################################################################################################################
+# Verifier shim #
+########################################################################################################################
+def run_verifier_shim(backend_config, args, start_time):
+    """Executes a verifier call via the verifier backend (executed by the shim script).
+
+    Besides the call log record, a record of the call (with its statistics, if collected) is appended next to its
+    model file, which holds the durations of the verifier process, of the wait for a free slot, and of the shim itself
+    (from the start of the shim script until the record is written, without the process and the wait), so that the
+    matching durations measured by the caller can be told apart from the overhead of the shim, and the peak RSS of
+    the verifier process.
+
+    Args:
+        backend_config: The backend configuration of the shim.
+        args: The arguments of the call.
+        start_time: The time at which the shim script was started.
+
+    Returns:
+        The exit status of the call.
+    """
+    is_statistics_arg_added = backend_config.get("collect_statistics", False) and statistics_arg not in args
+    if is_statistics_arg_added:
+        args = [statistics_arg] + list(args)
+    result = create_verifier_backend(verifier_backend_config=backend_config).execute(args=args)
+    statistics = None
+    if backend_config.get("collect_statistics", False):
+        statistics = parse_verifier_statistics(output=result.stdout)
+    if is_statistics_arg_added:
+        result.stdout = strip_verifier_statistics(output=result.stdout)
+    sys.stdout.write(result.stdout)
+    sys.stderr.write(result.stderr)
+    if result.is_timeout:
+        sys.stderr.write(f'Verifier call timed out after {backend_config["call_timeout"]} seconds.\n')
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    record = result.get_log_data(max_output_length=backend_config["max_logged_output_length"])
+    record["time"] = time.time()
+    record["caller_pid"] = os.getppid()
+    record["statistics"] = statistics
+    append_call_log_record(call_log_file_path=backend_config["call_log_file_path"], record=record)
+    model_dir_path = get_model_dir_path(args=args)
+    if model_dir_path is not None:
+        shim_duration = time.time() - start_time - result.duration - result.queue_duration
+        append_call_log_record(call_log_file_path=os.path.join(model_dir_path, statistics_file_name), record={
+            "time": record["time"], "duration": result.duration, "queue_duration": result.queue_duration,
+            "shim_duration": shim_duration, "peak_rss": result.peak_rss, "statistics": statistics})
+    return result.exit_status if result.exit_status >= 0 else 128 - result.exit_status
@@ -0,0 +1,307 @@
+"""This module implements a file-locked SQLite work queue, which distributes experiment runs across worker processes
+(on one or several nodes sharing a file system)."""
+import contextlib
+import fcntl
+import json
+import os
+import pathlib
+import pickle
+import socket
+import sqlite3
+import time
+
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.observation_series import \
+    encode_observation_series
+
+########################################################################################################################
+# Queue configurations #
+########################################################################################################################
+pending_state = "pending"
+leased_state = "leased"
+done_state = "done"
+failed_state = "failed"
+
+queue_schema = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    scenario_key TEXT PRIMARY KEY,
+    scenario BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scenario_key TEXT NOT NULL,
+    run_idx INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    worker_id TEXT,
+    lease_expiry REAL,
+    attempt_count INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    is_collected INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (scenario_key, run_idx)
+);
+CREATE INDEX IF NOT EXISTS tasks_state_index ON tasks (state, task_id);
+"""
+
+
+def get_worker_id():
+    """Gets an ID of the current worker process which is unique across nodes.
+
+    Returns:
+        The worker ID.
+    """
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def get_scenario_key(scenario):
+    """Gets the queue key of a scenario, which changes whenever the scenario configuration changes.
+
+    Args:
+        scenario: The scenario data.
+
+    Returns:
+        The scenario key.
+    """
+    return f'{scenario["id"]}#{scenario["config_fingerprint"]}'
+
+
+class QueueTask:
+    """A task (i.e., a single scenario run) claimed from the work queue."""
+
+    def __init__(self, task_id, scenario, run_idx, attempt_count):
+        """Initializes QueueTask.
+
+        Args:
+            task_id: The task ID.
+            scenario: The scenario data.
+            run_idx: The run index.
+            attempt_count: The number of attempts (including the current one).
+        """
+        self.task_id = task_id
+        self.scenario = scenario
+        self.run_idx = run_idx
+        self.attempt_count = attempt_count
+
+
+########################################################################################################################
+# Work queue #
+########################################################################################################################
+class WorkQueue:
+    """A work queue of scenario runs, stored in an SQLite database file.
+
+    Since the locking of SQLite is unreliable on network file systems, every transaction is additionally guarded by
+    an exclusive POSIX lock on a separate lock file, and the database uses a rollback journal (instead of WAL). Tasks
+    are leased by the claiming worker; if a worker crashes, its lease expires and the task is claimed again. Lease
+    expiry relies on the clocks of the participating nodes being roughly synchronized.
+    """
+
+    def __init__(self, queue_file_path, lease_duration=300, max_attempt_count=3):
+        """Initializes WorkQueue.
+
+        Args:
+            queue_file_path: The path of the queue database file.
+            lease_duration: The duration (in seconds) of a task lease, which must be renewed while a task is executed.
+            max_attempt_count: The maximum number of attempts per task before it is marked as failed.
+        """
+        self.queue_file_path = pathlib.Path(queue_file_path)
+        self.lock_file_path = self.queue_file_path.with_name(f'{self.queue_file_path.name}.lock')
+        self.lease_duration = lease_duration
+        self.max_attempt_count = max_attempt_count
+        self.queue_file_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as connection:
+            for statement in queue_schema.split(";"):
+                if statement.strip():
+                    connection.execute(statement)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Opens an exclusive transaction on the queue database.
+
+        Yields:
+            The database connection.
+        """
+        with open(self.lock_file_path, 'a') as lock_file:
+            fcntl.lockf(lock_file, fcntl.LOCK_EX)
+            try:
+                connection = sqlite3.connect(str(self.queue_file_path), timeout=60, isolation_level=None)
+                try:
+                    connection.execute("PRAGMA journal_mode=DELETE")
+                    connection.execute("BEGIN IMMEDIATE")
+                    try:
+                        yield connection
+                    except BaseException:
+                        connection.execute("ROLLBACK")
+                        raise
+                    connection.execute("COMMIT")
+                finally:
+                    connection.close()
+            finally:
+                fcntl.lockf(lock_file, fcntl.LOCK_UN)
+
+    def submit(self, scenarios, resume=False):
+        """Submits the runs (given by the "run_indices") of the given scenarios.
+
+        Runs which are already queued are kept (with their state), except that failed runs are retried. Since the
+        scenario key only depends on the scenario configuration, runs which were finished before (e.g., by an earlier
+        execution of the same scenarios) are executed again, unless the submitter resumes, in which case their
+        results are handed out again by "collect_results()" instead.
+
+        Args:
+            scenarios: The scenario data list.
+            resume: Choose whether the results of runs which were finished before are reused.
+        """
+        with self._transaction() as connection:
+            for scenario in scenarios:
+                scenario_key = get_scenario_key(scenario=scenario)
+                connection.execute("INSERT OR IGNORE INTO scenarios (scenario_key, scenario) VALUES (?, ?)",
+                                   (scenario_key, pickle.dumps(scenario, protocol=pickle.HIGHEST_PROTOCOL)))
+                for run_idx in scenario["run_indices"]:
+                    connection.execute(
+                        "INSERT OR IGNORE INTO tasks (scenario_key, run_idx, state) VALUES (?, ?, ?)",
+                        (scenario_key, run_idx, pending_state))
+                    connection.execute(
+                        "UPDATE tasks SET state = ?, attempt_count = 0, error = NULL "
+                        "WHERE scenario_key = ? AND run_idx = ? AND state = ?",
+                        (pending_state, scenario_key, run_idx, failed_state))
+                    if resume:
+                        connection.execute(
+                            "UPDATE tasks SET is_collected = 0 WHERE scenario_key = ? AND run_idx = ?",
+                            (scenario_key, run_idx))
+                    else:
+                        connection.execute(
+                            "UPDATE tasks SET state = ?, worker_id = NULL, lease_expiry = NULL, attempt_count = 0, "
+                            "result = NULL, error = NULL, is_collected = 0 "
+                            "WHERE scenario_key = ? AND run_idx = ? AND state = ?",
+                            (pending_state, scenario_key, run_idx, done_state))
+
+    def claim(self, worker_id):
+        """Claims the next open task (i.e., a pending task or a task whose lease expired).
+
+        Args:
+            worker_id: The ID of the claiming worker.
+
+        Returns:
+            The claimed task, or None if no task is open.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE tasks SET state = ?, error = ? WHERE state = ? AND lease_expiry < ? AND attempt_count >= ?",
+                (failed_state, "Lease expired too often", leased_state, now, self.max_attempt_count))
+            row = connection.execute(
+                "SELECT tasks.task_id, tasks.run_idx, tasks.attempt_count, scenarios.scenario FROM tasks "
+                "JOIN scenarios ON tasks.scenario_key = scenarios.scenario_key "
+                "WHERE tasks.state = ? OR (tasks.state = ? AND tasks.lease_expiry < ?) "
+                "ORDER BY tasks.task_id LIMIT 1",
+                (pending_state, leased_state, now)).fetchone()
+            if row is None:
+                return None
+            task_id, run_idx, attempt_count, scenario_data = row
+            connection.execute(
+                "UPDATE tasks SET state = ?, worker_id = ?, lease_expiry = ?, attempt_count = ? WHERE task_id = ?",
+                (leased_state, worker_id, now + self.lease_duration, attempt_count + 1, task_id))
+        return QueueTask(task_id=task_id, scenario=pickle.loads(scenario_data), run_idx=run_idx,
+                         attempt_count=attempt_count + 1)
+
+    def renew_lease(self, task_id, worker_id):
+        """Renews the lease of a task claimed by the given worker.
+
+        Args:
+            task_id: The task ID.
+            worker_id: The ID of the worker holding the lease.
+
+        Returns:
+            True if the lease was renewed, False if the worker no longer holds the lease.
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE tasks SET lease_expiry = ? WHERE task_id = ? AND state = ? AND worker_id = ?",
+                (time.time() + self.lease_duration, task_id, leased_state, worker_id))
+        return cursor.rowcount > 0
+
+    def complete(self, task_id, run_log_data):
+        """Stores the result of a task and marks it as done.
+
+        The result is accepted even if the lease already expired, as long as no other worker finished the task first.
+
+        Args:
+            task_id: The task ID.
+            run_log_data: The run log data (which must be JSON-serializable, besides observation series).
+        """
+        result = json.dumps(run_log_data, separators=(',', ':'), default=encode_observation_series)
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE tasks SET state = ?, result = ?, error = NULL WHERE task_id = ? AND state != ?",
+                (done_state, result, task_id, done_state))
+
+    def fail(self, task_id, worker_id, error):
+        """Releases a task after a failed attempt, which marks it as failed if no attempts are left.
+
+        Args:
+            task_id: The task ID.
+            worker_id: The ID of the worker holding the lease.
+            error: The error description.
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE tasks SET state = CASE WHEN attempt_count >= ? THEN ? ELSE ? END, error = ?, "
+                "worker_id = NULL, lease_expiry = NULL WHERE task_id = ? AND state = ? AND worker_id = ?",
+                (self.max_attempt_count, failed_state, pending_state, error, task_id, leased_state, worker_id))
+
+    def collect_results(self, scenarios, max_result_count=100):
+        """Collects the results of finished runs of the given scenarios, which were not collected before.
+
+        Args:
+            scenarios: The scenario data list.
+            max_result_count: The maximum number of collected results.
+
+        Returns:
+            A list of (scenario ID, run index, run log data) tuples.
+        """
+        scenario_ids = dict((get_scenario_key(scenario=scenario), scenario["id"]) for scenario in scenarios)
+        collected_results = []
+        with self._transaction() as connection:
+            connection.execute("CREATE TEMP TABLE collected_scenario_keys (scenario_key TEXT PRIMARY KEY)")
+            connection.executemany("INSERT INTO collected_scenario_keys VALUES (?)",
+                                   [(scenario_key,) for scenario_key in scenario_ids])
+            rows = connection.execute(
+                "SELECT task_id, scenario_key, run_idx, result FROM tasks WHERE state = ? AND is_collected = 0 AND "
+                "scenario_key IN (SELECT scenario_key FROM collected_scenario_keys) ORDER BY task_id LIMIT ?",
+                (done_state, max_result_count)).fetchall()
+            for task_id, scenario_key, run_idx, result in rows:
+                connection.execute("UPDATE tasks SET is_collected = 1 WHERE task_id = ?", (task_id,))
+                collected_results.append((scenario_ids[scenario_key], run_idx, json.loads(result)))
+        return collected_results
+
+    def get_failed_tasks(self, scenarios):
+        """Gets the failed tasks of the given scenarios.
+
+        Args:
+            scenarios: The scenario data list.
+
+        Returns:
+            A list of (scenario key, run index, error) tuples.
+        """
+        scenario_keys = set(get_scenario_key(scenario=scenario) for scenario in scenarios)
+        with self._transaction() as connection:
+            rows = connection.execute("SELECT scenario_key, run_idx, error FROM tasks WHERE state = ?",
+                                      (failed_state,)).fetchall()
+        return [row for row in rows if row[0] in scenario_keys]
+
+    def get_state_counts(self):
+        """Gets the number of tasks per state.
+
+        Returns:
+            The task counts per state.
+        """
+        with self._transaction() as connection:
+            rows = connection.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+        return dict(rows)
+
+    def get_open_task_count(self):
+        """Gets the number of tasks which are pending or leased.
+
+        Returns:
+            The number of open tasks.
+        """
+        state_counts = self.get_state_counts()
+        return state_counts.get(pending_state, 0) + state_counts.get(leased_state, 0)
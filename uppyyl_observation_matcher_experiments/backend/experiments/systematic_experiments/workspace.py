@@ -0,0 +1,126 @@
+"""This module implements isolated (and optionally memory-backed) workspaces for experiment runs."""
+import os
+import pathlib
+import shutil
+import tempfile
+
+########################################################################################################################
+# Workspace configurations #
+########################################################################################################################
+memory_backed_dir_path = pathlib.Path("/dev/shm")
+failure_marker_file_name = "FAILED"
+
+
+########################################################################################################################
+# Workspaces #
+########################################################################################################################
+class Workspace:
+    """A unique directory for the temporary model and trace files of a run."""
+
+    def __init__(self, dir_path, keep_on_failure=False):
+        """Initializes Workspace.
+
+        Args:
+            dir_path: The path of the workspace directory.
+            keep_on_failure: Choose whether the directory is kept if the workspace is closed after a failure.
+        """
+        self.dir_path = dir_path
+        self.keep_on_failure = keep_on_failure
+        self.is_failed = False
+        self.is_closed = False
+
+    def mark_failed(self):
+        """Marks the workspace as failed, so that it is kept for debugging if configured."""
+        self.is_failed = True
+        if self.keep_on_failure and self.dir_path.exists():
+            self.dir_path.joinpath(failure_marker_file_name).touch()
+
+    def close(self):
+        """Closes the workspace and removes its directory (unless it is kept after a failure)."""
+        if self.is_closed:
+            return
+        self.is_closed = True
+        if self.is_failed and self.keep_on_failure:
+            return
+        shutil.rmtree(self.dir_path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.mark_failed()
+        self.close()
+        return False
+
+
+class WorkspaceManager:
+    """Creates unique workspace directories below a common session directory, and cleans them up.
+
+    If a memory-backed root is requested and available (i.e., "/dev/shm"), all workspaces are placed on the tmpfs,
+    which keeps the frequent model and trace writes off the (potentially slow) disk of the experiment directory.
+    The manager only holds plain data, so that it can be handed to worker processes.
+    """
+
+    def __init__(self, base_dir_path, use_memory_backed_root=False, keep_on_failure=False):
+        """Initializes WorkspaceManager.
+
+        Args:
+            base_dir_path: The path of the base directory used if no memory-backed root is used.
+            use_memory_backed_root: Choose whether the workspaces are placed on a memory-backed file system.
+            keep_on_failure: Choose whether workspaces of failed runs are kept for debugging.
+        """
+        self.base_dir_path = pathlib.Path(base_dir_path)
+        self.use_memory_backed_root = use_memory_backed_root
+        self.keep_on_failure = keep_on_failure
+        self.session_dir_path = None
+
+    @property
+    def root_dir_path(self):
+        """The path of the root directory of all sessions."""
+        is_memory_backed_dir_usable = memory_backed_dir_path.is_dir() and os.access(memory_backed_dir_path, os.W_OK)
+        if self.use_memory_backed_root and is_memory_backed_dir_usable:
+            return memory_backed_dir_path.joinpath("uppyyl_observation_matcher_experiments")
+        return self.base_dir_path.joinpath("workspaces")
+
+    def open_session(self):
+        """Opens a new session directory in which all subsequent workspaces are created.
+
+        Returns:
+            The path of the session directory.
+        """
+        root_dir_path = self.root_dir_path
+        root_dir_path.mkdir(parents=True, exist_ok=True)
+        self.session_dir_path = pathlib.Path(tempfile.mkdtemp(prefix=f'session_{os.getpid()}_', dir=root_dir_path))
+        return self.session_dir_path
+
+    def create_workspace(self, name):
+        """Creates a new unique workspace.
+
+        Args:
+            name: A descriptive name used as prefix of the workspace directory name.
+
+        Returns:
+            The workspace.
+        """
+        if self.session_dir_path is None:
+            self.open_session()
+        safe_name = "".join(c if (c.isalnum() or c in "-_") else "_" for c in name)
+        dir_path = pathlib.Path(tempfile.mkdtemp(prefix=f'{safe_name}_', dir=self.session_dir_path))
+        return Workspace(dir_path=dir_path, keep_on_failure=self.keep_on_failure)
+
+    def cleanup(self):
+        """Removes the session directory, except for the workspaces of failed runs if these should be kept."""
+        session_dir_path = self.session_dir_path
+        if session_dir_path is None or not session_dir_path.exists():
+            return
+        if self.keep_on_failure:
+            for workspace_dir_path in session_dir_path.iterdir():
+                if workspace_dir_path.joinpath(failure_marker_file_name).exists():
+                    print(f'Workspace "{workspace_dir_path}" of failed run kept for debugging.')
+                else:
+                    shutil.rmtree(workspace_dir_path, ignore_errors=True)
+            if any(session_dir_path.iterdir()):
+                return
+        shutil.rmtree(session_dir_path, ignore_errors=True)
+        self.session_dir_path = None
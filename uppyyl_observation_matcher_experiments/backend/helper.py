@@ -8,6 +8,22 @@ import numpy as np
 
 from uppyyl_observation_matcher.backend.helper import parse_config_value
 
+# The two-sided critical values of the Student's t-distribution for 1 to 30 degrees of freedom (for larger degrees of
+# freedom, they are approximated from the critical values of the normal distribution)
+t_distribution_critical_values = {
+    0.90: [6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833, 1.812,
+           1.796, 1.782, 1.771, 1.761, 1.753, 1.746, 1.740, 1.734, 1.729, 1.725,
+           1.721, 1.717, 1.714, 1.711, 1.708, 1.706, 1.703, 1.701, 1.699, 1.697],
+    0.95: [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+           2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+           2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042],
+    0.99: [63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250, 3.169,
+           3.106, 3.055, 3.012, 2.977, 2.947, 2.921, 2.898, 2.878, 2.861, 2.845,
+           2.831, 2.819, 2.807, 2.797, 2.787, 2.779, 2.771, 2.763, 2.756, 2.750],
+}
+normal_distribution_critical_values = {0.90: 1.644854, 0.95: 1.959964, 0.99: 2.575829}
+supported_confidence_levels = tuple(t_distribution_critical_values)
+
 
 def load_and_parse_config(config_file_path):
     """Load and parse the configuration file for the observation matcher.
@@ -63,6 +79,57 @@ def calculate_min_max_avg_float(vals):
     return val_min, val_max, val_avg
 
 
+def get_t_distribution_critical_value(degrees_of_freedom, confidence_level):
+    """Gets the two-sided critical value of the Student's t-distribution.
+
+    Up to 30 degrees of freedom, the tabulated values are used. For larger degrees of freedom, the value is
+    approximated by the Cornish-Fisher expansion around the critical value of the normal distribution (which deviates
+    less than 0.001 from the exact value there).
+
+    Args:
+        degrees_of_freedom: The degrees of freedom (at least 1).
+        confidence_level: The confidence level (0.90, 0.95, or 0.99).
+
+    Returns:
+        The critical value.
+
+    Raises:
+        ValueError: If the confidence level is not supported, or the degrees of freedom are less than 1.
+    """
+    if confidence_level not in t_distribution_critical_values:
+        raise ValueError(f'Unsupported confidence level {confidence_level} (supported confidence levels: '
+                         f'{", ".join(str(level) for level in supported_confidence_levels)})')
+    if degrees_of_freedom < 1:
+        raise ValueError(f'The critical value requires at least 1 degree of freedom (got {degrees_of_freedom})')
+    if degrees_of_freedom <= len(t_distribution_critical_values[confidence_level]):
+        return t_distribution_critical_values[confidence_level][degrees_of_freedom - 1]
+    z = normal_distribution_critical_values[confidence_level]
+    df = degrees_of_freedom
+    return (z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+
+def calculate_confidence_interval_float(vals, confidence_level=0.95):
+    """Calculates the confidence interval of the mean of a given list (based on the Student's t-distribution).
+
+    Args:
+        vals: The value list (containing at least two values).
+        confidence_level: The confidence level (0.90, 0.95, or 0.99).
+
+    Returns:
+        The lower and upper bound of the confidence interval.
+
+    Raises:
+        ValueError: If the confidence level is not supported, or fewer than two values are given.
+    """
+    val_count = len(vals)
+    critical_value = get_t_distribution_critical_value(degrees_of_freedom=val_count - 1,
+                                                       confidence_level=confidence_level)
+    val_avg = float(np.average(vals))
+    half_width = critical_value * float(np.std(vals, ddof=1)) / float(np.sqrt(val_count))
+    return val_avg - half_width, val_avg + half_width
+
+
 def get_model_details(uppyyl_simulator, model_data):
     """Get the details (e.g., component counts) of a model.
 
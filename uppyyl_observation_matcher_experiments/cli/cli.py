@@ -1,6 +1,8 @@
 """This module implements a CLI for the Uppaal observation matcher experiments."""
+import copy
 import glob
 import os
+import pathlib
 import readline
 import shlex
 from cmd import Cmd
@@ -10,8 +12,24 @@ from colorama import Fore
 
 from uppyyl_observation_matcher_experiments.backend.experiments.introduction_example.introduction_example import \
     experiment_introduction_example
+from uppyyl_observation_matcher_experiments.backend.experiments.online_monitoring.online_monitor import \
+    default_monitor_config, monitor_observation_stream, stdin_source
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.adaptive_run_counts import \
+    default_adaptive_run_config, validate_adaptive_run_config
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.budget_planner import \
+    default_time_budget_config, format_duration, parse_duration
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.early_termination import \
+    default_early_termination_config
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.experiment_driver import \
+    ExperimentDriver, run_experiment_functions
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.memory_sampler import \
+    default_memory_sampling_config, is_memory_sampling_supported
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.result_cache import \
+    default_result_cache_config
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.systematic_experiments import \
     SystematicExperiments
+from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.verifier_backend import \
+    default_verifier_backend_config
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.plots import Plots
 from uppyyl_observation_matcher_experiments.definitions import RES_DIR
 
@@ -47,6 +65,7 @@ class UppaalObservationMatcherExperimentsCLI(Cmd):
         plot_output_dir_path = experiment_log_dir_path.joinpath("plots")
 
         self.experiments = SystematicExperiments(experiment_base_dir_path, experiment_log_dir_path)
+        self.experiment_driver = ExperimentDriver(task_dir_path=experiment_log_dir_path.joinpath("tasks"))
         self.plots = Plots(experiment_log_dir_path=experiment_log_dir_path, plot_output_dir_path=plot_output_dir_path)
         self.all_experiment_data = {
             "exp.examples.introduction": {
@@ -106,6 +125,14 @@ class UppaalObservationMatcherExperimentsCLI(Cmd):
                 "function": self.plots.create_plot_for_compare_performance_of_observation_sizes_and_extents,
                 "description": "Creates the plot for performance comparison of different observation sizes and extents"
             },
+            "plot.obs_sizes_and_extents_states": {
+                "function": self.plots.create_plot_for_verifier_statistics_of_observation_sizes_and_extents,
+                "description": "Creates the plot of the explored states for different observation sizes and extents"
+            },
+            "plot.phase_durations": {
+                "function": self.plots.create_csv_file_for_phase_durations,
+                "description": "Creates the CSV file of the phase durations of the runs, and shows the dominant phases"
+            },
         }
 
         self.active_view = View.EXPERIMENTS
@@ -226,23 +253,313 @@ class UppaalObservationMatcherExperimentsCLI(Cmd):
             is_file, choices = _complete_path(text)
         return choices
 
-    def do_run(self, arg):
-        """Performs the "run" command."""
+    def do_set_workers(self, arg):
+        """Performs the "set_workers" command."""
+        try:
+            worker_count = int(arg)
+        except ValueError:
+            worker_count = 0
+        if worker_count < 1:
+            self.print_view(message=f'{Fore.RED}"{arg}" is not a valid worker count.{Fore.RESET}')
+            return
+
+        self.experiments.worker_count = worker_count
+        self.print_view(message=f'Experiment worker count set to {worker_count}.')
+
+    @staticmethod
+    def help_set_workers():
+        """Shows help for the "set_workers" command."""
+        print('Sets the number of worker processes used for the experiment runs (default: 1).')
+
+    def do_set_adaptive_runs(self, arg):
+        """Performs the "set_adaptive_runs" command."""
+        args = shlex.split(arg)
+        if args == ["off"]:
+            self.experiments.adaptive_run_config = None
+            self.print_view(message=f'Adaptive run counts disabled.')
+            return
+
+        adaptive_run_config = copy.deepcopy(default_adaptive_run_config)
+        try:
+            if args:
+                min_run_count, max_run_count, target_relative_ci_width = args
+                adaptive_run_config["min_run_count"] = int(min_run_count)
+                adaptive_run_config["max_run_count"] = int(max_run_count)
+                adaptive_run_config["target_relative_ci_width"] = float(target_relative_ci_width)
+        except ValueError:
+            self.print_view(message=f'{Fore.RED}"{arg}" are not valid adaptive run count settings.{Fore.RESET}')
+            return
+        try:
+            validate_adaptive_run_config(adaptive_run_config=adaptive_run_config)
+        except ValueError as error:
+            self.print_view(message=f'{Fore.RED}{error}.{Fore.RESET}')
+            return
+
+        self.experiments.adaptive_run_config = adaptive_run_config
+        self.print_view(message=f'Adaptive run counts enabled ({adaptive_run_config["min_run_count"]} to '
+                                f'{adaptive_run_config["max_run_count"]} runs, target relative CI width '
+                                f'{adaptive_run_config["target_relative_ci_width"]}).')
+
+    @staticmethod
+    def help_set_adaptive_runs():
+        """Shows help for the "set_adaptive_runs" command."""
+        print('Repeats the runs of each scenario until the confidence interval of the matching duration is within the '
+              'target relative width ("set_adaptive_runs [min max target_width]", or "set_adaptive_runs off" for the '
+              'fixed run counts).')
+
+    def do_set_early_termination(self, arg):
+        """Performs the "set_early_termination" command."""
         args = shlex.split(arg)
-        exp_names = args
+        if args == ["off"]:
+            self.experiments.early_termination_config = None
+            self.print_view(message=f'Early termination of size sweeps disabled.')
+            return
+
+        early_termination_config = copy.deepcopy(default_early_termination_config)
+        try:
+            if args:
+                early_termination_config["max_timeout_fraction"] = float(args[0])
+            if len(args) > 1:
+                early_termination_config["mode"] = args[1]
+        except ValueError:
+            self.print_view(message=f'{Fore.RED}"{arg}" are not valid early termination settings.{Fore.RESET}')
+            return
+        if early_termination_config["mode"] not in ["skip", "sparse"] or len(args) > 2:
+            self.print_view(message=f'{Fore.RED}"{arg}" are not valid early termination settings.{Fore.RESET}')
+            return
+
+        self.experiments.early_termination_config = early_termination_config
+        self.print_view(message=f'Early termination of size sweeps enabled (timeout fraction '
+                                f'{early_termination_config["max_timeout_fraction"]}, '
+                                f'mode "{early_termination_config["mode"]}").')
+
+    @staticmethod
+    def help_set_early_termination():
+        """Shows help for the "set_early_termination" command."""
+        print('Skips ("skip") or sparsely samples ("sparse") the larger sizes of the observation size and extent '
+              'sweeps of a model once the given fraction of runs of a size timed out ("set_early_termination [fraction '
+              '[skip|sparse]]", or "set_early_termination off").')
+
+    def do_set_budget(self, arg):
+        """Performs the "set_budget" command."""
+        if arg.strip() == "off":
+            self.experiments.time_budget_config = None
+            self.print_view(message=f'Time budget disabled.')
+            return
+        try:
+            time_budget = parse_duration(arg)
+        except ValueError:
+            time_budget = 0
+        if time_budget <= 0:
+            self.print_view(message=f'{Fore.RED}"{arg}" is not a valid time budget.{Fore.RESET}')
+            return
+
+        self.experiments.time_budget_config = dict(copy.deepcopy(default_time_budget_config), time_budget=time_budget)
+        self.print_view(message=f'Time budget set to {format_duration(time_budget)}.')
+
+    @staticmethod
+    def help_set_budget():
+        """Shows help for the "set_budget" command."""
+        print('Sets a wall-clock time budget (e.g., "set_budget 4h") for the next "run", which is shared by the '
+              'selected experiments; the run counts are planned from the durations of the existing logs ("off" '
+              'disables it).')
+
+    def do_set_verifier_pool(self, arg):
+        """Performs the "set_verifier_pool" command."""
+        if arg.strip() == "off":
+            self.experiments.verifier_backend_config = None
+            self.print_view(message=f'Verifier pool disabled.')
+            return
+        args = arg.split()
+        collect_statistics = "stats" in args
+        args = [a for a in args if a != "stats"]
+        try:
+            max_process_count = int(args[0]) if args else default_verifier_backend_config["max_process_count"]
+        except ValueError:
+            max_process_count = 0
+        if max_process_count < 1 or len(args) > 1:
+            self.print_view(message=f'{Fore.RED}"{arg}" is not a valid verifier process count.{Fore.RESET}')
+            return
+
+        self.experiments.verifier_backend_config = dict(
+            copy.deepcopy(default_verifier_backend_config), max_process_count=max_process_count,
+            collect_statistics=collect_statistics)
+        self.print_view(message=f'Verifier pool enabled (at most {max_process_count} verifier processes per node'
+                                f'{", collecting statistics" if collect_statistics else ""}).')
+
+    @staticmethod
+    def help_set_verifier_pool():
+        """Shows help for the "set_verifier_pool" command."""
+        print('Executes all verifier calls via the verifier backend, which runs at most the given number of verifier '
+              'processes per node at once, and with "stats", records the state space statistics of each matching '
+              '("set_verifier_pool [count] [stats]", or "set_verifier_pool off").')
+
+    def do_set_batch_concurrency(self, arg):
+        """Performs the "set_batch_concurrency" command."""
+        try:
+            batch_concurrency = int(arg)
+        except ValueError:
+            batch_concurrency = 0
+        if batch_concurrency < 1:
+            self.print_view(message=f'{Fore.RED}"{arg}" is not a valid batch concurrency.{Fore.RESET}')
+            return
+
+        self.experiments.batch_concurrency = batch_concurrency
+        self.print_view(message=f'Batch matching concurrency set to {batch_concurrency}.')
+
+    @staticmethod
+    def help_set_batch_concurrency():
+        """Shows help for the "set_batch_concurrency" command."""
+        print('Sets the number of observations matched at once against a prepared matcher per worker in experiments '
+              '1 and 3 (default: 1).')
+
+    def do_set_result_cache(self, arg):
+        """Performs the "set_result_cache" command."""
+        mode = arg.strip() or "on"
+        if mode == "off":
+            self.experiments.result_cache_config = None
+            self.print_view(message=f'Match result cache disabled.')
+            return
+        if mode not in ["on", "timing"]:
+            self.print_view(message=f'{Fore.RED}"{arg}" is not a valid result cache mode.{Fore.RESET}')
+            return
+
+        self.experiments.result_cache_config = dict(
+            copy.deepcopy(default_result_cache_config), bypass_timing_runs=(mode == "on"))
+        if mode == "on":
+            self.print_view(message=f'Match result cache enabled (bypassed by timing runs).')
+        else:
+            self.print_view(message=f'Match result cache enabled (including timing runs).')
+
+    @staticmethod
+    def help_set_result_cache():
+        """Shows help for the "set_result_cache" command."""
+        print('Reuses the results of recurring observations instead of matching them again; "on" bypasses the cache '
+              'for the runs of timing experiments, "timing" uses it for all runs ("set_result_cache [on|timing|off]").')
+
+    def do_set_prefilter(self, arg):
+        """Performs the "set_prefilter" command."""
+        mode = arg.strip() or "on"
+        if mode not in ["on", "off"]:
+            self.print_view(message=f'{Fore.RED}"{arg}" is not a valid pre-filter mode.{Fore.RESET}')
+            return
+
+        self.experiments.use_observation_prefilter = (mode == "on")
+        self.print_view(message=f'Observation pre-filter {"enabled" if mode == "on" else "disabled"}.')
+
+    @staticmethod
+    def help_set_prefilter():
+        """Shows help for the "set_prefilter" command."""
+        print('Rejects the observations of experiment 1 which violate statically derived necessary conditions of the '
+              'model (e.g., never assigned values or unreachable locations) without verifying them ("set_prefilter '
+              '[on|off]").')
+
+    def do_set_memory_sampling(self, arg):
+        """Performs the "set_memory_sampling" command."""
+        if arg.strip() == "off":
+            self.experiments.memory_sampling_config = None
+            self.print_view(message=f'Memory sampling disabled.')
+            return
+        if not is_memory_sampling_supported():
+            self.print_view(message=f'{Fore.RED}Memory sampling requires the "/proc" file system.{Fore.RESET}')
+            return
+        try:
+            sample_interval = float(arg) if arg.strip() else default_memory_sampling_config["sample_interval"]
+        except ValueError:
+            sample_interval = 0
+        if sample_interval <= 0:
+            self.print_view(message=f'{Fore.RED}"{arg}" is not a valid sample interval.{Fore.RESET}')
+            return
+
+        self.experiments.memory_sampling_config = dict(
+            copy.deepcopy(default_memory_sampling_config), sample_interval=sample_interval)
+        self.print_view(message=f'Memory sampling enabled (every {sample_interval} seconds).')
+
+    @staticmethod
+    def help_set_memory_sampling():
+        """Shows help for the "set_memory_sampling" command."""
+        print('Samples the RSS of the verifier processes during each matching, and records its peak and time-weighted '
+              'average in the run logs and scenario summaries ("set_memory_sampling [interval]" or '
+              '"set_memory_sampling off").')
+
+    def do_set_queue(self, arg):
+        """Performs the "set_queue" command."""
+        queue_file_path = arg.strip()
+        if queue_file_path and not os.path.isdir(os.path.dirname(os.path.abspath(queue_file_path))):
+            self.print_view(message=f'{Fore.RED}The directory of "{queue_file_path}" does not exist.{Fore.RESET}')
+            return
+
+        self.experiments.work_queue_file_path = queue_file_path if queue_file_path else None
+        if queue_file_path:
+            self.print_view(message=f'Experiment work queue "{queue_file_path}" set successfully.')
+        else:
+            self.print_view(message=f'Experiment work queue disabled.')
+
+    @staticmethod
+    def help_set_queue():
+        """Shows help for the "set_queue" command."""
+        print('Sets a (shared) work queue file via which the experiment runs are distributed to all nodes serving it '
+              '(default: None, i.e., the runs are executed locally).')
+
+    complete_set_queue = complete_set_folder
+
+    def do_work(self, arg):
+        """Performs the "work" command."""
+        if not self.experiments.work_queue_file_path:
+            self.print_view(message=f'{Fore.RED}No work queue is set (see "set_queue").{Fore.RESET}')
+            return
+        try:
+            idle_timeout = float(arg) if arg.strip() else None
+        except ValueError:
+            self.print_view(message=f'{Fore.RED}"{arg}" is not a valid idle timeout.{Fore.RESET}')
+            return
+
+        try:
+            self.experiments.serve_work_queue(idle_timeout=idle_timeout)
+        except KeyboardInterrupt:
+            pass
+        self.print_view(message=f'Stopped serving the work queue.')
+
+    @staticmethod
+    def help_work():
+        """Shows help for the "work" command."""
+        print('Executes runs of the work queue which were submitted by other nodes, until the queue has been idle for '
+              'the given number of seconds (default: Serve until interrupted).')
+
+    def parse_experiment_selection(self, arg):
+        """Parses the experiment names and options of the "run" and "start" commands.
+
+        Args:
+            arg: The command argument.
+
+        Returns:
+            The selected experiment data (None if an experiment does not exist), and whether "--resume" is set.
+        """
+        args = shlex.split(arg)
+        resume = "--resume" in args
+        exp_names = [a for a in args if a != "--resume"]
         selected_exps = {}
-        if args:
+        if exp_names:
             for exp_name in exp_names:
                 try:
                     selected_exps[exp_name] = self.all_experiment_data[exp_name]
                 except KeyError:
                     self.print_view(message=f'{Fore.RED}Experiment "{exp_name}" does not exist.{Fore.RESET}')
-                    return
+                    return None, resume
         else:
             selected_exps = self.all_experiment_data
+        return selected_exps, resume
 
-        for expr_name, exp_data in selected_exps.items():
-            exp_data["function"]()
+    def do_run(self, arg):
+        """Performs the "run" command."""
+        selected_exps, resume = self.parse_experiment_selection(arg=arg)
+        if selected_exps is None:
+            return
+
+        run_experiment_functions(
+            experiments=self.experiments, experiment_functions=[exp_data["function"]
+                                                                for exp_data in selected_exps.values()],
+            resume=resume)
 
         input("Experiment(s) successfully executed. Press Enter to return to menu ...")
         self.print_view(message=f'Experiments successfully executed.')
@@ -250,13 +567,125 @@ class UppaalObservationMatcherExperimentsCLI(Cmd):
     @staticmethod
     def help_run():
         """Shows help for the "run" command."""
-        print('Run a specific experiment (default: Run all experiments).')
+        print('Run a specific experiment (default: Run all experiments).\n'
+              'With "--resume", runs already contained in the existing logs are skipped.')
+
+    def do_start(self, arg):
+        """Performs the "start" command."""
+        selected_exps, resume = self.parse_experiment_selection(arg=arg)
+        if selected_exps is None:
+            return
+        active_exp_names = set(exp_name for task in self.experiment_driver.get_active_tasks()
+                               for exp_name in task.experiment_names)
+        started_exp_names = sorted(active_exp_names.intersection(selected_exps))
+        if started_exp_names:
+            self.print_view(message=f'{Fore.RED}Experiment(s) {", ".join(started_exp_names)} already started in the '
+                                    f'background.{Fore.RESET}')
+            return
+
+        task = self.experiment_driver.submit(
+            experiments=self.experiments, experiment_functions=[exp_data["function"]
+                                                                for exp_data in selected_exps.values()],
+            experiment_names=list(selected_exps), resume=resume)
+        self.print_view(message=f'Experiment task {task.task_id} started in the background (output: '
+                                f'"{task.output_file_path}").')
+
+    @staticmethod
+    def help_start():
+        """Shows help for the "start" command."""
+        print('Starts a specific experiment in the background with the current settings (default: Start all '
+              'experiments).\nWith "--resume", runs already contained in the existing logs are skipped. The progress '
+              'is shown by "status", and the task can be stopped by "cancel".')
+
+    def do_status(self, _):
+        """Performs the "status" command."""
+        if not self.experiment_driver.tasks:
+            self.print_view(message=f'No experiment tasks started.')
+            return
+        status_strings = [task.get_status_string() for task in self.experiment_driver.tasks.values()]
+        self.print_view(message="Experiment tasks:\n" + "\n".join(status_strings))
+
+    @staticmethod
+    def help_status():
+        """Shows help for the "status" command."""
+        print('Shows the status and progress of the experiment tasks started in the background.')
+
+    def do_cancel(self, arg):
+        """Performs the "cancel" command."""
+        if arg.strip():
+            try:
+                task_ids = [int(arg)]
+            except ValueError:
+                self.print_view(message=f'{Fore.RED}"{arg}" is not a valid task ID.{Fore.RESET}')
+                return
+        else:
+            task_ids = [task.task_id for task in self.experiment_driver.get_active_tasks()]
+
+        cancelled_task_ids = [task_id for task_id in task_ids if self.experiment_driver.cancel(task_id=task_id)]
+        if cancelled_task_ids:
+            self.print_view(message=f'Experiment task(s) {", ".join(map(str, cancelled_task_ids))} cancelled (see '
+                                    f'"status"; the experiments can be continued with "--resume").')
+        else:
+            self.print_view(message=f'{Fore.RED}No active experiment task to cancel.{Fore.RESET}')
+
+    @staticmethod
+    def help_cancel():
+        """Shows help for the "cancel" command."""
+        print('Cancels an experiment task started in the background, and kills its running verifier processes '
+              '(default: Cancel all active tasks).')
+
+    def do_monitor(self, arg):
+        """Performs the "monitor" command."""
+        args = shlex.split(arg)
+        model_file_path = RES_DIR.joinpath("example_models/introduction_example/main-example-model.xml")
+        if "--model" in args:
+            model_arg_idx = args.index("--model")
+            if model_arg_idx + 1 >= len(args):
+                self.print_view(message=f'{Fore.RED}No model file given for "--model".{Fore.RESET}')
+                return
+            model_file_path = pathlib.Path(args[model_arg_idx + 1])
+            del args[model_arg_idx:model_arg_idx + 2]
+        monitor_config = copy.deepcopy(default_monitor_config)
+        try:
+            source = args[0]
+            if len(args) > 1:
+                monitor_config["window_size"] = int(args[1])
+            if len(args) > 2:
+                monitor_config["window_step"] = int(args[2])
+            if len(args) > 3:
+                monitor_config["idle_timeout"] = float(args[3])
+        except (IndexError, ValueError):
+            self.print_view(message=f'{Fore.RED}"{arg}" are not valid monitoring settings.{Fore.RESET}')
+            return
+        if source != stdin_source and not os.path.isfile(source):
+            self.print_view(message=f'{Fore.RED}The observation file "{source}" does not exist.{Fore.RESET}')
+            return
+        if not model_file_path.is_file():
+            self.print_view(message=f'{Fore.RED}The model file "{model_file_path}" does not exist.{Fore.RESET}')
+            return
+
+        monitor_observation_stream(
+            model_file_path=model_file_path, source=source,
+            output_dir_path=self.experiments.experiment_log_dir_path.joinpath("monitoring", model_file_path.stem),
+            monitor_config=monitor_config)
+        input("Monitoring finished. Press Enter to return to menu ...")
+        self.print_view(message=f'Monitoring finished.')
+
+    @staticmethod
+    def help_monitor():
+        """Shows help for the "monitor" command."""
+        print('Matches a sliding window of a growing observation CSV file ("-" reads from stdin) against a model '
+              '(default: the introduction example model), until the file is idle for the given number of seconds or '
+              'the monitoring is interrupted ("monitor <csv_file|-> [window_size [window_step [idle_timeout]]] '
+              '[--model <model_file>]").')
 
     def complete_run(self, text, _line, _start_idx, _end_idx):
         """Autocompletes the experiment name argument of the "run" command."""
-        choices = list(filter(lambda n: n.startswith(text), self.all_experiment_data.keys()))
+        choices = list(filter(lambda n: n.startswith(text), list(self.all_experiment_data.keys()) + ["--resume"]))
         return choices
 
+    complete_start = complete_run
+
     def do_plot(self, arg):
         """Performs the "plot" command."""
         args = shlex.split(arg)
@@ -287,9 +716,11 @@ class UppaalObservationMatcherExperimentsCLI(Cmd):
         choices = list(filter(lambda n: n.startswith(text), self.all_plot_data.keys()))
         return choices
 
-    @staticmethod
-    def do_exit(_=None):
+    def do_exit(self, _=None):
         """Performs the "exit" command."""
+        if self.experiment_driver.get_active_tasks():
+            print(f'Cancelling the experiment tasks running in the background ...')
+        self.experiment_driver.shutdown()
         return True
 
     @staticmethod
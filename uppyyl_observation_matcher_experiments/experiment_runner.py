@@ -3,6 +3,8 @@ import pathlib
 
 from uppyyl_observation_matcher_experiments.backend.experiments.introduction_example.introduction_example import \
     experiment_introduction_example
+from uppyyl_observation_matcher_experiments.backend.experiments.online_monitoring.online_monitor import \
+    default_monitor_config, monitor_observation_stream
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.helper_experiments import \
     HelperExperiments
 from uppyyl_observation_matcher_experiments.backend.experiments.systematic_experiments.systematic_experiments import \
@@ -14,6 +16,18 @@ def main():
     """The main function."""
     experiment_base_dir_path = RES_DIR.parent.joinpath("logs/temp")  # pathlib.Path("/media/temp_disk/experiments")
     experiment_log_dir_path = RES_DIR.parent.joinpath("logs")
+    worker_count = 1  # os.cpu_count()
+    resume = False
+    adaptive_run_config = None  # default_adaptive_run_config
+    early_termination_config = None  # default_early_termination_config
+    time_budget_config = None  # dict(default_time_budget_config, time_budget=4 * 60 * 60)
+    verifier_backend_config = None  # dict(default_verifier_backend_config, max_process_count=8)
+    # verifier_backend_config["collect_statistics"] = True
+    batch_concurrency = 1  # 4
+    result_cache_config = None  # default_result_cache_config
+    use_observation_prefilter = False
+    memory_sampling_config = None  # default_memory_sampling_config
+    work_queue_file_path = None  # pathlib.Path("/media/shared_disk/experiments/work_queue.sqlite")
 
     ####################################
     # Helper Experiments
@@ -26,8 +40,18 @@ def main():
     # Experiments
     ####################################
     systematic_experiments = SystematicExperiments(
-        experiment_base_dir_path=experiment_base_dir_path, experiment_log_dir_path=experiment_log_dir_path)
+        experiment_base_dir_path=experiment_base_dir_path, experiment_log_dir_path=experiment_log_dir_path,
+        worker_count=worker_count, use_memory_backed_workspaces=False, keep_failed_workspaces=False,
+        resume=resume, work_queue_file_path=work_queue_file_path, adaptive_run_config=adaptive_run_config,
+        early_termination_config=early_termination_config, time_budget_config=time_budget_config,
+        verifier_backend_config=verifier_backend_config, batch_concurrency=batch_concurrency,
+        result_cache_config=result_cache_config, use_observation_prefilter=use_observation_prefilter,
+        memory_sampling_config=memory_sampling_config)
+    # systematic_experiments.serve_work_queue()
     # experiment_introduction_example()
+    # monitor_observation_stream(
+    #     model_file_path=RES_DIR.joinpath("example_models/introduction_example/main-example-model.xml"), source="-",
+    #     output_dir_path=experiment_log_dir_path.joinpath("monitoring"), monitor_config=default_monitor_config)
     # systematic_experiments.experiment_full_workflow_with_positive_and_negative_observations()
     # systematic_experiments.experiment_compare_performance_of_matcher_models()
     systematic_experiments.experiment_compare_performance_of_observation_types()
@@ -17,6 +17,7 @@ def main():
     plots.create_latex_table_for_compare_performance_of_matcher_models(save_plot=True, show_plot=True)
     plots.create_latex_table_for_compare_performance_of_observation_types(save_plot=True, show_plot=True)
     plots.create_plot_for_compare_performance_of_observation_sizes_and_extents(save_plot=True, show_plot=True)
+    plots.create_csv_file_for_phase_durations(save_plot=True, show_plot=True)
 
 
 if __name__ == '__main__':